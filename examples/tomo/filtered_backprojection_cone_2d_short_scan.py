@@ -47,7 +47,9 @@ fbp = odl.tomo.fbp_op(ray_trafo, filter_type='Hann', frequency_scaling=0.8)
 # Apply parker weighting in order to improve reconstruction
 parker_weighting = odl.tomo.parker_weighting(ray_trafo)
 parker_weighting.show()
-parker_weighted_fbp = fbp * parker_weighting
+parker_weighted_fbp = odl.tomo.fbp_op(ray_trafo, filter_type='Hann',
+                                      frequency_scaling=0.8,
+                                      weighting=parker_weighting)
 
 
 # --- Show some examples --- #
@@ -48,9 +48,12 @@ ray_trafo = odl.tomo.RayTransform(reco_space, geometry, impl='astra_cuda')
 fbp = odl.tomo.fbp_op(ray_trafo,
                       filter_type='Shepp-Logan', frequency_scaling=0.8)
 
-# Apply parker weighting in order to improve reconstruction
+# Apply parker weighting in order to improve reconstruction. The weights are
+# applied in the same pass as the filtering.
 parker_weighting = odl.tomo.parker_weighting(ray_trafo)
-parker_weighted_fbp = fbp * parker_weighting
+parker_weighted_fbp = odl.tomo.fbp_op(ray_trafo, filter_type='Shepp-Logan',
+                                      frequency_scaling=0.8,
+                                      weighting=parker_weighting)
 
 
 # --- Show some examples --- #
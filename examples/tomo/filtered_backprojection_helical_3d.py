@@ -38,8 +38,11 @@ ray_trafo = odl.tomo.RayTransform(space, geometry)
 # avoid high frequency noise.
 fbp = odl.tomo.fbp_op(ray_trafo, filter_type='Hamming', frequency_scaling=0.8)
 
-# Create Tam-Danielson window to improve result
-windowed_fbp = fbp * odl.tomo.tam_danielson_window(ray_trafo)
+# Create Tam-Danielson window to improve result, it is applied in the same
+# pass as the filtering
+td_window = odl.tomo.tam_danielson_window(ray_trafo)
+windowed_fbp = odl.tomo.fbp_op(ray_trafo, filter_type='Hamming',
+                               frequency_scaling=0.8, weighting=td_window)
 
 
 # --- Show some examples --- #
@@ -13,6 +13,8 @@ restricted to) inverse problems.
 """
 
 from __future__ import absolute_import
+import importlib
+import sys
 import numpy as np
 
 __version__ = '1.0.0.dev0'
@@ -59,15 +61,33 @@ __all__ += discr.__all__
 # More "advanced" subpackages keep their namespaces separate from top-level,
 # we only import the modules themselves
 from . import contrib
-from . import deform
-from . import diagnostics
-from . import phantom
-from . import solvers
-from . import tomo
-from . import trafos
-from . import ufunc_ops
 from . import util
 
+# These subpackages and their (optional) back-ends are comparatively
+# expensive to import. They are imported on first access, e.g., of
+# `odl.tomo`, which is possible with module-level `__getattr__` since
+# Python 3.7.
+_LAZY_SUBPACKAGES = ('deform', 'diagnostics', 'phantom', 'solvers', 'tomo',
+                     'trafos', 'ufunc_ops')
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Import a lazily loaded subpackage on first access."""
+        if name in _LAZY_SUBPACKAGES:
+            # Importing binds the subpackage in this namespace, so this
+            # function is not called again for the same name
+            return importlib.import_module('.' + name, __name__)
+        raise AttributeError('module {!r} has no attribute {!r}'
+                             ''.format(__name__, name))
+
+    def __dir__():
+        """Return the attributes, including not yet loaded subpackages."""
+        return sorted(frozenset(globals()).union(_LAZY_SUBPACKAGES))
+else:
+    for _name in _LAZY_SUBPACKAGES:
+        importlib.import_module('.' + _name, __name__)
+    del _name
+
 # Add `test` function to global namespace so users can run `odl.test()`
 from .util import test
 __all__ += ('test',)
@@ -17,8 +17,14 @@ In addition to the standard ODL requirements, this library also requires:
 """
 
 from __future__ import division
+import hashlib
+import json
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import numpy as np
 import os
+import shutil
+import tempfile
 import dicom
 import odl
 import tqdm
@@ -34,55 +40,167 @@ NameDict.update((CleanName(tag), tag) for tag in new_dict_items)
 __all__ = ('load_projections', 'load_reconstruction')
 
 
-def _read_projections(folder, indices):
-    """Read mayo projections from a folder."""
-    datasets = []
+# DICOM fields of the projection files that are needed for the geometry
+PROJECTION_GEOMETRY_FIELDS = (
+    'NumberofDetectorRows', 'NumberofDetectorColumns',
+    'DetectorElementTransverseSpacing', 'DetectorElementAxialSpacing',
+    'DetectorCentralElement', 'DetectorFocalCenterAngularPosition',
+    'DetectorFocalCenterAxialPosition', 'DetectorFocalCenterRadialDistance',
+    'ConstantRadialDistance', 'SourceAxialPositionShift',
+    'SourceAngularPositionShift', 'SourceRadialDistanceShift')
 
-    # Get the relevant file names
-    file_names = sorted([f for f in os.listdir(folder) if f.endswith(".dcm")])
 
-    if len(file_names) == 0:
-        raise ValueError('No DICOM files found in {}'.format(folder))
+def _header_value(value):
+    """Convert a DICOM value to a float or a list of floats."""
+    try:
+        return [float(v) for v in value]
+    except TypeError:
+        return float(value)
 
-    file_names = file_names[indices]
 
-    data_array = None
+def _decode_projection(file_name, out):
+    """Read a projection file into ``out`` and return its geometry fields.
 
-    for i, file_name in enumerate(tqdm.tqdm(file_names,
-                                            'Loading projection data')):
-        # read the file
-        dataset = dicom.read_file(folder + '/' + file_name)
+    The pixel data is decoded, flipped and rescaled in place in ``out``,
+    without intermediate arrays of the full projection size.
+    """
+    dataset = dicom.read_file(file_name)
+    rows = dataset.NumberofDetectorRows
+    cols = dataset.NumberofDetectorColumns
 
-        # Get some required data
-        rows = dataset.NumberofDetectorRows
-        cols = dataset.NumberofDetectorColumns
-        hu_factor = dataset.HUCalibrationFactor
-        rescale_intercept = dataset.RescaleIntercept
-        rescale_slope = dataset.RescaleSlope
+    # View of the pixel data with shape (cols, rows), flipped along rows
+    pixels = np.frombuffer(dataset.PixelData, 'H')
+    pixels = pixels.reshape([rows, cols], order='F').T[:, ::-1]
 
-        # Load the array as bytes
-        proj_array = np.array(np.frombuffer(dataset.PixelData, 'H'),
-                              dtype='float32')
-        proj_array = proj_array.reshape([rows, cols], order='F').T
+    np.multiply(pixels, np.float32(dataset.RescaleSlope), out=out,
+                dtype='float32')
+    out += np.float32(dataset.RescaleIntercept)
+    out /= np.float32(dataset.HUCalibrationFactor)
 
-        # Rescale array
-        proj_array *= rescale_slope
-        proj_array += rescale_intercept
-        proj_array /= hu_factor
+    return {name: _header_value(getattr(dataset, name))
+            for name in PROJECTION_GEOMETRY_FIELDS}
 
-        # Store results
-        if data_array is None:
-            # We need to load the first dataset before we know the shape
-            data_array = np.empty((len(file_names), cols, rows),
-                                  dtype='float32')
 
-        data_array[i] = proj_array[:, ::-1]
-        datasets.append(dataset)
+def _decode_projection_to_file(args):
+    """Worker for process pools, writing into a ``.npy`` file."""
+    file_name, npy_file, index = args
+    data_array = np.load(npy_file, mmap_mode='r+')
+    header = _decode_projection(file_name, data_array[index])
+    data_array.flush()
+    return index, header
+
+
+def _projections_cache_key(file_names):
+    """Return a hash identifying the contents of ``file_names``."""
+    key = hashlib.sha1()
+    for file_name in file_names:
+        stat = os.stat(file_name)
+        key.update('{}:{}:{}'.format(os.path.abspath(file_name),
+                                     stat.st_size, stat.st_mtime).encode())
+    return key.hexdigest()
 
-    return datasets, data_array
 
+def _read_projections(folder, indices, num_workers=None,
+                      use_processes=False, cache_dir=None):
+    """Read mayo projections from a folder.
 
-def load_projections(folder, indices=None):
+    Returns
+    -------
+    headers : list of dict
+        The `PROJECTION_GEOMETRY_FIELDS` of each file.
+    data_array : `numpy.ndarray`
+        Projection data of shape ``(num_files, cols, rows)``. If
+        ``cache_dir`` is given, this is a memory map of the cached data.
+    """
+    # Get the relevant file names
+    file_names = sorted([f for f in os.listdir(folder) if f.endswith(".dcm")])
+
+    if len(file_names) == 0:
+        raise ValueError('No DICOM files found in {}'.format(folder))
+
+    file_names = [os.path.join(folder, f) for f in file_names]
+    file_names = np.array(file_names)[indices].ravel().tolist()
+
+    if cache_dir is not None:
+        cache_name = os.path.join(
+            cache_dir,
+            'mayo_projections_' + _projections_cache_key(file_names))
+        if os.path.exists(cache_name + '.json'):
+            with open(cache_name + '.json') as f:
+                headers = json.load(f)
+            return headers, np.load(cache_name + '.npy', mmap_mode='r')
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+
+    # Only the header of the first file is needed for the shape
+    first = dicom.read_file(file_names[0], stop_before_pixels=True)
+    shape = (len(file_names), int(first.NumberofDetectorColumns),
+             int(first.NumberofDetectorRows))
+
+    # Processes and the cache need the data in a file, otherwise it is
+    # decoded directly into memory
+    tmp_dir = None
+    if cache_dir is not None:
+        npy_file = cache_name + '.npy.part'
+    elif use_processes:
+        tmp_dir = tempfile.mkdtemp()
+        npy_file = os.path.join(tmp_dir, 'projections.npy')
+    else:
+        npy_file = None
+
+    if npy_file is None:
+        data_array = np.empty(shape, dtype='float32')
+    else:
+        data_array = np.lib.format.open_memmap(npy_file, mode='w+',
+                                               dtype='float32', shape=shape)
+        data_array.flush()
+
+    headers = [None] * len(file_names)
+    try:
+        if use_processes:
+            pool = multiprocessing.Pool(num_workers)
+            tasks = [(file_name, npy_file, i)
+                     for i, file_name in enumerate(file_names)]
+            results = pool.imap_unordered(_decode_projection_to_file, tasks)
+        else:
+            pool = ThreadPool(num_workers)
+            results = pool.imap_unordered(
+                lambda i: (i, _decode_projection(file_names[i],
+                                                 data_array[i])),
+                range(len(file_names)))
+
+        try:
+            for i, header in tqdm.tqdm(results, 'Loading projection data',
+                                       total=len(file_names)):
+                headers[i] = header
+        finally:
+            pool.close()
+            pool.join()
+
+        if cache_dir is not None:
+            data_array.flush()
+            del data_array
+            os.rename(npy_file, cache_name + '.npy')
+            with open(cache_name + '.json', 'w') as f:
+                json.dump(headers, f)
+            data_array = np.load(cache_name + '.npy', mmap_mode='r')
+        elif use_processes:
+            data_array = np.load(npy_file)
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        elif cache_dir is not None and os.path.exists(npy_file):
+            # Incomplete cache file after an error
+            os.remove(npy_file)
+
+    return headers, data_array
+
+
+def load_projections(folder, indices=None, num_workers=None,
+                     use_processes=False, cache_dir=None):
     """Load geometry and data stored in Mayo format from folder.
 
     Parameters
@@ -92,6 +210,19 @@ def load_projections(folder, indices=None):
     indices : optional
         Indices of the projections to load.
         Accepts advanced indexing such as slice or list of indices.
+    num_workers : positive int, optional
+        Number of threads or processes reading the files in parallel.
+        Default: number of CPUs
+    use_processes : bool, optional
+        If ``True``, read the files in a process pool instead of a thread
+        pool. This is faster if parsing the DICOM files, which holds the
+        Python GIL, dominates the reading time. The processes write to a
+        temporary ``.npy`` file, unless ``cache_dir`` is given.
+    cache_dir : str, optional
+        Directory in which the decoded projection data and the geometry
+        information are cached. If the same files (identified by name,
+        size and modification time) are loaded again, the DICOM files
+        are not read, and the data is memory-mapped from the cache.
 
     Returns
     -------
@@ -101,38 +232,42 @@ def load_projections(folder, indices=None):
         Projection data, given as the line integral of the linear attenuation
         coefficient (g/cm^3). Its unit is thus g/cm^2.
     """
-    datasets, data_array = _read_projections(folder, indices)
+    headers, data_array = _read_projections(
+        folder, indices, num_workers=num_workers,
+        use_processes=use_processes, cache_dir=cache_dir)
 
     # Get the angles
-    angles = [d.DetectorFocalCenterAngularPosition for d in datasets]
+    angles = [h['DetectorFocalCenterAngularPosition'] for h in headers]
     angles = -np.unwrap(angles) - np.pi  # different defintion of angles
 
     # Set minimum and maximum corners
-    shape = np.array([datasets[0].NumberofDetectorColumns,
-                      datasets[0].NumberofDetectorRows])
-    pixel_size = np.array([datasets[0].DetectorElementTransverseSpacing,
-                           datasets[0].DetectorElementAxialSpacing])
+    shape = np.array([headers[0]['NumberofDetectorColumns'],
+                      headers[0]['NumberofDetectorRows']], dtype=int)
+    pixel_size = np.array([headers[0]['DetectorElementTransverseSpacing'],
+                           headers[0]['DetectorElementAxialSpacing']])
 
     # Correct from center of pixel to corner of pixel
-    minp = -(np.array(datasets[0].DetectorCentralElement) - 0.5) * pixel_size
+    minp = -(np.array(headers[0]['DetectorCentralElement']) - 0.5) * pixel_size
     maxp = minp + shape * pixel_size
 
     # Select geometry parameters
-    src_radius = datasets[0].DetectorFocalCenterRadialDistance
-    det_radius = (datasets[0].ConstantRadialDistance -
-                  datasets[0].DetectorFocalCenterRadialDistance)
+    src_radius = headers[0]['DetectorFocalCenterRadialDistance']
+    det_radius = (headers[0]['ConstantRadialDistance'] -
+                  headers[0]['DetectorFocalCenterRadialDistance'])
 
     # For unknown reasons, mayo does not include the tag
     # "TableFeedPerRotation", which is what we want.
     # Instead we manually compute the pitch
-    pitch = ((datasets[-1].DetectorFocalCenterAxialPosition -
-              datasets[0].DetectorFocalCenterAxialPosition) /
+    pitch = ((headers[-1]['DetectorFocalCenterAxialPosition'] -
+              headers[0]['DetectorFocalCenterAxialPosition']) /
              ((np.max(angles) - np.min(angles)) / (2 * np.pi)))
 
     # Get flying focal spot data
-    offset_axial = np.array([d.SourceAxialPositionShift for d in datasets])
-    offset_angular = np.array([d.SourceAngularPositionShift for d in datasets])
-    offset_radial = np.array([d.SourceRadialDistanceShift for d in datasets])
+    offset_axial = np.array([h['SourceAxialPositionShift'] for h in headers])
+    offset_angular = np.array([h['SourceAngularPositionShift']
+                               for h in headers])
+    offset_radial = np.array([h['SourceRadialDistanceShift']
+                              for h in headers])
 
     # TODO(adler-j): Implement proper handling of flying focal spot.
     # Currently we do not fully account for it, merely making some "first
@@ -163,7 +298,7 @@ def load_projections(folder, indices=None):
 
     # Convert offset to odl defintions
     offset_along_axis = (mean_offset_along_axis_for_ffz +
-                         datasets[0].DetectorFocalCenterAxialPosition -
+                         headers[0]['DetectorFocalCenterAxialPosition'] -
                          angles[0] / (2 * np.pi) * pitch)
 
     # Assemble geometry
@@ -353,6 +353,30 @@ class MRCHeaderProperties(object):
                 axis_order = (0, 1, 2)
             return axis_order
 
+    @property
+    def data_section_axis(self):
+        """Axis of `data_shape` along which sections are stored.
+
+        Sections are the slices along the slowest varying axis in the
+        file, i.e., the last axis of `data_storage_shape`. Each range of
+        sections occupies a contiguous block in the file.
+        """
+        return tuple(self.data_axis_order).index(2)
+
+    @property
+    def section_size_bytes(self):
+        """Size of one section in the file in bytes.
+
+        See Also
+        --------
+        data_section_axis
+        """
+        if self.data_shape == -1:
+            raise ValueError('size of the sections is not known before the '
+                             'header has been set')
+        nx, ny, _ = self.data_storage_shape
+        return nx * ny * self.data_dtype.itemsize
+
     @property
     def cell_sides_angstrom(self):
         """Array of sizes of a unit cell in Angstroms.
@@ -586,7 +610,7 @@ extended-mrc-format-not-used-by-2dx
             raise ValueError("`groupby` '{}' not understood"
                              "".format(groupby_in))
 
-    def read_data(self, dstart=None, dend=None, swap_axes=True):
+    def read_data(self, dstart=None, dend=None, swap_axes=True, mmap=False):
         """Read the data from `file` and return it as Numpy array.
 
         Parameters
@@ -604,19 +628,105 @@ extended-mrc-format-not-used-by-2dx
             If ``True``, use `data_axis_order` to swap the axes in the
             returned array. In that case, the shape of the array may no
             longer agree with `data_storage_shape`.
+        mmap : bool, optional
+            If ``True``, return a read-only view of a `numpy.memmap` of
+            the data instead of reading it into memory. Reshaping and
+            swapping of axes do not copy the data, and only the parts
+            that are accessed are loaded from disk.
 
         Returns
         -------
         data : `numpy.ndarray`
             The data read from `file`.
+
+        See Also
+        --------
+        read_sections : Read a range of sections.
+        read_subvolume : Read an arbitrary part of the volume.
         """
-        data = super(FileReaderMRC, self).read_data(dstart, dend)
-        data = data.reshape(self.data_shape, order='F')
+        data = super(FileReaderMRC, self).read_data(dstart, dend, mmap=mmap)
+        data = data.reshape(self.data_storage_shape, order='F')
         if swap_axes:
             data = np.transpose(data, axes=self.data_axis_order)
             assert data.shape == self.data_shape
         return data
 
+    def read_sections(self, start, stop=None, swap_axes=True, mmap=False):
+        """Read a range of sections from `file`.
+
+        Only the bytes of the requested sections are read, i.e., the
+        memory needed is proportional to ``stop - start``. If the header
+        has not been read yet, `read_header` is called first.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first section to read. Negative values count
+            from the end.
+        stop : int, optional
+            Index of the section after the last one to read. Negative
+            values count from the end. For ``None``, all sections from
+            ``start`` on are read.
+        swap_axes : bool, optional
+            If ``True``, use `data_axis_order` to swap the axes in the
+            returned array. In that case, the sections are taken along
+            `data_section_axis`. Otherwise, the sections are along the
+            last axis.
+        mmap : bool, optional
+            If ``True``, return a view of a `numpy.memmap` instead of
+            reading the sections into memory.
+
+        Returns
+        -------
+        data : `numpy.ndarray`
+            The sections read from `file`. Its shape is `data_shape` (or
+            `data_storage_shape` if ``swap_axes=False``) with
+            ``stop - start`` sections.
+        """
+        if not self.header:
+            self.read_header()
+
+        nx, ny, nz = self.data_storage_shape
+        start, stop, _ = slice(start, stop).indices(nz)
+        if start >= stop:
+            raise ValueError('empty range of sections ({}, {})'
+                             ''.format(start, stop))
+
+        dstart = self.header_size + start * self.section_size_bytes
+        dend = self.header_size + stop * self.section_size_bytes
+        data = super(FileReaderMRC, self).read_data(dstart, dend, mmap=mmap)
+        data = data.reshape((nx, ny, stop - start), order='F')
+        if swap_axes:
+            data = np.transpose(data, axes=self.data_axis_order)
+        return data
+
+    def read_subvolume(self, index, swap_axes=True):
+        """Read a part of the data from `file`.
+
+        The data is accessed through a `numpy.memmap`, such that only
+        the parts of the file containing the subvolume are loaded. If the
+        header has not been read yet, `read_header` is called first.
+
+        Parameters
+        ----------
+        index : index expression
+            Indices of the subvolume with respect to `data_shape`, or
+            to `data_storage_shape` if ``swap_axes=False``, e.g.,
+            ``np.s_[:, 10:20, ::2]``.
+        swap_axes : bool, optional
+            If ``True``, use `data_axis_order` to swap the axes of the
+            data before indexing.
+
+        Returns
+        -------
+        data : `numpy.ndarray`
+            Newly allocated array containing the subvolume.
+        """
+        if not self.header:
+            self.read_header()
+        data = self.read_data(swap_axes=swap_axes, mmap=True)
+        return np.array(data[index])
+
 
 class FileWriterMRC(MRCHeaderProperties, FileWriterRawBinaryWithHeader):
 
@@ -633,6 +743,28 @@ class FileWriterMRC(MRCHeaderProperties, FileWriterRawBinaryWithHeader):
     Biology, 129 (2015), pp 146--150.
     """
 
+    def __init__(self, file, header=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        file : file-like or str
+            Stream or filename to which to write the data. A stream
+            must be open in a writable mode.
+        header : `OrderedDict`, optional
+            Header in form of an ordered dictionary, see
+            `mrc_header_from_params`. For ``None``, no header is written.
+        """
+        # `MRCHeaderProperties` has no `__init__`, so this calls
+        # `FileWriterRawBinaryWithHeader.__init__`
+        super(FileWriterMRC, self).__init__(file, header)
+        self.__next_section = 0
+
+    @property
+    def next_section(self):
+        """Index of the section written next by `append_sections`."""
+        return self.__next_section
+
     def write_data(self, data, dstart=None, swap_axes=True):
         """Write ``data`` to `file`.
 
@@ -652,31 +784,110 @@ class FileWriterMRC(MRCHeaderProperties, FileWriterRawBinaryWithHeader):
             order.
         """
         if dstart is None:
-            shape = self.data_shape
-            dstart = int(self.header_size)
-        elif dstart < 0:
+            shape = self.data_shape if swap_axes else self.data_storage_shape
+            data = np.asarray(data, dtype=self.data_dtype).reshape(shape)
+            self.write_sections(data, 0, swap_axes=swap_axes)
+            return
+
+        if dstart < 0:
             raise ValueError('`dstart` must be non-negative, got {}'
                              ''.format(dstart))
-        else:
-            shape = -1
-            dstart = int(dstart)
-
+        dstart = int(dstart)
         if dstart < self.header_size:
             raise ValueError('invalid `dstart`, resulting in absolute '
                              '`dstart` < `header_size` ({} < {})'
                              ''.format(dstart, self.header_size))
 
-        data = np.asarray(data, dtype=self.data_dtype).reshape(shape)
+        data = np.asarray(data, dtype=self.data_dtype).reshape(-1)
+        self.file.seek(dstart)
+        data.tofile(self.file)
+
+    def write_sections(self, data, start, swap_axes=True):
+        """Write a range of sections to `file`.
+
+        The sections are written one at a time, such that no copy of the
+        full ``data`` is made.
+
+        Parameters
+        ----------
+        data : `array-like`
+            Sections that should be written, either a 3D array with the
+            shape of `data_shape` except along `data_section_axis`, or
+            a 2D array for a single section.
+        start : int
+            Index of the first section to be written.
+        swap_axes : bool, optional
+            If ``True``, use the ``'mapc', 'mapr', 'maps'`` header entries
+            to swap the axes in the ``data`` before writing. Use ``False``
+            only if the data is already consistent with the final axis
+            order, i.e., the sections are along the last axis.
+
+        See Also
+        --------
+        append_sections
+        """
+        if self.data_shape == -1:
+            raise ValueError('cannot write sections without header')
+
+        nx, ny, nz = self.data_storage_shape
+        data = np.asarray(data, dtype=self.data_dtype)
+        if data.ndim == 2:
+            axis = self.data_section_axis if swap_axes else 2
+            data = np.expand_dims(data, axis)
         if swap_axes:
             # Need to argsort here since `data_axis_order` tells
             # "which axis comes from where", which is the inverse of what the
             # `transpose` function needs.
             data = np.transpose(data, axes=np.argsort(self.data_axis_order))
-            assert data.shape == self.data_storage_shape
 
-        data = data.reshape(-1, order='F')
-        self.file.seek(dstart)
-        data.tofile(self.file)
+        start = int(start)
+        stop = start + data.shape[2]
+        if data.shape[:2] != (nx, ny):
+            raise ValueError('sections of `data` have shape {}, expected {}'
+                             ''.format(data.shape[:2], (nx, ny)))
+        if start < 0 or stop > nz:
+            raise ValueError('sections ({}, {}) out of range for {} sections'
+                             ''.format(start, stop, nz))
+
+        self.file.seek(self.header_size + start * self.section_size_bytes)
+        for i in range(data.shape[2]):
+            data[:, :, i].ravel(order='F').tofile(self.file)
+        self.__next_section = stop
+
+    def append_sections(self, data, swap_axes=True):
+        """Write sections following the previously written ones.
+
+        This allows to write a large volume in chunks, e.g., while it is
+        being computed, without holding the full volume in memory. The
+        first call writes at the start of the data block, subsequent
+        calls continue after the last section written by
+        `write_sections` or `append_sections`.
+
+        Parameters
+        ----------
+        data : `array-like`
+            Sections that should be written, see `write_sections`.
+        swap_axes : bool, optional
+            If ``True``, use the ``'mapc', 'mapr', 'maps'`` header entries
+            to swap the axes in the ``data`` before writing.
+
+        Examples
+        --------
+        Write a volume of 4 sections in chunks of 2 sections:
+
+        >>> import tempfile
+        >>> header = mrc_header_from_params((2, 3, 4), 'float32', 'volume')
+        >>> with tempfile.NamedTemporaryFile() as f:
+        ...     with FileWriterMRC(f, header) as writer:
+        ...         writer.write_header()
+        ...         writer.append_sections(np.zeros((2, 3, 2)))
+        ...         writer.append_sections(np.ones((2, 3, 2)))
+        ...     with FileReaderMRC(f) as reader:
+        ...         data = reader.read_sections(1, 3)
+        >>> data[0, 0]
+        array([ 0.,  1.], dtype=float32)
+        """
+        self.write_sections(data, self.next_section, swap_axes=swap_axes)
 
 
 def mrc_header_from_params(shape, dtype, kind, **kwargs):
@@ -217,5 +217,64 @@ def test_mrc_io(shape, mrc_mode_dtype, ispg_kind, axis_order):
         assert reader.labels == ()
 
 
+def test_mrc_io_chunked(shape, axis_order):
+    """Test memory-mapped, section and subvolume reads and chunked writes."""
+    dtype = np.dtype('float32')
+    header = mrc_header_from_params(shape, dtype, 'volume',
+                                    axis_order=axis_order)
+    data = np.random.rand(*shape).astype(dtype)
+
+    with tempfile.NamedTemporaryFile() as named_file:
+        file = named_file.file
+
+        # Write in chunks of at most 2 sections, along the right axis
+        with FileWriterMRC(file, header) as writer:
+            writer.write_header()
+            sec_axis = writer.data_section_axis
+            assert shape[sec_axis] == writer.data_storage_shape[2]
+            nsec = shape[sec_axis]
+            for start in range(0, nsec, 2):
+                chunk = np.take(data, range(start, min(start + 2, nsec)),
+                                axis=sec_axis)
+                writer.append_sections(chunk)
+            assert writer.next_section == nsec
+            with pytest.raises(ValueError):
+                writer.append_sections(np.take(data, [0], axis=sec_axis))
+
+            # Single 2D section and wrong sizes
+            writer.write_sections(np.take(data, 0, axis=sec_axis), 0)
+            assert writer.next_section == 1
+            with pytest.raises(ValueError):
+                writer.write_sections(np.zeros((2, 2, 2)), 0)
+
+        with FileReaderMRC(file) as reader:
+            # Header is read on demand
+            section = reader.read_sections(-1)
+            assert np.array_equal(section,
+                                  np.take(data, [-1], axis=sec_axis))
+
+            full = reader.read_data()
+            assert np.array_equal(full, data)
+            full_mmap = reader.read_data(mmap=True)
+            assert isinstance(full_mmap.base, np.memmap)
+            assert np.array_equal(full_mmap, data)
+
+            stop = min(3, nsec)
+            for mmap in (False, True):
+                sections = reader.read_sections(0, stop, mmap=mmap)
+                assert np.array_equal(
+                    sections, np.take(data, range(stop), axis=sec_axis))
+            storage = reader.read_sections(0, stop, swap_axes=False)
+            assert storage.shape[2] == stop
+
+            index = np.s_[::2, -1:, 1:]
+            subvolume = reader.read_subvolume(index)
+            assert type(subvolume) is np.ndarray
+            assert np.array_equal(subvolume, data[index])
+
+            with pytest.raises(ValueError):
+                reader.read_sections(1, 1)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -460,7 +460,7 @@ class FileReaderRawBinaryWithHeader(object):
 
         return header
 
-    def read_data(self, dstart=None, dend=None):
+    def read_data(self, dstart=None, dend=None, mmap=False):
         """Read data from `file` and return it as Numpy array.
 
         Parameters
@@ -474,6 +474,12 @@ class FileReaderRawBinaryWithHeader(object):
             End position in bytes until which data is read (exclusive).
             Backwards indexing with negative values is also supported.
             Use a value different from the file size to extract a data subset.
+        mmap : bool, optional
+            If ``True``, return a read-only `numpy.memmap` of the data
+            instead of reading it into memory. Creating the map is cheap
+            regardless of the data size, and only the accessed parts of
+            the data are loaded from disk. This requires `file` to be
+            an actual file with a file descriptor.
 
         Returns
         -------
@@ -520,6 +526,10 @@ class FileReaderRawBinaryWithHeader(object):
                 'the itemsize {} of the data type {}'
                 ''.format(dend_abs - dstart_abs, self.data_dtype.itemsize,
                           self.data_dtype))
+        if mmap:
+            return np.memmap(self.file, dtype=self.data_dtype, mode='r',
+                             offset=dstart_abs, shape=(int(num_elems),))
+
         self.file.seek(dstart_abs)
         array = np.empty(int(num_elems), dtype=self.data_dtype)
         self.file.readinto(array.data)
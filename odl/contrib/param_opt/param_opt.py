@@ -8,14 +8,122 @@
 
 """Method(s) to find optimal reconstruction parameter(s) w.r.t. given FOM."""
 
+from __future__ import division
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
 import scipy.optimize
 
 __all__ = ('optimal_parameters', )
 
 
+# Problem definition in worker processes, see `_init_worker`
+_WORKER_PROBLEM = None
+
+
+def _init_worker(reconstruction, fom, phantoms, data):
+    """Store the problem in a worker process of the pool.
+
+    With the ``fork`` start method, the arguments are inherited instead of
+    pickled, such that local functions can be used.
+    """
+    global _WORKER_PROBLEM
+    _WORKER_PROBLEM = (reconstruction, fom, phantoms, data)
+
+
+def _evaluate_in_worker(task):
+    """Return the figure of merit for ``task = (index, parameters)``."""
+    reconstruction, fom, phantoms, data = _WORKER_PROBLEM
+    index, parameters = task
+    return fom(reconstruction(data[index], parameters), phantoms[index])
+
+
+def _parameters_key(parameters):
+    """Return a hashable key for ``parameters``."""
+    return tuple(float(p) for p in np.ravel(parameters))
+
+
+class _FomSum(object):
+
+    """Sum of figures of merit over all phantoms as function of parameters.
+
+    Results are stored per pair of parameters and phantom, such that
+    points probed repeatedly by the optimizer are not recomputed.
+    """
+
+    def __init__(self, reconstruction, fom, phantoms, data, pool=None,
+                 use_processes=False, cache=True):
+        """Initialize a new instance."""
+        self.reconstruction = reconstruction
+        self.fom = fom
+        self.phantoms = phantoms
+        self.data = data
+        self.pool = pool
+        self.use_processes = use_processes
+        self.cache = {} if cache else None
+
+    def _evaluate(self, task):
+        """Return the figure of merit for ``task = (index, parameters)``."""
+        index, parameters = task
+        return self.fom(self.reconstruction(self.data[index], parameters),
+                        self.phantoms[index])
+
+    def evaluate_many(self, parameter_list):
+        """Return the sums for all ``parameter_list`` entries at once.
+
+        All missing (parameters, phantom) pairs are evaluated in one batch
+        of pool tasks.
+        """
+        results = {} if self.cache is None else self.cache
+        keys = [_parameters_key(params) for params in parameter_list]
+
+        tasks = []
+        pending = set()
+        for key, params in zip(keys, parameter_list):
+            for index in range(len(self.phantoms)):
+                if (key, index) not in results and (key, index) not in pending:
+                    pending.add((key, index))
+                    tasks.append((index, params))
+
+        if self.pool is None:
+            values = [self._evaluate(task) for task in tasks]
+        elif self.use_processes:
+            values = self.pool.map(_evaluate_in_worker, tasks)
+        else:
+            values = self.pool.map(self._evaluate, tasks)
+
+        for (index, params), value in zip(tasks, values):
+            results[_parameters_key(params), index] = value
+
+        # Sum in the order of the phantoms for reproducible results
+        return [sum(results[key, index] for index in range(len(self.phantoms)))
+                for key in keys]
+
+    def __call__(self, parameters):
+        """Return the sum of figures of merit for ``parameters``."""
+        return self.evaluate_many([parameters])[0]
+
+
+def _univariate_bracket(values, fom_values):
+    """Return a bracket for `scipy.optimize.minimize_scalar` from a grid."""
+    order = np.argsort(values)
+    values = np.asarray(values)[order]
+    fom_values = np.asarray(fom_values)[order]
+    i = int(np.argmin(fom_values))
+    if (0 < i < len(values) - 1 and fom_values[i] < fom_values[i - 1] and
+            fom_values[i] < fom_values[i + 1]):
+        return (values[i - 1], values[i], values[i + 1])
+    elif i < len(values) - 1:
+        return (values[i], values[i + 1])
+    else:
+        return (values[i - 1], values[i])
+
+
 def optimal_parameters(reconstruction, fom, phantoms, data,
-                       initial=None, univariate=False):
+                       initial=None, univariate=False, grid=None,
+                       num_workers=1, use_processes=True, cache=True):
     r"""Find the optimal parameters for a reconstruction method.
 
     Notes
@@ -59,32 +167,87 @@ def optimal_parameters(reconstruction, fom, phantoms, data,
         Initial guess for the parameters. It is
         - a required array in the multivariate case
         - an optional pair in the univariate case.
+        It is ignored if ``grid`` is given.
     univariate : bool, optional
         Whether to use a univariate solver
+    grid : sequence, optional
+        Candidate values to be evaluated before the local optimization,
+        as a sequence of values in the univariate case and as a sequence
+        containing a sequence of values per parameter in the multivariate
+        case. All (combinations of) values are evaluated in one batch,
+        and the best one is used as starting point (the bracket in the
+        univariate case).
+    num_workers : positive int, optional
+        Number of workers evaluating the reconstructions of the different
+        phantoms (and grid points) concurrently. ``None`` means the number
+        of CPUs. For 1, everything is evaluated in the calling thread.
+    use_processes : bool, optional
+        If ``True``, the workers are processes, otherwise threads.
+        Processes are not limited by the GIL, but ``reconstruction``,
+        ``fom``, ``phantoms`` and ``data`` must be picklable if the
+        ``fork`` start method of `multiprocessing` is not available.
+    cache : bool, optional
+        If ``True``, the figure of merit of each pair of parameters and
+        phantom is stored, such that parameters probed several times by
+        the optimizer are only evaluated once.
 
     Returns
     -------
     parameters : 'numpy.ndarray'
         The  optimal parameters for the reconstruction problem.
     """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    num_workers, num_workers_in = int(num_workers), num_workers
+    if num_workers < 1:
+        raise ValueError('`num_workers` must be positive, got {}'
+                         ''.format(num_workers_in))
+
+    if num_workers == 1:
+        pool = None
+    elif use_processes:
+        pool = multiprocessing.Pool(
+            num_workers, initializer=_init_worker,
+            initargs=(reconstruction, fom, phantoms, data))
+    else:
+        pool = ThreadPool(num_workers)
 
-    def func(lam):
-        # Function to be minimized by scipy
-        return sum(fom(reconstruction(datai, lam), phantomi)
-                   for phantomi, datai in zip(phantoms, data))
+    # Function to be minimized by scipy
+    func = _FomSum(reconstruction, fom, phantoms, data, pool=pool,
+                   use_processes=use_processes, cache=cache)
 
     # Pick resolution to fit the one used by the space
     tol = np.finfo(phantoms[0].space.dtype).resolution * 10
 
-    if univariate:
-        # We use a faster optimizer for the one parameter case
-        result = scipy.optimize.minimize_scalar(
-            func, bracket=initial, tol=tol, bounds=None,
-            options={'disp': False})
-        return result.x
-    else:
-        # Use a gradient free method to find the best parameters
-        initial = np.asarray(initial)
-        parameters = scipy.optimize.fmin_powell(
-            func, initial, xtol=tol, ftol=tol, disp=False)
-        return parameters
+    try:
+        if univariate:
+            if grid is not None:
+                values = [float(v) for v in np.ravel(grid)]
+                if len(values) < 2:
+                    raise ValueError('`grid` must contain at least 2 '
+                                     'values, got {}'.format(len(values)))
+                initial = _univariate_bracket(values,
+                                              func.evaluate_many(values))
+
+            # We use a faster optimizer for the one parameter case
+            result = scipy.optimize.minimize_scalar(
+                func, bracket=initial, tol=tol, bounds=None,
+                options={'disp': False})
+            return result.x
+        else:
+            if grid is not None:
+                candidates = [np.array(point, dtype=float) for point in
+                              itertools.product(*[np.ravel(values)
+                                                  for values in grid])]
+                fom_values = func.evaluate_many(candidates)
+                initial = candidates[int(np.argmin(fom_values))]
+
+            # Use a gradient free method to find the best parameters
+            initial = np.asarray(initial)
+            parameters = scipy.optimize.fmin_powell(
+                func, initial, xtol=tol, ftol=tol, disp=False)
+            return parameters
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
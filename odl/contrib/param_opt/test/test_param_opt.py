@@ -68,5 +68,48 @@ def test_optimal_parameters_two_parameters(space, fom):
     assert sum(result2) == pytest.approx(0, abs=1e-4)
 
 
+def scaled_reconstruction(data, lam):
+    """Reconstruction with optimal parameter 1.23, see above."""
+    return 1.23 * data / lam
+
+
+def test_optimal_parameters_parallel(space, fom):
+    """Tests parallel evaluation, grid search and caching."""
+    noise = [odl.phantom.white_noise(space) for _ in range(3)]
+    phantoms = noise.copy()
+    data = noise.copy()
+
+    result = odl.contrib.param_opt.optimal_parameters(
+        scaled_reconstruction, fom, phantoms, data, [.9, 1.1],
+        univariate=True, num_workers=2)
+    assert result == pytest.approx(1.23, abs=1e-4)
+
+    # Record all evaluations to check that none is repeated
+    calls = []
+
+    def reconstruction(data, lam):
+        calls.append((float(lam), id(data)))
+        return scaled_reconstruction(data, lam)
+
+    result = odl.contrib.param_opt.optimal_parameters(
+        reconstruction, fom, phantoms, data, univariate=True,
+        grid=[0.5, 1.0, 1.0, 1.5, 2.0], num_workers=2, use_processes=False)
+    assert result == pytest.approx(1.23, abs=1e-4)
+    assert len(calls) == len(set(calls))
+
+    def reconstruction2(data, params):
+        return data + sum(params)
+
+    result2 = odl.contrib.param_opt.optimal_parameters(
+        reconstruction2, fom, phantoms, data,
+        grid=[[-1, 0.5, 2], [0, 1]], num_workers=2)
+    assert sum(result2) == pytest.approx(0, abs=1e-4)
+
+    with pytest.raises(ValueError):
+        odl.contrib.param_opt.optimal_parameters(
+            reconstruction, fom, phantoms, data, [.9, 1.1],
+            univariate=True, num_workers=0)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -11,6 +11,7 @@
 from __future__ import print_function, division
 import numpy as np
 import odl
+from odl.solvers.util.checkpoint import checkpoint_and_state
 
 __all__ = ('pdhg', 'spdhg', 'pa_spdhg', 'spdhg_generic', 'da_spdhg',
            'spdhg_pesquet')
@@ -292,6 +293,14 @@ def spdhg_generic(x, f, g, A, tau, sigma, niter, **kwargs):
         i \in {1,...,n} with probability 1/n.
     callback : callable, optional
         Function called with the current iterate after each iteration.
+    checkpoint : `odl.solvers.SolverCheckpoint` or str, optional
+        If given, the state of the iteration (x, y, z, z_relax, step sizes,
+        theta and the state of the NumPy random number generator) is
+        periodically written to disk.
+    resume_from : `odl.solvers.SolverCheckpoint` or str, optional
+        Checkpoint from which the iteration is resumed. The stored state
+        overrides the given variables and step sizes, and only the
+        iterations missing to reach niter are run.
 
     References
     ----------
@@ -350,13 +359,33 @@ def spdhg_generic(x, f, g, A, tau, sigma, niter, **kwargs):
     dz = A.domain.element()
     y_old = A.range.element()
 
+    # Checkpointing; step sizes only change with acceleration
+    checkpoint, state = checkpoint_and_state(kwargs.pop('checkpoint', None),
+                                             kwargs.pop('resume_from', None))
+
+    def checkpoint_params():
+        params = {'theta': theta}
+        if update_proximal_primal:
+            params.update(tau=tau, sigma=sigma)
+        return params
+
+    start = 0
+    if state is not None:
+        state.restore(x=x, y=y, z=z, z_relax=z_relax)
+        state.restore_rng()
+        theta = state.params['theta']
+        if update_proximal_primal:
+            tau = state.params['tau']
+            sigma[:] = state.params['sigma']
+        start = state.iteration
+
     # Save proximal operators
     proximal_dual_sigma = [fi.convex_conj.proximal(si)
                            for fi, si in zip(f, sigma)]
     proximal_primal_tau = g.proximal(tau)
 
     # run the iterations
-    for k in range(niter):
+    for k in range(start, niter):
 
         # select block
         selected = fun_select(k)
@@ -408,6 +437,16 @@ def spdhg_generic(x, f, g, A, tau, sigma, niter, **kwargs):
         if callback is not None:
             callback([x, y])
 
+        if checkpoint is not None:
+            checkpoint.update(k + 1, {'x': x, 'y': y, 'z': z,
+                                      'z_relax': z_relax},
+                              checkpoint_params())
+
+    if checkpoint is not None:
+        checkpoint.finish(max(niter, start),
+                          {'x': x, 'y': y, 'z': z, 'z_relax': z_relax},
+                          checkpoint_params())
+
 
 def da_spdhg(x, f, g, A, tau, sigma_tilde, niter, mu, **kwargs):
     """Computes a saddle point with a PDHG and dual acceleration.
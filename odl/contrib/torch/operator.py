@@ -14,6 +14,8 @@ see `the pytorch installation guide
 """
 
 from __future__ import division
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 from packaging.version import parse as parse_version
 import warnings
 
@@ -29,6 +31,32 @@ __all__ = ('OperatorAsAutogradFunction', 'OperatorAsModule')
 # TODO: ProductSpaceOperator as implementation of channels_in and channels_out?
 
 
+def _numpy_view(tensor):
+    """Return a Numpy array sharing memory with (a CPU copy of) ``tensor``.
+
+    For tensors on the CPU, no data is copied.
+    """
+    arr = tensor.detach().cpu().numpy()
+    if any(s == 0 for s in arr.strides):
+        # TODO: remove when Numpy issue #9165 is fixed
+        # https://github.com/numpy/numpy/pull/9177
+        arr = arr.copy()
+    return arr
+
+
+def _space_shape(space):
+    """Return the shape of elements of ``space``, ``()`` for fields."""
+    return tuple(getattr(space, 'shape', ()))
+
+
+def _to_device(tensor, like):
+    """Move ``tensor`` to the GPU if ``like`` is on the GPU."""
+    if like.is_cuda:
+        # Push back to GPU
+        tensor = tensor.cuda()
+    return tensor
+
+
 class OperatorAsAutogradFunction(torch.autograd.Function):
 
     """Wrapper of an ODL operator as a ``torch.autograd.Function``.
@@ -37,12 +65,14 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
     autograd machinery by implementing custom ``forward()`` and
     ``backward()`` methods.
 
-    Do not use this directly in a pytorch ``Module`` since backpropagation
-    with batches and channels will not work as expected. For that
-    purpose, use `OperatorAsModule` instead.
+    Inputs with extra leading axes (batch and channels) are evaluated as
+    a whole with `Operator.batch`. For CPU tensors, the data is shared
+    with Numpy arrays in both directions, i.e., inputs and results are
+    not copied. The recommended way to use this function in a pytorch
+    ``Module`` is `OperatorAsModule`.
     """
 
-    def __init__(self, operator):
+    def __init__(self, operator, num_threads=None):
         """Initialize a new instance.
 
         Parameters
@@ -50,6 +80,11 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
         operator : `Operator`
             The ODL operator to be wrapped. For gradient computations to
             work, ``operator.derivative(x).adjoint`` must be implemented.
+        num_threads : positive int, optional
+            Number of threads used for batches of inputs if ``operator``
+            has no vectorized batch implementation, and for the
+            derivatives of nonlinear operators in `backward`.
+            Default: number of CPUs
 
         Examples
         --------
@@ -62,6 +97,8 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
         """
         super(OperatorAsAutogradFunction, self).__init__()
         self.operator = operator
+        self.num_threads = num_threads
+        self.batch_shape = None
 
     def forward(self, input):
         """Evaluate forward pass on the input.
@@ -69,7 +106,9 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
         Parameters
         ----------
         input : `torch.tensor._TensorBase`
-            Point at which to evaluate the operator.
+            Point at which to evaluate the operator. Its shape must be
+            ``batch_shape + operator.domain.shape``, where ``batch_shape``
+            can be empty.
 
         Returns
         -------
@@ -103,17 +142,26 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
          14
         [torch.FloatTensor of size 1]
         """
-        # TODO: batched evaluation
         if not self.operator.is_linear:
             # Only needed for nonlinear operators
             self.save_for_backward(input)
 
         # TODO: use GPU memory directly if possible
-        input_arr = input.cpu().detach().numpy()
-        if any(s == 0 for s in input_arr.strides):
-            # TODO: remove when Numpy issue #9165 is fixed
-            # https://github.com/numpy/numpy/pull/9177
-            input_arr = input_arr.copy()
+        input_arr = _numpy_view(input)
+        dom_ndim = len(_space_shape(self.operator.domain))
+        self.batch_shape = input_arr.shape[:input_arr.ndim - dom_ndim]
+
+        if self.batch_shape:
+            # Evaluate the whole stack directly into the memory of the
+            # result tensor. Functionals get the dtype of the domain.
+            ran_dtype = getattr(self.operator.range, 'dtype',
+                                self.operator.domain.dtype)
+            out_arr = np.empty(
+                self.batch_shape + _space_shape(self.operator.range),
+                dtype=ran_dtype)
+            self.operator.batch(input_arr, out=out_arr,
+                                num_threads=self.num_threads)
+            return _to_device(torch.from_numpy(out_arr), input)
 
         op_result = self.operator(input_arr)
         if np.isscalar(op_result):
@@ -123,10 +171,7 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
             op_result = np.array(op_result, ndmin=1,
                                  dtype=self.operator.domain.dtype)
         tensor = torch.from_numpy(np.array(op_result, copy=False, ndmin=1))
-        if input.is_cuda:
-            # Push back to GPU
-            tensor = tensor.cuda()
-        return tensor
+        return _to_device(tensor, input)
 
     def backward(self, grad_output):
         """Apply the adjoint of the derivative at ``grad_output``.
@@ -213,11 +258,7 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
         """
         # TODO: implement directly for GPU data
         if not self.operator.is_linear:
-            input_arr = self.saved_variables[0].data.cpu().numpy()
-            if any(s == 0 for s in input_arr.strides):
-                # TODO: remove when Numpy issue #9165 is fixed
-                # https://github.com/numpy/numpy/pull/9177
-                input_arr = input_arr.copy()
+            input_arr = _numpy_view(self.saved_variables[0].data)
 
         grad = None
 
@@ -235,11 +276,16 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
         scaling = dom_weight / ran_weight
 
         if self.needs_input_grad[0]:
-            grad_output_arr = grad_output.cpu().numpy()
-            if any(s == 0 for s in grad_output_arr.strides):
-                # TODO: remove when Numpy issue #9165 is fixed
-                # https://github.com/numpy/numpy/pull/9177
-                grad_output_arr = grad_output_arr.copy()
+            grad_output_arr = _numpy_view(grad_output)
+
+            if self.batch_shape:
+                grad_arr = self._backward_batch(grad_output_arr,
+                                                input_arr=None if
+                                                self.operator.is_linear
+                                                else input_arr)
+                if scaling != 1.0:
+                    grad_arr *= scaling
+                return _to_device(torch.from_numpy(grad_arr), grad_output)
 
             if self.operator.is_linear:
                 adjoint = self.operator.adjoint
@@ -252,13 +298,52 @@ class OperatorAsAutogradFunction(torch.autograd.Function):
                 grad_odl *= scaling
 
             grad = torch.from_numpy(np.array(grad_odl, copy=False, ndmin=1))
-
-            if grad_output.is_cuda:
-                # Push back to GPU
-                grad = grad.cuda()
+            grad = _to_device(grad, grad_output)
 
         return grad
 
+    def _backward_batch(self, grad_output_arr, input_arr=None):
+        """Apply the Jacobian adjoints to a stack of output gradients.
+
+        The results are written into a preallocated array, which is
+        returned. For linear operators (``input_arr`` is ``None``), the
+        adjoint is evaluated on the whole stack with `Operator.batch`,
+        otherwise the derivative at each input is built in a thread pool.
+        """
+        dom_shape = _space_shape(self.operator.domain)
+        grad_arr = np.empty(self.batch_shape + dom_shape,
+                            dtype=self.operator.domain.dtype)
+
+        if input_arr is None:
+            self.operator.adjoint.batch(grad_output_arr, out=grad_arr,
+                                        num_threads=self.num_threads)
+            return grad_arr
+
+        ran_shape = _space_shape(self.operator.range)
+        grad_output_flat = grad_output_arr.reshape((-1,) + ran_shape)
+        input_flat = input_arr.reshape((-1,) + dom_shape)
+        grad_flat = grad_arr.reshape((-1,) + dom_shape)
+
+        def apply(i):
+            adjoint = self.operator.derivative(input_flat[i]).adjoint
+            grad_flat[i] = adjoint(grad_output_flat[i])
+
+        num_threads = self.num_threads
+        if num_threads is None:
+            num_threads = cpu_count()
+        num_threads = min(int(num_threads), len(grad_flat))
+        if num_threads <= 1:
+            for i in range(len(grad_flat)):
+                apply(i)
+        else:
+            pool = ThreadPool(num_threads)
+            try:
+                pool.map(apply, range(len(grad_flat)))
+            finally:
+                pool.close()
+
+        return grad_arr
+
     def __repr__(self):
         """Return ``repr(self)``."""
         return '{}(\n    {!r}    \n)'.format(self.__class__.__name__,
@@ -273,12 +358,12 @@ class OperatorAsModule(torch.nn.Module):
     It works with arbitrary batches and channels and supports
     backpropagation.
 
-    .. note::
-        Currently, batches and channels are supported by simply looping
-        over them and stacking the results.
+    Batches and channels are evaluated in one call of `Operator.batch`,
+    which uses a vectorized implementation if the operator has one and
+    a thread pool otherwise.
     """
 
-    def __init__(self, operator):
+    def __init__(self, operator, num_threads=None):
         """Initialize a new instance.
 
         Parameters
@@ -286,6 +371,9 @@ class OperatorAsModule(torch.nn.Module):
         operator : `Operator`
             The ODL operator to be wrapped. For gradient computations to
             work, ``operator.derivative(x).adjoint`` must be implemented.
+        num_threads : positive int, optional
+            Number of threads used for operators without vectorized
+            batch implementation. Default: number of CPUs
 
         Examples
         --------
@@ -297,7 +385,8 @@ class OperatorAsModule(torch.nn.Module):
         True
         """
         super(OperatorAsModule, self).__init__()
-        self.op_func = OperatorAsAutogradFunction(operator)
+        self.op_func = OperatorAsAutogradFunction(operator,
+                                                  num_threads=num_threads)
 
     @property
     def operator(self):
@@ -376,9 +465,8 @@ class OperatorAsModule(torch.nn.Module):
            5  10
         [torch.FloatTensor of size 3x2x2]
         """
-        in_shape = x.data.shape
+        in_shape = tuple(x.data.shape)
         op_in_shape = self.op_func.operator.domain.shape
-        op_out_shape = self.op_func.operator.range.shape
 
         extra_shape = in_shape[:-len(op_in_shape)]
 
@@ -387,16 +475,8 @@ class OperatorAsModule(torch.nn.Module):
             raise ValueError('expected input of shape (N, *, {}), got input '
                              'with shape {}'.format(shp_str, in_shape))
 
-        # Flatten extra axes, then do one entry at a time
-        newshape = (int(np.prod(extra_shape)),) + op_in_shape
-        x_flat_xtra = x.reshape(*newshape)
-        results = []
-        for i in range(x_flat_xtra.data.shape[0]):
-            results.append(self.op_func(x_flat_xtra[i]))
-
-        # Reshape the resulting stack to the expected output shape
-        stack_flat_xtra = torch.stack(results)
-        return stack_flat_xtra.view(extra_shape + op_out_shape)
+        # The whole stack is evaluated at once, keeping the extra axes
+        return self.op_func(x)
 
     def __repr__(self):
         """Return ``repr(self)``."""
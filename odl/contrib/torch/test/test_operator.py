@@ -93,6 +93,39 @@ def test_autograd_function_backward(dtype, use_cuda):
         assert torch_grad.is_cuda
 
 
+def test_autograd_function_batch(dtype, use_cuda):
+    """Test batched evaluation and backprop with autograd functions."""
+    matrix = np.random.rand(2, 3).astype(dtype)
+    odl_op = odl.MatrixOperator(matrix)
+    odl_cost = odl.solvers.L2NormSquared(odl_op.range)
+    torch_op = odl_torch.OperatorAsAutogradFunction(odl_op, num_threads=2)
+
+    x_arr = np.random.rand(4, 5, 3).astype(dtype)
+    x = torch.from_numpy(x_arr)
+    if use_cuda:
+        x = x.cuda()
+    x_var = autograd.Variable(x, requires_grad=True)
+
+    res_var = torch_op(x_var)
+    assert res_var.shape == (4, 5, 2)
+    assert res_var.data.cpu().numpy().dtype == dtype
+    odl_res = np.array([[odl_op(xi) for xi in x_row] for x_row in x_arr])
+    assert all_almost_equal(res_var.data.cpu().numpy(), odl_res)
+
+    # Backprop through the operator, summing the cost over the batch
+    res_var.pow(2).sum().backward()
+    odl_grad = np.array([[(odl_cost * odl_op).gradient(xi) for xi in x_row]
+                         for x_row in x_arr])
+    assert x_var.grad.data.cpu().numpy().dtype == dtype
+    assert all_almost_equal(x_var.grad.data.cpu().numpy(), odl_grad,
+                            ndigits=5)
+
+    # Make sure data stays on the GPU
+    if use_cuda:
+        assert res_var.is_cuda
+        assert x_var.grad.is_cuda
+
+
 def test_module_forward(shape, use_cuda):
     """Test forward evaluation with operators as modules."""
     ndim = len(shape)
@@ -11,10 +11,10 @@
 from __future__ import print_function, division, absolute_import
 import numpy as np
 
-from odl.discr import DiscreteLp, Gradient, Divergence
+from odl.discr import DiscreteLp, Gradient, Divergence, InterpolationPlan
 from odl.operator import Operator, PointwiseInner
 from odl.space import ProductSpace
-from odl.util import signature_string, indent
+from odl.util import signature_string, indent, writable_array
 
 
 __all__ = ('LinDeformFixedTempl', 'LinDeformFixedDisp', 'linear_deform')
@@ -70,11 +70,36 @@ def linear_deform(template, displacement, out=None):
     >>> linear_deform(template, displacement_field)
     array([ 0. ,  0. ,  1. ,  0.5,  0. ])
     """
-    image_pts = template.space.points()
-    for i, vi in enumerate(displacement):
-        image_pts[:, i] += vi.asarray().ravel()
-    values = template.interpolation(image_pts.T, out=out, bounds_check=False)
-    return values.reshape(template.space.shape)
+    plan = _deform_plan(template.space, displacement)
+    return _deform_with_plan(plan, template, out)
+
+
+def _deform_plan(templ_space, displacement):
+    """Return an interpolation plan for deformation with ``displacement``.
+
+    The deformed points ``x + v(x)`` are built per axis from the sparse
+    mesh of the grid of ``templ_space``, which avoids creating the full
+    array of grid points.
+    """
+    grid = templ_space.grid
+    image_pts = [mesh_i + vi.asarray()
+                 for mesh_i, vi in zip(grid.meshgrid, displacement)]
+    return InterpolationPlan(grid.coord_vectors, image_pts,
+                             schemes=templ_space.interp_byaxis)
+
+
+def _deform_with_plan(plan, template, out=None):
+    """Deform ``template`` with precomputed ``plan``, see `linear_deform`."""
+    values = template.asarray()
+    if out is None:
+        return plan(values)
+
+    with writable_array(out) as out_arr:
+        if out_arr.shape == plan.shape:
+            plan(values, out=out_arr)
+        else:
+            out_arr[:] = plan(values).reshape(out_arr.shape)
+    return out
 
 
 class LinDeformFixedTempl(Operator):
@@ -225,8 +250,10 @@ class LinDeformFixedTempl(Operator):
         grad = Gradient(domain=self.range, method='central',
                         pad_mode='symmetric')
         grad_templ = grad(self.template)
+        # All components are deformed with the same displacement
+        plan = _deform_plan(self.range, displacement)
         def_grad = self.domain.element(
-            [linear_deform(gf, displacement) for gf in grad_templ])
+            [_deform_with_plan(plan, gf) for gf in grad_templ])
 
         return PointwiseInner(self.domain, def_grad)
 
@@ -339,6 +366,7 @@ class LinDeformFixedDisp(Operator):
         super(LinDeformFixedDisp, self).__init__(
             domain=templ_space, range=templ_space, linear=True)
         self.__displacement = displacement
+        self.__plan = None
 
     @property
     def displacement(self):
@@ -347,7 +375,11 @@ class LinDeformFixedDisp(Operator):
 
     def _call(self, template, out=None):
         """Implementation of ``self(template[, out])``."""
-        return linear_deform(template, self.displacement, out)
+        # The interpolation indices and weights only depend on the fixed
+        # displacement, hence they are computed once and reused
+        if self.__plan is None:
+            self.__plan = _deform_plan(self.domain, self.displacement)
+        return _deform_with_plan(self.__plan, template, out)
 
     @property
     def inverse(self):
@@ -24,15 +24,19 @@ from odl.space import FunctionSpace
 from odl.util import (
     is_valid_input_meshgrid, out_shape_from_array, out_shape_from_meshgrid,
     is_string, is_numeric_dtype, signature_string, indent, dtype_repr,
-    writable_array)
+    writable_array, parallel_map)
 
 
 __all__ = ('FunctionSpaceMapping',
            'PointCollocation', 'NearestInterpolation', 'LinearInterpolation',
-           'PerAxisInterpolation')
+           'PerAxisInterpolation', 'InterpolationPlan')
 
 _SUPPORTED_INTERP_SCHEMES = ['nearest', 'linear']
 
+# Number of points per chunk in interpolation gathers, small enough for
+# the temporaries to stay in cache
+CHUNK_SIZE = 2 ** 14
+
 
 class FunctionSpaceMapping(Operator):
 
@@ -716,27 +720,68 @@ scipy.interpolate.RegularGridInterpolator.html>`_ class.
 
         Can be overridden by subclasses to improve efficiency.
         """
-        # find relevant edges between which xi are situated
-        index_vecs = []
-        # compute distance to lower edge in unity units
-        norm_distances = []
+        return _find_indices(self.coord_vecs, x)
 
-        # iterate through dimensions
-        for xi, cvec in zip(x, self.coord_vecs):
-            idcs = np.searchsorted(cvec, xi) - 1
+    def _evaluate(self, indices, norm_distances, out=None):
+        """Evaluation method, needs to be overridden."""
+        raise NotImplementedError('abstract method')
+
+
+def _uniform_step(cvec):
+    """Return the step of a uniformly spaced ``cvec``, or ``None``.
+
+    Small deviations from uniformity are tolerated since they are only
+    used for a first guess of the indices.
+    """
+    if cvec.size < 3:
+        return None
+    step = (cvec[-1] - cvec[0]) / (cvec.size - 1)
+    deviation = cvec - (cvec[0] + step * np.arange(cvec.size))
+    if step > 0 and np.max(np.abs(deviation)) <= 0.25 * step:
+        return step
+    else:
+        return None
+
+
+def _find_indices(coord_vecs, x):
+    """Find indices and normalized distances of points ``x`` in a grid.
 
+    For each axis, the returned index ``i`` of a point ``xi`` satisfies
+    ``cvec[i] <= xi <= cvec[i + 1]`` if ``xi`` lies inside the grid, and
+    it is clipped to the first or last cell otherwise. The normalized
+    distance is ``(xi - cvec[i]) / (cvec[i + 1] - cvec[i])``.
+
+    On uniform grids, the indices are computed in O(1) per point instead
+    of a binary search.
+    """
+    # find relevant edges between which xi are situated
+    index_vecs = []
+    # compute distance to lower edge in unity units
+    norm_distances = []
+
+    # iterate through dimensions
+    for xi, cvec in zip(x, coord_vecs):
+        xi = np.asarray(xi)
+        step = _uniform_step(cvec)
+        if step is None:
+            idcs = np.searchsorted(cvec, xi) - 1
             idcs[idcs < 0] = 0
             idcs[idcs > cvec.size - 2] = cvec.size - 2
-            index_vecs.append(idcs)
+        else:
+            # Round down to the cell, then correct for rounding errors
+            # that may move points across a node
+            idcs = np.floor((xi - cvec[0]) / step)
+            np.clip(idcs, 0, cvec.size - 2, out=idcs)
+            idcs = idcs.astype(np.intp)
+            idcs -= (xi < cvec[idcs]) & (idcs > 0)
+            idcs += (xi > cvec[idcs + 1]) & (idcs < cvec.size - 2)
 
-            norm_distances.append((xi - cvec[idcs]) /
-                                  (cvec[idcs + 1] - cvec[idcs]))
+        index_vecs.append(idcs)
 
-        return index_vecs, norm_distances
+        norm_distances.append((xi - cvec[idcs]) /
+                              (cvec[idcs + 1] - cvec[idcs]))
 
-    def _evaluate(self, indices, norm_distances, out=None):
-        """Evaluation method, needs to be overridden."""
-        raise NotImplementedError('abstract method')
+    return index_vecs, norm_distances
 
 
 class _NearestInterpolator(_Interpolator):
@@ -910,6 +955,26 @@ class _PerAxisInterpolator(_Interpolator):
 
         Modified for in-place evaluation and treatment of out-of-bounds
         points by implicitly assuming 0 at the next node."""
+        if self.values.ndim == len(indices):
+            out_shape = out_shape_from_meshgrid(norm_distances)
+            if out is None:
+                out = np.empty(out_shape, dtype=self.values.dtype)
+            indices = [idcs.ravel() for idcs in
+                       np.broadcast_arrays(*indices)]
+            norm_distances = [ndist.ravel() for ndist in
+                              np.broadcast_arrays(*norm_distances)]
+            with writable_array(out) as out_arr:
+                out_flat = out_arr.reshape(-1)
+                if not np.may_share_memory(out_flat, out_arr):
+                    out_flat = np.empty(out_arr.size, dtype=out_arr.dtype)
+                _interp_gather(self.values, indices, norm_distances,
+                               self.schemes, self.nn_variants, out_flat)
+                if out_flat.base is None:
+                    out_arr[:] = out_flat.reshape(out_arr.shape)
+            return np.array(out, copy=False, ndmin=1)
+
+        # General case with trailing dimensions in `self.values`, looping
+        # over all corners of the cells
         # slice for broadcasting over trailing dimensions in self.values
         vslice = (slice(None),) + (None,) * (self.values.ndim - len(indices))
 
@@ -945,6 +1010,195 @@ class _PerAxisInterpolator(_Interpolator):
         return np.array(out, copy=False, ndmin=1)
 
 
+def _interp_gather(values, indices, norm_distances, schemes, variants, out,
+                   num_threads=None):
+    """Interpolate ``values`` at scattered points and write to ``out``.
+
+    The points are given by their indices and normalized distances per
+    axis, as flat arrays. They are processed in chunks of `CHUNK_SIZE`
+    on a thread pool. Per chunk, the flat indices and weights of the
+    cell corners are built up axis by axis, and nearest neighbor axes
+    contribute only one corner.
+    """
+    values_flat = np.ascontiguousarray(values).ravel()
+    strides = [int(np.prod(values.shape[i + 1:]))
+               for i in range(values.ndim)]
+
+    def interp_chunk(start, stop):
+        # Per axis, a list of (flat_offset, weight) for the cell corners
+        corners_per_axis = []
+        for i, (scm, var) in enumerate(zip(schemes, variants)):
+            # The weight helpers modify the indices in-place
+            idcs = indices[i][start:stop].copy()
+            ndist = norm_distances[i][start:stop]
+            if scm == 'nearest':
+                w_lo, _, edge = _compute_nearest_weights_edge(idcs, ndist,
+                                                              var)
+                nearest = np.where(w_lo > 0, edge[0], edge[1])
+                nearest[nearest < 0] += values.shape[i]
+                corners_per_axis.append([(nearest * strides[i], None)])
+            else:
+                w_lo, w_hi, edge = _compute_linear_weights_edge(idcs, ndist)
+                edge[0][edge[0] < 0] += values.shape[i]
+                corners_per_axis.append([(edge[0] * strides[i], w_lo),
+                                         (edge[1] * strides[i], w_hi)])
+
+        out_chunk = out[start:stop]
+        out_chunk.fill(0)
+        for corners in product(*corners_per_axis):
+            flat_idcs = corners[0][0]
+            weight = corners[0][1]
+            for offset, w in corners[1:]:
+                flat_idcs = flat_idcs + offset
+                if w is not None:
+                    weight = w if weight is None else weight * w
+            corner_values = np.take(values_flat, flat_idcs)
+            if weight is None:
+                out_chunk += corner_values
+            else:
+                out_chunk += corner_values * weight
+
+    size = out.size
+    chunks = [(start, min(start + CHUNK_SIZE, size))
+              for start in range(0, size, CHUNK_SIZE)]
+    parallel_map(lambda chunk: interp_chunk(*chunk), chunks, num_threads)
+
+
+class InterpolationPlan(object):
+
+    """Interpolation at a fixed set of points.
+
+    The plan stores the grid indices and normalized distances of the
+    evaluation points. Interpolating values on the grid at these points
+    then only requires gathering the values at the cell corners and
+    weighting them, which is done in chunks of points on a thread pool.
+    This pays off when different values are interpolated at the same
+    points repeatedly, e.g., in a deformation with a fixed displacement.
+
+    The result is the same as for `PerAxisInterpolation` with the same
+    schemes, including the treatment of points outside of the grid.
+    """
+
+    def __init__(self, coord_vecs, points, schemes, nn_variants='left',
+                 num_threads=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        coord_vecs : sequence of `numpy.ndarray`
+            Coordinate vectors of the grid on which values are given.
+        points : sequence of `array-like`
+            Coordinates of the evaluation points, one array per axis.
+            The arrays are broadcast against each other, and the
+            interpolated values have the broadcast shape.
+        schemes : string or sequence of strings
+            Interpolation scheme, ``'nearest'`` or ``'linear'``, per axis.
+            A single string is used for all axes.
+        nn_variants : string or sequence of strings, optional
+            Variant, ``'left'`` or ``'right'``, of nearest neighbor
+            interpolation per axis, see `PerAxisInterpolation`.
+        num_threads : positive int, optional
+            Number of threads used for the interpolation.
+            Default: number of CPUs
+
+        Examples
+        --------
+        Interpolate linearly on a 1D grid at fixed points:
+
+        >>> coord_vec = np.array([0.0, 1.0, 2.0])
+        >>> plan = InterpolationPlan([coord_vec], [[0.25, 1.0, 1.5]],
+        ...                          schemes='linear')
+        >>> plan([0.0, 4.0, 8.0])
+        array([ 1.,  4.,  6.])
+        >>> plan([1.0, 0.0, 0.0])
+        array([ 0.75,  0.  ,  0.  ])
+
+        The points can also be given as a sparse mesh, here with nearest
+        neighbor interpolation in the first axis:
+
+        >>> plan = InterpolationPlan([coord_vec, coord_vec],
+        ...                          [[[0.4], [1.6]], [[0.5, 1.0]]],
+        ...                          schemes=['nearest', 'linear'])
+        >>> plan([[0, 1, 2],
+        ...       [3, 4, 5],
+        ...       [6, 7, 8]])
+        array([[ 0.5,  1. ],
+               [ 6.5,  7. ]])
+        """
+        self.coord_vecs = tuple(np.asarray(vec, dtype=float)
+                                for vec in coord_vecs)
+        ndim = len(self.coord_vecs)
+        if len(points) != ndim:
+            raise ValueError('expected {} point arrays, got {}'
+                             ''.format(ndim, len(points)))
+
+        if is_string(schemes):
+            schemes = [schemes] * ndim
+        self.schemes = [str(scm).lower() for scm in schemes]
+        if is_string(nn_variants) or nn_variants is None:
+            nn_variants = [nn_variants] * ndim
+        self.nn_variants = [
+            str(var).lower() if scm == 'nearest' else None
+            for scm, var in zip(self.schemes, nn_variants)]
+        if len(self.schemes) != ndim or len(self.nn_variants) != ndim:
+            raise ValueError('need {} `schemes` and `nn_variants`, got {} '
+                             'and {}'.format(ndim, len(self.schemes),
+                                             len(self.nn_variants)))
+        for scm, var in zip(self.schemes, self.nn_variants):
+            if scm not in _SUPPORTED_INTERP_SCHEMES:
+                raise ValueError('scheme {!r} not understood'.format(scm))
+            if scm == 'nearest' and var not in ('left', 'right'):
+                raise ValueError('variant {!r} not understood'.format(var))
+
+        points = np.broadcast_arrays(*[np.asarray(pts, dtype=float)
+                                       for pts in points])
+        self.shape = points[0].shape
+        indices, norm_distances = _find_indices(
+            self.coord_vecs, [pts.ravel() for pts in points])
+        self.__indices = indices
+        self.__norm_distances = norm_distances
+        self.num_threads = num_threads
+
+    def __call__(self, values, out=None):
+        """Return the interpolated ``values`` at the points of the plan.
+
+        Parameters
+        ----------
+        values : `array-like`
+            Values on the grid given by ``coord_vecs``.
+        out : `numpy.ndarray`, optional
+            Array of shape `shape` to which the result is written.
+
+        Returns
+        -------
+        out : `numpy.ndarray`
+            Interpolated values. If ``out`` was given, the returned object
+            is a reference to it.
+        """
+        values = np.asarray(values)
+        grid_shape = tuple(vec.size for vec in self.coord_vecs)
+        if values.shape != grid_shape:
+            raise ValueError('`values` must have shape {}, got {}'
+                             ''.format(grid_shape, values.shape))
+        if out is None:
+            out = np.empty(self.shape,
+                           dtype=np.result_type(values.dtype, float))
+        elif out.shape != self.shape:
+            raise ValueError('`out` must have shape {}, got {}'
+                             ''.format(self.shape, out.shape))
+
+        with writable_array(out) as out_arr:
+            out_flat = out_arr.reshape(-1)
+            if not np.may_share_memory(out_flat, out_arr):
+                out_flat = np.empty(out_arr.size, dtype=out_arr.dtype)
+            _interp_gather(values, self.__indices, self.__norm_distances,
+                           self.schemes, self.nn_variants, out_flat,
+                           self.num_threads)
+            if out_flat.base is None:
+                out_arr[:] = out_flat.reshape(self.shape)
+        return out
+
+
 class _LinearInterpolator(_PerAxisInterpolator):
 
     """Linear (i.e. bi-/tri-/multi-linear) interpolator.
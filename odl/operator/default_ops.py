@@ -79,6 +79,10 @@ class ScalingOperator(Operator):
             out.lincomb(self.scalar, x)
         return out
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Scale a stack of inputs in one pass."""
+        np.multiply(x, self.scalar, out=out, casting='unsafe')
+
     @property
     def inverse(self):
         """Return the inverse operator.
@@ -329,6 +333,22 @@ class MultiplyOperator(Operator):
         else:
             raise ValueError('can only use `out` with `LinearSpace` range')
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Multiply a stack of inputs in one pass."""
+        if self.__range_is_field:
+            return super(MultiplyOperator, self)._call_batch(
+                x, out, num_threads=num_threads)
+        elif self.__domain_is_field:
+            # Scalars times fixed vector, broadcast along the batch axis
+            x = x.reshape(x.shape + (1,) * (out.ndim - 1))
+            np.multiply(x, self.multiplicand.asarray(), out=out,
+                        casting='unsafe')
+        else:
+            multiplicand = self.multiplicand
+            if isinstance(multiplicand, LinearSpaceElement):
+                multiplicand = multiplicand.asarray()
+            np.multiply(x, multiplicand, out=out, casting='unsafe')
+
     @property
     def adjoint(self):
         """Adjoint of this operator.
@@ -930,6 +950,10 @@ class ZeroOperator(Operator):
                 out.assign(result)
         return out
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Fill the stack of outputs with zeros."""
+        out.fill(0)
+
     @property
     def adjoint(self):
         """Adjoint of the operator.
@@ -13,10 +13,11 @@ from builtins import object
 import inspect
 from numbers import Number, Integral
 import sys
+import numpy as np
 
-from odl.set import LinearSpace, Set, Field
+from odl.set import LinearSpace, Set, Field, ComplexNumbers
 from odl.set.space import LinearSpaceElement
-from odl.util import cache_arguments
+from odl.util import cache_arguments, parallel_map
 
 
 __all__ = ('Operator', 'OperatorComp', 'OperatorSum', 'OperatorVectorSum',
@@ -74,6 +75,42 @@ def _default_call_in_place(op, x, out, **kwargs):
     out.assign(op.range.element(op._call_out_of_place(x, **kwargs)))
 
 
+def _batch_shape_and_dtype(space):
+    """Return shape and dtype of arrays representing ``space`` elements.
+
+    Parameters
+    ----------
+    space : `LinearSpace` or `Field`
+        Space for which array shape and data type should be determined.
+
+    Returns
+    -------
+    shape : tuple of int
+        Shape of a single element, ``()`` for fields.
+    dtype : `numpy.dtype`
+        Data type of the array representation.
+
+    Raises
+    ------
+    TypeError
+        If ``space`` has no fixed array representation, e.g., since it
+        is a `ProductSpace` that is not a power space.
+    """
+    if isinstance(space, Field):
+        if isinstance(space, ComplexNumbers):
+            return (), np.dtype(complex)
+        else:
+            return (), np.dtype(float)
+
+    shape = getattr(space, 'shape', None)
+    dtype = getattr(space, 'dtype', None)
+    if (shape is None or dtype is None or
+            not getattr(space, 'is_power_space', True)):
+        raise TypeError('{!r} has no array representation, batched '
+                        'evaluation not possible'.format(space))
+    return tuple(shape), np.dtype(dtype)
+
+
 def _function_signature(func):
     """Return the signature of a callable as a string.
 
@@ -694,6 +731,121 @@ class Operator(object):
                         'the range {!r}'.format(out, self.range))
         return out
 
+    def batch(self, x, out=None, num_threads=None):
+        """Evaluate the operator on a stack of inputs.
+
+        Parameters
+        ----------
+        x : `array-like`
+            Stack of inputs of shape ``batch_shape + domain.shape``, with
+            an arbitrary number of leading batch axes. Each entry
+            ``x[i]`` is interpreted as an element of `domain`.
+        out : `numpy.ndarray`, optional
+            Array of shape ``batch_shape + range.shape`` to which the
+            results are written.
+        num_threads : positive int, optional
+            Number of threads used by operators that evaluate the stack
+            one element at a time.
+            Default: number of CPUs
+
+        Returns
+        -------
+        out : `numpy.ndarray`
+            Stack of results of shape ``batch_shape + range.shape``.
+            If ``out`` was provided, the returned object is a reference
+            to it.
+
+        Notes
+        -----
+        Operators that can process all entries of the stack in one
+        vectorized pass implement the private method ``_call_batch``.
+        For all other operators, the stack is evaluated entry by entry
+        in a thread pool.
+
+        Examples
+        --------
+        >>> op = odl.ScalingOperator(odl.rn(3), 2.0)
+        >>> op.batch([[1, 2, 3],
+        ...           [4, 5, 6]])
+        array([[  2.,   4.,   6.],
+               [  8.,  10.,  12.]])
+
+        Results for single inputs are the same as with the usual call:
+
+        >>> grad = odl.Gradient(odl.uniform_discr([0, 0], [1, 1], (4, 5)))
+        >>> x_stack = np.random.rand(3, 4, 5)
+        >>> grad_stack = grad.batch(x_stack)
+        >>> grad_stack.shape
+        (3, 2, 4, 5)
+        >>> np.allclose(grad_stack[1], grad(x_stack[1]))
+        True
+        """
+        dom_shape, dom_dtype = _batch_shape_and_dtype(self.domain)
+        ran_shape, ran_dtype = _batch_shape_and_dtype(self.range)
+
+        x = np.asarray(x)
+        batch_ndim = x.ndim - len(dom_shape)
+        if batch_ndim < 0 or x.shape[batch_ndim:] != dom_shape:
+            raise OpDomainError(
+                'input shape {} does not end with the domain shape {}'
+                ''.format(x.shape, dom_shape))
+        if not np.can_cast(x.dtype, dom_dtype, casting='same_kind'):
+            raise OpDomainError(
+                'unable to cast data type {} of the input to the domain '
+                'data type {}'.format(x.dtype, dom_dtype))
+
+        batch_shape = x.shape[:batch_ndim]
+        batch_size = int(np.prod(batch_shape))
+        x_flat = x.astype(dom_dtype, copy=False).reshape(
+            (batch_size,) + dom_shape)
+
+        if out is None:
+            out = np.empty(batch_shape + ran_shape, dtype=ran_dtype)
+        elif not isinstance(out, np.ndarray):
+            raise TypeError('`out` {!r} not a `numpy.ndarray`'.format(out))
+        elif out.shape != batch_shape + ran_shape:
+            raise OpRangeError('`out` has shape {}, expected {}'
+                               ''.format(out.shape, batch_shape + ran_shape))
+
+        if (out.flags.c_contiguous and out.dtype == ran_dtype and
+                not np.may_share_memory(out, x_flat)):
+            out_flat = out.reshape((batch_size,) + ran_shape)
+        else:
+            out_flat = np.empty((batch_size,) + ran_shape, dtype=ran_dtype)
+
+        if batch_size > 0:
+            self._call_batch(x_flat, out_flat, num_threads=num_threads)
+
+        if not np.may_share_memory(out_flat, out):
+            out[:] = out_flat.reshape(out.shape)
+        return out
+
+    def _call_batch(self, x, out, num_threads=None):
+        """Implementation of the batched evaluation.
+
+        This default implementation calls the operator for each entry
+        of the stack in a thread pool. Subclasses can override it with
+        a vectorized variant.
+
+        Parameters
+        ----------
+        x : `numpy.ndarray`
+            Stack of inputs of shape ``(N,) + domain.shape`` with
+            ``N >= 1`` and data type ``domain.dtype``.
+        out : `numpy.ndarray`
+            C-contiguous array of shape ``(N,) + range.shape`` and data
+            type ``range.dtype`` to which the results are written.
+        num_threads : positive int, optional
+            Number of threads to use. Default: number of CPUs
+        """
+        def apply(i):
+            result = self(x[i])
+            if isinstance(result, LinearSpaceElement):
+                result = result.asarray()
+            out[i] = result
+
+        parallel_map(apply, range(len(x)), num_threads)
+
     def norm(self, estimate=False, **kwargs):
         """Return the operator norm of this operator.
 
@@ -704,7 +856,8 @@ class Operator(object):
         estimate : bool
             If true, estimate the operator norm. By default, it is estimated
             using `power_method_opnorm`, which is only applicable for linear
-            operators.
+            operators. The estimate is computed only once, see
+            `estimate_opnorm`.
             Subclasses are allowed to ignore this parameter if they can provide
             an exact value.
 
@@ -712,7 +865,7 @@ class Operator(object):
         ----------------
         kwargs :
             If ``estimate`` is True, pass these arguments to the
-            `power_method_opnorm` call.
+            `estimate_opnorm` call.
 
         Returns
         -------
@@ -739,13 +892,8 @@ class Operator(object):
                                       '`Operator.norm(estimate=True)` to '
                                       'obtain an estimate.')
         else:
-            norm = getattr(self, '__norm', None)
-            if norm is not None:
-                return norm
-            else:
-                from odl.operator.oputils import power_method_opnorm
-                self.__norm = power_method_opnorm(self, **kwargs)
-                return self.__norm
+            from odl.operator.oputils import estimate_opnorm
+            return estimate_opnorm(self, **kwargs)
 
     def __add__(self, other):
         """Return ``self + other``.
@@ -1159,6 +1307,13 @@ class OperatorSum(Operator):
             self.right(x, out=out)
             out += tmp
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Implement ``self.batch(x, out)`` by batching both summands."""
+        self.left._call_batch(x, out, num_threads=num_threads)
+        tmp = np.empty_like(out)
+        self.right._call_batch(x, tmp, num_threads=num_threads)
+        out += tmp
+
     def derivative(self, x):
         """Return the operator derivative at ``x``.
 
@@ -1368,6 +1523,21 @@ class OperatorComp(Operator):
             self.right(x, out=tmp)
             return self.left(tmp, out=out)
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Implement ``self.batch(x, out)`` by batching both operators."""
+        try:
+            tmp_shape, tmp_dtype = _batch_shape_and_dtype(self.right.range)
+            _, left_dtype = _batch_shape_and_dtype(self.left.domain)
+        except TypeError:
+            # Intermediate result has no array representation
+            return super(OperatorComp, self)._call_batch(
+                x, out, num_threads=num_threads)
+
+        tmp = np.empty((len(x),) + tmp_shape, dtype=tmp_dtype)
+        self.right._call_batch(x, tmp, num_threads=num_threads)
+        self.left._call_batch(tmp.astype(left_dtype, copy=False), out,
+                              num_threads=num_threads)
+
     @property
     def inverse(self):
         """Inverse of this operator.
@@ -1587,6 +1757,11 @@ class OperatorLeftScalarMult(Operator):
             self.operator(x, out=out)
             out *= self.scalar
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Implement ``self.batch(x, out)``."""
+        self.operator._call_batch(x, out, num_threads=num_threads)
+        out *= self.scalar
+
     @property
     def inverse(self):
         """Inverse of this operator.
@@ -1762,6 +1937,11 @@ class OperatorRightScalarMult(Operator):
             tmp.lincomb(self.scalar, x)
             self.operator(tmp, out=out)
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Implement ``self.batch(x, out)``."""
+        scaled = np.multiply(x, self.scalar).astype(x.dtype, copy=False)
+        self.operator._call_batch(scaled, out, num_threads=num_threads)
+
     def __mul__(self, other):
         """Implement ``self * other``.
 
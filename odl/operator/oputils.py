@@ -10,15 +10,26 @@
 
 from __future__ import print_function, division, absolute_import
 from future.utils import native
+import hashlib
+import json
+import os
+import tempfile
 import numpy as np
 
+from odl.operator.operator import (
+    OperatorComp, OperatorSum, OperatorLeftScalarMult,
+    OperatorRightScalarMult)
+from odl.operator.pspace_ops import (
+    ProductSpaceOperator, BroadcastOperator, ReductionOperator)
 from odl.space.base_tensors import TensorSpace
 from odl.space import ProductSpace
 from odl.util import nd_iterator
 from odl.util.testutils import noise_element
 
-__all__ = ('matrix_representation', 'power_method_opnorm', 'as_scipy_operator',
-           'as_scipy_functional', 'as_proximal_lang_operator')
+__all__ = ('matrix_representation', 'sparse_matrix_representation',
+           'power_method_opnorm', 'lanczos_opnorm', 'estimate_opnorm',
+           'opnorm_upper_bound', 'as_scipy_operator', 'as_scipy_functional',
+           'as_proximal_lang_operator')
 
 
 def matrix_representation(op):
@@ -85,6 +96,27 @@ def matrix_representation(op):
     stacking the output as a matrix.
     """
 
+    _check_matrix_spaces(op)
+
+    # Generate the matrix
+    dtype = np.promote_types(op.domain.dtype, op.range.dtype)
+    matrix = np.zeros(op.range.shape + op.domain.shape, dtype=dtype)
+    tmp_ran = op.range.element()  # Store for reuse in loop
+    tmp_dom = op.domain.zero()  # Store for reuse in loop
+
+    for j in nd_iterator(op.domain.shape):
+        tmp_dom[j] = 1.0
+
+        op(tmp_dom, out=tmp_ran)
+        matrix[(Ellipsis,) + j] = tmp_ran.asarray()
+
+        tmp_dom[j] = 0.0
+
+    return matrix
+
+
+def _check_matrix_spaces(op):
+    """Raise if ``op`` has no matrix representation."""
     if not op.is_linear:
         raise ValueError('the operator is not linear')
 
@@ -104,25 +136,190 @@ def matrix_representation(op):
                         'nor `ProductSpace` with only equal `TensorSpace` '
                         'components'.format(op.range))
 
-    # Generate the matrix
-    dtype = np.promote_types(op.domain.dtype, op.range.dtype)
-    matrix = np.zeros(op.range.shape + op.domain.shape, dtype=dtype)
-    tmp_ran = op.range.element()  # Store for reuse in loop
-    tmp_dom = op.domain.zero()  # Store for reuse in loop
 
-    for j in nd_iterator(op.domain.shape):
-        tmp_dom[j] = 1.0
+def sparse_matrix_representation(op, spacing=None, max_spacing=None):
+    """Return a sparse matrix representation of a linear operator.
 
-        op(tmp_dom, out=tmp_ran)
-        matrix[(Ellipsis,) + j] = tmp_ran.asarray()
+    Instead of applying ``op`` to each unit vector, the matrix is found
+    by applying it to a few probe vectors, each of which combines many
+    unit vectors. This is efficient for operators acting locally, like
+    finite differences or point sampling, where the number of operator
+    calls does not depend on the size of the domain.
 
-        tmp_dom[j] = 0.0
+    Parameters
+    ----------
+    op : `Operator`
+        The linear operator of which one wants a matrix representation.
+        If the domain or range is a `ProductSpace`, it must be a power-space.
+    spacing : positive int, optional
+        Initial grid spacing of the unit vectors that are combined in one
+        probe, see Notes. For ``None``, start with 1.
+    max_spacing : positive int, optional
+        If no valid probing is found up to this spacing, a `ValueError`
+        is raised. For ``None``, the spacing is increased until each
+        probe is a unit vector, which always succeeds.
 
-    return matrix
+    Returns
+    -------
+    matrix : `scipy.sparse.csr_matrix`
+        The matrix representation of the operator, acting on flattened
+        (C order) arrays. Its shape is ``(op.range.size, op.domain.size)``
+        and the dtype is the promoted (greatest) dtype of the domain and
+        range.
+
+    See Also
+    --------
+    matrix_representation : dense matrix representation
+    odl.operator.tensor_ops.SparseMatrixOperator :
+        operator defined by a sparse matrix
+
+    Examples
+    --------
+    The gradient on a 2D grid is found with a small number of operator
+    calls, independent of the grid size:
+
+    >>> space = odl.uniform_discr([0, 0], [1, 1], (20, 30))
+    >>> grad = odl.Gradient(space)
+    >>> matrix = sparse_matrix_representation(grad)
+    >>> matrix.shape
+    (1200, 600)
+    >>> x = odl.phantom.white_noise(space)
+    >>> np.allclose(matrix.dot(x.asarray().ravel()),
+    ...             grad(x).asarray().ravel())
+    True
+
+    It coincides with the dense representation:
+
+    >>> space = odl.uniform_discr([0, 0], [2, 2], (2, 2))
+    >>> grad = odl.Gradient(space)
+    >>> dense = matrix_representation(grad)
+    >>> sparse = sparse_matrix_representation(grad)
+    >>> np.array_equal(sparse.toarray(), dense.reshape(8, 4))
+    True
+
+    Notes
+    -----
+    The unit vectors are grouped by the grid of indices with a given
+    ``spacing`` along each axis of ``op.domain.shape``, shifted by all
+    possible offsets. Each group is a "color" of a coloring of the matrix
+    columns. The columns of one group are reconstructed from the
+    responses to probes with the same support, whose coefficients encode
+    the column index in base-`PROBE_BASE` digits. This requires that
+    columns in the same group do not share nonzero rows, which is
+    verified with an additional random probe. If the verification fails,
+    the spacing is increased.
+    """
+    # Lazy import to improve `import odl` time
+    import scipy.sparse
+
+    _check_matrix_spaces(op)
+
+    dom_shape = op.domain.shape
+    dom_size = int(np.prod(dom_shape))
+    dtype = np.promote_types(op.domain.dtype, op.range.dtype)
+    if spacing is None:
+        spacing = 1
+    spacing, spacing_in = int(spacing), spacing
+    if spacing <= 0 or spacing != spacing_in:
+        raise ValueError('`spacing` must be a positive integer, got {}'
+                         ''.format(spacing_in))
+    max_spacing_needed = max(dom_shape + (1,))
+    if max_spacing is None:
+        max_spacing = max_spacing_needed
+
+    rand_coeffs = np.random.RandomState(42).uniform(1, 2, size=dom_size)
+    while True:
+        result = _probe_columns(op, spacing, rand_coeffs, dtype)
+        if result is not None:
+            rows, cols, data = result
+            return scipy.sparse.csr_matrix(
+                (data, (rows, cols)), shape=(int(op.range.size), dom_size),
+                dtype=dtype)
+
+        if spacing >= min(max_spacing, max_spacing_needed):
+            raise ValueError('no valid probing of `op` found up to spacing '
+                             '{}'.format(spacing))
+        spacing = min(2 * spacing + 1, max_spacing, max_spacing_needed)
+
+
+# Base of the digits of column indices in probe coefficients
+PROBE_BASE = 64
+
+
+def _probe_columns(op, spacing, rand_coeffs, dtype):
+    """Reconstruct the columns of ``op`` with probes of given ``spacing``.
+
+    Returns
+    -------
+    rows, cols, data : `numpy.ndarray` or None
+        Coordinate format of the nonzero matrix entries, or ``None`` if
+        columns in one group share nonzero rows.
+    """
+    dom_shape = op.domain.shape
+    flat_idcs = np.arange(int(np.prod(dom_shape))).reshape(dom_shape)
+    rows, cols, data = [], [], []
+
+    for offset in nd_iterator((spacing,) * len(dom_shape)):
+        slc = tuple(slice(o, None, spacing) for o in offset)
+        group = flat_idcs[slc].ravel()
+        if group.size == 0:
+            continue
+        # Position of each column within the group, encoded in digits
+        num_digits = 1
+        while PROBE_BASE ** num_digits < group.size:
+            num_digits += 1
+
+        def response(coeffs):
+            probe = np.zeros(dom_shape, dtype=op.domain.dtype)
+            probe[slc] = coeffs.reshape(probe[slc].shape)
+            return np.asarray(op(probe).asarray(), dtype=dtype).ravel()
+
+        resp_one = response(np.ones(group.size))
+        resp_rand = response(rand_coeffs[group])
+        positions = np.zeros(resp_one.shape, dtype=float)
+        resp_digits = []
+        for k in range(num_digits):
+            digits = (np.arange(group.size) // PROBE_BASE ** k) % PROBE_BASE
+            resp_digits.append(response(digits + 1.0))
+
+        # Entries below roundoff level are considered zero
+        scale = max(np.max(np.abs(resp_one)), np.max(np.abs(resp_rand)))
+        tol = 100 * np.finfo(dtype).resolution * scale
+        nonzero = np.abs(resp_one) > tol
+        if (np.any(np.abs(resp_rand[~nonzero]) > 2 * tol) or
+                any(np.any(np.abs(resp[~nonzero]) > PROBE_BASE * tol)
+                    for resp in resp_digits)):
+            return None
+
+        one_nz = resp_one[nonzero]
+        for k, resp in enumerate(resp_digits):
+            digit = np.real(resp[nonzero] / one_nz) - 1
+            digit_int = np.round(digit)
+            if (np.any(np.abs(digit - digit_int) > 0.25) or
+                    np.any(digit_int < 0) or
+                    np.any(digit_int >= PROBE_BASE)):
+                return None
+            positions[nonzero] += digit_int * PROBE_BASE ** k
+
+        pos_nz = positions[nonzero].astype(int)
+        if np.any(pos_nz >= group.size):
+            return None
+        col_nz = group[pos_nz]
+        # Verify that each row has indeed only one column of the group
+        if not np.allclose(resp_rand[nonzero], rand_coeffs[col_nz] * one_nz,
+                           rtol=1e-3, atol=tol):
+            return None
+
+        rows.append(np.flatnonzero(nonzero))
+        cols.append(col_nz)
+        data.append(one_nz)
+
+    return (np.concatenate(rows), np.concatenate(cols),
+            np.concatenate(data))
 
 
 def power_method_opnorm(op, xstart=None, maxiter=100, rtol=1e-05, atol=1e-08,
-                        callback=None):
+                        callback=None, return_vector=False):
     """Estimate the operator norm with the power method.
 
     Parameters
@@ -145,11 +342,21 @@ def power_method_opnorm(op, xstart=None, maxiter=100, rtol=1e-05, atol=1e-08,
         Absolute tolerance parameter (see Notes).
     callback : callable, optional
         Function called with the current iterate in each iteration.
+    return_vector : bool, optional
+        If ``True``, return also the last iterate, normalized to norm 1.
+        It can be used as ``xstart`` in a later run.
 
     Returns
     -------
     est_opnorm : float
         The estimated operator norm of ``op``.
+    vector : ``op.domain`` element
+        The last iterate, only returned if ``return_vector=True``.
+
+    See Also
+    --------
+    lanczos_opnorm : Faster converging alternative
+    estimate_opnorm : Estimation with caching of the results
 
     Examples
     --------
@@ -256,9 +463,450 @@ def power_method_opnorm(op, xstart=None, maxiter=100, rtol=1e-05, atol=1e-08,
         if callback is not None:
             callback(x)
 
+    if return_vector:
+        x /= x.norm()
+        return opnorm, x
+    else:
+        return opnorm
+
+
+def lanczos_opnorm(op, xstart=None, maxiter=30, rtol=1e-05, atol=1e-08,
+                   callback=None, return_vector=False):
+    """Estimate the operator norm with the Lanczos method.
+
+    The Lanczos method approximates the largest eigenvalue of the normal
+    operator ``op.adjoint * op`` from the Krylov space of all previous
+    iterates instead of only the last one, like the power method. It
+    therefore typically needs considerably fewer operator evaluations for
+    the same accuracy.
+
+    Parameters
+    ----------
+    op : `Operator`
+        Linear operator whose norm is to be estimated. It must have an
+        `Operator.adjoint`, unless its domain and range coincide, in which
+        case it is assumed to be self-adjoint if no adjoint is available.
+    xstart : ``op.domain`` `element-like`, optional
+        Starting point of the iteration. By default an `Operator.domain`
+        element containing noise is used.
+    maxiter : positive int, optional
+        Maximum number of iterations, each of which evaluates ``op`` and
+        its adjoint once.
+    rtol : float, optional
+        Relative tolerance parameter, see `power_method_opnorm`.
+    atol : float, optional
+        Absolute tolerance parameter, see `power_method_opnorm`.
+    callback : callable, optional
+        Function called with the current Lanczos vector in each iteration.
+    return_vector : bool, optional
+        If ``True``, return also the approximate right singular vector
+        corresponding to the largest singular value. This requires to keep
+        all Lanczos vectors in memory.
+
+    Returns
+    -------
+    est_opnorm : float
+        The estimated operator norm of ``op``.
+    vector : ``op.domain`` element
+        The approximate singular vector of norm 1, only returned if
+        ``return_vector=True``.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr(0, 1, 50)
+    >>> op = odl.ScalingOperator(space, 2.0)
+    >>> round(lanczos_opnorm(op), 4)
+    2.0
+
+    For the gradient, the norm is approximately ``2 / cell_size``:
+
+    >>> grad = odl.Gradient(space)
+    >>> exact = 2 / space.cell_sides[0]
+    >>> abs(lanczos_opnorm(grad, maxiter=20) - exact) / exact < 1e-2
+    True
+
+    Notes
+    -----
+    With the tridiagonal matrix :math:`T_k` generated by :math:`k` Lanczos
+    iterations for the normal operator :math:`A^* A`, the operator norm is
+    estimated as :math:`\sqrt{\lambda_{\max}(T_k)}`. If ``op`` has no
+    adjoint, the iteration uses :math:`A` itself, and the estimate is the
+    largest absolute eigenvalue of :math:`T_k`. The iteration is
+    stopped when consecutive estimates fulfill the same criterion as in
+    `power_method_opnorm`. The Lanczos vectors are not reorthogonalized,
+    which does not affect the estimate of the largest eigenvalue.
+    """
+    maxiter, maxiter_in = int(maxiter), maxiter
+    if maxiter <= 0:
+        raise ValueError('`maxiter` must be positive, got {}'
+                         ''.format(maxiter_in))
+
+    try:
+        adjoint = op.adjoint
+    except NotImplementedError:
+        if op.domain != op.range:
+            raise
+        adjoint = None
+
+    def normal_op(x):
+        if adjoint is None:
+            return op(x)
+        else:
+            return adjoint(op(x))
+
+    def opnorm_from_eigval(eigval):
+        # Without adjoint, `op` is self-adjoint and `T_k` approximates
+        # `op` itself instead of the normal operator
+        if adjoint is None:
+            return abs(eigval)
+        else:
+            return np.sqrt(max(eigval, 0.0))
+
+    largest_abs = adjoint is None
+
+    if xstart is None:
+        v = noise_element(op.domain)
+    else:
+        v = op.domain.element(xstart).copy()
+
+    v_norm = v.norm()
+    if v_norm == 0:
+        raise ValueError('``xstart`` must be nonzero')
+    v /= v_norm
+
+    alphas, betas = [], []
+    vectors = [v] if return_vector else None
+    v_old = None
+    eigval = 0.0
+    for i in range(maxiter):
+        w = normal_op(v)
+        if v_old is not None:
+            w.lincomb(1, w, -betas[-1], v_old)
+        alpha = w.inner(v).real
+        w.lincomb(1, w, -alpha, v)
+        alphas.append(alpha)
+
+        eigval_old = eigval
+        eigval = _max_eigval_tridiag(alphas, betas, largest_abs=largest_abs)
+        if not np.isfinite(eigval):
+            raise ValueError('reached nonfinite estimate after {} iterations'
+                             ''.format(i))
+
+        beta = w.norm()
+        converged = (i > 0 and np.isclose(opnorm_from_eigval(eigval),
+                                          opnorm_from_eigval(eigval_old),
+                                          rtol, atol))
+        if converged or beta <= 1e-12 * max(abs(alpha), 1):
+            break
+
+        betas.append(beta)
+        w /= beta
+        v_old, v = v, w
+        if return_vector:
+            vectors.append(v)
+
+        if callback is not None:
+            callback(v)
+
+    opnorm = opnorm_from_eigval(eigval)
+    if not return_vector:
+        return opnorm
+
+    # Ritz vector from the eigenvector of the tridiagonal matrix
+    _, eigvec = _max_eigval_tridiag(alphas, betas[:len(alphas) - 1],
+                                    largest_abs=largest_abs,
+                                    return_vector=True)
+    x = op.domain.zero()
+    for coeff, vec in zip(eigvec, vectors):
+        x.lincomb(1, x, coeff, vec)
+    x /= x.norm()
+    return opnorm, x
+
+
+def _max_eigval_tridiag(alphas, betas, largest_abs=False,
+                        return_vector=False):
+    """Return the largest eigenvalue of a symmetric tridiagonal matrix.
+
+    With ``largest_abs=True``, the eigenvalue of largest absolute value
+    is returned instead.
+    """
+    mat = np.diag(alphas)
+    if betas:
+        mat += np.diag(betas, 1) + np.diag(betas, -1)
+    if return_vector:
+        eigvals, eigvecs = np.linalg.eigh(mat)
+    else:
+        eigvals = np.linalg.eigvalsh(mat)
+    idx = np.argmax(np.abs(eigvals)) if largest_abs else -1
+    if return_vector:
+        return eigvals[idx], eigvecs[:, idx]
+    else:
+        return eigvals[idx]
+
+
+def estimate_opnorm(op, method=None, xstart=None, cache_dir=None,
+                    use_cache=True, **kwargs):
+    """Estimate the operator norm with caching of the results.
+
+    The estimate is stored with ``op`` and, optionally, on disk, and
+    returned directly in later calls without ``method`` and ``kwargs``, or
+    with the same ones as for the stored estimate. New estimations start
+    from the vector of the last estimation for the same operator, which is
+    stored with ``op`` as well, if no ``xstart`` is given. This is used by
+    ``Operator.norm`` with ``estimate=True``.
+
+    Parameters
+    ----------
+    op : `Operator`
+        Operator whose norm is to be estimated.
+    method : {'power', 'lanczos'}, optional
+        Method for the estimation, see `power_method_opnorm` and
+        `lanczos_opnorm`. ``None`` means ``'power'``, or any method if
+        an estimate is stored.
+    xstart : ``op.domain`` `element-like`, optional
+        Starting point of the iteration. By default, the vector of the
+        last estimation for ``op`` is used, or an element containing
+        noise.
+    cache_dir : str, optional
+        Directory in which estimates and vectors are stored on disk. Only
+        operators with an ``opnorm_cache_key`` attribute that is not
+        ``None``, like `odl.tomo.RayTransform`, are cached on disk. The
+        key must be a string that identifies the operator uniquely and
+        does not change between sessions.
+    use_cache : bool, optional
+        If ``False``, estimate the norm even if a cached value exists.
+        The cache is still updated.
+
+    Other Parameters
+    ----------------
+    kwargs :
+        Further arguments passed on to the estimation method. Except for
+        ``callback``, they must have a ``repr`` that identifies them.
+
+    Returns
+    -------
+    est_opnorm : float
+        The estimated operator norm of ``op``.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr(0, 1, 10)
+    >>> grad = odl.Gradient(space)
+    >>> opnorm = estimate_opnorm(grad, method='lanczos')
+
+    Repeated calls return the stored value, unless they ask for a different
+    method or different parameters:
+
+    >>> estimate_opnorm(grad) == opnorm
+    True
+    """
+    if method is None and not kwargs:
+        requested = None
+    else:
+        requested = _opnorm_params(method, kwargs)
+
+    def reuse(stored_params):
+        return use_cache and requested in (None, stored_params)
+
+    stored_params, opnorm = getattr(op, '_opnorm_estimate', (None, None))
+    if opnorm is not None and reuse(stored_params):
+        return opnorm
+
+    if method is None:
+        method = 'power'
+    method, method_in = str(method).lower(), method
+    if method == 'power':
+        estimator = power_method_opnorm
+    elif method == 'lanczos':
+        estimator = lanczos_opnorm
+    else:
+        raise ValueError('`method` {!r} not understood'.format(method_in))
+
+    op_key = _opnorm_cache_key(op)
+    op_path = vec_path = None
+    if cache_dir is not None and op_key is not None:
+        op_path = os.path.join(cache_dir, 'opnorm_{}.json'.format(op_key))
+        vec_path = os.path.join(cache_dir,
+                                'opnorm_vector_{}.npy'.format(op_key))
+
+    params = _opnorm_params(method, kwargs)
+    if op_path is not None and os.path.isfile(op_path):
+        with open(op_path) as f:
+            stored = json.load(f)
+        stored_params = (str(stored['method']),
+                         tuple(sorted((str(key), str(value)) for key, value
+                                      in stored.get('kwargs', {}).items())))
+        if reuse(stored_params):
+            op._opnorm_estimate = (stored_params, stored['opnorm'])
+            return stored['opnorm']
+
+    if xstart is None:
+        xstart = getattr(op, '_opnorm_vector', None)
+    if xstart is None and vec_path is not None and os.path.isfile(vec_path):
+        xstart = np.load(vec_path)
+    if xstart is not None and np.shape(xstart) != op.domain.shape:
+        xstart = None
+
+    opnorm, vector = estimator(op, xstart=xstart, return_vector=True,
+                               **kwargs)
+    opnorm = float(opnorm)
+    op._opnorm_estimate = (params, opnorm)
+    op._opnorm_vector = vector.asarray().copy()
+
+    if op_path is not None:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        stored = {'opnorm': opnorm, 'method': method,
+                  'kwargs': dict(params[1])}
+        _save_atomic(op_path,
+                     lambda f: f.write(json.dumps(stored).encode('utf-8')))
+        _save_atomic(vec_path, lambda f: np.save(f, vector.asarray()))
+
     return opnorm
 
 
+def _opnorm_params(method, kwargs):
+    """Return a hashable identifier of the parameters of an estimation.
+
+    Values of ``kwargs`` are identified by their ``repr``, and the
+    ``callback`` argument is ignored since it does not influence the
+    estimate.
+    """
+    kwargs = tuple(sorted((str(key), repr(value))
+                          for key, value in kwargs.items()
+                          if key != 'callback'))
+    return str(method).lower(), kwargs
+
+
+def _opnorm_cache_key(op):
+    """Return the disk cache key of ``op``, or ``None`` if it has none.
+
+    The key is computed from ``op.opnorm_cache_key``, which operators can
+    provide if they are identified by a short, stable string. A hash of
+    the ``repr`` is not sufficient since NumPy abbreviates large arrays.
+    """
+    key = getattr(op, 'opnorm_cache_key', None)
+    if key is None:
+        return None
+    hasher = hashlib.sha1()
+    hasher.update(type(op).__name__.encode('utf-8'))
+    hasher.update(str(key).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _save_atomic(path, write):
+    """Write a file via a temporary file, such that it is never partial."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def opnorm_upper_bound(op, **kwargs):
+    """Return an upper bound of the operator norm from component norms.
+
+    For compositions, sums and scalar multiples of operators, and for
+    operators acting on product spaces, the bound is computed from the
+    norms of the components with the triangle inequality and the
+    submultiplicativity of operator norms. Components that do not know
+    their exact norm are estimated with `estimate_opnorm`, so each of
+    them is estimated only once, and typically they are much cheaper to
+    evaluate than the full operator.
+
+    The bound is appropriate for choosing step sizes of solvers like
+    `odl.solvers.pdhg`, whose convergence requires upper bounds.
+
+    Parameters
+    ----------
+    op : `Operator`
+        Operator whose norm is to be bounded.
+
+    Other Parameters
+    ----------------
+    kwargs :
+        Further arguments passed on to `estimate_opnorm`.
+
+    Returns
+    -------
+    opnorm_bound : float
+        Upper bound of the operator norm, up to the accuracy of the
+        estimates of the components.
+
+    Notes
+    -----
+    For operators between product spaces, the bound is the spectral norm
+    of the matrix of component norms, e.g., the root of the sum of the
+    squared component norms for a `BroadcastOperator`. This requires
+    product spaces with exponent 2 and constant weighting, otherwise the
+    norm of the full operator is estimated.
+
+    Examples
+    --------
+    Operators with known norms give exact bounds:
+
+    >>> space = odl.rn(3)
+    >>> ident = odl.IdentityOperator(space)
+    >>> scaling = odl.ScalingOperator(space, -3)
+    >>> opnorm_upper_bound(2 * ident + scaling * scaling)
+    11.0
+    """
+    if isinstance(op, OperatorComp):
+        return (opnorm_upper_bound(op.left, **kwargs) *
+                opnorm_upper_bound(op.right, **kwargs))
+    elif isinstance(op, OperatorSum):
+        return (opnorm_upper_bound(op.left, **kwargs) +
+                opnorm_upper_bound(op.right, **kwargs))
+    elif isinstance(op, (OperatorLeftScalarMult, OperatorRightScalarMult)):
+        return abs(op.scalar) * opnorm_upper_bound(op.operator, **kwargs)
+
+    # Operators on product spaces, bounded by the spectral norm of the
+    # matrix of component norms
+    component_norms = None
+    if isinstance(op, BroadcastOperator):
+        component_norms = [[opnorm_upper_bound(op_i, **kwargs)]
+                           for op_i in op.operators]
+    elif isinstance(op, ReductionOperator):
+        component_norms = [[opnorm_upper_bound(op_i, **kwargs)
+                            for op_i in op.operators]]
+    elif isinstance(op, ProductSpaceOperator):
+        component_norms = np.zeros(op.ops.shape)
+        for i, j, op_ij in zip(op.ops.row, op.ops.col, op.ops.data):
+            component_norms[i, j] = opnorm_upper_bound(op_ij, **kwargs)
+
+    if component_norms is not None:
+        scaling = _pspace_norm_scaling(op.range)
+        dom_scaling = _pspace_norm_scaling(op.domain)
+        if scaling is not None and dom_scaling is not None:
+            return (np.linalg.norm(component_norms, 2) *
+                    np.sqrt(scaling / dom_scaling))
+
+    try:
+        return op.norm(estimate=False)
+    except NotImplementedError:
+        return estimate_opnorm(op, **kwargs)
+
+
+def _pspace_norm_scaling(space):
+    """Return the squared norm scaling of product spaces, or ``None``.
+
+    For a product space with exponent 2 and constant weighting, the
+    squared norm is the weighting constant times the sum of squared
+    component norms. Other spaces give 1.
+    """
+    if not isinstance(space, ProductSpace):
+        return 1.0
+    weighting = space.weighting
+    if space.exponent == 2 and hasattr(weighting, 'const'):
+        return float(weighting.const)
+    else:
+        return None
+
+
 def as_scipy_operator(op):
     """Wrap ``op`` as a ``scipy.sparse.linalg.LinearOperator``.
 
@@ -17,14 +17,14 @@ from odl.operator.operator import Operator
 from odl.set import RealNumbers, ComplexNumbers
 from odl.space import ProductSpace, tensor_space
 from odl.space.base_tensors import TensorSpace
-from odl.space.weighting import ArrayWeighting
+from odl.space.weighting import ArrayWeighting, ConstWeighting
 from odl.util import (
     signature_string, indent, dtype_repr, moveaxis, writable_array)
 
 
 __all__ = ('PointwiseNorm', 'PointwiseInner', 'PointwiseSum', 'MatrixOperator',
-           'SamplingOperator', 'WeightedSumSamplingOperator',
-           'FlatteningOperator')
+           'SparseMatrixOperator', 'SamplingOperator',
+           'WeightedSumSamplingOperator', 'FlatteningOperator')
 
 _SUPPORTED_DIFF_METHODS = ('central', 'forward', 'backward')
 
@@ -229,6 +229,10 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
             self._call_vecfield_1(f, out)
         elif self.exponent == float('inf'):
             self._call_vecfield_inf(f, out)
+        elif (self.exponent == 2.0 and
+              self.base_space.field == RealNumbers() and
+              _is_vectorizable(f, out)):
+            self._call_vecfield_2_block(f, out)
         else:
             self._call_vecfield_p(f, out)
 
@@ -264,6 +268,18 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
                 tmp *= wi
             out.ufuncs.maximum(tmp, out=out)
 
+    def _call_vecfield_2_block(self, vf, out):
+        """Implement ``self(vf, out)`` for exponent 2 in one call."""
+        data = vf.data
+        with writable_array(out) as out_arr:
+            if self.is_weighted:
+                weights = self.weights.astype(data.dtype)
+                np.einsum('i,i...,i...->...', weights, data, data,
+                          out=out_arr)
+            else:
+                np.einsum('i...,i...->...', data, data, out=out_arr)
+            np.sqrt(out_arr, out=out_arr)
+
     def _call_vecfield_p(self, vf, out):
         """Implement ``self(vf, out)`` for exponent 1 < p < ``inf``."""
         # Optimization for 1 component - just absolute value (maybe weighted)
@@ -520,6 +536,20 @@ class PointwiseInner(PointwiseInnerBase):
 
     def _call(self, vf, out):
         """Implement ``self(vf, out)``."""
+        if (self.domain.field != ComplexNumbers() and
+                self.vecfield.data is not None and
+                _is_vectorizable(vf, out)):
+            # Single call for contiguous vector fields
+            with writable_array(out) as out_arr:
+                if self.is_weighted:
+                    weights = self.weights.astype(vf.dtype)
+                    np.einsum('i,i...,i...->...', weights, vf.data,
+                              self.vecfield.data, out=out_arr)
+                else:
+                    np.einsum('i...,i...->...', vf.data, self.vecfield.data,
+                              out=out_arr)
+            return
+
         if self.domain.field == ComplexNumbers():
             vf[0].multiply(self._vecfield[0].conj(), out=out)
         else:
@@ -627,6 +657,15 @@ class PointwiseInnerAdjoint(PointwiseInnerBase):
 
     def _call(self, f, out):
         """Implement ``self(vf, out)``."""
+        if self.vecfield.data is not None and _is_vectorizable(out, f):
+            # Single call for contiguous vector fields
+            np.multiply(self.vecfield.data, f.asarray(), out=out.data)
+            for oi, ran_wi, dom_wi in zip(out.data, self.__ran_weights,
+                                          self.weights):
+                if not np.isclose(ran_wi, dom_wi):
+                    oi *= dom_wi / ran_wi
+            return
+
         for vfi, oi, ran_wi, dom_wi in zip(self.vecfield, out,
                                            self.__ran_weights, self.weights):
             vfi.multiply(f, out=oi)
@@ -976,6 +1015,178 @@ class MatrixOperator(Operator):
         return repr(self)
 
 
+class SparseMatrixOperator(Operator):
+
+    """Linear operator given by a sparse matrix acting on flattened arrays.
+
+    In contrast to `MatrixOperator`, domain and range can have arbitrary
+    shapes, and they can also be power spaces. Elements are flattened in C
+    order before the multiplication with the matrix. This makes the class
+    suitable for storing the result of
+    `odl.operator.oputils.sparse_matrix_representation`, i.e., to replace a
+    matrix-free operator with one that is applied by a sparse matrix-vector
+    product.
+    """
+
+    def __init__(self, matrix, domain=None, range=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        matrix : `scipy.sparse.base.spmatrix` or `array-like`
+            Matrix representing the linear mapping of flattened arrays.
+            It is converted to CSR format.
+        domain : `TensorSpace` or power space of `TensorSpace`, optional
+            Space of elements on which the operator can act. Its
+            ``size`` must be equal to ``matrix.shape[1]``.
+            For the default ``None``, a space with 1 axis and size
+            ``matrix.shape[1]`` is used, together with the matrix' data
+            type.
+        range : `TensorSpace` or power space of `TensorSpace`, optional
+            Space of elements on to which the operator maps. Its
+            ``size`` must be equal to ``matrix.shape[0]``.
+            For the default ``None``, a space with 1 axis and size
+            ``matrix.shape[0]`` is used, together with the matrix' data
+            type.
+
+        Examples
+        --------
+        Compile a gradient into a sparse matrix once, and apply the
+        matrix afterwards:
+
+        >>> space = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+        >>> grad = odl.Gradient(space)
+        >>> matrix = odl.sparse_matrix_representation(grad)
+        >>> op = SparseMatrixOperator(matrix, grad.domain, grad.range)
+        >>> x = odl.phantom.white_noise(space)
+        >>> op(x).space == grad.range
+        True
+        >>> (op(x) - grad(x)).norm() < 1e-10
+        True
+
+        The adjoint is the conjugate transposed matrix, scaled by the
+        ratio of the space weightings:
+
+        >>> y = odl.phantom.white_noise(grad.range)
+        >>> (op.adjoint(y) - grad.adjoint(y)).norm() < 1e-10
+        True
+        """
+        # Lazy import to improve `import odl` time
+        import scipy.sparse
+
+        if scipy.sparse.isspmatrix(matrix):
+            self.__matrix = matrix.tocsr()
+        else:
+            self.__matrix = scipy.sparse.csr_matrix(np.array(matrix,
+                                                             copy=False,
+                                                             ndmin=2))
+
+        if self.matrix.ndim != 2:
+            raise ValueError('`matrix` has {} axes instead of 2'
+                             ''.format(self.matrix.ndim))
+
+        if domain is None:
+            domain = tensor_space(self.matrix.shape[1],
+                                  dtype=self.matrix.dtype)
+        if range is None:
+            range = tensor_space(self.matrix.shape[0],
+                                 dtype=self.matrix.dtype)
+
+        for space, name, size in [(domain, 'domain', self.matrix.shape[1]),
+                                  (range, 'range', self.matrix.shape[0])]:
+            if not (isinstance(space, TensorSpace) or
+                    (isinstance(space, ProductSpace) and
+                     space.is_power_space and
+                     all(isinstance(spc, TensorSpace) for spc in space))):
+                raise TypeError('`{}` must be a `TensorSpace` or a power '
+                                'space of `TensorSpace`, got {!r}'
+                                ''.format(name, space))
+            if space.size != size:
+                raise ValueError('`{}.size` not equal to matrix size {}, '
+                                 'got {}'.format(name, size, space.size))
+
+        result_dtype = np.promote_types(domain.dtype, self.matrix.dtype)
+        if not np.can_cast(result_dtype, range.dtype):
+            raise ValueError('result data type {} cannot be safely cast to '
+                             'range data type {}'
+                             ''.format(dtype_repr(result_dtype),
+                                       dtype_repr(range.dtype)))
+
+        super(SparseMatrixOperator, self).__init__(domain, range, linear=True)
+
+    @property
+    def matrix(self):
+        """Sparse matrix representing this operator, in CSR format."""
+        return self.__matrix
+
+    @property
+    def adjoint(self):
+        """Adjoint operator represented by the adjoint matrix.
+
+        If the spaces are weighted by constants, the adjoint matrix is
+        scaled by the ratio of the constants.
+
+        Returns
+        -------
+        adjoint : `SparseMatrixOperator`
+
+        Raises
+        ------
+        NotImplementedError
+            If a space has a weighting that is not constant.
+        """
+        dom_const = _const_weighting(self.domain)
+        ran_const = _const_weighting(self.range)
+        if dom_const is None or ran_const is None:
+            raise NotImplementedError('adjoint only defined for spaces with '
+                                      'constant weighting')
+
+        adj_matrix = self.matrix.conj().T.tocsr()
+        if dom_const != ran_const:
+            adj_matrix *= ran_const / dom_const
+        return SparseMatrixOperator(adj_matrix, domain=self.range,
+                                    range=self.domain)
+
+    def _call(self, x, out=None):
+        """Return ``self(x[, out])``."""
+        # Unfortunately, there is no native in-place dot product for
+        # sparse matrices
+        result = self.matrix.dot(x.asarray().ravel())
+        if out is None:
+            return self.range.element(result.reshape(self.range.shape))
+        else:
+            with writable_array(out) as out_arr:
+                out_arr[:] = result.reshape(self.range.shape)
+            return out
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        # Don't convert the matrix to dense, can take forever
+        posargs = [repr(self.matrix), self.domain, self.range]
+        inner_str = signature_string(posargs, [], sep=',\n',
+                                     mod=[['!s', '!r', '!r'], ''])
+        return '{}(\n{}\n)'.format(self.__class__.__name__,
+                                    indent(inner_str))
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return repr(self)
+
+
+def _const_weighting(space):
+    """Return the weighting constant of ``space``, or ``None``."""
+    if isinstance(space, ProductSpace):
+        base_const = _const_weighting(space[0])
+        if base_const is None or not isinstance(space.weighting,
+                                                ConstWeighting):
+            return None
+        return space.weighting.const * base_const
+    elif isinstance(space.weighting, ConstWeighting):
+        return space.weighting.const
+    else:
+        return None
+
+
 def _normalize_sampling_points(sampling_points, ndim):
     """Normalize points to an ndim-long list of linear index arrays.
 
@@ -1567,6 +1778,19 @@ class FlatteningOperator(Operator):
         return repr(self)
 
 
+def _is_vectorizable(vf, f):
+    """Return ``True`` if ``vf`` and ``f`` can be combined in one call.
+
+    This is the case if the vector field ``vf`` stores its components
+    in one array (see `ProductSpaceElement.data`) with the same data
+    type as the scalar function ``f``, and the two do not overlap in
+    memory.
+    """
+    data = getattr(vf, 'data', None)
+    return (data is not None and data.dtype == f.dtype and
+            not np.may_share_memory(data, f.asarray()))
+
+
 def is_compatible_space(space, base_space):
     """Check compatibility of a (power) space with a base space.
 
@@ -9,15 +9,23 @@
 """Phantoms given by simple geometric objects such as cubes or spheres."""
 
 from __future__ import print_function, division, absolute_import
+from bisect import bisect_left
+from itertools import product
+from multiprocessing import cpu_count
 import numpy as np
 
 from odl.discr.lp_discr import uniform_discr_fromdiscr
 from odl.util.numerics import resize_array
+from odl.util.parallel import parallel_map
 
 __all__ = ('cuboid', 'defrise', 'ellipsoid_phantom', 'indicate_proj_axis',
            'smooth_cuboid', 'tgv_phantom')
 
 
+# Approximate number of array entries per slab in the ellipsoid rasterizer
+SLAB_SIZE = 2 ** 16
+
+
 def cuboid(space, min_pt=None, max_pt=None):
     """Rectangular cuboid.
 
@@ -307,21 +315,188 @@ def indicate_proj_axis(space, scale_structures=0.5):
     return space.element(phan)
 
 
-def _getshapes_2d(center, max_radius, shape):
-    """Calculate indices and slices for the bounding box of a disk."""
-    index_mean = shape * center
-    index_radius = max_radius / 2.0 * np.array(shape)
+def _normalized_coord_vectors(space):
+    """Return the grid coordinate vectors of ``space`` mapped to [-1, 1].
+
+    Where ``space.shape`` is 1 in an axis, the coordinate is 0. This
+    allows constructing a slice of a phantom.
+
+    Returns
+    -------
+    coord_vecs : list of `numpy.ndarray`
+        Normalized coordinate vectors.
+    scalings : list of float
+        Factors by which the coordinates were scaled.
+    """
+    minp = space.grid.min_pt
+    maxp = space.grid.max_pt
+    coord_vecs = []
+    scalings = []
+    for i, vec in enumerate(space.grid.coord_vectors):
+        mean_i = (minp[i] + maxp[i]) / 2.0
+        # Where space.shape = 1, we have minp = maxp, so we set diff_i = 1
+        # to avoid division by zero.
+        diff_i = (maxp[i] - minp[i]) / 2.0 or 1.0
+        coord_vecs.append((vec - mean_i) / diff_i)
+        scalings.append(1.0 / diff_i)
+    return coord_vecs, scalings
+
+
+def _rasterize_ellipsoids(space, ellipsoids, supersampling=1,
+                          num_threads=None):
+    """Return an array with the sum of ellipsoid indicator functions.
 
-    # Avoid negative indices
-    min_idx = np.maximum(np.floor(index_mean - index_radius), 0).astype(int)
-    max_idx = np.ceil(index_mean + index_radius).astype(int)
-    idx = [slice(minx, maxx) for minx, maxx in zip(min_idx, max_idx)]
-    shapes = [(idx[0], slice(None)),
-              (slice(None), idx[1])]
-    return tuple(idx), tuple(shapes)
+    The volume is processed in slabs along axis 0 on a thread pool. For
+    each slab, only the ellipsoids whose bounding box intersects the slab
+    are evaluated, and only on the intersection.
 
+    Parameters
+    ----------
+    space : `DiscreteLp`
+        Space in which the phantom is created.
+    ellipsoids : sequence of tuple
+        Each entry is a tuple ``(value, axes, center, mat)``, where
+        ``axes`` and ``center`` are given in normalized coordinates,
+        and ``mat`` is a rotation matrix applied to ``x - center``, or
+        ``None`` for no rotation.
+    supersampling : positive int, optional
+        Number of sampling points per cell and axis. For values larger
+        than 1, each cell gets the fraction of its sampling points inside
+        an ellipsoid, which gives anti-aliased edges.
+    num_threads : positive int, optional
+        Number of threads to use. Default: number of CPUs
 
-def _ellipse_phantom_2d(space, ellipses):
+    Returns
+    -------
+    phantom : `numpy.ndarray`
+        Array of shape ``space.shape`` and data type ``space.dtype``.
+    """
+    ndim = space.ndim
+    shape = space.shape
+    supersampling, supersampling_in = int(supersampling), supersampling
+    if supersampling < 1 or supersampling != supersampling_in:
+        raise ValueError('`supersampling` must be a positive integer, got '
+                         '{}'.format(supersampling_in))
+
+    coord_vecs, scalings = _normalized_coord_vectors(space)
+
+    # Offsets of the sampling points relative to the cell midpoints, and
+    # the maximum offset per axis that enlarges the bounding boxes
+    offsets = []
+    for i in range(ndim):
+        if supersampling == 1 or shape[i] == 1:
+            offsets.append(np.zeros(1))
+        else:
+            cell_side = space.cell_sides[i] * scalings[i]
+            rel_offsets = ((np.arange(supersampling) + 0.5) / supersampling -
+                           0.5)
+            offsets.append(rel_offsets * cell_side)
+    margins = [np.max(np.abs(off)) for off in offsets]
+    num_samples = float(np.prod([len(off) for off in offsets]))
+
+    # Bounding boxes as index ranges, in the original order
+    boxes = []
+    for value, axes, center, mat in ellipsoids:
+        if mat is None:
+            extent = np.abs(axes)
+        else:
+            extent = np.sqrt((mat ** 2).T.dot(np.square(axes)))
+        box = []
+        for i in range(ndim):
+            start = np.searchsorted(
+                coord_vecs[i], center[i] - extent[i] - margins[i], 'left')
+            stop = np.searchsorted(
+                coord_vecs[i], center[i] + extent[i] + margins[i], 'right')
+            box.append(slice(start, stop))
+        if all(slc.start < slc.stop for slc in box):
+            boxes.append(box)
+        else:
+            boxes.append(None)
+
+    # Sort by start of the bounding box in axis 0 for quick lookup
+    order = sorted((i for i in range(len(boxes)) if boxes[i] is not None),
+                   key=lambda i: boxes[i][0].start)
+    starts = [boxes[i][0].start for i in order]
+
+    phantom = np.zeros(shape, dtype=space.dtype)
+
+    def add_ellipsoid(value, axes, center, mat, box):
+        """Add one ellipsoid within ``box`` to ``phantom``."""
+        scales = [1 / a ** 2 for a in axes]
+        count = None
+        for offset in product(*offsets):
+            # Coordinate differences as broadcastable 1d arrays
+            diffs = []
+            for i in range(ndim):
+                bcast = [1] * ndim
+                bcast[i] = -1
+                diff = coord_vecs[i][box[i]] + offset[i] - center[i]
+                diffs.append(diff.reshape(bcast))
+
+            if mat is None:
+                squared_dist = [a * d ** 2 for a, d in zip(scales, diffs)]
+            else:
+                squared_dist = []
+                for j in range(ndim):
+                    rotated = mat[j, 0] * diffs[0]
+                    for i in range(1, ndim):
+                        rotated = rotated + mat[j, i] * diffs[i]
+                    squared_dist.append(scales[j] * rotated ** 2)
+
+            # Parentheses to get best order for broadcasting
+            if ndim == 3:
+                radius = squared_dist[0] + (squared_dist[1] +
+                                            squared_dist[2])
+            else:
+                radius = squared_dist[0]
+                for sq_dist in squared_dist[1:]:
+                    radius = radius + sq_dist
+
+            inside = radius <= 1
+            if num_samples == 1:
+                sub = phantom[tuple(box)]
+                np.add(sub, value, out=sub, where=inside)
+                return
+            elif count is None:
+                count = inside.astype(float)
+            else:
+                count += inside
+
+        phantom[tuple(box)] += value * count / num_samples
+
+    def process_slabs(slabs):
+        for slab_start, slab_stop in slabs:
+            # Ellipsoids intersecting the slab, in original order
+            last = bisect_left(starts, slab_stop)
+            indices = sorted(i for i in order[:last]
+                             if boxes[i][0].stop > slab_start)
+            for i in indices:
+                value, axes, center, mat = ellipsoids[i]
+                box = list(boxes[i])
+                box[0] = slice(max(box[0].start, slab_start),
+                               min(box[0].stop, slab_stop))
+                add_ellipsoid(value, axes, center, mat, box)
+
+    row_size = int(np.prod(shape[1:]))
+    step = max(1, SLAB_SIZE // max(row_size, 1))
+    slabs = [(start, min(start + step, shape[0]))
+             for start in range(0, shape[0], step)]
+
+    if num_threads is None:
+        num_threads = cpu_count()
+    num_threads = max(1, min(num_threads, len(slabs)))
+    if num_threads == 1:
+        process_slabs(slabs)
+    else:
+        bounds = np.linspace(0, len(slabs), num_threads + 1).astype(int)
+        parallel_map(process_slabs, [slabs[i:j] for i, j in
+                                     zip(bounds[:-1], bounds[1:])],
+                     num_threads)
+
+    return phantom
+
+
+def _ellipse_phantom_2d(space, ellipses, supersampling=1):
     """Create a phantom of ellipses in 2d space.
 
     Parameters
@@ -342,6 +517,9 @@ def _ellipse_phantom_2d(space, ellipses):
         The provided ellipses need to be specified relative to the
         reference rectangle ``[-1, -1] x [1, 1]``. Angles are to be given
         in radians.
+    supersampling : positive int, optional
+        Number of sampling points per cell and axis, see
+        `ellipsoid_phantom`.
 
     Returns
     -------
@@ -352,101 +530,26 @@ def _ellipse_phantom_2d(space, ellipses):
     --------
     shepp_logan : The typical use-case for this function.
     """
-    # Blank image
-    p = np.zeros(space.shape, dtype=space.dtype)
-
-    minp = space.grid.min_pt
-    maxp = space.grid.max_pt
-
-    # Create the pixel grid
-    grid_in = space.grid.meshgrid
-
-    # move points to [-1, 1]
-    grid = []
-    for i in range(2):
-        mean_i = (minp[i] + maxp[i]) / 2.0
-        # Where space.shape = 1, we have minp = maxp, so we set diff_i = 1
-        # to avoid division by zero. Effectively, this allows constructing
-        # a slice of a 2D phantom.
-        diff_i = (maxp[i] - minp[i]) / 2.0 or 1.0
-        grid.append((grid_in[i] - mean_i) / diff_i)
-
+    params = []
     for ellip in ellipses:
         assert len(ellip) == 6
 
-        intensity = ellip[0]
-        a_squared = ellip[1] ** 2
-        b_squared = ellip[2] ** 2
-        x0 = ellip[3]
-        y0 = ellip[4]
         theta = ellip[5]
-
-        scales = [1 / a_squared, 1 / b_squared]
-        center = (np.array([x0, y0]) + 1.0) / 2.0
-
-        # Create the offset x,y and z values for the grid
         if theta != 0:
             # Rotate the points to the expected coordinate system.
             ctheta = np.cos(theta)
             stheta = np.sin(theta)
-
             mat = np.array([[ctheta, stheta],
                             [-stheta, ctheta]])
-
-            # Calculate the points that could possibly be inside the volume
-            # Since the points are rotated, we cannot do anything directional
-            # without more logic
-            max_radius = np.sqrt(
-                np.abs(mat).dot([a_squared, b_squared]))
-            idx, shapes = _getshapes_2d(center, max_radius, space.shape)
-
-            subgrid = [g[idi] for g, idi in zip(grid, shapes)]
-            offset_points = [vec * (xi - x0i)[..., None]
-                             for xi, vec, x0i in zip(subgrid,
-                                                     mat.T,
-                                                     [x0, y0])]
-            rotated = offset_points[0] + offset_points[1]
-            np.square(rotated, out=rotated)
-            radius = np.dot(rotated, scales)
         else:
-            # Calculate the points that could possibly be inside the volume
-            max_radius = np.sqrt([a_squared, b_squared])
-            idx, shapes = _getshapes_2d(center, max_radius, space.shape)
-
-            subgrid = [g[idi] for g, idi in zip(grid, shapes)]
-            squared_dist = [ai * (xi - x0i) ** 2
-                            for xi, ai, x0i in zip(subgrid,
-                                                   scales,
-                                                   [x0, y0])]
-
-            # Parentheses to get best order for broadcasting
-            radius = squared_dist[0] + squared_dist[1]
-
-        # Find the points within the ellipse
-        inside = radius <= 1
-
-        # Add the ellipse intensity to those points
-        p[idx][inside] += intensity
-
-    return space.element(p)
+            mat = None
 
+        params.append((ellip[0], ellip[1:3], ellip[3:5], mat))
 
-def _getshapes_3d(center, max_radius, shape):
-    """Calculate indices and slices for the bounding box of a ball."""
-    index_mean = shape * center
-    index_radius = max_radius / 2.0 * np.array(shape)
+    return space.element(_rasterize_ellipsoids(space, params, supersampling))
 
-    min_idx = np.floor(index_mean - index_radius).astype(int)
-    min_idx = np.maximum(min_idx, 0)  # avoid negative indices
-    max_idx = np.ceil(index_mean + index_radius).astype(int)
-    idx = [slice(minx, maxx) for minx, maxx in zip(min_idx, max_idx)]
-    shapes = [(idx[0], slice(None), slice(None)),
-              (slice(None), idx[1], slice(None)),
-              (slice(None), slice(None), idx[2])]
-    return tuple(idx), tuple(shapes)
 
-
-def _ellipsoid_phantom_3d(space, ellipsoids):
+def _ellipsoid_phantom_3d(space, ellipsoids, supersampling=1):
     """Create an ellipsoid phantom in 3d space.
 
     Parameters
@@ -466,6 +569,9 @@ def _ellipsoid_phantom_3d(space, ellipsoids):
         The provided ellipsoids need to be specified relative to the
         reference cube ``[-1, -1, -1] x [1, 1, 1]``. Angles are to be given
         in radians.
+    supersampling : positive int, optional
+        Number of sampling points per cell and axis, see
+        `ellipsoid_phantom`.
 
     Returns
     -------
@@ -476,43 +582,11 @@ def _ellipsoid_phantom_3d(space, ellipsoids):
     --------
     shepp_logan : The typical use-case for this function.
     """
-    # Blank volume
-    p = np.zeros(space.shape, dtype=space.dtype)
-
-    minp = space.grid.min_pt
-    maxp = space.grid.max_pt
-
-    # Create the pixel grid
-    grid_in = space.grid.meshgrid
-
-    # Move points to [-1, 1]
-    grid = []
-    for i in range(3):
-        mean_i = (minp[i] + maxp[i]) / 2.0
-        # Where space.shape = 1, we have minp = maxp, so we set diff_i = 1
-        # to avoid division by zero. Effectively, this allows constructing
-        # a slice of a 3D phantom.
-        diff_i = (maxp[i] - minp[i]) / 2.0 or 1.0
-        grid.append((grid_in[i] - mean_i) / diff_i)
-
+    params = []
     for ellip in ellipsoids:
         assert len(ellip) == 10
 
-        intensity = ellip[0]
-        a_squared = ellip[1] ** 2
-        b_squared = ellip[2] ** 2
-        c_squared = ellip[3] ** 2
-        x0 = ellip[4]
-        y0 = ellip[5]
-        z0 = ellip[6]
-        phi = ellip[7]
-        theta = ellip[8]
-        psi = ellip[9]
-
-        scales = [1 / a_squared, 1 / b_squared, 1 / c_squared]
-        center = (np.array([x0, y0, z0]) + 1.0) / 2.0
-
-        # Create the offset x,y and z values for the grid
+        phi, theta, psi = ellip[7:10]
         if any([phi, theta, psi]):
             # Rotate the points to the expected coordinate system.
             cphi = np.cos(phi)
@@ -531,46 +605,16 @@ def _ellipsoid_phantom_3d(space, ellipsoids):
                             [stheta * sphi,
                              -stheta * cphi,
                              ctheta]])
-
-            # Calculate the points that could possibly be inside the volume
-            # Since the points are rotated, we cannot do anything directional
-            # without more logic
-            max_radius = np.sqrt(
-                np.abs(mat).dot([a_squared, b_squared, c_squared]))
-            idx, shapes = _getshapes_3d(center, max_radius, space.shape)
-
-            subgrid = [g[idi] for g, idi in zip(grid, shapes)]
-            offset_points = [vec * (xi - x0i)[..., None]
-                             for xi, vec, x0i in zip(subgrid,
-                                                     mat.T,
-                                                     [x0, y0, z0])]
-            rotated = offset_points[0] + offset_points[1] + offset_points[2]
-            np.square(rotated, out=rotated)
-            radius = np.dot(rotated, scales)
         else:
-            # Calculate the points that could possibly be inside the volume
-            max_radius = np.sqrt([a_squared, b_squared, c_squared])
-            idx, shapes = _getshapes_3d(center, max_radius, space.shape)
-
-            subgrid = [g[idi] for g, idi in zip(grid, shapes)]
-            squared_dist = [ai * (xi - x0i) ** 2
-                            for xi, ai, x0i in zip(subgrid,
-                                                   scales,
-                                                   [x0, y0, z0])]
-
-            # Parentheses to get best order for broadcasting
-            radius = squared_dist[0] + (squared_dist[1] + squared_dist[2])
-
-        # Find the points within the ellipse
-        inside = radius <= 1
+            mat = None
 
-        # Add the ellipse intensity to those points
-        p[idx][inside] += intensity
+        params.append((ellip[0], ellip[1:4], ellip[4:7], mat))
 
-    return space.element(p)
+    return space.element(_rasterize_ellipsoids(space, params, supersampling))
 
 
-def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
+def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None,
+                      supersampling=1):
     """Return a phantom given by ellipsoids.
 
     Parameters
@@ -612,6 +656,11 @@ def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
             new_max_pt = space.max_pt + (min_pt - space.min_pt)
 
         Providing both results in a scaled version of the phantom.
+    supersampling : positive int, optional
+        Number of sampling points per cell and axis. For values larger
+        than 1, each cell gets the value of an ellipsoid weighted by the
+        fraction of its sampling points inside the ellipsoid, resulting in
+        anti-aliased edges. The default 1 samples at the cell midpoints.
 
     Notes
     -----
@@ -626,14 +675,13 @@ def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
     faster than "trivial" implementations. It is therefore recommended to use
     it in all phantoms where applicable.
 
-    The main optimization is that it only considers a subset of all the
-    points when updating for each ellipse. It does this by first finding
-    a subset of points that could possibly be inside the ellipse. This
-    optimization is very good for "spherical" ellipsoids, but not so
-    much for elongated or rotated ones.
+    The main optimization is that it only considers the points in the
+    bounding box of each ellipse. Furthermore, the volume is processed in
+    slabs along the first axis in parallel, where each slab is only
+    updated by the ellipses intersecting it.
 
-    It also does calculations wherever possible on the meshgrid instead of
-    individual points.
+    It also does calculations wherever possible on the coordinate vectors
+    instead of individual points.
 
     Examples
     --------
@@ -649,6 +697,15 @@ def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
      [ 0.,  1.,  2.,  1.,  0.],
      [ 0.,  0.,  1.,  0.,  0.]]
 
+    With supersampling, cells at the edges are partially filled:
+
+    >>> print(ellipsoid_phantom(space, ellipses[:1], supersampling=4))
+    [[ 0.  ,  0.25,  0.5 ,  0.25,  0.  ],
+     [ 0.25,  1.  ,  1.  ,  1.  ,  0.25],
+     [ 0.5 ,  1.  ,  1.  ,  1.  ,  0.5 ],
+     [ 0.25,  1.  ,  1.  ,  1.  ,  0.25],
+     [ 0.  ,  0.25,  0.5 ,  0.25,  0.  ]]
+
     See Also
     --------
     odl.phantom.transmission.shepp_logan : Classical Shepp-Logan phantom,
@@ -666,7 +723,7 @@ def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
         raise ValueError('dimension not 2 or 3, no phantom available')
 
     if min_pt is None and max_pt is None:
-        return _phantom(space, ellipsoids)
+        return _phantom(space, ellipsoids, supersampling)
 
     else:
         # Generate a temporary space with given `min_pt` and `max_pt`
@@ -697,7 +754,7 @@ def ellipsoid_phantom(space, ellipsoids, min_pt=None, max_pt=None):
             space, min_pt=snapped_min_pt, max_pt=snapped_max_pt,
             cell_sides=space.cell_sides)
 
-        tmp_phantom = _phantom(tmp_space, ellipsoids)
+        tmp_phantom = _phantom(tmp_space, ellipsoids, supersampling)
         offset = space.partition.index(tmp_space.min_pt)
         return space.element(
             resize_array(tmp_phantom, space.shape, offset))
@@ -28,6 +28,7 @@ from odl.solvers.nonsmooth.proximal_operators import (
     proximal_convex_conj_kl, proximal_convex_conj_kl_cross_entropy,
     combine_proximals, proximal_convex_conj)
 from odl.util import conj_exponent, moveaxis
+from odl.util.numerics import batched_svdvals, batched_svd_map
 
 
 __all__ = ('ZeroFunctional', 'ConstantFunctional', 'ScalingFunctional',
@@ -1964,9 +1965,11 @@ class NuclearNorm(Functional):
             space=space, linear=False, grad_lipschitz=np.nan)
 
         self.outernorm = LpNorm(self.domain[0, 0], exponent=outer_exp)
-        self.pwisenorm = PointwiseNorm(self.domain[0],
-                                       exponent=singular_vector_exp)
         self.pshape = (len(self.domain), len(self.domain[0]))
+        # There are min(n, m) singular values per point
+        self.pwisenorm = PointwiseNorm(
+            ProductSpace(self.domain[0, 0], min(self.pshape)),
+            exponent=singular_vector_exp)
 
     def _asarray(self, vec):
         """Convert ``x`` to an array.
@@ -1997,7 +2000,7 @@ class NuclearNorm(Functional):
 
         # Convert to array with most
         arr = self._asarray(x)
-        svd_diag = np.linalg.svd(arr, compute_uv=False)
+        svd_diag = batched_svdvals(arr)
 
         # Rotate the axes so the svd-direction is first
         s_reordered = moveaxis(svd_diag, -1, 0)
@@ -2022,10 +2025,6 @@ class NuclearNorm(Functional):
             raise NotImplementedError('`proximal` only implemented for '
                                       '`singular_vector_exp` in [1, 2, inf]')
 
-        def nddot(a, b):
-            """Compute pointwise matrix product in the last indices."""
-            return np.einsum('...ij,...jk->...ik', a, b)
-
         func = self
 
         # Add epsilon to fix rounding errors, i.e. make sure that when we
@@ -2042,46 +2041,35 @@ class NuclearNorm(Functional):
                 super(NuclearNormProximal, self).__init__(
                     func.domain, func.domain, linear=False)
 
-            def _call(self, x):
-                """Return ``self(x)``."""
-                arr = func._asarray(x)
-
-                # Compute SVD
-                U, s, Vt = np.linalg.svd(arr, full_matrices=False)
-
-                # transpose pointwise
-                V = Vt.swapaxes(-1, -2)
-
-                # Take pseudoinverse of s
-                sinv = s.copy()
-                sinv[sinv != 0] = 1 / sinv[sinv != 0]
-
-                # Take pointwise proximal operator of s w.r.t. the norm
-                # on the singular vectors
-                if func.pwisenorm.exponent == 1:
-                    abss = np.abs(s) - (self.sigma - eps)
-                    sprox = np.sign(s) * np.maximum(abss, 0)
-                elif func.pwisenorm.exponent == 2:
-                    s_reordered = moveaxis(s, -1, 0)
-                    snorm = func.pwisenorm(s_reordered).asarray()
-                    snorm = np.maximum(self.sigma, snorm, out=snorm)
-                    sprox = ((1 - eps) - self.sigma / snorm)[..., None] * s
-                elif func.pwisenorm.exponent == np.inf:
-                    snorm = np.sum(np.abs(s), axis=-1)
-                    snorm = np.maximum(self.sigma, snorm, out=snorm)
-                    sprox = ((1 - eps) - self.sigma / snorm)[..., None] * s
-                else:
-                    raise RuntimeError
-
-                # Compute s matrix
-                sproxsinv = (sprox * sinv)[..., :, None]
+            def _call(self, x, out):
+                """Implement ``self(x, out)``."""
+                sigma = self.sigma
+
+                def svdvals_prox(s):
+                    """Pointwise proximal operator of the singular values
+                    w.r.t. the norm on the singular vectors."""
+                    if func.pwisenorm.exponent == 1:
+                        abss = np.abs(s) - (sigma - eps)
+                        return np.sign(s) * np.maximum(abss, 0)
+                    elif func.pwisenorm.exponent == 2:
+                        snorm = np.sqrt(np.sum(s ** 2, axis=-1))
+                    elif func.pwisenorm.exponent == np.inf:
+                        snorm = np.sum(np.abs(s), axis=-1)
+                    else:
+                        raise RuntimeError
+                    snorm = np.maximum(sigma, snorm, out=snorm)
+                    return ((1 - eps) - sigma / snorm)[..., None] * s
 
-                # Compute the final result
-                result = nddot(nddot(arr, V), sproxsinv * Vt)
+                # Map the singular values pointwise, reusing the array
+                # as output since it is a copy anyway
+                arr = func._asarray(x)
+                batched_svd_map(arr, svdvals_prox, out=arr)
 
-                # Cast to vector and return. Note array and vector have
-                # different shapes.
-                return func._asvector(result)
+                # Note array and vector have different shapes
+                for i, out_i in enumerate(out):
+                    for j, out_ij in enumerate(out_i):
+                        out_ij[:] = arr[..., i, j]
+                return out
 
             def __repr__(self):
                 """Return ``repr(self)``."""
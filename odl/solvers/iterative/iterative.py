@@ -14,6 +14,7 @@ import numpy as np
 
 from odl.operator import IdentityOperator, OperatorComp, OperatorSum
 from odl.util import normalized_scalar_param_list
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('landweber', 'conjugate_gradient', 'conjugate_gradient_normal',
@@ -23,6 +24,7 @@ __all__ = ('landweber', 'conjugate_gradient', 'conjugate_gradient_normal',
 # TODO: update all docs
 
 
+@flush_callback_on_exit
 def landweber(op, x, rhs, niter, omega=None, projection=None, callback=None):
     """Optimized implementation of Landweber's method.
 
@@ -120,6 +122,7 @@ def landweber(op, x, rhs, niter, omega=None, projection=None, callback=None):
             callback(x)
 
 
+@flush_callback_on_exit
 def conjugate_gradient(op, x, rhs, niter, callback=None):
     """Optimized implementation of CG for self-adjoint operators.
 
@@ -201,6 +204,7 @@ def conjugate_gradient(op, x, rhs, niter, callback=None):
             callback(x)
 
 
+@flush_callback_on_exit
 def conjugate_gradient_normal(op, x, rhs, niter=1, callback=None):
     """Optimized implementation of CG for the normal equation.
 
@@ -307,6 +311,7 @@ def exp_zero_seq(base):
         yield value
 
 
+@flush_callback_on_exit
 def gauss_newton(op, x, rhs, niter, zero_seq=exp_zero_seq(2.0),
                  callback=None):
     """Optimized implementation of a Gauss-Newton method.
@@ -389,6 +394,7 @@ def gauss_newton(op, x, rhs, niter, zero_seq=exp_zero_seq(2.0),
             callback(x)
 
 
+@flush_callback_on_exit
 def kaczmarz(ops, x, rhs, niter, omega=1, projection=None, random=False,
              callback=None, callback_loop='outer'):
     """Optimized implementation of Kaczmarz's method.
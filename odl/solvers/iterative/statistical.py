@@ -11,12 +11,16 @@
 from __future__ import print_function, division, absolute_import
 import numpy as np
 
+from odl.solvers.util.callback import flush_callback_on_exit
+from odl.solvers.util.checkpoint import checkpoint_and_state
+
 __all__ = ('mlem', 'osmlem', 'loglikelihood')
 
 
 AVAILABLE_MLEM_NOISE = ('poisson',)
 
 
+@flush_callback_on_exit
 def mlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
 
     """Maximum Likelihood Expectation Maximation algorithm.
@@ -58,6 +62,8 @@ def mlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
         Usable with ``noise='poisson'``. The algorithm contains a ``A^T 1``
         term, if this parameter is given, it is replaced by it.
         Default: ``op.adjoint(op.range.one())``
+    checkpoint, resume_from : optional
+        Checkpointing of the iteration, see `osmlem`.
 
     Notes
     -----
@@ -81,6 +87,7 @@ def mlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
            **kwargs)
 
 
+@flush_callback_on_exit
 def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
     """Ordered Subsets Maximum Likelihood Expectation Maximation algorithm.
 
@@ -121,6 +128,14 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
         Usable with ``noise='poisson'``. The algorithm contains an ``A^T 1``
         term, if this parameter is given, it is replaced by it.
         Default: ``op[i].adjoint(op[i].range.one())``
+    checkpoint : `SolverCheckpoint` or str, optional
+        If given, ``x`` is periodically written to disk after full
+        iterations over all subsets. A string is interpreted as
+        directory of a `SolverCheckpoint` with default settings.
+    resume_from : `SolverCheckpoint` or str, optional
+        Checkpoint from which the iteration is resumed. The stored state
+        overrides ``x``, and only the iterations missing to reach
+        ``niter`` are run.
 
     Notes
     -----
@@ -189,7 +204,15 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
         tmp_dom = op[0].domain.element()
         tmp_ran = [opi.range.element() for opi in op]
 
-        for _ in range(niter):
+        # Checkpointing
+        checkpoint, state = checkpoint_and_state(
+            kwargs.pop('checkpoint', None), kwargs.pop('resume_from', None))
+        start = 0
+        if state is not None:
+            state.restore(x=x)
+            start = state.iteration
+
+        for k in range(start, niter):
             for i in range(n_ops):
                 op[i](x, out=tmp_ran[i])
                 tmp_ran[i].ufuncs.maximum(eps, out=tmp_ran[i])
@@ -202,6 +225,12 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
 
                 if callback is not None:
                     callback(x)
+
+            if checkpoint is not None:
+                checkpoint.update(k + 1, {'x': x})
+
+        if checkpoint is not None:
+            checkpoint.finish(max(niter, start), {'x': x})
     else:
         raise RuntimeError('unknown noise model')
 
@@ -4,11 +4,14 @@ from __future__ import division
 from builtins import range
 
 from odl.operator import Operator, OpDomainError
+from odl.solvers.util.callback import flush_callback_on_exit
+from odl.solvers.util.checkpoint import checkpoint_and_state
 
 
 __all__ = ('admm_linearized',)
 
 
+@flush_callback_on_exit
 def admm_linearized(x, f, g, L, tau, sigma, niter, **kwargs):
     """Generic linearized ADMM method for convex problems.
 
@@ -42,6 +45,14 @@ def admm_linearized(x, f, g, L, tau, sigma, niter, **kwargs):
     ----------------
     callback : callable, optional
         Function called with the current iterate after each iteration.
+    checkpoint : `SolverCheckpoint` or str, optional
+        If given, the state of the iteration (``x``, ``z`` and ``u``) is
+        periodically written to disk. A string is interpreted as
+        directory of a `SolverCheckpoint` with default settings.
+    resume_from : `SolverCheckpoint` or str, optional
+        Checkpoint from which the iteration is resumed. The stored state
+        overrides ``x``, and only the iterations missing to reach
+        ``niter`` are run.
 
     Notes
     -----
@@ -112,6 +123,14 @@ def admm_linearized(x, f, g, L, tau, sigma, niter, **kwargs):
     z = L.range.zero()
     u = L.range.zero()
 
+    # Checkpointing
+    checkpoint, state = checkpoint_and_state(kwargs.pop('checkpoint', None),
+                                             kwargs.pop('resume_from', None))
+    start = 0
+    if state is not None:
+        state.restore(x=x, z=z, u=u)
+        start = state.iteration
+
     # Temporary for Lx + u [- z]
     tmp_ran = L(x)
     # Temporary for L^*(Lx + u - z)
@@ -121,7 +140,7 @@ def admm_linearized(x, f, g, L, tau, sigma, niter, **kwargs):
     prox_tau_f = f.proximal(tau)
     prox_sigma_g = g.proximal(sigma)
 
-    for _ in range(niter):
+    for k in range(start, niter):
         # tmp_ran has value Lx^k here
         # tmp_dom <- L^*(Lx^k + u^k - z^k)
         tmp_ran += u
@@ -145,7 +164,14 @@ def admm_linearized(x, f, g, L, tau, sigma, niter, **kwargs):
         if callback is not None:
             callback(x)
 
+        if checkpoint is not None:
+            checkpoint.update(k + 1, {'x': x, 'z': z, 'u': u})
+
+    if checkpoint is not None:
+        checkpoint.finish(max(niter, start), {'x': x, 'z': z, 'u': u})
+
 
+@flush_callback_on_exit
 def admm_linearized_simple(x, f, g, L, tau, sigma, niter, **kwargs):
     """Non-optimized version of ``admm_linearized``.
 
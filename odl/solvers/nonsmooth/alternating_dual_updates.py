@@ -17,9 +17,12 @@ from __future__ import print_function, division, absolute_import
 
 import numpy as np
 
+from odl.solvers.util.callback import flush_callback_on_exit
+
 __all__ = ('adupdates',)
 
 
+@flush_callback_on_exit
 def adupdates(x, g, L, stepsize, inner_stepsizes, niter, random=False,
               callback=None, callback_loop='outer'):
     r"""Alternating Dual updates method.
@@ -15,9 +15,12 @@ difference of two convex functions.
 
 from __future__ import print_function, division, absolute_import
 
+from odl.solvers.util.callback import flush_callback_on_exit
+
 __all__ = ('dca', 'prox_dca', 'doubleprox_dc')
 
 
+@flush_callback_on_exit
 def dca(x, f, g, niter, callback=None):
     r"""Subgradient DCA of Tao and An.
 
@@ -95,6 +98,7 @@ def dca(x, f, g, niter, callback=None):
             callback(x)
 
 
+@flush_callback_on_exit
 def prox_dca(x, f, g, niter, gamma, callback=None):
     r"""Proximal DCA of Sun, Sampaio and Candido.
 
@@ -166,6 +170,7 @@ def prox_dca(x, f, g, niter, gamma, callback=None):
             callback(x)
 
 
+@flush_callback_on_exit
 def doubleprox_dc(x, y, f, phi, g, K, niter, gamma, mu, callback=None):
     r"""Double-proxmial gradient d.c. algorithm of Banert and Bot.
 
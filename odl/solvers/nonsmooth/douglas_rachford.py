@@ -13,11 +13,13 @@ from __future__ import print_function, division, absolute_import
 import numpy as np
 
 from odl.operator import Operator
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('douglas_rachford_pd', 'douglas_rachford_pd_stepsize')
 
 
+@flush_callback_on_exit
 def douglas_rachford_pd(x, f, g, L, niter, tau=None, sigma=None,
                         callback=None, **kwargs):
     r"""Douglas-Rachford primal-dual splitting algorithm.
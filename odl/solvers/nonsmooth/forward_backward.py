@@ -11,11 +11,13 @@
 from __future__ import print_function, division, absolute_import
 
 from odl.operator import Operator
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('forward_backward_pd',)
 
 
+@flush_callback_on_exit
 def forward_backward_pd(x, f, g, L, h, tau, sigma, niter,
                         callback=None, **kwargs):
     r"""The forward-backward primal-dual splitting algorithm.
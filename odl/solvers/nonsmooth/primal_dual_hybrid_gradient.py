@@ -16,6 +16,8 @@ from __future__ import print_function, division, absolute_import
 import numpy as np
 
 from odl.operator import Operator
+from odl.solvers.util.callback import flush_callback_on_exit
+from odl.solvers.util.checkpoint import checkpoint_and_state
 
 
 __all__ = ('pdhg', 'pdhg_stepsize')
@@ -24,6 +26,7 @@ __all__ = ('pdhg', 'pdhg_stepsize')
 # TODO: add dual gap as convergence measure
 # TODO: diagonal preconditioning
 
+@flush_callback_on_exit
 def pdhg(x, f, g, L, niter, tau=None, sigma=None, **kwargs):
     r"""Primal-dual hybrid gradient algorithm for convex optimization.
 
@@ -95,6 +98,16 @@ def pdhg(x, f, g, L, niter, tau=None, sigma=None, **kwargs):
         Required to resume iteration. For ``None``, ``op.range.zero()``
         is used.
         Default: ``None``
+    checkpoint : `SolverCheckpoint` or str, optional
+        If given, the state of the iteration (``x``, ``x_relax``, ``y``,
+        step sizes and ``theta``) is periodically written to disk. A
+        string is interpreted as directory of a `SolverCheckpoint` with
+        default settings.
+    resume_from : `SolverCheckpoint` or str, optional
+        Checkpoint from which the iteration is resumed. The stored state
+        overrides ``x``, ``x_relax``, ``y``, ``tau``, ``sigma`` and
+        ``theta``, and only the iterations missing to reach ``niter`` are
+        run.
 
     Notes
     -----
@@ -247,6 +260,17 @@ def pdhg(x, f, g, L, niter, tau=None, sigma=None, **kwargs):
         raise TypeError('`y` {} is not in the range of `L` '
                         '{}'.format(y.space, L.range))
 
+    # Checkpointing
+    checkpoint, state = checkpoint_and_state(kwargs.pop('checkpoint', None),
+                                             kwargs.pop('resume_from', None))
+    start = 0
+    if state is not None:
+        state.restore(x=x, x_relax=x_relax, y=y)
+        tau = state.params['tau']
+        sigma = state.params['sigma']
+        theta = state.params['theta']
+        start = state.iteration
+
     # Get the proximals
     proximal_primal = f.proximal
     proximal_dual = g.convex_conj.proximal
@@ -263,7 +287,7 @@ def pdhg(x, f, g, L, niter, tau=None, sigma=None, **kwargs):
     dual_tmp = L.range.element()
     primal_tmp = L.domain.element()
 
-    for _ in range(niter):
+    for k in range(start, niter):
         # Copy required for relaxation
         x_old.assign(x)
 
@@ -304,6 +328,15 @@ def pdhg(x, f, g, L, niter, tau=None, sigma=None, **kwargs):
         if callback is not None:
             callback(x)
 
+        if checkpoint is not None:
+            checkpoint.update(k + 1, {'x': x, 'x_relax': x_relax, 'y': y},
+                              {'tau': tau, 'sigma': sigma, 'theta': theta})
+
+    if checkpoint is not None:
+        checkpoint.finish(max(niter, start),
+                          {'x': x, 'x_relax': x_relax, 'y': y},
+                          {'tau': tau, 'sigma': sigma, 'theta': theta})
+
 
 def pdhg_stepsize(L, tau=None, sigma=None):
     r"""Default step sizes for `pdhg`.
@@ -11,10 +11,13 @@
 from __future__ import print_function, division, absolute_import
 import numpy as np
 
+from odl.solvers.util.callback import flush_callback_on_exit
+
 
 __all__ = ('proximal_gradient', 'accelerated_proximal_gradient')
 
 
+@flush_callback_on_exit
 def proximal_gradient(x, f, g, gamma, niter, callback=None, **kwargs):
     """(Accelerated) proximal gradient algorithm for convex optimization.
 
@@ -117,6 +120,7 @@ def proximal_gradient(x, f, g, gamma, niter, callback=None, **kwargs):
             callback(x)
 
 
+@flush_callback_on_exit
 def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
                                   **kwargs):
     """Accelerated proximal gradient algorithm for convex optimization.
@@ -12,6 +12,7 @@ from __future__ import print_function, division, absolute_import
 import numpy as np
 
 from odl.solvers.util import ConstantLineSearch
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('steepest_descent', 'adam')
@@ -20,6 +21,7 @@ __all__ = ('steepest_descent', 'adam')
 # TODO: update all docs
 
 
+@flush_callback_on_exit
 def steepest_descent(f, x, line_search=1.0, maxiter=1000, tol=1e-16,
                      projection=None, callback=None):
     """Steepest descent method to minimize an objective function.
@@ -105,6 +107,7 @@ def steepest_descent(f, x, line_search=1.0, maxiter=1000, tol=1e-16,
             callback(x)
 
 
+@flush_callback_on_exit
 def adam(f, x, learning_rate=1e-3, beta1=0.9, beta2=0.999, eps=1e-8,
          maxiter=1000, tol=1e-16, callback=None):
     """ADAM method to minimize an objective function.
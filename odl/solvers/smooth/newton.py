@@ -13,6 +13,7 @@ import numpy as np
 
 from odl.solvers.util import ConstantLineSearch
 from odl.solvers.iterative.iterative import conjugate_gradient
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('newtons_method', 'bfgs_method', 'broydens_method')
@@ -124,6 +125,7 @@ def _broydens_direction(s, y, x, hessinv_estimate=None, impl='first'):
     return r
 
 
+@flush_callback_on_exit
 def newtons_method(f, x, line_search=1.0, maxiter=1000, tol=1e-16,
                    cg_iter=None, callback=None):
     """Newton's method for minimizing a functional.
@@ -243,6 +245,7 @@ def newtons_method(f, x, line_search=1.0, maxiter=1000, tol=1e-16,
             callback(x)
 
 
+@flush_callback_on_exit
 def bfgs_method(f, x, line_search=1.0, maxiter=1000, tol=1e-15, num_store=None,
                 hessinv_estimate=None, callback=None):
     """Quasi-Newton BFGS method to minimize a differentiable function.
@@ -357,6 +360,7 @@ Goldfarb%E2%80%93Shanno_algorithm>`_
             callback(x)
 
 
+@flush_callback_on_exit
 def broydens_method(f, x, line_search=1.0, impl='first', maxiter=1000,
                     tol=1e-15, hessinv_estimate=None,
                     callback=None):
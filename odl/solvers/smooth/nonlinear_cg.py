@@ -11,11 +11,13 @@
 from __future__ import print_function, division, absolute_import
 
 from odl.solvers.util import ConstantLineSearch
+from odl.solvers.util.callback import flush_callback_on_exit
 
 
 __all__ = ('conjugate_gradient_nonlinear',)
 
 
+@flush_callback_on_exit
 def conjugate_gradient_nonlinear(f, x, line_search=1.0, maxiter=1000, nreset=0,
                                  tol=1e-16, beta_method='FR',
                                  callback=None):
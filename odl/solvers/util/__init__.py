@@ -15,3 +15,6 @@ __all__ += callback.__all__
 
 from .steplen import *
 __all__ += steplen.__all__
+
+from .checkpoint import *
+__all__ += checkpoint.__all__
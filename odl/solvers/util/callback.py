@@ -10,9 +10,14 @@
 
 from __future__ import print_function, division, absolute_import
 from builtins import object
+from collections import deque
 import copy
+from functools import wraps
+import inspect
 import numpy as np
 import os
+from queue import Queue, Full
+import threading
 import time
 import warnings
 
@@ -22,7 +27,7 @@ __all__ = ('Callback', 'CallbackStore', 'CallbackApply', 'CallbackPrintTiming',
            'CallbackPrintIteration', 'CallbackPrint', 'CallbackPrintNorm',
            'CallbackShow', 'CallbackSaveToDisk', 'CallbackSleep',
            'CallbackShowConvergence', 'CallbackPrintHardwareUsage',
-           'CallbackProgressBar')
+           'CallbackProgressBar', 'AsyncCallback')
 
 
 class Callback(object):
@@ -102,11 +107,52 @@ class Callback(object):
         """
         pass
 
+    def flush(self):
+        """Finish processing of all iterates passed so far.
+
+        Solvers call this method before they return. Should be overridden
+        by subclasses that process iterates asynchronously.
+        """
+        pass
+
     def __repr__(self):
         """Return ``repr(self)``."""
         return '{}()'.format(self.__class__.__name__)
 
 
+def flush_callback_on_exit(solver):
+    """Decorate ``solver`` such that its callback is flushed on exit.
+
+    The `Callback.flush` method of the ``callback`` argument of
+    ``solver`` is called when the solver returns or raises an exception.
+    Errors from flushing are only raised if the solver itself succeeded.
+    """
+    @wraps(solver)
+    def wrapper(*args, **kwargs):
+        try:
+            callback = inspect.getcallargs(solver, *args, **kwargs).get(
+                'callback', kwargs.get('callback'))
+        except TypeError:
+            # Let the solver raise the error for the invalid arguments
+            callback = None
+
+        try:
+            result = solver(*args, **kwargs)
+        except Exception:
+            if isinstance(callback, Callback):
+                try:
+                    callback.flush()
+                except Exception:
+                    pass
+            raise
+
+        if isinstance(callback, Callback):
+            callback.flush()
+        return result
+
+    return wrapper
+
+
 class _CallbackAnd(Callback):
 
     """Callback used for combining several callbacks."""
@@ -134,6 +180,11 @@ class _CallbackAnd(Callback):
         for callback in self.callbacks:
             callback.reset()
 
+    def flush(self):
+        """Finish processing in all callbacks."""
+        for callback in self.callbacks:
+            callback.flush()
+
     def __repr__(self):
         """Return ``repr(self)``."""
         return ' & '.join('{!r}'.format(p) for p in self.callbacks)
@@ -164,6 +215,11 @@ class _CallbackCompose(Callback):
         """Reset the internal callback to its initial state."""
         self.callback.reset()
 
+    def flush(self):
+        """Finish processing in the internal callback."""
+        if isinstance(self.callback, Callback):
+            self.callback.flush()
+
     def __repr__(self):
         """Return ``repr(self)``.
 
@@ -1034,6 +1090,217 @@ class CallbackProgressBar(Callback):
                                    inner_str)
 
 
+def _snapshot(result, buffer=None):
+    """Return a copy of ``result``, reusing ``buffer`` if possible.
+
+    Lists and tuples (e.g. ``[x, y]`` of primal-dual solvers) are copied
+    entry by entry.
+    """
+    if isinstance(result, (list, tuple)):
+        if buffer is None or len(buffer) != len(result):
+            buffer = [None] * len(result)
+        return type(result)(_snapshot(res, buf)
+                            for res, buf in zip(result, buffer))
+
+    if (buffer is not None and hasattr(buffer, 'assign') and
+            getattr(buffer, 'space', None) == getattr(result, 'space', None)):
+        buffer.assign(result)
+        return buffer
+
+    try:
+        return result.copy()
+    except AttributeError:
+        return copy.deepcopy(result)
+
+
+class AsyncCallback(Callback):
+
+    """Callback wrapper running another callback in a background thread.
+
+    Each call copies the iterate and puts the copy into a bounded queue,
+    from which a worker thread feeds the wrapped callback. The solver
+    thus only pays for the copy, while expensive work like writing to
+    disk, computing norms or plotting runs concurrently with the
+    iteration.
+
+    Since the wrapped callback runs asynchronously, all pending iterates
+    should be processed before its results are used. This is done by
+    `flush`, which all solvers in `odl.solvers` call before they return,
+    or automatically when using the callback as context manager. The
+    worker is a daemon thread, so iterates that are still queued when
+    the interpreter exits without a flush are lost.
+    """
+
+    def __init__(self, callback, maxsize=2, policy='block',
+                 reuse_buffers=False):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        callback : callable
+            The callback to run asynchronously.
+        maxsize : positive int, optional
+            Maximum number of iterates waiting to be processed.
+        policy : {'block', 'drop'}, optional
+            What to do if ``maxsize`` iterates are waiting.
+            ``'block'``: Wait until the worker has processed an iterate.
+            ``'drop'``: Skip the current iterate, without copying it. The
+            number of skipped iterates is counted in ``dropped``.
+        reuse_buffers : bool, optional
+            If ``True``, copies that have been processed are reused for
+            later iterates, such that no new memory is allocated after
+            the first few calls. This requires that ``callback`` does not
+            keep references to its argument.
+
+        Examples
+        --------
+        Store iterates in the background, making sure that all of them
+        are stored at the end of the ``with`` block:
+
+        >>> store = odl.solvers.CallbackStore()
+        >>> x = odl.rn(3).zero()
+        >>> with odl.solvers.AsyncCallback(store) as callback:
+        ...     for _ in range(3):
+        ...         x += 1
+        ...         callback(x)
+        >>> store.results
+        [rn(3).element([ 1.,  1.,  1.]), rn(3).element([ 2.,  2.,  2.]), \
+rn(3).element([ 3.,  3.,  3.])]
+
+        Without ``with``, `flush` has to be called explicitly:
+
+        >>> callback = odl.solvers.AsyncCallback(
+        ...     odl.solvers.CallbackPrint(), policy='drop')
+        >>> callback(x)
+        >>> callback.flush()
+        rn(3).element([ 3.,  3.,  3.])
+        """
+        if not callable(callback):
+            raise TypeError('`callback` {!r} is not callable'
+                            ''.format(callback))
+        self.callback = callback
+
+        self.maxsize, maxsize_in = int(maxsize), maxsize
+        if self.maxsize <= 0:
+            raise ValueError('`maxsize` must be positive, got {}'
+                             ''.format(maxsize_in))
+
+        self.policy, policy_in = str(policy).lower(), policy
+        if self.policy not in ('block', 'drop'):
+            raise ValueError('`policy` {!r} not understood'
+                             ''.format(policy_in))
+
+        self.reuse_buffers = bool(reuse_buffers)
+        self.dropped = 0
+
+        self.__queue = Queue(self.maxsize)
+        self.__buffers = deque()
+        self.__thread = None
+        self.__error = None
+
+    def __call__(self, result):
+        """Copy ``result`` and queue it for the wrapped callback."""
+        self._raise_error()
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self._work)
+            self.__thread.daemon = True
+            self.__thread.start()
+
+        if self.policy == 'drop' and self.__queue.full():
+            self.dropped += 1
+            return
+
+        try:
+            buffer = self.__buffers.popleft()
+        except IndexError:
+            buffer = None
+        snapshot = _snapshot(result, buffer)
+
+        if self.policy == 'block':
+            self.__queue.put(snapshot)
+        else:
+            try:
+                self.__queue.put_nowait(snapshot)
+            except Full:
+                self.dropped += 1
+
+    def _work(self):
+        """Run the wrapped callback on queued iterates until stopped."""
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is self.__queue:  # stop signal
+                    return
+                if self.__error is None:
+                    self.callback(item)
+                    if self.reuse_buffers:
+                        self.__buffers.append(item)
+            except Exception as exc:
+                self.__error = exc
+            finally:
+                self.__queue.task_done()
+
+    def _raise_error(self):
+        """Re-raise an error from the worker thread."""
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+    def flush(self):
+        """Wait until all queued iterates are processed.
+
+        Errors raised by the wrapped callback are re-raised here.
+        """
+        if self.__thread is not None:
+            self.__queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Flush and stop the worker thread.
+
+        A new worker is started if the callback is called again.
+        """
+        try:
+            self.flush()
+        finally:
+            if self.__thread is not None:
+                self.__queue.put(self.__queue)
+                self.__thread.join()
+                self.__thread = None
+            self.__buffers.clear()
+
+    def reset(self):
+        """Flush and reset the wrapped callback to its initial state."""
+        self.flush()
+        self.dropped = 0
+        if hasattr(self.callback, 'reset'):
+            self.callback.reset()
+
+    def __enter__(self):
+        """Return ``self``, to be used in a ``with`` statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Process all pending iterates and stop the worker."""
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not hide the original error by errors of the worker
+            try:
+                self.close()
+            except Exception:
+                pass
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        posargs = [self.callback]
+        optargs = [('maxsize', self.maxsize, 2),
+                   ('policy', self.policy, 'block'),
+                   ('reuse_buffers', self.reuse_buffers, False)]
+        inner_str = signature_string(posargs, optargs)
+        return '{}({})'.format(self.__class__.__name__, inner_str)
+
+
 if __name__ == '__main__':
     from odl.util.testutils import run_doctests
     run_doctests()
@@ -0,0 +1,455 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Checkpointing of the full state of iterative solvers.
+
+A checkpoint is a directory with one ``.npy`` file per array of the
+solver state (primal and dual variables etc.) and a ``state.json`` file
+with the iteration count, scalar parameters like step sizes and the state
+of the NumPy random number generator. Checkpoints are written in a
+background thread to a temporary directory that is renamed when
+complete, such that an interrupted write never corrupts an existing
+checkpoint.
+"""
+
+from __future__ import print_function, division, absolute_import
+from builtins import object
+from collections import OrderedDict
+import json
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+from odl.util import is_string
+
+__all__ = ('SolverCheckpoint', 'SolverState', 'load_solver_state')
+
+
+_STATE_FILE = 'state.json'
+_LATEST_FILE = 'latest'
+_SNAPSHOT_FMT = 'iter_{:08d}'
+
+
+def _element_arrays(name, elem):
+    """Return ``(name, array)`` pairs of the leaves of ``elem``.
+
+    Product space elements are split recursively into their parts, with
+    names ``'<name>.<index>'``. The arrays are copies, so they are not
+    affected by subsequent in-place updates of ``elem``.
+    """
+    parts = getattr(elem, 'parts', None)
+    if parts is not None:
+        pairs = []
+        for i, part in enumerate(parts):
+            pairs.extend(_element_arrays('{}.{}'.format(name, i), part))
+        return pairs
+    else:
+        return [(name, np.array(elem, copy=True))]
+
+
+def _assign_arrays(name, elem, arrays):
+    """Assign the arrays stored for ``name`` to ``elem`` in-place."""
+    parts = getattr(elem, 'parts', None)
+    if parts is not None:
+        for i, part in enumerate(parts):
+            _assign_arrays('{}.{}'.format(name, i), part, arrays)
+    else:
+        try:
+            arr = arrays[name]
+        except KeyError:
+            raise ValueError('no array {!r} in the solver state'.format(name))
+        if arr.shape != elem.shape:
+            raise ValueError('stored array {!r} has shape {}, expected {}'
+                             ''.format(name, arr.shape, elem.shape))
+        elem[:] = arr
+
+
+def _param_to_json(value):
+    """Convert a scalar or a sequence of scalars to a float or a list.
+
+    Returns ``None`` for values that cannot be converted.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return [float(v) for v in value]
+    except (TypeError, ValueError):
+        return None
+
+
+class SolverState(object):
+
+    """State of an iterative solver loaded from a checkpoint.
+
+    Attributes
+    ----------
+    iteration : int
+        Number of completed iterations.
+    arrays : dict
+        Arrays of the solver variables, memory-mapped from disk.
+    params : dict
+        Scalar parameters (e.g. step sizes), with floats or lists of
+        floats as values.
+    rng_state : tuple
+        State of the NumPy global random number generator in the format
+        of `numpy.random.get_state`.
+    """
+
+    def __init__(self, iteration, arrays, params, rng_state):
+        """Initialize a new instance."""
+        self.iteration = int(iteration)
+        self.arrays = arrays
+        self.params = params
+        self.rng_state = rng_state
+
+    def restore(self, **elements):
+        """Assign the stored arrays to solver variables in-place.
+
+        Parameters
+        ----------
+        elements :
+            Solver variables to be overwritten, given as keyword
+            arguments with the names used when saving.
+
+        Examples
+        --------
+        >>> space = odl.rn(3)
+        >>> state = SolverState(5, {'x': np.array([1.0, 2.0, 3.0])}, {},
+        ...                     None)
+        >>> x = space.zero()
+        >>> state.restore(x=x)
+        >>> x
+        rn(3).element([ 1.,  2.,  3.])
+        """
+        for name, elem in elements.items():
+            _assign_arrays(name, elem, self.arrays)
+
+    def restore_rng(self):
+        """Set the NumPy random number generator to the stored state."""
+        if self.rng_state is None:
+            raise ValueError('no random number generator state stored')
+        np.random.set_state(self.rng_state)
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}(iteration={}, arrays={}, params={})'.format(
+            self.__class__.__name__, self.iteration, sorted(self.arrays),
+            self.params)
+
+
+def _snapshot_dir(directory):
+    """Return the path of the most recent complete snapshot."""
+    if os.path.isfile(os.path.join(directory, _STATE_FILE)):
+        return directory
+
+    latest_path = os.path.join(directory, _LATEST_FILE)
+    if not os.path.isfile(latest_path):
+        raise IOError('no solver checkpoint found in {!r}'.format(directory))
+    with open(latest_path) as f:
+        return os.path.join(directory, f.read().strip())
+
+
+def load_solver_state(directory):
+    """Load the latest solver state from a checkpoint directory.
+
+    Parameters
+    ----------
+    directory : str or `SolverCheckpoint`
+        Directory given to `SolverCheckpoint`, or the directory of a
+        single snapshot.
+
+    Returns
+    -------
+    state : `SolverState`
+        The loaded state. Its arrays are memory-mapped read-only, i.e.,
+        they are only read from disk when accessed.
+    """
+    if isinstance(directory, SolverCheckpoint):
+        directory.wait()
+        directory = directory.directory
+    path = _snapshot_dir(directory)
+
+    with open(os.path.join(path, _STATE_FILE)) as f:
+        meta = json.load(f)
+
+    arrays = {name: np.load(os.path.join(path, name + '.npy'),
+                            mmap_mode='r')
+              for name in meta['arrays']}
+
+    rng = meta.get('rng_state')
+    if rng is not None:
+        keys = np.load(os.path.join(path, 'rng_keys.npy'))
+        rng_state = (str(rng['name']), keys, int(rng['pos']),
+                     int(rng['has_gauss']), float(rng['cached_gaussian']))
+    else:
+        rng_state = None
+
+    return SolverState(meta['iteration'], arrays, meta['params'], rng_state)
+
+
+class SolverCheckpoint(object):
+
+    """Periodic writer of solver states to disk.
+
+    Solvers that support checkpointing take an instance of this class as
+    ``checkpoint`` argument and hand over their state after each
+    iteration. Every ``interval`` iterations, the state is copied in
+    memory and written to a new snapshot directory in a background
+    thread, while the iteration continues. The snapshot is written to a
+    temporary directory first and renamed when complete, so a solver
+    that is killed during writing leaves the previous snapshot intact.
+
+    A run can be continued by passing the same directory as
+    ``resume_from`` argument to the solver.
+
+    Examples
+    --------
+    Run 10 iterations of `pdhg` and save a checkpoint every 5 iterations:
+
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> space = odl.rn(3)
+    >>> f = odl.solvers.ZeroFunctional(space)
+    >>> g = odl.solvers.L2NormSquared(space).translated([1, 2, 3])
+    >>> L = odl.IdentityOperator(space)
+    >>> x = space.zero()
+    >>> checkpoint = odl.solvers.SolverCheckpoint(directory, interval=5)
+    >>> odl.solvers.pdhg(x, f, g, L, niter=10, tau=0.5, sigma=0.5,
+    ...                  checkpoint=checkpoint)
+    >>> odl.solvers.load_solver_state(directory).iteration
+    10
+
+    Resuming runs the remaining iterations up to the new ``niter``:
+
+    >>> x_resumed = space.zero()
+    >>> odl.solvers.pdhg(x_resumed, f, g, L, niter=20, tau=0.5, sigma=0.5,
+    ...                  resume_from=directory)
+    >>> x_full = space.zero()
+    >>> odl.solvers.pdhg(x_full, f, g, L, niter=20, tau=0.5, sigma=0.5)
+    >>> x_resumed == x_full
+    True
+    >>> import shutil
+    >>> shutil.rmtree(directory)
+    """
+
+    def __init__(self, directory, interval=10, keep=2, blocking=False):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        directory : str
+            Directory in which the snapshots are stored. It is created
+            if it does not exist.
+        interval : positive int, optional
+            Number of iterations between two snapshots.
+        keep : positive int, optional
+            Number of most recent snapshots to keep on disk.
+        blocking : bool, optional
+            If ``True``, write the snapshots in the calling thread.
+            Otherwise, only the in-memory copy of the state is done in
+            the calling thread.
+        """
+        self.directory = str(directory)
+        self.interval, interval_in = int(interval), interval
+        if self.interval <= 0:
+            raise ValueError('`interval` must be positive, got {}'
+                             ''.format(interval_in))
+        self.keep, keep_in = int(keep), keep
+        if self.keep <= 0:
+            raise ValueError('`keep` must be positive, got {}'
+                             ''.format(keep_in))
+        self.blocking = bool(blocking)
+        self.last_iteration = None
+
+        self.__thread = None
+        self.__error = None
+
+    def update(self, iteration, variables, params=None):
+        """Save the state if ``iteration`` is a multiple of ``interval``.
+
+        Parameters
+        ----------
+        iteration : int
+            Number of completed iterations.
+        variables, params : dict, optional
+            Solver state, see `save`.
+        """
+        if iteration % self.interval == 0:
+            self.save(iteration, variables, params)
+
+    def finish(self, iteration, variables, params=None):
+        """Save the final state unless already done, and wait for writing.
+
+        Parameters
+        ----------
+        iteration : int
+            Number of completed iterations.
+        variables, params : dict, optional
+            Solver state, see `save`.
+        """
+        if iteration != self.last_iteration:
+            self.save(iteration, variables, params)
+        self.wait()
+
+    def save(self, iteration, variables, params=None):
+        """Save the solver state.
+
+        If a previous snapshot is still being written, this method waits
+        for it to complete.
+
+        Parameters
+        ----------
+        iteration : int
+            Number of completed iterations.
+        variables : dict
+            Solver variables (`LinearSpaceElement` or array-like), with
+            names as keys. Elements of product spaces are stored part by
+            part.
+        params : dict, optional
+            Scalar solver parameters (e.g. step sizes) as values, or
+            sequences of scalars.
+        """
+        iteration = int(iteration)
+        arrays = []
+        for name, elem in variables.items():
+            arrays.extend(_element_arrays(name, elem))
+
+        json_params = OrderedDict()
+        for name, value in (params or {}).items():
+            json_value = _param_to_json(value)
+            if json_value is None:
+                raise TypeError('parameter {!r} = {!r} cannot be stored'
+                                ''.format(name, value))
+            json_params[name] = json_value
+
+        rng_state = np.random.get_state()
+
+        self.wait()
+        self.last_iteration = iteration
+        args = (iteration, arrays, json_params, rng_state)
+        if self.blocking:
+            self._write(*args)
+        else:
+            self.__thread = threading.Thread(target=self._write_safe,
+                                             args=args)
+            self.__thread.daemon = False
+            self.__thread.start()
+
+    def wait(self):
+        """Wait until the pending snapshot is written.
+
+        Errors that happened while writing in the background are raised
+        here.
+        """
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+    def _write_safe(self, *args):
+        """Call `_write` and store errors for re-raising in `wait`."""
+        try:
+            self._write(*args)
+        except Exception as exc:
+            self.__error = exc
+
+    def _write(self, iteration, arrays, params, rng_state):
+        """Write a snapshot and update the ``latest`` pointer."""
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+
+        tmp_path = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            for name, arr in arrays:
+                np.save(os.path.join(tmp_path, name + '.npy'), arr)
+            np.save(os.path.join(tmp_path, 'rng_keys.npy'), rng_state[1])
+
+            meta = {'iteration': iteration,
+                    'arrays': [name for name, _ in arrays],
+                    'params': params,
+                    'rng_state': {'name': rng_state[0],
+                                  'pos': int(rng_state[2]),
+                                  'has_gauss': int(rng_state[3]),
+                                  'cached_gaussian': float(rng_state[4])}}
+            with open(os.path.join(tmp_path, _STATE_FILE), 'w') as f:
+                json.dump(meta, f, indent=1)
+
+            snapshot = _SNAPSHOT_FMT.format(iteration)
+            path = os.path.join(self.directory, snapshot)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.rename(tmp_path, path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        fd, tmp_file = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            f.write(snapshot)
+        os.rename(tmp_file, os.path.join(self.directory, _LATEST_FILE))
+
+        # Remove old snapshots
+        snapshots = sorted(d for d in os.listdir(self.directory)
+                           if d.startswith('iter_') and d != snapshot)
+        for old in snapshots[:max(len(snapshots) - self.keep + 1, 0)]:
+            shutil.rmtree(os.path.join(self.directory, old),
+                          ignore_errors=True)
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r}, interval={}, keep={})'.format(
+            self.__class__.__name__, self.directory, self.interval,
+            self.keep)
+
+
+def checkpoint_and_state(checkpoint, resume_from):
+    """Return the checkpoint writer and the state to resume from.
+
+    Helper for solvers to handle their ``checkpoint`` and ``resume_from``
+    arguments.
+
+    Parameters
+    ----------
+    checkpoint : `SolverCheckpoint`, str or None
+        Checkpoint writer, or a directory for a writer with default
+        settings.
+    resume_from : `SolverCheckpoint`, str or None
+        Checkpoint or directory from which the state is loaded.
+
+    Returns
+    -------
+    checkpoint : `SolverCheckpoint` or None
+    state : `SolverState` or None
+    """
+    if is_string(checkpoint):
+        checkpoint = SolverCheckpoint(checkpoint)
+    elif checkpoint is not None and not isinstance(checkpoint,
+                                                   SolverCheckpoint):
+        raise TypeError('`checkpoint` must be a `SolverCheckpoint` or a '
+                        'directory, got {!r}'.format(checkpoint))
+
+    if resume_from is None:
+        state = None
+    else:
+        state = load_solver_state(resume_from)
+    return checkpoint, state
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
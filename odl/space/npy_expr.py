@@ -0,0 +1,472 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Lazy element-wise expressions of NumPy tensors.
+
+Arithmetic with `NumpyTensor` elements makes one full pass over memory
+per operation and allocates a new array for each intermediate result.
+A `NumpyTensorExpression` instead records the operations and evaluates
+the whole expression in one pass. If the `numexpr
+<https://github.com/pydata/numexpr>`_ package is installed, it is used
+for the evaluation. Otherwise, the expression is evaluated in blocks
+that fit into the CPU cache, using scratch buffers that are reused
+between blocks and evaluations.
+"""
+
+from __future__ import print_function, division, absolute_import
+from builtins import object
+from numbers import Number
+import threading
+import numpy as np
+
+from odl.space.base_tensors import Tensor
+
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+
+__all__ = ('NumpyTensorExpression', 'NUMEXPR_AVAILABLE')
+
+
+# Number of entries per block in the NumPy evaluation. Together with
+# the scratch buffers, blocks should fit into the L2 cache.
+CHUNK_SIZE = 2 ** 13
+
+_UNARY_UFUNCS = ('negative', 'absolute', 'sqrt', 'square', 'exp', 'expm1',
+                 'log', 'log10', 'log1p', 'sin', 'cos', 'tan', 'arcsin',
+                 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'arcsinh',
+                 'arccosh', 'arctanh', 'conjugate', 'sign', 'floor', 'ceil')
+_BINARY_UFUNCS = ('add', 'subtract', 'multiply', 'true_divide', 'power',
+                  'maximum', 'minimum', 'arctan2')
+
+# Infix operators and function names in the numexpr language
+_NUMEXPR_INFIX = {'add': '+', 'subtract': '-', 'multiply': '*',
+                  'true_divide': '/', 'power': '**'}
+_NUMEXPR_FUNCS = {'absolute': 'abs', 'conjugate': 'conj'}
+_NUMEXPR_FUNCS.update((name, name) for name in (
+    'sqrt', 'exp', 'expm1', 'log', 'log10', 'log1p', 'sin', 'cos', 'tan',
+    'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'arcsinh',
+    'arccosh', 'arctanh', 'arctan2'))
+_NUMEXPR_DTYPES = (np.dtype('float32'), np.dtype('float64'),
+                   np.dtype('complex128'))
+
+# Scratch buffers per thread, reused between evaluations
+_SCRATCH = threading.local()
+
+
+def _ufunc_name(ufunc):
+    """Return the name of ``ufunc``, using the Python 3 names."""
+    name = ufunc.__name__
+    return 'true_divide' if name == 'divide' else name
+
+
+def _scratch_buffers(dtype, num):
+    """Return ``num`` scratch arrays of size `CHUNK_SIZE`."""
+    pool = getattr(_SCRATCH, 'pool', None)
+    if pool is None:
+        pool = _SCRATCH.pool = {}
+    bufs = pool.setdefault(np.dtype(dtype), [])
+    while len(bufs) < num:
+        bufs.append(np.empty(CHUNK_SIZE, dtype=dtype))
+    return bufs[:num]
+
+
+class NumpyTensorExpression(object):
+
+    """Lazy element-wise expression of `NumpyTensor` elements.
+
+    Expressions are created with `NumpyTensor.lazy` or
+    `NumpyTensorSpace.lazy_lincomb` and combined with the arithmetic
+    operators ``+, -, *, /, **``, with scalars and with element-wise
+    NumPy ufuncs such as `numpy.sqrt` or `numpy.maximum`. Nothing is
+    computed until `evaluate` is called.
+    """
+
+    # Take precedence over `LinearSpaceElement` in binary operations
+    __array_priority__ = 2000000.0
+
+    def __init__(self, space, op, args):
+        """Initialize a new instance.
+
+        Users should not call this constructor directly, see the class
+        documentation for how to create expressions.
+
+        Parameters
+        ----------
+        space : `NumpyTensorSpace`
+            Space in which the expression is evaluated.
+        op : str or None
+            Name of the ufunc applied to ``args``. ``None`` means that
+            this is a leaf of the expression tree.
+        args : tuple
+            Operands of ``op``, i.e., expressions or scalars. For leaves,
+            this is a 1-tuple containing a `numpy.ndarray`.
+        """
+        self.__space = space
+        self.__op = op
+        self.__args = tuple(args)
+
+    @classmethod
+    def leaf(cls, tensor):
+        """Return an expression that evaluates to ``tensor``."""
+        if not isinstance(tensor, Tensor):
+            raise TypeError('`tensor` {!r} is not a `Tensor` instance'
+                            ''.format(tensor))
+        if not np.issubdtype(tensor.dtype, np.inexact):
+            raise TypeError('lazy expressions require a floating point '
+                            'data type, got {}'.format(tensor.dtype))
+        return cls(tensor.space, None, (tensor.data,))
+
+    @property
+    def space(self):
+        """Space in which the expression is evaluated."""
+        return self.__space
+
+    @property
+    def op(self):
+        """Name of the ufunc at the root, ``None`` for leaves."""
+        return self.__op
+
+    @property
+    def args(self):
+        """Operands of `op`."""
+        return self.__args
+
+    @property
+    def is_leaf(self):
+        """``True`` if this expression is a tensor without operation."""
+        return self.op is None
+
+    # --- Building expressions --- #
+
+    def _operand(self, other):
+        """Convert ``other`` to an operand, or return ``None``."""
+        if isinstance(other, NumpyTensorExpression):
+            return other if other.space == self.space else None
+        elif isinstance(other, Tensor):
+            return self.leaf(other) if other in self.space else None
+        elif isinstance(other, Number) and other in self.space.field:
+            return other
+        else:
+            return None
+
+    def _apply(self, op, *operands):
+        """Return ``op(*operands)``, or ``NotImplemented`` if invalid."""
+        args = [self._operand(operand) for operand in operands]
+        if any(arg is None for arg in args):
+            return NotImplemented
+        return NumpyTensorExpression(self.space, op, args)
+
+    def __add__(self, other):
+        """Return ``self + other``."""
+        return self._apply('add', self, other)
+
+    def __radd__(self, other):
+        """Return ``other + self``."""
+        return self._apply('add', other, self)
+
+    def __sub__(self, other):
+        """Return ``self - other``."""
+        return self._apply('subtract', self, other)
+
+    def __rsub__(self, other):
+        """Return ``other - self``."""
+        return self._apply('subtract', other, self)
+
+    def __mul__(self, other):
+        """Return ``self * other``."""
+        return self._apply('multiply', self, other)
+
+    def __rmul__(self, other):
+        """Return ``other * self``."""
+        return self._apply('multiply', other, self)
+
+    def __truediv__(self, other):
+        """Return ``self / other``."""
+        return self._apply('true_divide', self, other)
+
+    def __rtruediv__(self, other):
+        """Return ``other / self``."""
+        return self._apply('true_divide', other, self)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, other):
+        """Return ``self ** other``."""
+        return self._apply('power', self, other)
+
+    def __rpow__(self, other):
+        """Return ``other ** self``."""
+        return self._apply('power', other, self)
+
+    def __neg__(self):
+        """Return ``-self``."""
+        return self._apply('negative', self)
+
+    def __pos__(self):
+        """Return ``+self``."""
+        return self
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Record the application of an element-wise ufunc.
+
+        Only plain calls of the supported unary and binary ufuncs without
+        further arguments are recorded, everything else is rejected.
+        """
+        name = _ufunc_name(ufunc)
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        if not ((ufunc.nin == 1 and name in _UNARY_UFUNCS) or
+                (ufunc.nin == 2 and name in _BINARY_UFUNCS)):
+            return NotImplemented
+        return self._apply(name, *inputs)
+
+    # --- Evaluation --- #
+
+    def _leaves(self):
+        """Return the list of all leaf arrays, possibly with repetitions."""
+        if self.is_leaf:
+            return [self.args[0]]
+        leaves = []
+        for arg in self.args:
+            if isinstance(arg, NumpyTensorExpression):
+                leaves.extend(arg._leaves())
+        return leaves
+
+    def _numexpr_string(self, local_dict, names):
+        """Return the numexpr string, updating the variable dictionaries.
+
+        Returns ``None`` if the expression cannot be evaluated by numexpr.
+        """
+        if self.is_leaf:
+            arr = self.args[0]
+            if id(arr) not in names:
+                names[id(arr)] = 'x{}'.format(len(names))
+                local_dict[names[id(arr)]] = arr
+            return names[id(arr)]
+
+        arg_strs = []
+        for arg in self.args:
+            if isinstance(arg, NumpyTensorExpression):
+                arg_str = arg._numexpr_string(local_dict, names)
+                if arg_str is None:
+                    return None
+            else:
+                # Scalars as variables of the space data type to avoid
+                # upcasting of single precision arrays
+                arg_str = 'c{}'.format(len(local_dict))
+                local_dict[arg_str] = np.array(arg, dtype=self.space.dtype)
+            arg_strs.append(arg_str)
+
+        if self.op in _NUMEXPR_INFIX:
+            return '({} {} {})'.format(arg_strs[0], _NUMEXPR_INFIX[self.op],
+                                       arg_strs[1])
+        elif self.op == 'negative':
+            return '(-{})'.format(arg_strs[0])
+        elif self.op == 'square':
+            return '({} ** 2)'.format(arg_strs[0])
+        elif self.op in _NUMEXPR_FUNCS:
+            return '{}({})'.format(_NUMEXPR_FUNCS[self.op],
+                                   ', '.join(arg_strs))
+        else:
+            return None
+
+    def _eval_numpy(self, slc, dest, bufs, reg):
+        """Evaluate ``self`` on ``slc`` of the flat leaf arrays.
+
+        Parameters
+        ----------
+        slc : slice
+            Part of the (flattened) leaf arrays on which to evaluate.
+        dest : `numpy.ndarray`
+            Array to which the result is written. Not used for leaves.
+        bufs : sequence of `numpy.ndarray`
+            Scratch arrays of the same size as ``dest``.
+        reg : int
+            Index of the first scratch array that can be used.
+
+        Returns
+        -------
+        result : `numpy.ndarray`
+            ``dest`` or, for leaves, a view into the leaf array.
+        """
+        if self.is_leaf:
+            return self.args[0][slc]
+
+        # The first non-leaf operand may use `dest` since it is only read
+        # by the final ufunc call, the others get their own scratch arrays
+        operands = []
+        dest_used = False
+        for arg in self.args:
+            if not isinstance(arg, NumpyTensorExpression):
+                operands.append(arg)
+            elif arg.is_leaf:
+                operands.append(arg._eval_numpy(slc, None, bufs, reg))
+            elif not dest_used:
+                operands.append(arg._eval_numpy(slc, dest, bufs, reg))
+                dest_used = True
+            else:
+                operands.append(arg._eval_numpy(slc, bufs[reg][:len(dest)],
+                                                bufs, reg + 1))
+                reg += 1
+
+        getattr(np, self.op)(*operands, out=dest)
+        return dest
+
+    def _num_scratch(self):
+        """Return the number of scratch arrays needed by `_eval_numpy`."""
+        subexprs = [arg for arg in self.args
+                    if isinstance(arg, NumpyTensorExpression) and
+                    not arg.is_leaf]
+        return max([0] + [i + arg._num_scratch()
+                          for i, arg in enumerate(subexprs)])
+
+    def evaluate(self, out=None, impl=None):
+        """Evaluate the expression in one pass over the data.
+
+        Parameters
+        ----------
+        out : `NumpyTensor`, optional
+            Element of `space` to which the result is written. It may
+            be one of the operands of the expression.
+        impl : {'numexpr', 'numpy'}, optional
+            Back-end for the evaluation. By default, ``'numexpr'`` is
+            used if it is available and supports the expression.
+
+        Returns
+        -------
+        out : `NumpyTensor`
+            The result of the evaluation. If ``out`` was provided, the
+            returned object is a reference to it.
+
+        Examples
+        --------
+        >>> space = odl.rn(3)
+        >>> x = space.element([1, 2, 3])
+        >>> y = space.element([1, 0, -1])
+        >>> expr = np.sqrt(2 * x.lazy() - y.lazy() + 1)
+        >>> expr.evaluate()
+        rn(3).element([ 1.41421356,  2.23606798,  2.82842712])
+
+        The result can be written to one of the operands:
+
+        >>> result = expr.evaluate(out=x)
+        >>> result is x
+        True
+        >>> x
+        rn(3).element([ 1.41421356,  2.23606798,  2.82842712])
+        """
+        if out is None:
+            out = self.space.element()
+        elif out not in self.space:
+            raise TypeError('`out` {!r} is not an element of {!r}'
+                            ''.format(out, self.space))
+
+        if impl is None:
+            use_numexpr = (NUMEXPR_AVAILABLE and
+                           self.space.dtype in _NUMEXPR_DTYPES)
+        else:
+            impl, impl_in = str(impl).lower(), impl
+            if impl not in ('numexpr', 'numpy'):
+                raise ValueError('`impl` {!r} not understood'
+                                 ''.format(impl_in))
+            elif impl == 'numexpr' and not NUMEXPR_AVAILABLE:
+                raise ValueError('`numexpr` is not available')
+            elif (impl == 'numexpr' and
+                  self.space.dtype not in _NUMEXPR_DTYPES):
+                raise ValueError('data type {} not supported by numexpr'
+                                 ''.format(self.space.dtype))
+            use_numexpr = (impl == 'numexpr')
+
+        if use_numexpr:
+            local_dict = {}
+            ne_str = self._numexpr_string(local_dict, names={})
+            if ne_str is not None:
+                numexpr.evaluate(ne_str, local_dict=local_dict, out=out.data,
+                                 casting='same_kind')
+                return out
+            elif impl is not None:
+                raise ValueError('expression not supported by numexpr')
+
+        self._evaluate_numpy(out.data)
+        return out
+
+    def _evaluate_numpy(self, out_arr):
+        """Evaluate the expression blockwise into ``out_arr``."""
+        leaves = self._leaves()
+        arrays = leaves + [out_arr]
+        if all(arr.flags.c_contiguous for arr in arrays):
+            order = 'C'
+        elif all(arr.flags.f_contiguous for arr in arrays):
+            order = 'F'
+        else:
+            order = None
+
+        if order is None:
+            # No common flat memory layout, evaluate on full arrays
+            bufs = [np.empty_like(out_arr)
+                    for _ in range(self._num_scratch() + 1)]
+            if any(np.may_share_memory(arr, out_arr) for arr in leaves):
+                out_arr[:] = self._eval_numpy(Ellipsis, bufs[0], bufs, 1)
+            else:
+                self._eval_numpy(Ellipsis, out_arr, bufs, 0)
+            return
+
+        flat_expr = self._flat(order)
+        out_flat = out_arr.ravel(order)
+        aliased = any(np.may_share_memory(arr, out_arr) for arr in leaves)
+        # Aliased output needs one extra buffer for the final result
+        bufs = _scratch_buffers(out_arr.dtype,
+                                self._num_scratch() + int(aliased))
+        for start in range(0, out_flat.size, CHUNK_SIZE):
+            slc = slice(start, min(start + CHUNK_SIZE, out_flat.size))
+            out_chunk = out_flat[slc]
+            if aliased:
+                # Operands can be read after the result has been written
+                # to `out_chunk`, so we use a scratch array first
+                out_chunk[:] = flat_expr._eval_numpy(
+                    slc, bufs[0][:len(out_chunk)], bufs, 1)
+            else:
+                flat_expr._eval_numpy(slc, out_chunk, bufs, 0)
+
+    def _flat(self, order):
+        """Return a copy of the expression with raveled leaf arrays."""
+        if self.is_leaf:
+            return NumpyTensorExpression(self.space, None,
+                                         (self.args[0].ravel(order),))
+        args = [arg._flat(order) if isinstance(arg, NumpyTensorExpression)
+                else arg for arg in self.args]
+        return NumpyTensorExpression(self.space, self.op, args)
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r}, {!r})'.format(self.__class__.__name__, self.space,
+                                       str(self))
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return self._to_string(names={})
+
+    def _to_string(self, names):
+        """Return a string representation with enumerated leaves."""
+        if self.is_leaf:
+            return names.setdefault(id(self.args[0]),
+                                    'x{}'.format(len(names)))
+        arg_strs = [arg._to_string(names)
+                    if isinstance(arg, NumpyTensorExpression) else repr(arg)
+                    for arg in self.args]
+        return '{}({})'.format(self.op, ', '.join(arg_strs))
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -13,17 +13,20 @@ from future.utils import native
 from builtins import object
 import ctypes
 from functools import partial
+from itertools import product
+from multiprocessing import cpu_count
 import numpy as np
 
 from odl.set.sets import RealNumbers, ComplexNumbers
 from odl.set.space import LinearSpaceTypeError
 from odl.space.base_tensors import TensorSpace, Tensor
+from odl.space.npy_expr import NumpyTensorExpression
 from odl.space.weighting import (
     Weighting, ArrayWeighting, ConstWeighting,
     CustomInner, CustomNorm, CustomDist)
 from odl.util import (
     dtype_str, signature_string, is_real_dtype, is_numeric_dtype,
-    writable_array, is_floating_dtype)
+    writable_array, is_floating_dtype, parallel_map)
 
 
 __all__ = ('NumpyTensorSpace',)
@@ -35,6 +38,11 @@ _BLAS_DTYPES = (np.dtype('float32'), np.dtype('float64'),
 # Define size thresholds to switch implementations
 THRESHOLD_SMALL = 100
 THRESHOLD_MEDIUM = 50000
+THRESHOLD_LARGE = 2 ** 20
+
+# Number of entries per block in the blocked implementations, chosen such
+# that a few blocks fit into the L2 cache
+BLOCK_SIZE = 2 ** 15
 
 
 class NumpyTensorSpace(TensorSpace):
@@ -718,6 +726,58 @@ class NumpyTensorSpace(TensorSpace):
         """
         np.divide(x1.data, x2.data, out=out.data)
 
+    def lazy_lincomb(self, a, x1, b=None, x2=None):
+        """Return the linear combination ``a*x1 + b*x2`` as lazy expression.
+
+        Unlike `lincomb`, nothing is computed here. The returned
+        expression can be combined further with element-wise arithmetic
+        and evaluated in one pass, see `NumpyTensorExpression`.
+
+        Parameters
+        ----------
+        a, b : `field` element
+            Scalars to multiply ``x1`` and ``x2`` with.
+        x1, x2 : `NumpyTensor` or `NumpyTensorExpression`
+            Summands in the linear combination.
+
+        Returns
+        -------
+        expr : `NumpyTensorExpression`
+
+        Examples
+        --------
+        >>> space = odl.rn(3)
+        >>> x = space.element([1, 2, 3])
+        >>> y = space.element([1, 0, -1])
+        >>> expr = space.lazy_lincomb(1, x, 2, y)
+        >>> expr.evaluate()
+        rn(3).element([ 3.,  2.,  1.])
+        >>> np.maximum(expr, 2).evaluate()
+        rn(3).element([ 3.,  2.,  2.])
+        """
+        if x1 not in self and not (
+                isinstance(x1, NumpyTensorExpression) and x1.space == self):
+            raise LinearSpaceTypeError('`x1` {!r} is not an element or '
+                                       'expression of {!r}'.format(x1, self))
+        if self.field is not None and a not in self.field:
+            raise LinearSpaceTypeError('`a` {!r} not an element of the field '
+                                       '{!r} of {!r}'
+                                       ''.format(a, self.field, self))
+        if (b is None) != (x2 is None):
+            raise ValueError('`b` and `x2` must be given together')
+        if (b is not None and self.field is not None and
+                b not in self.field):
+            raise LinearSpaceTypeError('`b` {!r} not an element of the '
+                                       'field {!r} of {!r}'
+                                       ''.format(b, self.field, self))
+        if isinstance(x1, Tensor):
+            x1 = NumpyTensorExpression.leaf(x1)
+
+        expr = a * x1
+        if x2 is not None:
+            expr = expr + self.lazy_lincomb(b, x2)
+        return expr
+
     def __eq__(self, other):
         """Return ``self == other``.
 
@@ -925,6 +985,29 @@ class NumpyTensor(Tensor):
         """
         return self.space.astype(dtype).element(self.data.astype(dtype))
 
+    def lazy(self):
+        """Return this element as a lazy expression.
+
+        Arithmetic with the returned `NumpyTensorExpression` is recorded
+        instead of being computed. The final expression is evaluated in
+        one pass over the data, which avoids temporary arrays and saves
+        memory bandwidth for large elements.
+
+        Returns
+        -------
+        expr : `NumpyTensorExpression`
+
+        Examples
+        --------
+        >>> space = odl.rn(3)
+        >>> x = space.element([1, 2, 3])
+        >>> y = space.element([1, 0, -1])
+        >>> expr = np.abs(x.lazy() * 2 - 4 * y)
+        >>> expr.evaluate()
+        rn(3).element([  2.,   4.,  10.])
+        """
+        return NumpyTensorExpression.leaf(self)
+
     @property
     def data_ptr(self):
         """A raw pointer to the data container of ``self``.
@@ -1799,6 +1882,186 @@ def _blas_is_applicable(*args):
         return True
 
 
+def _block_indices(shape, order='C'):
+    """Return index tuples splitting an array into blocks.
+
+    The blocks have at most `BLOCK_SIZE` entries (unless a single entry
+    along the fastest axis is already larger) and are obtained by
+    splitting the array along the slowest axes with respect to
+    ``order``. Hence, indexing with them creates views, also for
+    non-contiguous arrays.
+
+    Parameters
+    ----------
+    shape : sequence of int
+        Shape of the array to split.
+    order : {'C', 'F'}, optional
+        Axis ordering of the array from slowest to fastest axis.
+
+    Returns
+    -------
+    indices : list of tuple
+        Indices of the blocks, each a tuple of ints and slices.
+
+    Examples
+    --------
+    >>> _block_indices((3, 4))
+    [(slice(None, None, None), slice(None, None, None))]
+    """
+    shape = tuple(int(n) for n in shape)
+    axes = list(range(len(shape)))
+    if order == 'F':
+        axes.reverse()
+
+    # Find the slowest axis such that all faster axes together fit into
+    # a block, and split that axis
+    inner_size = 1
+    split_pos = len(axes)
+    for pos in reversed(range(len(axes))):
+        if inner_size * shape[axes[pos]] > BLOCK_SIZE:
+            break
+        inner_size *= shape[axes[pos]]
+        split_pos = pos
+
+    if split_pos == 0:
+        # Everything fits into one block
+        return [(slice(None),) * len(shape)]
+
+    split_axis = axes[split_pos - 1]
+    step = max(1, BLOCK_SIZE // inner_size)
+    outer_axes = axes[:split_pos - 1]
+
+    indices = []
+    for outer_idx in product(*[range(shape[ax]) for ax in outer_axes]):
+        for start in range(0, shape[split_axis], step):
+            idx = [slice(None)] * len(shape)
+            for ax, i in zip(outer_axes, outer_idx):
+                idx[ax] = i
+            idx[split_axis] = slice(start, min(start + step,
+                                               shape[split_axis]))
+            indices.append(tuple(idx))
+    return indices
+
+
+def _map_blocks(func, indices, num_threads=None):
+    """Apply ``func`` to groups of block indices in parallel.
+
+    Parameters
+    ----------
+    func : callable
+        Function taking a list of block indices as single argument.
+    indices : list
+        Block indices as returned by `_block_indices`.
+    num_threads : positive int, optional
+        Number of threads to use. Default: number of CPUs
+
+    Returns
+    -------
+    results : list
+        Return values of ``func`` for each group of blocks.
+    """
+    if num_threads is None:
+        num_threads = cpu_count()
+    num_threads = max(1, min(num_threads, len(indices)))
+    if num_threads == 1:
+        return [func(indices)]
+
+    # Contiguous groups of blocks keep the memory access local per thread
+    groups = [list(group) for group in np.array_split(
+        np.arange(len(indices)), num_threads)]
+    groups = [[indices[i] for i in group] for group in groups]
+    return parallel_map(func, groups, num_threads)
+
+
+def _block_order(*arrays):
+    """Return the common memory order of ``arrays``, defaulting to C."""
+    if (all(arr.flags.f_contiguous for arr in arrays) and
+            not all(arr.flags.c_contiguous for arr in arrays)):
+        return 'F'
+    else:
+        return 'C'
+
+
+def _lincomb_blocked(a, x1_arr, b, x2_arr, out_arr):
+    """Compute ``out_arr[:] = a * x1_arr + b * x2_arr`` block-wise.
+
+    The blocks are processed in parallel, and only temporaries of block
+    size are created. Any aliasing of the arrays is allowed.
+    """
+    inexact = is_floating_dtype(out_arr.dtype)
+
+    def lincomb_blocks(indices):
+        tmp = None
+        for idx in indices:
+            x1_blk, x2_blk, out_blk = x1_arr[idx], x2_arr[idx], out_arr[idx]
+            if not inexact:
+                # Let NumPy handle casting for integer and other types
+                out_blk[...] = a * x1_blk + b * x2_blk
+            elif a == 0 and b == 0:
+                out_blk.fill(0)
+            elif b == 0:
+                np.multiply(x1_blk, a, out=out_blk)
+            elif a == 0:
+                np.multiply(x2_blk, b, out=out_blk)
+            else:
+                if tmp is None:
+                    tmp = np.empty(BLOCK_SIZE, dtype=out_arr.dtype)
+                # `out_blk` may be `x2_blk`, so we use it only at the end
+                tmp_blk = tmp[:out_blk.size].reshape(out_blk.shape)
+                np.multiply(x2_blk, b, out=tmp_blk)
+                np.multiply(x1_blk, a, out=out_blk)
+                out_blk += tmp_blk
+
+    indices = _block_indices(out_arr.shape,
+                             _block_order(x1_arr, x2_arr, out_arr))
+    _map_blocks(lincomb_blocks, indices)
+
+
+def _inner_blocked(x1_arr, x2_arr, weights=None):
+    """Return the (weighted) inner product computed block-wise.
+
+    The result is linear in ``x1_arr`` and conjugate-linear in
+    ``x2_arr``.
+    """
+    def inner_blocks(indices):
+        result = 0
+        for idx in indices:
+            x1_blk = x1_arr[idx]
+            if weights is not None:
+                x1_blk = x1_blk * weights[idx]
+            result += np.vdot(x2_arr[idx], x1_blk)
+        return result
+
+    arrays = (x1_arr, x2_arr) + ((weights,) if weights is not None else ())
+    indices = _block_indices(x1_arr.shape, _block_order(*arrays))
+    return sum(_map_blocks(inner_blocks, indices))
+
+
+def _pnorm_diff_blocked(x1_arr, x2_arr, p):
+    """Return the p-norm of ``x1_arr - x2_arr`` computed block-wise."""
+    def pnorm_blocks(indices):
+        tmp = np.empty(BLOCK_SIZE, dtype=x1_arr.dtype)
+        result = 0.0
+        for idx in indices:
+            x1_blk = x1_arr[idx]
+            diff = tmp[:x1_blk.size].reshape(x1_blk.shape)
+            np.subtract(x1_blk, x2_arr[idx], out=diff)
+            if p == float('inf'):
+                result = max(result, np.max(np.abs(diff)))
+            elif p == 2.0:
+                result += np.vdot(diff, diff).real
+            else:
+                result += np.sum(np.abs(diff) ** p)
+        return result
+
+    indices = _block_indices(x1_arr.shape, _block_order(x1_arr, x2_arr))
+    partial_results = _map_blocks(pnorm_blocks, indices)
+    if p == float('inf'):
+        return max(partial_results)
+    else:
+        return sum(partial_results) ** (1 / p)
+
+
 def _lincomb_impl(a, x1, b, x2, out):
     """Optimized implementation of ``out[:] = a * x1 + b * x2``."""
     # Lazy import to improve `import odl` time
@@ -1811,6 +2074,13 @@ def _lincomb_impl(a, x1, b, x2, out):
         out.data[:] = a * x1.data + b * x2.data
         return
 
+    elif (size >= THRESHOLD_LARGE or
+          (size >= THRESHOLD_MEDIUM and
+           not _blas_is_applicable(x1.data, x2.data, out.data))):
+        # Parallel and without full-size temporaries, for any memory layout
+        _lincomb_blocked(a, x1.data, b, x2.data, out.data)
+        return
+
     elif (size < THRESHOLD_MEDIUM or
           not _blas_is_applicable(x1.data, x2.data, out.data)):
 
@@ -2026,6 +2296,9 @@ def _pnorm_diagweight(x, p, w):
 
 def _inner_default(x1, x2):
     """Default Euclidean inner product implementation."""
+    if x1.size >= THRESHOLD_LARGE:
+        return _inner_blocked(x1.data, x2.data)
+
     # Ravel both in the same order
     order = 'F' if all(a.data.flags.f_contiguous for a in (x1, x2)) else 'C'
 
@@ -2143,7 +2416,12 @@ class NumpyTensorSpaceArrayWeighting(ArrayWeighting):
                                       'exponent != 2 (got {})'
                                       ''.format(self.exponent))
         else:
-            inner = _inner_default(x1 * self.array, x2)
+            if (x1.size >= THRESHOLD_LARGE and
+                    self.array.shape == x1.shape):
+                # Avoid the full-size temporary `x1 * self.array`
+                inner = _inner_blocked(x1.data, x2.data, self.array)
+            else:
+                inner = _inner_default(x1 * self.array, x2)
             if is_real_dtype(x1.dtype):
                 return float(inner)
             else:
@@ -2289,7 +2567,14 @@ class NumpyTensorSpaceConstWeighting(ConstWeighting):
         dist : float
             The distance between the tensors.
         """
-        if self.exponent == 2.0:
+        if x1.size >= THRESHOLD_LARGE:
+            # Avoid the full-size temporary `x1 - x2`
+            dist = _pnorm_diff_blocked(x1.data, x2.data, self.exponent)
+            if self.exponent == float('inf'):
+                return float(self.const * dist)
+            else:
+                return float(self.const ** (1 / self.exponent) * dist)
+        elif self.exponent == 2.0:
             return float(np.sqrt(self.const) * _norm_default(x1 - x2))
         elif self.exponent == float('inf'):
             return float(self.const * _pnorm_default(x1 - x2, self.exponent))
@@ -15,6 +15,8 @@ import numpy as np
 
 from odl.set import LinearSpace
 from odl.set.space import LinearSpaceElement
+from odl.space.npy_tensors import (
+    NumpyTensorSpace, NumpyTensorSpaceConstWeighting)
 from odl.space.weighting import (
     Weighting, ArrayWeighting, ConstWeighting,
     CustomInner, CustomNorm, CustomDist)
@@ -179,6 +181,13 @@ class ProductSpace(LinearSpace):
         .. math::
             d(x, y) = \max_i d_i(x_i, y_i)
 
+        Power spaces ``ProductSpace(space, n)`` of NumPy-based spaces
+        store their elements in one contiguous array of shape
+        ``(n,) + space.shape``, and the parts are views into this array.
+        Linear combination, pointwise arithmetic and, for constant
+        weightings, inner product, norm and distance are then computed
+        on the whole array at once.
+
         To implement own versions of these functions, you can use
         the following snippet to gather the vector of norms (analogously
         for inner products and distances)::
@@ -273,6 +282,10 @@ class ProductSpace(LinearSpace):
         else:  # all None -> no weighing
             self.__weighting = ProductSpaceConstWeighting(1.0, exponent)
 
+        # Power spaces of NumPy-based spaces store all parts of an element
+        # in one array, which allows for vectorized arithmetic
+        self.__block_space, self.__block_weighted = _block_storage(self)
+
     def __len__(self):
         """Return ``len(self)``.
 
@@ -351,6 +364,23 @@ class ProductSpace(LinearSpace):
         """``True`` if all member spaces are equal."""
         return self.__is_power_space
 
+    @property
+    def block_space(self):
+        """`NumpyTensorSpace` of the contiguous element storage.
+
+        This is ``None`` if the elements of this space are not stored
+        as one contiguous array, see `ProductSpaceElement.data`.
+
+        Examples
+        --------
+        >>> pspace = odl.ProductSpace(odl.rn(3), 2)
+        >>> pspace.block_space
+        rn((2, 3))
+        >>> odl.ProductSpace(odl.rn(2), odl.rn(3)).block_space is None
+        True
+        """
+        return self.__block_space
+
     @property
     def exponent(self):
         """Exponent of the product space norm/dist, ``None`` for custom."""
@@ -482,13 +512,23 @@ class ProductSpace(LinearSpace):
             [ 1.,  2.,  3.]
         ])
         """
-        # If data is given as keyword arg, prefer it over arg list
         if inp is None:
+            if self.block_space is not None:
+                return self._block_element(
+                    np.empty(self.shape, dtype=self.block_space.dtype))
             inp = [space.element() for space in self.spaces]
 
         if inp in self:
             return inp
 
+        if (self.block_space is not None and
+                isinstance(inp, np.ndarray) and
+                inp.shape == self.shape and
+                inp.dtype == self.block_space.dtype and
+                inp.flags.writeable):
+            # Wrap the array, as for tensor spaces
+            return self._block_element(inp)
+
         if len(inp) != len(self):
             raise ValueError('length of `inp` {} does not match length of '
                              'space {}'.format(len(inp), len(self)))
@@ -497,6 +537,13 @@ class ProductSpace(LinearSpace):
                 for v, space in zip(inp, self.spaces))):
             parts = list(inp)
         elif cast:
+            if self.block_space is not None:
+                # Copy the parts into contiguous storage
+                elem = self.element()
+                for part, arg, space in zip(elem.parts, inp, self.spaces):
+                    part[:] = space.element(arg)
+                return elem
+
             # Delegate constructors
             parts = [space.element(arg)
                      for arg, space in zip(inp, self.spaces)]
@@ -506,6 +553,26 @@ class ProductSpace(LinearSpace):
 
         return self.element_type(self, parts)
 
+    def _block_element(self, data):
+        """Return an element whose parts are views into ``data``."""
+        parts = [space.element(arr) for space, arr in zip(self.spaces, data)]
+        return self.element_type(self, parts, data=data)
+
+    def _block_tensors(self, *elems):
+        """Wrap the contiguous data of ``elems`` as `block_space` elements.
+
+        Identical input elements are wrapped by identical tensors such
+        that aliasing can be detected. Returns ``None`` if one of the
+        elements is not stored contiguously.
+        """
+        if any(elem.data is None for elem in elems):
+            return None
+        wrapped = {}
+        for elem in elems:
+            if id(elem) not in wrapped:
+                wrapped[id(elem)] = self.block_space.element(elem.data)
+        return [wrapped[id(elem)] for elem in elems]
+
     @property
     def examples(self):
         """Return examples from all sub-spaces."""
@@ -572,30 +639,57 @@ class ProductSpace(LinearSpace):
 
     def _lincomb(self, a, x, b, y, out):
         """Linear combination ``out = a*x + b*y``."""
+        tensors = self._block_tensors(x, y, out)
+        if tensors is not None:
+            self.block_space._lincomb(a, tensors[0], b, tensors[1],
+                                      tensors[2])
+            return
+
         for space, xp, yp, outp in zip(self.spaces, x.parts, y.parts,
                                        out.parts):
             space._lincomb(a, xp, b, yp, outp)
 
     def _dist(self, x1, x2):
         """Distance between two elements."""
+        if self.__block_weighted:
+            tensors = self._block_tensors(x1, x2)
+            if tensors is not None:
+                return self.block_space._dist(*tensors)
+
         return self.weighting.dist(x1, x2)
 
     def _norm(self, x):
         """Norm of an element."""
+        if self.__block_weighted and x.data is not None:
+            return self.block_space._norm(self.block_space.element(x.data))
+
         return self.weighting.norm(x)
 
     def _inner(self, x1, x2):
         """Inner product of two elements."""
+        if self.__block_weighted:
+            tensors = self._block_tensors(x1, x2)
+            if tensors is not None:
+                return self.block_space._inner(*tensors)
+
         return self.weighting.inner(x1, x2)
 
     def _multiply(self, x1, x2, out):
         """Product ``out = x1 * x2``."""
+        if all(elem.data is not None for elem in (x1, x2, out)):
+            np.multiply(x1.data, x2.data, out=out.data)
+            return
+
         for spc, xp, yp, outp in zip(self.spaces, x1.parts, x2.parts,
                                      out.parts):
             spc._multiply(xp, yp, outp)
 
     def _divide(self, x1, x2, out):
         """Quotient ``out = x1 / x2``."""
+        if all(elem.data is not None for elem in (x1, x2, out)):
+            np.divide(x1.data, x2.data, out=out.data)
+            return
+
         for spc, xp, yp, outp in zip(self.spaces, x1.parts, x2.parts,
                                      out.parts):
             spc._divide(xp, yp, outp)
@@ -794,16 +888,59 @@ class ProductSpaceElement(LinearSpaceElement):
 
     """Elements of a `ProductSpace`."""
 
-    def __init__(self, space, parts):
-        """Initialize a new instance."""
+    def __init__(self, space, parts, data=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        space : `ProductSpace`
+            Space to which the element belongs.
+        parts : sequence of `LinearSpaceElement`
+            Components of the element.
+        data : `numpy.ndarray`, optional
+            Array of shape ``space.shape`` that stores all ``parts``,
+            i.e., ``parts[i]`` must be a view of ``data[i]``.
+            Only possible if ``space.block_space`` is not ``None``.
+        """
         super(ProductSpaceElement, self).__init__(space)
         self.__parts = tuple(parts)
+        self.__data = data
 
     @property
     def parts(self):
         """Parts of this product space element."""
         return self.__parts
 
+    @property
+    def data(self):
+        """Array storing all parts of this element, or ``None``.
+
+        Elements of power spaces that are stored contiguously expose
+        their data as a `numpy.ndarray` of shape ``space.shape``, with
+        the parts being views into it. For elements built from
+        separately stored parts, this is ``None``.
+
+        Examples
+        --------
+        >>> pspace = odl.ProductSpace(odl.rn(3), 2)
+        >>> x = pspace.element([[1, 2, 3],
+        ...                     [4, 5, 6]])
+        >>> x.data
+        array([[ 1.,  2.,  3.],
+               [ 4.,  5.,  6.]])
+        >>> x[1][0] = 0
+        >>> x.data
+        array([[ 1.,  2.,  3.],
+               [ 0.,  5.,  6.]])
+
+        Elements that wrap existing parts are not contiguous:
+
+        >>> y = pspace.element([pspace[0].one(), pspace[1].one()])
+        >>> y.data is None
+        True
+        """
+        return self.__data
+
     @property
     def shape(self):
         """Number of values per axis in ``self``, computed recursively.
@@ -893,6 +1030,8 @@ class ProductSpaceElement(LinearSpaceElement):
             return True
         elif other not in self.space:
             return False
+        elif self.data is not None and other.data is not None:
+            return np.array_equal(self.data, other.data)
         else:
             return all(sp == op for sp, op in zip(self.parts, other.parts))
 
@@ -901,7 +1040,11 @@ class ProductSpaceElement(LinearSpaceElement):
         if isinstance(indices, Integral):
             return self.parts[indices]
         elif isinstance(indices, slice):
-            return self.space[indices].element(self.parts[indices])
+            space = self.space[indices]
+            if self.data is not None and space.block_space is not None:
+                return space.element_type(space, self.parts[indices],
+                                          data=self.data[indices])
+            return space.element(self.parts[indices])
         elif isinstance(indices, list):
             out_parts = [self.parts[i] for i in indices]
             return self.space[indices].element(out_parts)
@@ -1008,6 +1151,9 @@ class ProductSpaceElement(LinearSpaceElement):
 
             self[ind].asarray() == self.asarray()[ind]
 
+        For contiguously stored elements, the returned array is `data`
+        itself, otherwise the parts are copied into a new array.
+
         Parameters
         ----------
         out : `numpy.ndarray`, optional
@@ -1032,6 +1178,12 @@ class ProductSpaceElement(LinearSpaceElement):
         if not self.space.is_power_space:
             raise ValueError('cannot use `asarray` if `space.is_power_space` '
                              'is `False`')
+        elif self.data is not None:
+            if out is None:
+                return self.data
+            else:
+                out[:] = self.data
+                return out
         else:
             if out is None:
                 out = np.empty(self.shape, self.dtype)
@@ -1853,6 +2005,42 @@ class ProductSpaceCustomDist(CustomDist):
         super(ProductSpaceCustomDist, self).__init__(dist, impl='numpy')
 
 
+def _block_storage(pspace):
+    """Return the space for contiguous storage of ``pspace`` elements.
+
+    Returns
+    -------
+    block_space : `NumpyTensorSpace` or None
+        Space of arrays of shape ``pspace.shape``, or ``None`` if
+        ``pspace`` is not a power space of a space backed by
+        `NumpyTensorSpace`.
+    weighted : bool
+        ``True`` if inner product, norm and distance in ``block_space``
+        coincide with the ones in ``pspace``.
+    """
+    if len(pspace) == 0 or not pspace.is_power_space:
+        return None, False
+
+    base = pspace.spaces[0]
+    tspace = getattr(base, 'tspace', base)
+    if not isinstance(tspace, NumpyTensorSpace) or tspace.shape != base.shape:
+        return None, False
+
+    # Constant weightings with equal exponents are combined into one
+    # constant, see the notes of the weighting classes
+    pweighting, tweighting = pspace.weighting, tspace.weighting
+    if (type(pweighting) is ProductSpaceConstWeighting and
+            type(tweighting) is NumpyTensorSpaceConstWeighting and
+            pweighting.exponent == tweighting.exponent):
+        block_space = NumpyTensorSpace(
+            pspace.shape, dtype=tspace.dtype,
+            weighting=pweighting.const * tweighting.const,
+            exponent=tweighting.exponent)
+        return block_space, True
+    else:
+        return NumpyTensorSpace(pspace.shape, dtype=tspace.dtype), False
+
+
 def _strip_space(x):
     """Strip the SPACE.element( ... ) part from a repr."""
     r = repr(x)
@@ -0,0 +1,46 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmarks of the partial derivative based operators."""
+
+from __future__ import division
+
+import odl
+from odl.util.testutils import (noise_element, simple_fixture,
+                                skip_if_no_benchmark)
+
+pytestmark = skip_if_no_benchmark
+
+
+# --- pytest fixtures --- #
+
+
+shape = simple_fixture('shape', [(256, 256), (1024, 1024), (128, 128, 128)])
+
+
+# --- Benchmarks --- #
+
+
+def test_gradient(shape, odl_benchmark):
+    space = odl.uniform_discr([0] * len(shape), [1] * len(shape), shape)
+    grad = odl.Gradient(space)
+    x = noise_element(space)
+    out = grad.range.element()
+    odl_benchmark(grad, x, out=out)
+
+
+def test_divergence(shape, odl_benchmark):
+    space = odl.uniform_discr([0] * len(shape), [1] * len(shape), shape)
+    div = odl.Divergence(range=space)
+    x = noise_element(div.domain)
+    out = space.element()
+    odl_benchmark(div, x, out=out)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
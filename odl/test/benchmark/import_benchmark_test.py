@@ -0,0 +1,27 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmark of the time needed to import ODL."""
+
+from __future__ import division
+import subprocess
+import sys
+
+import odl
+from odl.util.testutils import skip_if_no_benchmark
+
+pytestmark = skip_if_no_benchmark
+
+
+def test_import_odl(odl_benchmark):
+    # Includes the start-up time of the interpreter
+    odl_benchmark(subprocess.check_call, [sys.executable, '-c', 'import odl'])
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
@@ -0,0 +1,80 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmarks of proximal operators and a complete reconstruction."""
+
+from __future__ import division
+
+import odl
+from odl.util.testutils import (noise_element, simple_fixture,
+                                skip_if_no_benchmark)
+
+pytestmark = skip_if_no_benchmark
+
+
+# --- pytest fixtures --- #
+
+
+shape = simple_fixture('shape', [(256, 256), (1024, 1024)])
+functional = simple_fixture(
+    'functional', ['l1', 'l2', 'l2_squared', 'l1_l2', 'huber', 'kl',
+                   'indicator_box'])
+convex_conj = simple_fixture('convex_conj', [False, True])
+
+
+def _functional(name, space):
+    if name == 'l1':
+        return odl.solvers.L1Norm(space)
+    elif name == 'l2':
+        return odl.solvers.L2Norm(space)
+    elif name == 'l2_squared':
+        return odl.solvers.L2NormSquared(space)
+    elif name == 'l1_l2':
+        # Isotropic TV type term on a vector-valued space
+        return odl.solvers.GroupL1Norm(odl.ProductSpace(space, 2))
+    elif name == 'huber':
+        return odl.solvers.Huber(space, gamma=0.1)
+    elif name == 'kl':
+        return odl.solvers.KullbackLeibler(space, prior=space.one())
+    elif name == 'indicator_box':
+        return odl.solvers.IndicatorBox(space, lower=0, upper=1)
+
+
+# --- Benchmarks --- #
+
+
+def test_proximal(shape, functional, convex_conj, odl_benchmark):
+    space = odl.uniform_discr([0, 0], [1, 1], shape)
+    func = _functional(functional, space)
+    if convex_conj:
+        func = func.convex_conj
+    prox = func.proximal(0.5)
+    x = noise_element(prox.domain)
+    out = prox.range.element()
+    odl_benchmark(prox, x, out=out)
+
+
+def test_pdhg_tv_denoising(shape, odl_benchmark):
+    space = odl.uniform_discr([0, 0], [1, 1], shape)
+    data = odl.phantom.shepp_logan(space, modified=True)
+    data += odl.phantom.white_noise(space) * 0.1
+    grad = odl.Gradient(space)
+    f = odl.solvers.L2NormSquared(space).translated(data)
+    g = 0.1 * odl.solvers.GroupL1Norm(grad.range)
+    op_norm = 1.1 * odl.power_method_opnorm(grad, maxiter=20)
+    tau = sigma = 1.0 / op_norm
+
+    def reconstruct():
+        x = space.zero()
+        odl.solvers.pdhg(x, f, g, grad, niter=20, tau=tau, sigma=sigma)
+
+    odl_benchmark(reconstruct)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
@@ -0,0 +1,52 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmarks of the basic vector space operations of `TensorSpace`."""
+
+from __future__ import division
+
+import odl
+from odl.util.testutils import (noise_element, simple_fixture,
+                                skip_if_no_benchmark)
+
+pytestmark = skip_if_no_benchmark
+
+
+# --- pytest fixtures --- #
+
+
+size = simple_fixture('size', [10 ** 4, 10 ** 6, 10 ** 7])
+dtype = simple_fixture('dtype', ['float32', 'float64', 'complex128'])
+
+
+def _elements(impl, size, dtype):
+    space = odl.tensor_space(size, dtype=dtype, impl=impl)
+    return space, noise_element(space), noise_element(space)
+
+
+# --- Benchmarks --- #
+
+
+def test_lincomb(odl_tspace_impl, size, dtype, odl_benchmark):
+    space, x, y = _elements(odl_tspace_impl, size, dtype)
+    out = space.element()
+    odl_benchmark(space.lincomb, 2, x, 3, y, out=out)
+
+
+def test_inner(odl_tspace_impl, size, dtype, odl_benchmark):
+    _, x, y = _elements(odl_tspace_impl, size, dtype)
+    odl_benchmark(x.inner, y)
+
+
+def test_norm(odl_tspace_impl, size, dtype, odl_benchmark):
+    _, x, _ = _elements(odl_tspace_impl, size, dtype)
+    odl_benchmark(x.norm)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
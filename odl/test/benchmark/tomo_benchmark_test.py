@@ -0,0 +1,61 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmarks of the ray transform on the CPU back-ends."""
+
+from __future__ import division
+
+import odl
+from odl.tomo import ASTRA_AVAILABLE, SKIMAGE_AVAILABLE
+from odl.util.testutils import (noise_element, simple_fixture,
+                                skip_if_no_benchmark)
+
+pytestmark = skip_if_no_benchmark
+
+
+# --- pytest fixtures --- #
+
+
+# Only available back-ends are benchmarked
+impl_params = ['numpy', 'sparse_matrix']
+if ASTRA_AVAILABLE:
+    impl_params.append('astra_cpu')
+if SKIMAGE_AVAILABLE:
+    impl_params.append('skimage')
+impl = simple_fixture('impl', impl_params)
+size = simple_fixture('size', [128, 256])
+
+
+def _ray_trafo(impl, size):
+    space = odl.uniform_discr([-20, -20], [20, 20], (size, size),
+                              dtype='float32')
+    geometry = odl.tomo.parallel_beam_geometry(space, num_angles=size)
+    return odl.tomo.RayTransform(space, geometry, impl=impl)
+
+
+# --- Benchmarks --- #
+
+
+def test_ray_transform(impl, size, odl_benchmark):
+    ray_trafo = _ray_trafo(impl, size)
+    x = noise_element(ray_trafo.domain)
+    ray_trafo(x)  # set-up, e.g., of the system matrix, is not timed
+    out = ray_trafo.range.element()
+    odl_benchmark(ray_trafo, x, out=out)
+
+
+def test_ray_transform_adjoint(impl, size, odl_benchmark):
+    ray_trafo = _ray_trafo(impl, size)
+    y = noise_element(ray_trafo.range)
+    ray_trafo.adjoint(y)
+    out = ray_trafo.domain.element()
+    odl_benchmark(ray_trafo.adjoint, y, out=out)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
@@ -0,0 +1,64 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Benchmarks of the Fourier and wavelet transforms."""
+
+from __future__ import division
+
+import odl
+from odl.trafos import PYFFTW_AVAILABLE, PYWT_AVAILABLE
+from odl.util.testutils import (noise_element, simple_fixture,
+                                skip_if_no_benchmark)
+
+pytestmark = skip_if_no_benchmark
+
+
+# --- pytest fixtures --- #
+
+
+shape = simple_fixture('shape', [(256, 256), (1024, 1024), (64, 64, 64)])
+
+# Only available back-ends are benchmarked
+fft_impl_params = ['numpy'] + (['pyfftw'] if PYFFTW_AVAILABLE else [])
+fft_impl = simple_fixture('fft_impl', fft_impl_params)
+wave_impl_params = ['pywt'] if PYWT_AVAILABLE else []
+wave_impl = simple_fixture('wave_impl', wave_impl_params)
+
+
+# --- Benchmarks --- #
+
+
+def test_fourier_transform(shape, fft_impl, odl_benchmark):
+    space = odl.uniform_discr([-1] * len(shape), [1] * len(shape), shape,
+                              dtype='complex128')
+    ft = odl.trafos.FourierTransform(space, impl=fft_impl)
+    x = noise_element(space)
+    out = ft.range.element()
+    odl_benchmark(ft, x, out=out)
+
+
+def test_wavelet_transform(shape, wave_impl, odl_benchmark):
+    space = odl.uniform_discr([-1] * len(shape), [1] * len(shape), shape)
+    wt = odl.trafos.WaveletTransform(space, wavelet='db2', nlevels=3,
+                                     impl=wave_impl)
+    x = noise_element(space)
+    out = wt.range.element()
+    odl_benchmark(wt, x, out=out)
+
+
+def test_wavelet_transform_inverse(shape, wave_impl, odl_benchmark):
+    space = odl.uniform_discr([-1] * len(shape), [1] * len(shape), shape)
+    wt = odl.trafos.WaveletTransform(space, wavelet='db2', nlevels=3,
+                                     impl=wave_impl)
+    coeffs = wt(noise_element(space))
+    out = space.element()
+    odl_benchmark(wt.inverse, coeffs, out=out)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__, ['--benchmark'])
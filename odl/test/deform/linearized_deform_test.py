@@ -13,9 +13,9 @@ import numpy as np
 import pytest
 
 import odl
-from odl.deform import LinDeformFixedTempl, LinDeformFixedDisp
+from odl.deform import LinDeformFixedTempl, LinDeformFixedDisp, linear_deform
 from odl.space.entry_points import tensor_space_impl
-from odl.util.testutils import simple_fixture
+from odl.util.testutils import all_equal, simple_fixture
 
 
 # --- pytest fixtures --- #
@@ -314,5 +314,26 @@ def test_fixed_disp_adj(space):
     assert inner1 == pytest.approx(inner2, abs=.1)
 
 
+def test_linear_deform_interpolation(space):
+    """Compare `linear_deform` to evaluation of the interpolation."""
+    template = space.element(template_function)
+    disp_field = space.real_space.tangent_bundle.element(
+        disp_field_factory(space.ndim))
+
+    image_pts = space.points()
+    for i, vi in enumerate(disp_field):
+        image_pts[:, i] += vi.asarray().ravel()
+    expected = template.interpolation(image_pts.T, bounds_check=False)
+    expected = expected.reshape(space.shape)
+    assert all_equal(linear_deform(template, disp_field), expected)
+
+    # Repeated calls with the same (cached) displacement, in-place
+    deform_op = LinDeformFixedDisp(disp_field, templ_space=space)
+    out = space.element()
+    for _ in range(2):
+        assert deform_op(template, out=out) is out
+        assert all_equal(out, expected)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -13,6 +13,7 @@ import pytest
 import numpy as np
 
 import odl
+from odl.discr import diff_ops
 from odl.discr.diff_ops import (
     finite_diff, PartialDerivative, Gradient, Divergence, Laplacian)
 from odl.util.testutils import (
@@ -431,6 +432,57 @@ def test_divergence(space, method, padding):
     assert lhs == pytest.approx(rhs, rel=dtype_tol(space.dtype))
 
 
+def test_diff_ops_batch(space, method, padding):
+    """Check batched evaluation of the differential operators."""
+    if isinstance(padding, tuple):
+        pad_mode, pad_const = padding
+    else:
+        pad_mode, pad_const = padding, 0
+
+    kwargs = dict(method=method, pad_mode=pad_mode, pad_const=pad_const)
+    ops = [PartialDerivative(space, axis=space.ndim - 1, **kwargs),
+           Gradient(space, **kwargs),
+           Divergence(range=space, **kwargs)]
+
+    for op in ops:
+        x_stack = np.array([noise_element(op.domain).asarray()
+                            for _ in range(3)])
+        result = op.batch(x_stack)
+        for x, res in zip(x_stack, result):
+            assert all_almost_equal(res, op(x))
+
+
+def test_diff_ops_fused(monkeypatch, method, padding):
+    """Compare fused gradient and divergence to per-axis differences."""
+    if isinstance(padding, tuple):
+        pad_mode, pad_const = padding
+    else:
+        pad_mode, pad_const = padding, 0
+
+    # Small slabs and several threads to test the slab boundaries
+    monkeypatch.setattr(diff_ops, 'SLAB_SIZE', 50)
+    monkeypatch.setattr(diff_ops, 'cpu_count', lambda: 3)
+
+    space = odl.uniform_discr([0, 0, 0], [1, 2, 3], (12, 5, 9))
+    dx = space.cell_sides
+    kwargs = dict(method=method, pad_mode=pad_mode, pad_const=pad_const)
+    for mode in (pad_mode, diff_ops._ADJ_PADDING[pad_mode]):
+        kwargs['pad_mode'] = mode
+        grad = Gradient(space, **kwargs)
+        div = Divergence(range=space, **kwargs)
+
+        x = noise_element(space)
+        expected = [finite_diff(x.asarray(), axis=i, dx=dx[i], **kwargs)
+                    for i in range(space.ndim)]
+        assert all_equal(grad(x), expected)
+
+        y = noise_element(grad.range)
+        expected = sum(finite_diff(y[i].asarray(), axis=i, dx=dx[i],
+                                   **kwargs)
+                       for i in range(space.ndim))
+        assert all_almost_equal(div(y), expected)
+
+
 # --- Laplacian --- #
 
 def test_laplacian_init():
@@ -14,9 +14,10 @@ import pytest
 
 import odl
 from odl.discr.grid import sparse_meshgrid
+from odl.discr import discr_mappings
 from odl.discr.discr_mappings import (
     PointCollocation, NearestInterpolation, LinearInterpolation,
-    PerAxisInterpolation)
+    PerAxisInterpolation, InterpolationPlan)
 from odl.util.testutils import all_almost_equal, all_equal
 
 
@@ -313,6 +314,11 @@ def test_per_axis_interpolation():
     function(mg, out=out)
     assert all_equal(out, true_mg)
 
+    # Output array that cannot be flattened without copy
+    out = np.zeros((2, 2), dtype='float64', order='F')
+    function(mg, out=out)
+    assert all_equal(out, true_mg)
+
     assert repr(interp_op) != ''
 
 
@@ -340,5 +346,63 @@ def test_collocation_interpolation_identity():
         assert all_almost_equal(ident_values, values)
 
 
+def test_find_indices_uniform():
+    """Check that uniform grids give the same indices as binary search."""
+    cvec = np.linspace(-1, 3, 17)
+    # Nodes, points close to nodes and points outside of the grid
+    pts = np.concatenate([cvec, cvec + 1e-14, cvec - 1e-14,
+                          np.random.uniform(-2, 4, size=1000)])
+
+    idcs, ndist = discr_mappings._find_indices([cvec], [pts])
+    true_idcs = np.clip(np.searchsorted(cvec, pts) - 1, 0, cvec.size - 2)
+    inside = (pts >= cvec[0]) & (pts <= cvec[-1])
+    # Points on nodes may be assigned to either neighboring cell
+    assert all(abs(idcs[0] - true_idcs) <= 1)
+    assert all(idcs[0] == np.clip(idcs[0], 0, cvec.size - 2))
+    assert all((ndist[0][inside] >= 0) & (ndist[0][inside] <= 1))
+    assert all_almost_equal(cvec[idcs[0]] +
+                            ndist[0] * (cvec[idcs[0] + 1] - cvec[idcs[0]]),
+                            pts)
+
+
+@pytest.mark.parametrize('schemes', [['nearest', 'nearest'],
+                                     ['linear', 'linear'],
+                                     ['nearest', 'linear']])
+def test_interpolation_plan(schemes, monkeypatch):
+    """Compare `InterpolationPlan` to `PerAxisInterpolation`."""
+    # Small chunks to test chunking and threading
+    monkeypatch.setattr(discr_mappings, 'CHUNK_SIZE', 7)
+    rect = odl.IntervalProd([0, -1], [1, 1])
+    part = odl.nonuniform_partition([0, 0.1, 0.5, 0.6, 1],
+                                    np.linspace(-1, 1, 5),
+                                    min_pt=[0, -1], max_pt=[1, 1])
+    space = odl.FunctionSpace(rect)
+    tspace = odl.rn(part.shape)
+    interp_op = PerAxisInterpolation(space, part, tspace, schemes=schemes)
+
+    # Points partly outside of the grid
+    pts = np.random.uniform([-0.2, -1.2], [1.2, 1.2], size=(50, 2)).T
+    plan = InterpolationPlan(part.coord_vectors, pts, schemes=schemes,
+                             num_threads=3)
+    assert plan.shape == (50,)
+
+    for _ in range(2):
+        values = np.random.rand(*part.shape)
+        function = interp_op(values)
+        expected = function(pts, bounds_check=False)
+        assert all_equal(plan(values), expected)
+
+        out = np.empty((100,))[::2]
+        assert plan(values, out=out) is out
+        assert all_equal(out, expected)
+
+    with pytest.raises(ValueError):
+        plan(np.zeros((4, 5)))
+    with pytest.raises(ValueError):
+        plan(values, out=np.empty(10))
+    with pytest.raises(ValueError):
+        InterpolationPlan(part.coord_vectors, pts, schemes='cubic')
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -784,6 +784,42 @@ def test_nonlinear_functional_operators():
     assert C(x) == pytest.approx(mat(x / 2.0))
 
 
+def test_operator_batch():
+    """Check batched evaluation against evaluation in a loop."""
+    mat1 = np.random.rand(3, 3)
+    mat2 = np.random.rand(4, 3)
+    op1 = MultiplyAndSquareOp(mat1)
+    op2 = MultiplyAndSquareOp(mat2)
+    x_stack = np.random.rand(2, 5, 3)
+    x_list = x_stack.reshape(-1, 3)
+
+    # Default implementation, serial and in a thread pool
+    for num_threads in [1, 3]:
+        result = op2.batch(x_stack, num_threads=num_threads)
+        assert result.shape == (2, 5, 4)
+        expected = [mult_sq_np(mat2, x) for x in x_list]
+        assert all_almost_equal(result.reshape(-1, 4), expected)
+
+    # Composition, sum and scalar multiplications
+    for op in [op2 * op1, op1 + op1, 2 * op1, op1 * 2,
+               2 * odl.IdentityOperator(op1.range) * op1]:
+        expected = [op(x) for x in x_list]
+        out = np.empty((2, 5) + op.range.shape)
+        assert op.batch(x_stack, out=out) is out
+        assert all_almost_equal(out.reshape(10, -1), expected)
+
+    # Functionals
+    func = SumSquaredFunctional(odl.rn(3))
+    assert all_almost_equal(func.batch(x_stack),
+                            np.sum(x_stack ** 2, axis=-1))
+
+    # Bad input and output shapes
+    with pytest.raises(OpDomainError):
+        op1.batch(np.zeros((2, 4)))
+    with pytest.raises(OpRangeError):
+        op1.batch(x_stack, out=np.empty((2, 5, 4)))
+
+
 # test functions to dispatch
 def f1(x):
     """f1(x)
@@ -11,11 +11,46 @@ import numpy as np
 import pytest
 
 import odl
-from odl.operator.oputils import matrix_representation, power_method_opnorm
+from odl.operator.oputils import (
+    matrix_representation, sparse_matrix_representation, power_method_opnorm,
+    lanczos_opnorm, estimate_opnorm, opnorm_upper_bound)
 from odl.operator.pspace_ops import ProductSpaceOperator
 from odl.util.testutils import all_almost_equal
 
 
+class CountingOp(odl.Operator):
+
+    """Wrapper of a linear operator that counts the operator calls."""
+
+    def __init__(self, op):
+        super(CountingOp, self).__init__(op.domain, op.range, linear=True)
+        self.op = op
+        self.num_calls = 0
+
+    def _call(self, x):
+        self.num_calls += 1
+        return self.op(x)
+
+    @property
+    def adjoint(self):
+        return CountingOp(self.op.adjoint)
+
+    def __repr__(self):
+        return 'CountingOp({!r})'.format(self.op)
+
+
+class NoAdjointOp(odl.Operator):
+
+    """Wrapper of a linear operator that hides its adjoint."""
+
+    def __init__(self, op):
+        super(NoAdjointOp, self).__init__(op.domain, op.range, linear=True)
+        self.op = op
+
+    def _call(self, x):
+        return self.op(x)
+
+
 def test_matrix_representation():
     """Verify that the matrix repr returns the correct matrix"""
     n = 3
@@ -141,6 +176,41 @@ def test_matrix_representation_wrong_range():
         matrix_representation(nonlin_op)
 
 
+def test_sparse_matrix_representation():
+    """Compare the sparse to the dense matrix representation."""
+    space = odl.uniform_discr([0, 0], [1, 1], (7, 6))
+    ops = [odl.Gradient(space, pad_mode='periodic'),
+           odl.Divergence(range=space),
+           odl.Laplacian(space),
+           odl.SamplingOperator(space, [[1, 5, 6], [2, 2, 0]]),
+           odl.MatrixOperator(np.random.rand(4, 5)),
+           odl.ScalingOperator(odl.cn(3), 1 - 2j)]
+
+    for op in ops:
+        dense = matrix_representation(op).reshape(op.range.size,
+                                                  op.domain.size)
+        sparse = sparse_matrix_representation(op)
+        assert sparse.shape == dense.shape
+        assert all_almost_equal(sparse.toarray(), dense)
+
+
+def test_sparse_matrix_representation_probes():
+    """Check that local operators need few calls and spacing is capped."""
+    space = odl.uniform_discr([0, 0], [1, 1], (100, 100))
+    op = CountingOp(odl.Gradient(space))
+    matrix = sparse_matrix_representation(op)
+    assert op.num_calls < 100
+    x = odl.phantom.white_noise(space)
+    assert all_almost_equal(matrix.dot(x.asarray().ravel()),
+                            op(x).asarray().ravel())
+
+    op = CountingOp(odl.MatrixOperator(np.random.rand(5, 10)))
+    with pytest.raises(ValueError):
+        sparse_matrix_representation(op, max_spacing=3)
+    with pytest.raises(ValueError):
+        sparse_matrix_representation(op, spacing=0)
+
+
 def test_power_method_opnorm_symm():
     """Test the power method on a symmetrix matrix operator"""
     # Test matrix with eigenvalues 1 and -2
@@ -212,5 +282,161 @@ def test_power_method_opnorm_exceptions():
         power_method_opnorm(op, maxiter=1, xstart=op.domain.one())
 
 
+def test_lanczos_opnorm():
+    """Compare the Lanczos method to exact operator norms."""
+    mat = np.array([[-1.52441557, 5.04276365],
+                    [1.90246927, 2.54424763],
+                    [5.32935411, 0.04573162]])
+    op = odl.MatrixOperator(mat)
+    # Exact in 2 iterations since the domain is 2-dimensional
+    opnorm_est, vec = lanczos_opnorm(op, maxiter=2, return_vector=True)
+    assert opnorm_est == pytest.approx(6)
+    assert vec.norm() == pytest.approx(1)
+    assert op(vec).norm() == pytest.approx(6)
+
+    space = odl.uniform_discr([0, 0], [1, 1], (30, 30))
+    grad = odl.Gradient(space)
+    matrix = sparse_matrix_representation(grad).toarray()
+    true_opnorm = np.sqrt(np.linalg.eigvalsh(matrix.T.dot(matrix))[-1])
+    opnorm_est = lanczos_opnorm(grad, maxiter=40, rtol=1e-6)
+    assert opnorm_est == pytest.approx(true_opnorm, rel=1e-2)
+
+    # Without adjoint, the operator itself is used instead of the normal
+    # operator, also for negative eigenvalues
+    space = odl.rn(3)
+    op = NoAdjointOp(odl.ScalingOperator(space, 4.0))
+    assert lanczos_opnorm(op) == pytest.approx(4.0)
+    assert power_method_opnorm(op) == pytest.approx(4.0)
+    op = NoAdjointOp(odl.MatrixOperator(np.diag([1.0, -3.0, 2.0])))
+    opnorm_est, vec = lanczos_opnorm(op, maxiter=3, return_vector=True)
+    assert opnorm_est == pytest.approx(3.0)
+    assert op(vec).norm() == pytest.approx(3.0)
+
+    with pytest.raises(ValueError):
+        lanczos_opnorm(grad, maxiter=0)
+    with pytest.raises(ValueError):
+        lanczos_opnorm(grad, xstart=space.zero())
+
+
+def test_estimate_opnorm_cache(tmpdir):
+    """Check caching and warm starts of operator norm estimates."""
+    cache_dir = str(tmpdir)
+    space = odl.uniform_discr([0, 0], [1, 1], (20, 20))
+    op = CountingOp(odl.Gradient(space))
+    op.opnorm_cache_key = 'gradient_20x20'
+
+    opnorm = estimate_opnorm(op, method='lanczos', cache_dir=cache_dir,
+                             rtol=1e-8)
+    num_calls = op.num_calls
+    assert num_calls > 0
+    assert op.norm(estimate=True) == opnorm
+    assert op.num_calls == num_calls
+
+    # Different object with the same key uses the disk cache
+    op = CountingOp(odl.Gradient(space))
+    op.opnorm_cache_key = 'gradient_20x20'
+    assert estimate_opnorm(op, cache_dir=cache_dir) == opnorm
+    assert op.num_calls == 0
+
+    # Re-estimation starts from the converged vector on disk and is faster
+    opnorm_new = estimate_opnorm(op, method='lanczos', cache_dir=cache_dir,
+                                 use_cache=False, rtol=1e-8)
+    assert opnorm_new == pytest.approx(opnorm, rel=1e-2)
+    assert opnorm_new >= opnorm * (1 - 1e-6)
+    assert op.num_calls < num_calls
+
+    # The vector is also stored with the operator
+    num_calls = op.num_calls
+    estimate_opnorm(op, method='lanczos', use_cache=False, rtol=1e-8)
+    assert op.num_calls - num_calls < num_calls
+
+    with pytest.raises(ValueError):
+        estimate_opnorm(op, method='bad', use_cache=False)
+
+
+def test_estimate_opnorm_params(tmpdir):
+    """Check that stored estimates are only reused for the same arguments."""
+    cache_dir = str(tmpdir)
+    space = odl.uniform_discr([0, 0], [1, 1], (20, 20))
+    op = CountingOp(odl.Gradient(space))
+    op.opnorm_cache_key = 'gradient_20x20'
+
+    opnorm_rough = op.norm(estimate=True, maxiter=2, cache_dir=cache_dir)
+    num_calls = op.num_calls
+
+    # Without arguments or with the same ones, the estimate is reused
+    assert op.norm(estimate=True) == opnorm_rough
+    assert op.norm(estimate=True, method='power', maxiter=2) == opnorm_rough
+    assert op.num_calls == num_calls
+
+    # Other arguments lead to a new estimate, also with the disk cache
+    opnorm = op.norm(estimate=True, method='lanczos', maxiter=100,
+                     rtol=1e-8, cache_dir=cache_dir)
+    assert op.num_calls > num_calls
+    assert opnorm > opnorm_rough
+    num_calls = op.num_calls
+    assert op.norm(estimate=True) == opnorm
+    assert op.num_calls == num_calls
+
+    op = CountingOp(odl.Gradient(space))
+    op.opnorm_cache_key = 'gradient_20x20'
+    assert estimate_opnorm(op, method='lanczos', maxiter=100, rtol=1e-8,
+                           cache_dir=cache_dir) == opnorm
+    assert op.num_calls == 0
+    assert estimate_opnorm(op, maxiter=2, cache_dir=cache_dir) != opnorm
+    assert op.num_calls > 0
+
+
+def test_estimate_opnorm_cache_key(tmpdir):
+    """Check that only operators with a cache key are cached on disk."""
+    cache_dir = str(tmpdir)
+
+    # Matrices that differ only in entries hidden in the abbreviated repr
+    mat1 = np.eye(100)
+    mat2 = np.eye(100)
+    mat2[50, 50] = 3.0
+    op1 = odl.MatrixOperator(mat1)
+    op2 = odl.MatrixOperator(mat2)
+    assert repr(op1) == repr(op2)
+
+    assert estimate_opnorm(op1, cache_dir=cache_dir) == pytest.approx(1.0)
+    assert estimate_opnorm(op2, cache_dir=cache_dir) == pytest.approx(3.0)
+    assert tmpdir.listdir() == []
+
+    op1.opnorm_cache_key = 'eye'
+    estimate_opnorm(op1, cache_dir=cache_dir, use_cache=False)
+    assert len(tmpdir.listdir()) == 2
+
+
+def test_estimate_opnorm_warm_start_per_operator():
+    """Check that warm starts are not shared between operators."""
+    space = odl.rn(2)
+
+    # The converged vector of the first operator is orthogonal to the
+    # dominant singular vector of the second one
+    op1 = odl.MatrixOperator(np.diag([1.0, 0.0]), domain=space, range=space)
+    op2 = odl.MatrixOperator(np.diag([0.5, 2.0]), domain=space, range=space)
+    assert op1.norm(estimate=True) == pytest.approx(1.0)
+    assert op2.norm(estimate=True) == pytest.approx(2.0)
+
+
+def test_opnorm_upper_bound():
+    """Check the bounds for sums and compositions of operators."""
+    space = odl.uniform_discr([0, 0], [1, 1], (10, 10))
+    grad = CountingOp(odl.Gradient(space))
+    scaling = odl.ScalingOperator(grad.range, -2)
+    op = scaling * grad + grad * 3
+
+    bound = opnorm_upper_bound(op, method='lanczos', rtol=1e-6)
+    grad_norm = grad.norm(estimate=True)
+    assert bound == pytest.approx(5 * grad_norm)
+    assert bound >= 0.99 * lanczos_opnorm(op, maxiter=50)
+
+    # The gradient norm is estimated only once
+    num_calls = grad.num_calls
+    opnorm_upper_bound(grad.adjoint * op)
+    assert grad.num_calls == num_calls
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
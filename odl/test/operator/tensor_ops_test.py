@@ -15,7 +15,8 @@ import scipy.sparse
 
 import odl
 from odl.operator.tensor_ops import (
-    PointwiseNorm, PointwiseInner, PointwiseSum, MatrixOperator)
+    PointwiseNorm, PointwiseInner, PointwiseSum, MatrixOperator,
+    SparseMatrixOperator)
 from odl.space.pspace import ProductSpace
 from odl.util import moveaxis
 from odl.util.testutils import (
@@ -518,6 +519,39 @@ def test_pointwise_inner_adjoint_weighted():
     assert all_almost_equal(out, true_inner_adj)
 
 
+def test_pointwise_ops_contiguous():
+    """Compare vectorized evaluation to the part-wise one."""
+    fspace = odl.uniform_discr([0, 0], [1, 1], (4, 5))
+    vfspace = ProductSpace(fspace, 3)
+    weights = [1.0, 2.0, 0.5]
+    vf_arr, vf = noise_elements(vfspace)
+    f = noise_element(fspace)
+    # Same vector field, but not stored contiguously
+    vf_sep = vfspace.element([fspace.element(vfi.copy()) for vfi in vf_arr])
+    assert vf.data is not None
+    assert vf_sep.data is None
+
+    pwnorm = PointwiseNorm(vfspace, weighting=weights)
+    assert all_almost_equal(pwnorm(vf), pwnorm(vf_sep))
+    expected = np.sqrt(np.sum(np.array(weights)[:, None, None] * vf_arr ** 2,
+                              axis=0))
+    assert all_almost_equal(pwnorm(vf), expected)
+
+    # Aliasing with the input
+    out = vf[0]
+    pwnorm(vf, out=out)
+    assert all_almost_equal(out, expected)
+
+    vf.assign(vf_sep)
+    pwinner = PointwiseInner(vfspace, vecfield=vf_sep.copy(),
+                             weighting=weights)
+    assert pwinner.vecfield.data is not None
+    assert all_almost_equal(pwinner(vf), pwinner(vf_sep))
+    assert all_almost_equal(pwinner.adjoint(f),
+                            PointwiseInner(vfspace, vecfield=vf_sep,
+                                           weighting=weights).adjoint(f))
+
+
 # ---- PointwiseSum ----
 
 
@@ -734,6 +768,40 @@ def test_matrix_op_inverse():
     assert all_almost_equal(x, minv_m_x)
 
 
+def test_sparse_matrix_op():
+    """Check `SparseMatrixOperator` against a compiled operator."""
+    space = odl.uniform_discr([0, 0], [1, 2], (4, 5))
+    grad = odl.Gradient(space)
+    matrix = odl.sparse_matrix_representation(grad)
+    op = SparseMatrixOperator(matrix, grad.domain, grad.range)
+    assert op.is_linear
+    assert op.domain == grad.domain
+    assert op.range == grad.range
+
+    x = noise_element(space)
+    y = noise_element(grad.range)
+    assert all_almost_equal(op(x), grad(x))
+    out = grad.range.element()
+    assert op(x, out=out) is out
+    assert all_almost_equal(out, grad(x))
+    assert all_almost_equal(op.adjoint(y), grad.adjoint(y))
+
+    # Defaults from the matrix
+    op = SparseMatrixOperator([[1, 2, 0], [0, 0, 1j]])
+    assert op.domain == odl.cn(3)
+    assert op.range == odl.cn(2)
+    assert all_almost_equal(op([1, 1, 1]), [3, 1j])
+
+    with pytest.raises(ValueError):
+        SparseMatrixOperator(matrix, grad.range, grad.domain)
+    with pytest.raises(ValueError):
+        SparseMatrixOperator(matrix.astype(complex), grad.domain,
+                             grad.range)
+    with pytest.raises(NotImplementedError):
+        SparseMatrixOperator(np.eye(3),
+                             odl.rn(3, weighting=[1, 2, 3])).adjoint
+
+
 def test_sampling_operator_adjoint():
     """Validate basic properties of `SamplingOperator.adjoint`."""
     # 1d space
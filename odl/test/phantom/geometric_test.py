@@ -0,0 +1,94 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for geometric phantoms."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.phantom import geometric
+from odl.util.testutils import all_equal
+
+
+# --- Tests --- #
+
+
+def test_ellipsoid_phantom_rotated_3d():
+    """Compare a rotated 3D ellipsoid to a brute-force evaluation."""
+    space = odl.uniform_discr([-1, -1, -1], [1, 1, 1], (20, 22, 24))
+    # Rotated ellipsoid whose bounding box is not aligned with its axes
+    ellipsoids = [[1.0, 0.2, 0.7, 0.9, -0.2, 0.2, 0.0, 0.2, 1.6, 1.5]]
+    phantom = odl.phantom.ellipsoid_phantom(space, ellipsoids)
+
+    # Brute force: evaluate the ellipsoid equation on all points,
+    # in the normalized coordinates of the phantom
+    coord_vecs = geometric._normalized_coord_vectors(space)[0]
+    points = np.meshgrid(*coord_vecs, indexing='ij')
+    phi, theta, psi = 0.2, 1.6, 1.5
+    cphi, sphi = np.cos(phi), np.sin(phi)
+    ctheta, stheta = np.cos(theta), np.sin(theta)
+    cpsi, spsi = np.cos(psi), np.sin(psi)
+    mat = np.array([[cpsi * cphi - ctheta * sphi * spsi,
+                     cpsi * sphi + ctheta * cphi * spsi,
+                     spsi * stheta],
+                    [-spsi * cphi - ctheta * sphi * cpsi,
+                     -spsi * sphi + ctheta * cphi * cpsi,
+                     cpsi * stheta],
+                    [stheta * sphi,
+                     -stheta * cphi,
+                     ctheta]])
+    diffs = [points[0] + 0.2, points[1] - 0.2, points[2]]
+    rotated = [sum(mat[j, i] * diffs[i] for i in range(3))
+               for j in range(3)]
+    radius = sum((rot / ax) ** 2
+                 for rot, ax in zip(rotated, [0.2, 0.7, 0.9]))
+    expected = (radius <= 1).astype(float)
+
+    assert all_equal(phantom, expected)
+
+
+def test_ellipsoid_phantom_slabs(monkeypatch):
+    """Check that the result does not depend on the slab partition."""
+    space = odl.uniform_discr([-1, -1, -1], [1, 1, 1], (30, 20, 10))
+    ellipsoids = odl.phantom.shepp_logan_ellipsoids(3, modified=True)
+    expected = odl.phantom.ellipsoid_phantom(space, ellipsoids)
+
+    # Slabs of 2 slices each, distributed over several threads
+    monkeypatch.setattr(geometric, 'SLAB_SIZE', 2 * 20 * 10)
+    monkeypatch.setattr(geometric, 'cpu_count', lambda: 3)
+    assert all_equal(odl.phantom.ellipsoid_phantom(space, ellipsoids),
+                     expected)
+
+
+def test_ellipsoid_phantom_supersampling():
+    """Check anti-aliased ellipsoid phantoms."""
+    space = odl.uniform_discr([-1, -1], [1, 1], (32, 32))
+    ellipses = [[2.0, 0.6, 0.4, 0.1, -0.2, 0.5]]
+    phantom = odl.phantom.ellipsoid_phantom(space, ellipses)
+    assert all_equal(
+        odl.phantom.ellipsoid_phantom(space, ellipses, supersampling=1),
+        phantom)
+
+    smooth = odl.phantom.ellipsoid_phantom(space, ellipses, supersampling=5)
+    smooth_arr = smooth.asarray()
+    assert np.all(smooth_arr >= 0) and np.all(smooth_arr <= 2)
+    assert np.any((smooth_arr > 0) & (smooth_arr < 2))
+    # Total mass is approximately preserved
+    assert smooth.inner(space.one()) == pytest.approx(
+        phantom.inner(space.one()), rel=2e-2)
+
+    with pytest.raises(ValueError):
+        odl.phantom.ellipsoid_phantom(space, ellipses, supersampling=0)
+    with pytest.raises(ValueError):
+        odl.phantom.ellipsoid_phantom(space, ellipses, supersampling=1.5)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
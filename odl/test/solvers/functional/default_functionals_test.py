@@ -668,5 +668,42 @@ def test_bregman_functional_l2_squared(space, sigma):
     assert all_almost_equal(prox_bregman_dist(x), prox_expected_func(x))
 
 
+@pytest.mark.parametrize('pshape', [(2, 2), (3, 2), (2, 3), (3, 3), (4, 4)])
+@pytest.mark.parametrize('singular_vector_exp', [1, 2, np.inf])
+def test_nuclear_norm(pshape, singular_vector_exp):
+    """Compare the nuclear norm and its proximal to a generic SVD."""
+    base = odl.uniform_discr([0, 0], [1, 1], (5, 4))
+    space = odl.ProductSpace(odl.ProductSpace(base, pshape[1]), pshape[0])
+    func = odl.solvers.NuclearNorm(space,
+                                   singular_vector_exp=singular_vector_exp)
+    x = noise_element(space)
+    # Matrix axes last
+    arr = np.moveaxis(x.asarray(), [0, 1], [-2, -1])
+
+    u, s, vt = np.linalg.svd(arr, full_matrices=False)
+    s_norm = np.linalg.norm(s, ord=singular_vector_exp, axis=-1)
+    expected = odl.solvers.L1Norm(base)(s_norm)
+    assert func(x) == pytest.approx(expected)
+
+    # Proximal of a scaled version to hit both regimes of the shrinkage
+    sigma = 0.7
+    if singular_vector_exp == 1:
+        s_prox = np.maximum(s - sigma, 0)
+    else:
+        if singular_vector_exp == 2:
+            s_norm = np.linalg.norm(s, axis=-1)
+        else:
+            s_norm = np.sum(s, axis=-1)
+        s_prox = (1 - sigma / np.maximum(sigma, s_norm))[..., None] * s
+    expected = np.einsum('...ik,...k,...kj->...ij', u, s_prox, vt)
+    expected = np.moveaxis(expected, [-2, -1], [0, 1])
+
+    prox = func.proximal(sigma)
+    assert all_almost_equal(prox(x), expected, ndigits=5)
+    out = space.element()
+    assert prox(x, out=out) is out
+    assert all_almost_equal(out, expected, ndigits=5)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
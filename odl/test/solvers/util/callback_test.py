@@ -0,0 +1,120 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for solver callbacks."""
+
+from __future__ import division
+import threading
+import time
+import pytest
+
+import odl
+from odl.solvers import AsyncCallback, CallbackStore
+
+
+def test_async_callback_solver():
+    """Check that an asynchronous callback sees all iterates of a solver."""
+    space = odl.uniform_discr(0, 1, 10)
+    op = odl.ScalingOperator(space, 2.0)
+    rhs = space.one()
+    niter = 5
+
+    x_sync = space.zero()
+    store_sync = CallbackStore()
+    odl.solvers.landweber(op, x_sync, rhs, niter, omega=0.1,
+                          callback=store_sync)
+
+    x = space.zero()
+    store = CallbackStore()
+    with AsyncCallback(store, maxsize=1) as callback:
+        odl.solvers.landweber(op, x, rhs, niter, omega=0.1,
+                              callback=callback)
+    assert len(store) == niter
+    assert all(xi == xi_sync for xi, xi_sync in zip(store, store_sync))
+
+    # Solvers flush the callback before they return, also when it is
+    # combined with other callbacks
+    def slow_store(x):
+        time.sleep(0.01)
+        store.append(x.copy())
+
+    for callback in [AsyncCallback(slow_store),
+                     odl.solvers.CallbackPrintIteration(step=100) &
+                     AsyncCallback(slow_store)]:
+        store = []
+        odl.solvers.landweber(op, space.zero(), rhs, niter, omega=0.1,
+                              callback=callback)
+        assert len(store) == niter
+        store = []
+        odl.solvers.pdhg(space.zero(), odl.solvers.ZeroFunctional(space),
+                         odl.solvers.L2NormSquared(space),
+                         odl.IdentityOperator(space), niter, tau=0.5,
+                         sigma=0.5, callback=callback)
+        assert len(store) == niter
+
+    # Lists of iterates, as used by primal-dual solvers
+    norms = []
+    callback = AsyncCallback(lambda xy: norms.append(xy[1].norm()),
+                             reuse_buffers=True)
+    y = space.one()
+    for i in range(4):
+        callback([x, y])
+        y *= 2
+    callback.flush()
+    assert norms == [2 ** i * space.one().norm() for i in range(4)]
+    callback.close()
+
+
+def test_async_callback_policies():
+    """Check the dropping policy and error propagation."""
+    space = odl.rn(3)
+    release = threading.Event()
+    results = []
+
+    def slow_callback(x):
+        release.wait()
+        results.append(x)
+
+    callback = AsyncCallback(slow_callback, maxsize=1, policy='drop')
+    x = space.zero()
+    for _ in range(10):
+        callback(x)
+        x += 1
+    # At most one iterate in the worker and one in the queue
+    assert callback.dropped >= 8
+    release.set()
+    callback.flush()
+    assert len(results) == 10 - callback.dropped
+    assert results[0] == space.zero()
+    callback.reset()
+    assert callback.dropped == 0
+
+    def failing_callback(x):
+        raise RuntimeError('failed')
+
+    callback = AsyncCallback(failing_callback)
+    callback(x)
+    with pytest.raises(RuntimeError):
+        callback.flush()
+    callback.flush()  # error is raised only once
+
+    with pytest.raises(RuntimeError):
+        with AsyncCallback(failing_callback) as callback:
+            callback(x)
+
+    with pytest.raises(ValueError):
+        AsyncCallback(slow_callback, policy='wait')
+    with pytest.raises(TypeError):
+        AsyncCallback(None)
+
+    assert repr(AsyncCallback(CallbackStore(), policy='drop')) == (
+        "AsyncCallback(CallbackStore(), policy='drop')")
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
@@ -0,0 +1,133 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for checkpointing of solver states."""
+
+from __future__ import division
+import os
+import numpy as np
+import pytest
+
+import odl
+from odl.solvers import SolverCheckpoint, load_solver_state
+from odl.util.testutils import all_equal, noise_element
+
+
+def test_checkpoint_save_load(tmpdir):
+    """Check saving and loading of states, including product spaces."""
+    directory = str(tmpdir.join('ckpt'))
+    space = odl.uniform_discr([0, 0], [1, 1], (4, 5))
+    pspace = odl.ProductSpace(space, odl.rn(3))
+    x = noise_element(space)
+    y = noise_element(pspace)
+
+    checkpoint = SolverCheckpoint(directory, interval=2, keep=2)
+    for it in range(1, 8):
+        checkpoint.update(it, {'x': x, 'y': y}, {'tau': 0.5 * it,
+                                                 'sigma': [1.0, 2.0]})
+        if it == 4:
+            x_4 = x.copy()
+            rng_state = np.random.get_state()
+        # Modified while the previous state may still be written
+        x += 1
+    checkpoint.wait()
+
+    # Snapshots for iterations 4 and 6 are kept
+    assert sorted(d for d in os.listdir(directory)
+                  if d.startswith('iter_')) == ['iter_00000004',
+                                                'iter_00000006']
+    state = load_solver_state(directory)
+    assert state.iteration == 6
+    assert state.params == {'tau': 3.0, 'sigma': [1.0, 2.0]}
+    assert isinstance(state.arrays['x'], np.memmap)
+
+    # Restore into fresh elements, also from a single snapshot directory
+    state = load_solver_state(os.path.join(directory, 'iter_00000004'))
+    x_new = space.zero()
+    y_new = pspace.zero()
+    state.restore(x=x_new, y=y_new)
+    assert x_new == x_4
+    assert y_new == y
+
+    np.random.rand(10)
+    state.restore_rng()
+    assert all_equal(np.random.get_state()[1], rng_state[1])
+
+    with pytest.raises(ValueError):
+        state.restore(z=space.zero())
+    with pytest.raises(ValueError):
+        state.restore(x=odl.rn(3).zero())
+    with pytest.raises(TypeError):
+        checkpoint.save(8, {'x': x}, {'tau': space.one()})
+    with pytest.raises(IOError):
+        load_solver_state(str(tmpdir))
+    with pytest.raises(ValueError):
+        SolverCheckpoint(directory, interval=0)
+
+
+def test_pdhg_resume(tmpdir):
+    """Check that a resumed PDHG run matches an uninterrupted one."""
+    directory = str(tmpdir)
+    space = odl.uniform_discr([0, 0], [1, 1], (10, 10))
+    grad = odl.Gradient(space)
+    data = noise_element(space)
+    f = odl.solvers.L2NormSquared(space).translated(data)
+    g = 0.1 * odl.solvers.L1Norm(grad.range)
+    kwargs = dict(tau=0.3, sigma=0.3, gamma_primal=0.1)
+
+    x_full = space.zero()
+    odl.solvers.pdhg(x_full, f, g, grad, niter=10, **kwargs)
+
+    # Interrupted run, followed by resumed run with a different start
+    checkpoint = SolverCheckpoint(directory, interval=3)
+    x = space.zero()
+    odl.solvers.pdhg(x, f, g, grad, niter=4, checkpoint=checkpoint,
+                     **kwargs)
+    assert load_solver_state(directory).iteration == 4
+
+    x_resumed = space.one()
+    odl.solvers.pdhg(x_resumed, f, g, grad, niter=10, resume_from=directory,
+                     checkpoint=directory, **kwargs)
+    assert x_resumed == x_full
+    assert load_solver_state(directory).iteration == 10
+
+
+def test_admm_osmlem_resume(tmpdir):
+    """Check resuming linearized ADMM and OSMLEM."""
+    space = odl.uniform_discr(0, 1, 10)
+    L = odl.ScalingOperator(space, 2.0)
+    data = noise_element(space)
+    f = odl.solvers.L1Norm(space).translated(data)
+    g = odl.solvers.L2NormSquared(space)
+
+    x_full = space.zero()
+    odl.solvers.admm_linearized(x_full, f, g, L, 0.1, 1.0, niter=6)
+    x = space.zero()
+    directory = str(tmpdir.join('admm'))
+    odl.solvers.admm_linearized(x, f, g, L, 0.1, 1.0, niter=2,
+                                checkpoint=directory)
+    x_resumed = space.zero()
+    odl.solvers.admm_linearized(x_resumed, f, g, L, 0.1, 1.0, niter=6,
+                                resume_from=directory)
+    assert x_resumed == x_full
+
+    ops = [odl.ScalingOperator(space, 1.0), odl.ScalingOperator(space, 2.0)]
+    data = [space.one(), space.one()]
+    x_full = space.one()
+    odl.solvers.osmlem(ops, x_full, data, niter=5)
+    x = space.one()
+    directory = str(tmpdir.join('osmlem'))
+    odl.solvers.osmlem(ops, x, data, niter=3, checkpoint=directory)
+    x_resumed = space.one()
+    odl.solvers.osmlem(ops, x_resumed, data, niter=5,
+                       resume_from=directory)
+    assert x_resumed == x_full
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
@@ -0,0 +1,148 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for lazy expressions of Numpy-based tensors."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.space import npy_expr
+from odl.space.npy_expr import NumpyTensorExpression, NUMEXPR_AVAILABLE
+from odl.util.testutils import (
+    all_almost_equal, simple_fixture, noise_elements)
+
+
+# --- pytest fixtures --- #
+
+
+impl = simple_fixture('impl', ['numpy', 'numexpr'])
+order = simple_fixture('order', ['C', 'F'])
+dtype = simple_fixture('dtype', ['float32', 'float64', 'complex128'])
+
+
+def _skip_if_unavailable(impl):
+    if impl == 'numexpr' and not NUMEXPR_AVAILABLE:
+        pytest.skip('numexpr not available')
+
+
+# --- Tests --- #
+
+
+def test_expression_evaluate(impl, order, dtype):
+    """Compare evaluation of expressions to direct NumPy computation."""
+    _skip_if_unavailable(impl)
+    # Larger than one block to test chunking
+    space = odl.tensor_space((30, 400), dtype=dtype)
+    [x_arr, y_arr, z_arr], [x, y, z] = noise_elements(space, 3)
+    x = space.element(x_arr, order=order)
+    y = space.element(y_arr, order=order)
+
+    sigma = 0.5
+    expr = space.lazy_lincomb(1, x, sigma, y) - z * y.lazy() / 3
+    assert isinstance(expr, NumpyTensorExpression)
+    expected = x_arr + sigma * y_arr - z_arr * y_arr / 3
+    result = expr.evaluate(impl=impl)
+    assert result in space
+    assert all_almost_equal(result, expected, ndigits=5)
+
+    # Ufuncs and powers
+    expr = np.exp(-(x.lazy() ** 2)) + np.sqrt(np.abs(y.lazy()) + 1)
+    expected = np.exp(-(x_arr ** 2)) + np.sqrt(np.abs(y_arr) + 1)
+    assert all_almost_equal(expr.evaluate(impl=impl), expected, ndigits=5)
+
+    # Aliased output
+    out = x.copy()
+    expr = 2 * out.lazy() - np.square(y.lazy() - out.lazy())
+    expected = 2 * x_arr - (y_arr - x_arr) ** 2
+    assert expr.evaluate(out=out, impl=impl) is out
+    assert all_almost_equal(out, expected, ndigits=4)
+
+
+def test_expression_numpy_only():
+    """Check ufuncs that are only supported by the NumPy back-end."""
+    space = odl.rn((5, 4000))
+    [x_arr, y_arr], [x, y] = noise_elements(space, 2)
+
+    expr = np.maximum(x.lazy(), 0.1) - np.minimum(x.lazy(), y.lazy())
+    expected = np.maximum(x_arr, 0.1) - np.minimum(x_arr, y_arr)
+    # Default chooses a working back-end
+    assert all_almost_equal(expr.evaluate(), expected)
+    assert all_almost_equal(expr.evaluate(impl='numpy'), expected)
+
+    if NUMEXPR_AVAILABLE:
+        with pytest.raises(ValueError):
+            expr.evaluate(impl='numexpr')
+
+
+def test_expression_non_contiguous():
+    """Check evaluation with non-contiguous operands."""
+    space = odl.rn((50, 60))
+    x, y = noise_elements(space, 2)[1]
+    # Make non-contiguous tensor via slicing
+    big = odl.rn((100, 60)).one()
+    z = space.element(big.asarray()[::2])
+    assert not z.data.flags.c_contiguous
+
+    expr = (x.lazy() + z) * y
+    expected = (x.asarray() + 1) * y.asarray()
+    assert all_almost_equal(expr.evaluate(impl='numpy'), expected)
+
+    out = space.element(np.empty((100, 60))[::2])
+    expr.evaluate(out=out, impl='numpy')
+    assert all_almost_equal(out, expected)
+
+
+def test_expression_scratch_reuse(monkeypatch):
+    """Check that scratch buffers are reused between evaluations."""
+    monkeypatch.setattr(npy_expr, 'CHUNK_SIZE', 16)
+    monkeypatch.setattr(npy_expr, '_SCRATCH', npy_expr.threading.local())
+    space = odl.rn(100)
+    x, y, z = noise_elements(space, 3)[1]
+
+    expr = (x.lazy() + y) * (y.lazy() - z) + x * (z.lazy() + 1)
+    expected = (x + y) * (y - z) + x * (z + 1)
+    assert all_almost_equal(expr.evaluate(impl='numpy'), expected)
+    # One scratch buffer is enough for this expression
+    pool = npy_expr._SCRATCH.pool[space.dtype]
+    assert len(pool) == 1
+    buf = pool[0]
+
+    expr.evaluate(impl='numpy')
+    assert len(pool) == 1
+    assert pool[0] is buf
+
+
+def test_expression_invalid():
+    """Check errors for invalid expressions."""
+    space = odl.rn(3)
+    x = space.one()
+
+    with pytest.raises(TypeError):
+        x.lazy() + odl.rn(4).one()
+    with pytest.raises(TypeError):
+        x.lazy() * 1j
+    with pytest.raises(TypeError):
+        np.add.reduce(x.lazy())
+    with pytest.raises(TypeError):
+        odl.tensor_space(3, dtype=int).one().lazy()
+    with pytest.raises(ValueError):
+        x.lazy().evaluate(impl='bad')
+    with pytest.raises(TypeError):
+        x.lazy().evaluate(out=odl.rn(4).element())
+    with pytest.raises(TypeError):
+        space.lazy_lincomb(1j, x)
+    with pytest.raises(TypeError):
+        space.lazy_lincomb(1, x, 1j, x)
+    with pytest.raises(ValueError):
+        space.lazy_lincomb(1, x, 2)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
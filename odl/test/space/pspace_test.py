@@ -1035,5 +1035,65 @@ def test_imag_setter_product_space(space, newpart):
     assert all_equal(x.imag, expected_result)
 
 
+def test_contiguous_storage():
+    """Check contiguous storage of power space elements."""
+    base = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    pspace = odl.ProductSpace(base, 3)
+    assert pspace.block_space == odl.tensor_space(
+        (3, 3, 4), weighting=base.cell_volume)
+    assert odl.ProductSpace(base, odl.rn(2)).block_space is None
+
+    x = pspace.element()
+    assert x.data.shape == (3, 3, 4)
+    for i in range(3):
+        assert np.shares_memory(x[i].asarray(), x.data[i])
+    assert x.asarray() is x.data
+
+    # Arrays of correct shape and dtype are wrapped, other input is copied
+    arr = np.zeros((3, 3, 4))
+    assert pspace.element(arr).data is arr
+    y = pspace.element([base.one(), base.zero(), base.one()])
+    assert y.data is None
+    z = pspace.element([np.ones((3, 4)), base.zero(), base.one()])
+    assert z.data is not None
+    assert all_equal(z.data[0], np.ones((3, 4)))
+
+    # Slices share the storage
+    x_slc = x[1:]
+    assert x_slc.data.shape == (2, 3, 4)
+    x_slc[0] = 5
+    assert all_equal(x[1], base.element(np.full((3, 4), 5.0)))
+
+
+@pytest.mark.parametrize('weighting', [None, 2.0, [1.0, 2.0, 3.0]])
+def test_contiguous_arithmetic(exponent, weighting):
+    """Compare contiguous and part-wise arithmetic of power spaces."""
+    if exponent == 0.5:
+        pytest.skip('exponent not supported')
+    base = odl.uniform_discr([0, 0], [1, 1], (3, 4), exponent=exponent)
+    pspace = odl.ProductSpace(base, 3, exponent=exponent,
+                              weighting=weighting)
+    [x_arr, y_arr], [x, y] = noise_elements(pspace, 2)
+    assert x.data is not None
+    # Same values in non-contiguous elements
+    x_sep = pspace.element([base.element(xi.copy()) for xi in x_arr])
+    y_sep = pspace.element([base.element(yi.copy()) for yi in y_arr])
+    assert x_sep.data is None
+
+    assert all_almost_equal(2 * x - y, 2 * x_sep - y_sep)
+    assert all_almost_equal(x * y, x_sep * y_sep)
+    assert all_almost_equal(x.ufuncs.maximum(y), x_sep.ufuncs.maximum(y_sep))
+    assert all_almost_equal(x.ufuncs.absolute(), x_sep.ufuncs.absolute())
+    assert x.ufuncs.sum() == pytest.approx(x_sep.ufuncs.sum())
+    assert x.norm() == pytest.approx(x_sep.norm())
+    assert x.dist(y) == pytest.approx(x_sep.dist(y_sep))
+    if exponent == 2.0:
+        assert x.inner(y) == pytest.approx(x_sep.inner(y_sep))
+
+    # Aliased linear combination
+    expected = 3 * x_arr + 3 * x_arr
+    pspace.lincomb(3, x, 3, x, out=x)
+    assert all_almost_equal(x, expected)
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -450,6 +450,50 @@ def test_lincomb_discontig(odl_tspace_impl):
             _test_lincomb(tspace, a, b, discontig=True)
 
 
+def test_blocked_impls(monkeypatch, odl_tspace_impl):
+    """Test the blocked implementations of lincomb, inner and dist."""
+    impl = odl_tspace_impl
+    if impl != 'numpy':
+        pytest.skip('only relevant for NumPy')
+
+    # Use small thresholds to test the blocked impls with many blocks
+    monkeypatch.setattr(odl.space.npy_tensors, 'THRESHOLD_LARGE', 500)
+    monkeypatch.setattr(odl.space.npy_tensors, 'BLOCK_SIZE', 64)
+    # Make sure that threads are used
+    monkeypatch.setattr(odl.space.npy_tensors, 'cpu_count', lambda: 3)
+
+    scalar_values = [0, 1, -1, 3.41]
+    for dtype in ['float32', 'complex128', 'int64']:
+        tspace = odl.tensor_space((30, 40), dtype=dtype, impl=impl)
+        for a in scalar_values:
+            for b in scalar_values:
+                if dtype == 'int64' and (a != int(a) or b != int(b)):
+                    continue
+                _test_lincomb(tspace, a, b, discontig=False)
+                _test_lincomb(tspace, a, b, discontig=True)
+
+    # Fortran-ordered arrays
+    tspace = odl.rn((30, 40), impl=impl)
+    [xarr, yarr], [x, y] = noise_elements(tspace, 2)
+    x = tspace.element(xarr, order='F')
+    out = tspace.element(order='F')
+    tspace.lincomb(2, x, -1, y, out=out)
+    assert all_almost_equal(out, 2 * xarr - yarr)
+
+    # Inner products and distances
+    weights = _pos_array(tspace)
+    inner = tspace.inner(x, y)
+    assert inner == pytest.approx(np.sum(xarr * yarr))
+    w_arr = NumpyTensorSpaceArrayWeighting(weights)
+    assert w_arr.inner(x, y) == pytest.approx(np.sum(xarr * yarr * weights))
+    for exponent in [2.0, 1.0, float('inf'), 1.5]:
+        w_const = NumpyTensorSpaceConstWeighting(1.5, exponent=exponent)
+        factor = 1.5 if exponent == float('inf') else 1.5 ** (1 / exponent)
+        true_dist = factor * np.linalg.norm((xarr - yarr).ravel(),
+                                            ord=exponent)
+        assert w_const.dist(x, y) == pytest.approx(true_dist)
+
+
 def test_lincomb_raise(tspace):
     """Test if lincomb raises correctly for bad input."""
     other_space = odl.rn((4, 3), impl=tspace.impl)
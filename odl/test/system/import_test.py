@@ -7,6 +7,8 @@
 # obtain one at https://mozilla.org/MPL/2.0/.
 
 from __future__ import division
+import subprocess
+import sys
 import pytest
 import odl
 
@@ -28,5 +30,25 @@ def test_all_imports():
         odl.array_str
 
 
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='lazy imports require Python 3.7')
+def test_lazy_imports():
+    # Heavy subpackages and optional backends are not loaded by `import odl`
+    lazy = ['odl.' + name for name in odl._LAZY_SUBPACKAGES]
+    lazy += ['astra', 'pywt', 'skimage', 'pyfftw', 'pytest']
+    code = ('import sys, odl; '
+            'print(sorted(set({!r}).intersection(sys.modules)))'
+            ''.format(lazy))
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.decode().strip() == '[]'
+
+    # ... but loaded on first access
+    assert 'tomo' in dir(odl)
+    assert odl.tomo.RayTransform is not None
+    assert odl.solvers.L2Norm is not None
+    with pytest.raises(AttributeError):
+        odl.no_such_subpackage
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -0,0 +1,208 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for the FBP filtering."""
+
+from __future__ import division
+import itertools
+import threading
+import time
+import numpy as np
+import pytest
+
+import odl
+from odl.tomo.analytic.filtered_back_projection import (
+    _fbp_filter, _fbp_filter_response, _prefetch)
+from odl.tomo.backends import sparse_matrix
+from odl.util.testutils import all_almost_equal, noise_element, simple_fixture
+
+
+# --- pytest fixtures --- #
+
+
+filter_type = simple_fixture(
+    'filter_type', ['Ram-Lak', 'Shepp-Logan', 'Cosine', 'Hamming', 'Hann'])
+padding = simple_fixture('padding', [True, False])
+
+
+@pytest.fixture(scope='module', params=['par2d', 'cone3d'])
+def ray_trafo(request):
+    apart = odl.uniform_partition(0, 2 * np.pi, 20)
+    if request.param == 'par2d':
+        space = odl.uniform_discr([-10, -10], [10, 10], (32, 32))
+        dpart = odl.uniform_partition(-15, 15, 48)
+        geom = odl.tomo.Parallel2dGeometry(apart, dpart)
+    else:
+        space = odl.uniform_discr([-10] * 3, [10] * 3, (16, 16, 16))
+        dpart = odl.uniform_partition([-15, -15], [15, 15], (24, 20))
+        geom = odl.tomo.ConeFlatGeometry(apart, dpart, src_radius=30,
+                                         det_radius=20)
+    return odl.tomo.RayTransform(space, geom, impl='numpy')
+
+
+# --- Tests --- #
+
+
+def test_fbp_filter_vs_fourier(ray_trafo, filter_type):
+    """Compare the FBP filter to filtering with `FourierTransform`."""
+    space = ray_trafo.range
+    op = odl.tomo.fbp_filter_op(ray_trafo, padding=False,
+                                filter_type=filter_type,
+                                frequency_scaling=0.8)
+    assert isinstance(op, odl.tomo.FbpFilterOperator)
+
+    # Without padding and with even size, the filters are the same
+    fourier = odl.trafos.FourierTransform(space, axes=1, impl='numpy')
+    alen = ray_trafo.geometry.motion_params.length
+    scaling = 1 / (2 * alen)
+    if space.ndim == 3:
+        geom = ray_trafo.geometry
+        scaling *= geom.src_radius / (geom.src_radius + geom.det_radius)
+    if not space.is_weighted:
+        scaling *= space.cell_volume
+
+    def fourier_filter(x):
+        abs_freq = np.abs(x[1])
+        norm_freq = abs_freq / np.max(abs_freq)
+        filt = _fbp_filter(norm_freq, filter_type, 0.8)
+        return filt * np.max(abs_freq) * scaling
+
+    ramp = fourier.range.element(fourier_filter)
+    expected_op = fourier.inverse * ramp * fourier
+
+    x = noise_element(space)
+    assert all_almost_equal(op(x), expected_op(x))
+
+
+def test_fbp_filter_weighting(ray_trafo, padding):
+    """Check weighting, threading and adjoint of the FBP filter."""
+    space = ray_trafo.range
+    weighting = noise_element(space)
+    op = odl.tomo.fbp_filter_op(ray_trafo, padding=padding,
+                                weighting=weighting)
+    unweighted_op = odl.tomo.fbp_filter_op(ray_trafo, padding=padding)
+
+    x = noise_element(space)
+    expected = unweighted_op(weighting * x)
+    assert all_almost_equal(op(x), expected)
+
+    threaded_op = odl.tomo.FbpFilterOperator(
+        space, axis=1, padding=padding, scaling=unweighted_op.scaling,
+        weighting=weighting, num_threads=3)
+    assert all_almost_equal(threaded_op(x), expected)
+
+    y = noise_element(space)
+    assert unweighted_op.adjoint is unweighted_op
+    assert op(x).inner(y) == pytest.approx(x.inner(op.adjoint(y)))
+
+
+def test_fbp_filter_response_cache():
+    """Check that filter responses are cached and read-only."""
+    response = _fbp_filter_response(64, 'Hann', 0.9)
+    assert _fbp_filter_response(64, 'Hann', 0.9) is response
+    assert not response.flags.writeable
+    assert response.shape == (33,)
+
+    freq = np.linspace(0, 1, 33)
+    assert all_almost_equal(response, 32 * _fbp_filter(freq, 'Hann', 0.9))
+
+
+def test_fbp_reconstruction():
+    """Check that FBP approximately reconstructs a phantom."""
+    space = odl.uniform_discr([-10, -10], [10, 10], (64, 64))
+    geom = odl.tomo.parallel_beam_geometry(space)
+    ray_trafo = odl.tomo.RayTransform(space, geom, impl='numpy')
+    phantom = odl.phantom.shepp_logan(space, modified=True)
+
+    fbp = odl.tomo.fbp_op(ray_trafo)
+    reco = fbp(ray_trafo(phantom))
+    assert reco.dist(phantom) < 0.35 * phantom.norm()
+
+
+def test_fbp_stream(ray_trafo, padding):
+    """Compare streaming FBP to FBP of the full data."""
+    data = noise_element(ray_trafo.range)
+    weighting = noise_element(ray_trafo.range)
+    expected = odl.tomo.fbp_op(ray_trafo, padding=padding,
+                               weighting=weighting)(data)
+
+    chunk_bounds = [0, 3, 4, 11, 20]
+    chunks = [data.asarray()[i:j]
+              for i, j in zip(chunk_bounds[:-1], chunk_bounds[1:])]
+    for num_prefetch in [0, 2]:
+        reco = odl.tomo.fbp_stream(ray_trafo, iter(chunks), padding=padding,
+                                   weighting=weighting,
+                                   num_prefetch=num_prefetch)
+        assert all_almost_equal(reco, expected)
+
+    out = ray_trafo.domain.one()
+    assert odl.tomo.fbp_stream(ray_trafo, chunks, padding=padding,
+                               weighting=weighting, out=out) is out
+    assert all_almost_equal(out, expected)
+
+    # Too few or too many angles
+    with pytest.raises(ValueError):
+        odl.tomo.fbp_stream(ray_trafo, chunks[:-1])
+    with pytest.raises(ValueError):
+        odl.tomo.fbp_stream(ray_trafo, chunks + chunks[:1])
+
+    # Errors while loading are propagated
+    def failing_chunks():
+        yield chunks[0]
+        raise IOError
+
+    with pytest.raises(IOError):
+        odl.tomo.fbp_stream(ray_trafo, failing_chunks())
+
+
+@pytest.mark.parametrize('impl', ['numpy', 'sparse_matrix'])
+def test_fbp_stream_weighted_range(impl, monkeypatch):
+    """Check streaming FBP for a range with non-default weighting."""
+    space = odl.uniform_discr([-1, -1], [1, 1], (20, 20))
+    geometry = odl.tomo.parallel_beam_geometry(space, num_angles=12)
+    ran = odl.uniform_discr_frompartition(geometry.partition, weighting=1.0)
+    ray_trafo = odl.tomo.RayTransform(space, geometry, range=ran, impl=impl)
+    data = ray_trafo(odl.phantom.shepp_logan(space, modified=True))
+    expected = odl.tomo.fbp_op(ray_trafo)(data)
+
+    # No system matrices are built for the chunks
+    def fail(*args, **kwargs):
+        raise AssertionError('system matrix computed')
+
+    monkeypatch.setattr(sparse_matrix, 'numpy_ray_trafo_matrix', fail)
+
+    chunks = [data.asarray()[i:i + 5] for i in range(0, 12, 5)]
+    reco = odl.tomo.fbp_stream(ray_trafo, chunks)
+    assert all_almost_equal(reco, expected)
+
+
+def test_prefetch_early_stop():
+    """Check that prefetching stops if the consumer stops early."""
+    num_threads = threading.active_count()
+    fetched = []
+
+    def items():
+        for i in itertools.count():
+            fetched.append(i)
+            yield np.zeros(10)
+
+    chunks = _prefetch(items(), 2)
+    next(chunks)
+    chunks.close()
+
+    # The producer thread terminates, no further items are fetched
+    for _ in range(50):
+        if threading.active_count() == num_threads:
+            break
+        time.sleep(0.1)
+    assert threading.active_count() == num_threads
+    assert len(fetched) <= 5
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
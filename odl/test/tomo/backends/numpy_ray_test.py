@@ -0,0 +1,151 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test the NumPy ray transform back-end."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.tomo.backends import numpy_ray
+from odl.tomo.backends.numpy_ray import (
+    numpy_forward_projector, numpy_back_projector)
+from odl.util.testutils import all_almost_equal, simple_fixture
+
+
+# --- pytest fixtures --- #
+
+
+geometry_type = simple_fixture(
+    'geometry', ['par2d', 'cone2d', 'par3d', 'par3d_euler', 'cone3d',
+                 'helical'])
+interp = simple_fixture('interp', ['nearest', 'linear'])
+
+
+@pytest.fixture(scope='module')
+def space_and_geometry(geometry_type):
+    """Small reconstruction space and geometry of the given type."""
+    n_angles = 10
+    if geometry_type in ('par2d', 'cone2d'):
+        space = odl.uniform_discr([-10, -10], [10, 10], (20, 16),
+                                  dtype='float32')
+        dpart = odl.uniform_partition(-20, 20, 24)
+    else:
+        space = odl.uniform_discr([-10, -10, -5], [10, 10, 5], (12, 16, 8),
+                                  dtype='float32')
+        dpart = odl.uniform_partition([-20, -10], [20, 10], (20, 10))
+
+    if geometry_type == 'par2d':
+        apart = odl.uniform_partition(0, np.pi, n_angles)
+        geom = odl.tomo.Parallel2dGeometry(apart, dpart)
+    elif geometry_type == 'cone2d':
+        apart = odl.uniform_partition(0, 2 * np.pi, n_angles)
+        geom = odl.tomo.FanFlatGeometry(apart, dpart, src_radius=50,
+                                        det_radius=20)
+    elif geometry_type == 'par3d':
+        apart = odl.uniform_partition(0, np.pi, n_angles)
+        geom = odl.tomo.Parallel3dAxisGeometry(apart, dpart)
+    elif geometry_type == 'par3d_euler':
+        apart = odl.uniform_partition([0, 0], [np.pi, np.pi], (4, 3))
+        geom = odl.tomo.Parallel3dEulerGeometry(apart, dpart)
+    elif geometry_type == 'cone3d':
+        apart = odl.uniform_partition(0, 2 * np.pi, n_angles)
+        geom = odl.tomo.ConeFlatGeometry(apart, dpart, src_radius=50,
+                                         det_radius=20)
+    elif geometry_type == 'helical':
+        apart = odl.uniform_partition(0, 4 * np.pi, n_angles)
+        geom = odl.tomo.ConeFlatGeometry(apart, dpart, src_radius=50,
+                                         det_radius=20, pitch=4)
+    else:
+        raise ValueError('geometry not valid')
+
+    return space, geom
+
+
+# --- Tests --- #
+
+
+def test_numpy_projector_adjoint(space_and_geometry, interp):
+    """Check that forward and back-projection are matched."""
+    space, geom = space_and_geometry
+    space = odl.uniform_discr_frompartition(space.partition, interp=interp,
+                                            dtype=space.dtype)
+    proj_space = odl.uniform_discr_frompartition(geom.partition,
+                                                 dtype=space.dtype)
+
+    vol = odl.util.testutils.noise_element(space)
+    data = odl.util.testutils.noise_element(proj_space)
+
+    proj = numpy_forward_projector(vol, geom, proj_space)
+    backproj = numpy_back_projector(data, geom, space)
+    assert proj.norm() > 0
+    assert backproj.norm() > 0
+    # Random data can have small inner products, hence relative to norms
+    tol = 1e-4 * proj.norm() * data.norm()
+    assert proj.inner(data) == pytest.approx(vol.inner(backproj), abs=tol)
+
+
+def test_numpy_projector_threads(space_and_geometry):
+    """Check that the result does not depend on the number of threads."""
+    space, geom = space_and_geometry
+    ray_trafo_1 = odl.tomo.RayTransform(space, geom, impl='numpy',
+                                        num_threads=1)
+    ray_trafo_3 = odl.tomo.RayTransform(space, geom, impl='numpy',
+                                        num_threads=3)
+    vol = odl.phantom.cuboid(space)
+    data = ray_trafo_1(vol)
+
+    assert all_almost_equal(data, ray_trafo_3(vol))
+    assert all_almost_equal(ray_trafo_1.adjoint(data),
+                            ray_trafo_3.adjoint(data))
+
+
+def test_numpy_projector_line_integral():
+    """Check the values of line integrals through a constant volume."""
+    space = odl.uniform_discr([-5, -5], [5, 5], (10, 10))
+    apart = odl.nonuniform_partition([0, np.pi / 4])
+    dpart = odl.uniform_partition(-1, 1, 2)
+    geom = odl.tomo.Parallel2dGeometry(apart, dpart)
+    ray_trafo = odl.tomo.RayTransform(space, geom, impl='numpy')
+
+    data = ray_trafo(space.one())
+    assert all_almost_equal(data[0], [10, 10])
+    # Rays at distance 0.5 from the diagonal
+    assert all_almost_equal(data[1], [10 * np.sqrt(2) - 1] * 2)
+
+
+def test_numpy_back_projector_memory(space_and_geometry, monkeypatch):
+    """Check that temporaries do not grow with the volume."""
+    space, geom = space_and_geometry
+    proj_space = odl.uniform_discr_frompartition(geom.partition,
+                                                 dtype=space.dtype)
+    data = odl.util.testutils.noise_element(proj_space)
+    expected = numpy_back_projector(data, geom, space)
+
+    # Blocks of few rays, whose indices are spread out over the volume
+    monkeypatch.setattr(numpy_ray, '_MAX_SAMPLES_PER_BLOCK', 64)
+    bincount = np.bincount
+    sizes = []
+
+    def bincount_size(x, weights=None, minlength=0):
+        result = bincount(x, weights, minlength)
+        sizes.append((result.size, x.size))
+        return result
+
+    monkeypatch.setattr(np, 'bincount', bincount_size)
+    backproj = numpy_back_projector(data, geom, space, num_threads=2)
+    monkeypatch.undo()
+
+    assert sizes
+    assert all(size <= 2 * num_idx for size, num_idx in sizes)
+    assert all_almost_equal(backproj, expected)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
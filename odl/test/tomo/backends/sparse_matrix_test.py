@@ -0,0 +1,97 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test the sparse matrix ray transform back-end."""
+
+from __future__ import division
+import os
+import numpy as np
+import pytest
+
+import odl
+from odl.tomo.backends.sparse_matrix import ray_trafo_matrix_key
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+# --- pytest fixtures --- #
+
+
+@pytest.fixture
+def space_and_geometry():
+    # Function scope since the geometry caches the matrix
+    space = odl.uniform_discr([-10, -10], [10, 10], (20, 16),
+                              dtype='float32')
+    apart = odl.uniform_partition(0, 2 * np.pi, 12)
+    dpart = odl.uniform_partition(-20, 20, 24)
+    geom = odl.tomo.FanFlatGeometry(apart, dpart, src_radius=50,
+                                    det_radius=20)
+    return space, geom
+
+
+# --- Tests --- #
+
+
+def test_sparse_matrix_vs_numpy(space_and_geometry):
+    """Compare the sparse matrix back-end to the NumPy back-end."""
+    space, geom = space_and_geometry
+    ray_trafo_np = odl.tomo.RayTransform(space, geom, impl='numpy')
+    ray_trafo_sp = odl.tomo.RayTransform(space, geom, impl='sparse_matrix',
+                                         num_threads=3)
+
+    vol = noise_element(space)
+    data = noise_element(ray_trafo_np.range)
+
+    assert all_almost_equal(ray_trafo_sp(vol), ray_trafo_np(vol), ndigits=4)
+    assert all_almost_equal(ray_trafo_sp.adjoint(data),
+                            ray_trafo_np.adjoint(data), ndigits=4)
+
+    # Forward operator and adjoint share the matrix via the geometry
+    assert len(geom.implementation_cache['sparse_matrix']) == 1
+
+    # Subsets use the same number of threads for both directions
+    slices = ray_trafo_sp.subset_slices(2)
+    for op_sp, op_np, slc in zip(ray_trafo_sp.subsets(2),
+                                 ray_trafo_np.subsets(2), slices):
+        data_sub = op_sp.range.element(data.asarray()[slc])
+        assert all_almost_equal(op_sp.adjoint(data_sub),
+                                op_np.adjoint(data_sub), ndigits=4)
+
+
+def test_sparse_matrix_disk_cache(space_and_geometry, tmpdir):
+    """Check that matrices are stored on disk and reused."""
+    space, geom = space_and_geometry
+    cache_dir = str(tmpdir)
+
+    ray_trafo = odl.tomo.RayTransform(space, geom, impl='sparse_matrix',
+                                      matrix_cache_dir=cache_dir)
+    vol = odl.phantom.shepp_logan(space, modified=True)
+    data = ray_trafo(vol)
+
+    key = ray_trafo_matrix_key(space, geom)
+    assert os.listdir(cache_dir) == [key]
+
+    # New geometry object, hence no in-memory cache, but same key
+    geom_new = odl.tomo.FanFlatGeometry(
+        geom.motion_partition, geom.det_partition,
+        src_radius=geom.src_radius, det_radius=geom.det_radius)
+    assert ray_trafo_matrix_key(space, geom_new) == key
+
+    ray_trafo_new = odl.tomo.RayTransform(space, geom_new,
+                                          impl='sparse_matrix',
+                                          matrix_cache_dir=cache_dir)
+    assert all_almost_equal(ray_trafo_new(vol), data)
+    # Data is memory-mapped, not loaded
+    assert not ray_trafo_new._sparse_matrix_impl.matrix.data.flags.owndata
+
+    backproj = ray_trafo.adjoint(data)
+    assert all_almost_equal(ray_trafo_new.adjoint(data), backproj)
+    assert data.inner(data) == pytest.approx(vol.inner(backproj), rel=1e-4)
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
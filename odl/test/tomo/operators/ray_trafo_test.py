@@ -26,7 +26,8 @@ from odl.util.testutils import all_almost_equal, simple_fixture
 impl = simple_fixture(
     name='impl', params=[skip_if_no_astra('astra_cpu'),
                          skip_if_no_astra_cuda('astra_cuda'),
-                         skip_if_no_skimage('skimage')])
+                         skip_if_no_skimage('skimage'),
+                         'numpy'])
 
 geometry_params = ['par2d', 'par3d', 'cone2d', 'cone3d', 'helical']
 geometry_ids = [" geometry='{}' ".format(p) for p in geometry_params]
@@ -91,11 +92,16 @@ projectors = [skip_if_no_astra('par2d astra_cpu uniform'),
               skip_if_no_astra_cuda('cone3d astra_cuda random'),
               skip_if_no_astra_cuda('helical astra_cuda uniform'),
               skip_if_no_skimage('par2d skimage uniform'),
-              skip_if_no_skimage('par2d skimage half_uniform')]
+              skip_if_no_skimage('par2d skimage half_uniform'),
+              'par2d numpy uniform',
+              'par2d numpy nonuniform',
+              'cone2d numpy uniform',
+              'cone2d numpy random']
 
 
 projector_ids = [" geom='{}' - impl='{}' - angles='{}' "
-                 ''.format(*p.args[1].split()) for p in projectors]
+                 ''.format(*getattr(p, 'args', [None, p])[1].split())
+                 for p in projectors]
 
 
 @pytest.fixture(scope='module', params=projectors, ids=projector_ids)
@@ -220,7 +226,8 @@ def test_adjoint(projector):
     """Test Ray transform backward projection."""
     # Relative tolerance, still rather high due to imperfectly matched
     # adjoint in the cone beam case
-    if (parse_version(ASTRA_VERSION) < parse_version('1.8rc1') and
+    if (projector.impl.startswith('astra') and
+            parse_version(ASTRA_VERSION) < parse_version('1.8rc1') and
             isinstance(projector.geometry, odl.tomo.ConeFlatGeometry)):
         rtol = 0.1
     else:
@@ -448,5 +455,106 @@ def test_shifted_volume(geometry_type):
     assert np.max(proj[3, 15:]) > 5
 
 
+@pytest.mark.parametrize('impl', ['numpy', 'sparse_matrix'])
+@pytest.mark.parametrize('order', ['interlaced', 'block'])
+def test_subsets(impl, order):
+    """Check that subsets are row blocks of the full ray transform."""
+    space = odl.uniform_discr([-5, -5], [5, 5], (12, 10), dtype='float32')
+    apart = odl.uniform_partition(0, 2 * np.pi, 10)
+    dpart = odl.uniform_partition(-10, 10, 16)
+    geometry = odl.tomo.FanFlatGeometry(apart, dpart, src_radius=50,
+                                        det_radius=20)
+    ray_trafo = odl.tomo.RayTransform(space, geometry, impl=impl)
+    vol = odl.phantom.shepp_logan(space, modified=True)
+    data = ray_trafo(vol)
+
+    subsets = ray_trafo.subsets(3, order=order)
+    slices = ray_trafo.subset_slices(3, order=order)
+    assert len(subsets) == 3
+    assert sum(op.range.shape[0] for op in subsets) == 10
+
+    backproj = space.zero()
+    tmp = space.element()
+    for op, slc in zip(subsets, slices):
+        assert op.domain == space
+        assert op.range.weighting == ray_trafo.range.weighting
+        data_sub = op(vol)
+        assert all_almost_equal(data_sub, data.asarray()[slc], ndigits=4)
+        op.adjoint(data_sub, out=tmp)
+        backproj += tmp
+    assert all_almost_equal(backproj, ray_trafo.adjoint(data), ndigits=3)
+
+    if impl == 'sparse_matrix':
+        # No additional system matrices are built
+        assert len(geometry.implementation_cache['sparse_matrix']) == 1
+        for op in subsets:
+            assert op.adjoint._sparse_matrix_impl is op._sparse_matrix_impl
+            assert op.geometry.implementation_cache == {}
+
+    # Usable in ordered-subset solvers
+    x = space.one()
+    odl.solvers.osmlem(subsets, x, [op(vol) for op in subsets], niter=2)
+    assert np.all(x.asarray() >= 0)
+
+    # Subsets of subsets are row blocks of the subsets
+    for op, slc in zip(subsets, slices):
+        sub_data = data.asarray()[slc]
+        for sub_op, sub_slc in zip(op.subsets(2), op.subset_slices(2)):
+            assert all_almost_equal(sub_op(vol), sub_data[sub_slc],
+                                    ndigits=4)
+            padded = np.zeros_like(sub_data)
+            padded[sub_slc] = sub_data[sub_slc]
+            sub_op.adjoint(sub_data[sub_slc], out=tmp)
+            assert all_almost_equal(tmp, op.adjoint(padded), ndigits=3)
+
+    with pytest.raises(ValueError):
+        ray_trafo.subsets(11)
+    with pytest.raises(ValueError):
+        ray_trafo.subsets(2, order='random')
+
+    # Adjoint created before the forward operator was evaluated
+    ray_trafo = odl.tomo.RayTransform(space, geometry, impl=impl)
+    ray_trafo.adjoint(data)
+    ray_trafo(vol)
+    if impl == 'sparse_matrix':
+        assert (ray_trafo.adjoint._sparse_matrix_impl is
+                ray_trafo._sparse_matrix_impl)
+
+    # Subsets of non-constant weightings are not supported
+    ran = odl.uniform_discr_frompartition(
+        geometry.partition, dtype='float32',
+        weighting=np.ones(geometry.partition.shape, dtype='float32'))
+    ray_trafo = odl.tomo.RayTransform(space, geometry, range=ran, impl=impl)
+    with pytest.raises(NotImplementedError):
+        ray_trafo.subsets(2)
+
+
+def test_opnorm_cache_key():
+    """Check the key for operator norm caching of ray transforms."""
+    space = odl.uniform_discr([-5, -5], [5, 5], (12, 10))
+    geometry = odl.tomo.parallel_beam_geometry(space, num_angles=8)
+    ray_trafo = odl.tomo.RayTransform(space, geometry, impl='numpy')
+    key = ray_trafo.opnorm_cache_key
+    assert key is not None
+    assert odl.tomo.RayTransform(
+        space, geometry, impl='sparse_matrix').opnorm_cache_key == key
+    assert ray_trafo.adjoint.opnorm_cache_key not in (None, key)
+
+    # Changes with the weighting and the geometry
+    ran = odl.uniform_discr_frompartition(geometry.partition, weighting=1.0)
+    assert odl.tomo.RayTransform(
+        space, geometry, range=ran, impl='numpy').opnorm_cache_key != key
+    geometry2 = odl.tomo.parallel_beam_geometry(space, num_angles=9)
+    assert odl.tomo.RayTransform(
+        space, geometry2, impl='numpy').opnorm_cache_key != key
+
+    # No key for non-constant weightings
+    ran = odl.uniform_discr_frompartition(
+        geometry.partition, weighting=np.ones(geometry.partition.shape))
+    ray_trafo = odl.tomo.RayTransform(space, geometry, range=ran,
+                                      impl='numpy')
+    assert ray_trafo.opnorm_cache_key is None
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -12,6 +12,7 @@ import pytest
 
 import odl
 from odl.trafos.backends import pyfftw_call, PYFFTW_AVAILABLE
+from odl.trafos.backends import pyfftw_bindings
 from odl.util import (
     is_real_dtype, complex_dtype)
 from odl.util.testutils import (
@@ -385,5 +386,67 @@ def test_pyfftw_call_backward_with_plan():
         assert all_almost_equal(idft_arr, true_idft)
 
 
+def test_pyfftw_call_plan_cache(monkeypatch):
+    import pyfftw
+
+    monkeypatch.setattr(pyfftw_bindings, 'PLAN_CACHE_SIZE', 2)
+    pyfftw_bindings.clear_fftw_plan_cache()
+
+    def aligned_arrays(shape):
+        arr = pyfftw.empty_aligned(shape, dtype='complex128')
+        arr[:] = _random_array(shape, dtype='complex128')
+        return arr, pyfftw.empty_aligned(shape, dtype='complex128')
+
+    arr, out = aligned_arrays((4, 5))
+    plan = pyfftw_call(arr, out, planning_effort='measure')
+    assert all_almost_equal(out, np.fft.fftn(arr))
+
+    # Same parameters, new arrays: plan is reused
+    arr, out = aligned_arrays((4, 5))
+    assert pyfftw_call(arr, out, planning_effort='measure') is plan
+    assert all_almost_equal(out, np.fft.fftn(arr))
+
+    # Different parameters or disabled cache: new plan
+    assert pyfftw_call(arr, out, planning_effort='estimate') is not plan
+    assert pyfftw_call(arr, out, planning_effort='measure',
+                       axes=(1,)) is not plan
+    assert pyfftw_call(arr, out, planning_effort='measure',
+                       plan_cache=False) is not plan
+
+    # Only 2 plans are kept, the least recently used one is gone
+    assert len(pyfftw_bindings._PLAN_CACHE) == 2
+    assert pyfftw_call(arr, out, planning_effort='measure') is not plan
+
+    pyfftw_bindings.clear_fftw_plan_cache()
+    assert len(pyfftw_bindings._PLAN_CACHE) == 0
+
+    # Size limit: plans referencing too much memory are discarded or not
+    # cached in the first place
+    monkeypatch.setattr(pyfftw_bindings, 'PLAN_CACHE_SIZE', 32)
+    nbytes = 2 * arr.nbytes
+    monkeypatch.setattr(pyfftw_bindings, 'PLAN_CACHE_MAX_BYTES',
+                        2 * nbytes)
+    pyfftw_call(arr, out, axes=(0,))
+    pyfftw_call(arr, out, axes=(1,))
+    pyfftw_call(arr, out)
+    assert len(pyfftw_bindings._PLAN_CACHE) == 2
+    big_arr, big_out = aligned_arrays((20, 20))
+    plan = pyfftw_call(big_arr, big_out)
+    assert all_almost_equal(big_out, np.fft.fftn(big_arr))
+    assert len(pyfftw_bindings._PLAN_CACHE) == 2
+    assert pyfftw_call(big_arr, big_out) is not plan
+    pyfftw_bindings.clear_fftw_plan_cache()
+
+
+def test_fftw_wisdom_file(tmpdir):
+    filename = str(tmpdir.join('wisdom'))
+    assert not pyfftw_bindings.import_fftw_wisdom(filename)
+
+    arr = _random_array((6, 7), dtype='complex128')
+    pyfftw_call(arr, np.empty_like(arr), planning_effort='measure')
+    pyfftw_bindings.export_fftw_wisdom(filename)
+    assert pyfftw_bindings.import_fftw_wisdom(filename)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
@@ -17,8 +17,8 @@ from odl.trafos.util.ft_utils import (
 from odl.trafos.fourier import (
     DiscreteFourierTransform, DiscreteFourierTransformInverse,
     FourierTransform)
-from odl.util import (all_almost_equal, never_skip, skip_if_no_pyfftw,
-                      noise_element,
+from odl.trafos import PYFFTW_AVAILABLE
+from odl.util import (all_almost_equal, noise_element,
                       is_real_dtype, conj_exponent, complex_dtype)
 from odl.util.testutils import simple_fixture
 
@@ -26,8 +26,11 @@ from odl.util.testutils import simple_fixture
 # --- pytest fixtures --- #
 
 
-impl = simple_fixture('impl', [never_skip('numpy'),
-                               skip_if_no_pyfftw('pyfftw')])
+# Only available back-ends are tested
+impl_params = ['numpy']
+if PYFFTW_AVAILABLE:
+    impl_params.append('pyfftw')
+impl = simple_fixture('impl', impl_params)
 exponent = simple_fixture('exponent', [2.0, 1.0, float('inf'), 1.5])
 sign = simple_fixture('sign', ['-', '+'])
 
@@ -252,6 +255,24 @@ def test_dft_call(impl):
     assert (rand_arr_idft - rand_arr).norm() < 1e-6
 
 
+def test_dft_batch(impl):
+    """Check batched evaluation of the DFT and its inverse."""
+    shape = (4, 5)
+    dft_dom = odl.discr_sequence_space(shape, dtype='float64')
+    dft = DiscreteFourierTransform(domain=dft_dom, impl=impl,
+                                   halfcomplex=True, axes=1)
+    idft = dft.inverse
+
+    x_stack = np.random.rand(2, 3, 4, 5)
+    x_stack_dft = dft.batch(x_stack)
+    assert x_stack_dft.shape == (2, 3) + dft.range.shape
+    for x, x_dft in zip(x_stack.reshape((-1,) + shape),
+                        x_stack_dft.reshape((-1,) + dft.range.shape)):
+        assert all_almost_equal(x_dft, dft(x))
+
+    assert all_almost_equal(idft.batch(x_stack_dft), x_stack)
+
+
 def test_dft_sign(impl):
     # Test if the FT sign behaves as expected, i.e. that the FT with sign
     # '+' and '-' have same real parts and opposite imaginary parts.
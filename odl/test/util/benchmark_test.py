@@ -0,0 +1,105 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for the recording and comparison of benchmark results."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.util.benchmark import (
+    BenchmarkRecorder, compare_benchmark_results, load_benchmark_results,
+    main, time_function)
+
+
+def test_time_function():
+    """Check the timing statistics and the calibration of ``number``."""
+    calls = []
+    timing = time_function(lambda: calls.append(1), repeat=3, number=4)
+    assert timing['repeat'] == 3
+    assert timing['number'] == 4
+    assert len(calls) == 1 + 3 * 4  # including the warm-up call
+    assert 0 <= timing['min'] <= timing['median'] <= timing['mean'] * 3
+
+    timing = time_function(lambda: None, repeat=1, min_time=1e-3)
+    assert timing['number'] > 1
+
+    with pytest.raises(ValueError):
+        time_function(lambda: None, repeat=0)
+    with pytest.raises(ValueError):
+        time_function(lambda: None, number=0)
+
+
+def test_benchmark_fixture(odl_benchmark, monkeypatch):
+    """Check that the fixture returns a result without an extra call."""
+    def fake_time_function(func):
+        func()
+        func()
+        return {'min': 0.0}
+
+    monkeypatch.setattr(odl.util.benchmark, 'time_function',
+                        fake_time_function)
+    calls = []
+
+    def func(x, y=0):
+        calls.append(1)
+        return len(calls) + x + y
+
+    assert odl_benchmark(func, 1, y=2) == 5
+    assert len(calls) == 2
+
+
+def test_save_load_compare(tmpdir, capsys):
+    """Check the JSON round trip and the compare command."""
+    recorder = BenchmarkRecorder()
+    recorder.run('sum', lambda: sum(range(10)), repeat=1, number=1,
+                 params={'size': np.int64(10), 'space': odl.rn(3)})
+    baseline_file = str(tmpdir.join('baseline.json'))
+    recorder.save(baseline_file)
+
+    baseline = load_benchmark_results(baseline_file)
+    assert baseline['machine']['versions']['odl'] == odl.__version__
+    assert baseline['machine']['cpu_count'] >= 1
+    assert baseline['results']['sum']['params'] == {'size': 10,
+                                                    'space': 'rn(3)'}
+
+    # Identical results are fine, a 2 times slower one is a regression
+    assert compare_benchmark_results(baseline, baseline)[0][-1] == 'ok'
+    recorder.add('sum', {key: 2 * baseline['results']['sum'][key]
+                         for key in ('min', 'median', 'mean')})
+    recorder.add('new', {'min': 1.0, 'median': 1.0, 'mean': 1.0})
+    current_file = str(tmpdir.join('current.json'))
+    recorder.save(current_file)
+    current = load_benchmark_results(current_file)
+    assert [row[-1] for row in compare_benchmark_results(
+        baseline, current)] == ['new', 'regression']
+    assert compare_benchmark_results(
+        baseline, current, threshold=1.5)[1][-1] == 'ok'
+    assert compare_benchmark_results(current, baseline)[0][-1] == 'missing'
+    with pytest.raises(ValueError):
+        compare_benchmark_results(baseline, current, threshold=-1)
+    with pytest.raises(ValueError):
+        compare_benchmark_results(baseline, current, stat='max')
+
+    # Command line interface
+    assert main(['compare', baseline_file, baseline_file]) == 0
+    assert main(['compare', baseline_file, current_file]) == 1
+    assert main(['compare', current_file, baseline_file]) == 0
+    assert main(['compare', current_file, baseline_file, '--strict']) == 1
+    output = capsys.readouterr()[0]
+    assert 'regression' in output and 'missing' in output
+
+    no_results = tmpdir.join('no_results.json')
+    no_results.write('{}')
+    with pytest.raises(ValueError):
+        load_benchmark_results(str(no_results))
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
@@ -13,8 +13,11 @@ import pytest
 import odl
 from odl.util import (
     apply_on_boundary, fast_1d_tensor_mult, resize_array, is_real_dtype)
-from odl.util.numerics import _SUPPORTED_RESIZE_PAD_MODES
-from odl.util.testutils import all_equal, dtype_tol, simple_fixture
+from odl.util.numerics import (
+    _SUPPORTED_RESIZE_PAD_MODES, batched_eigh, batched_svdvals,
+    batched_svd_map)
+from odl.util.testutils import (
+    all_almost_equal, all_equal, dtype_tol, simple_fixture)
 
 
 # --- pytest fixtures --- #
@@ -482,5 +485,106 @@ def test_resize_array_raise():
         resize_array(small_arr, (3, 4), offset=(0, 1), pad_mode='periodic')
 
 
+# --- batched small matrix functions --- #
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 4])
+def test_batched_eigh(n):
+    """Compare `batched_eigh` to `numpy.linalg.eigh`."""
+    mats = np.random.randn(50, 2, n, n)
+    mats += mats.swapaxes(-1, -2)
+    # Degenerate cases: multiples of identity and repeated eigenvalues
+    mats[0, 0] = 0
+    mats[1, 0] = 2 * np.eye(n)
+    q = np.linalg.qr(np.random.randn(n, n))[0]
+    mats[2, 0] = q.dot(np.diag([1.0] * (n - 1) + [3.0])).dot(q.T)
+    mats[3, 0] = q.dot(np.diag([1.0] + [3.0] * (n - 1))).dot(q.T)
+
+    eigvals, eigvecs = batched_eigh(mats, chunk_size=7)
+    assert eigvals.shape == (50, 2, n)
+    assert eigvecs.shape == (50, 2, n, n)
+    assert all_almost_equal(eigvals, np.linalg.eigvalsh(mats))
+    recon = np.einsum('...ik,...k,...jk->...ij', eigvecs, eigvals, eigvecs)
+    assert all_almost_equal(recon, mats)
+    gram = np.einsum('...ki,...kj->...ij', eigvecs, eigvecs)
+    assert all_almost_equal(gram, np.broadcast_to(np.eye(n), gram.shape))
+
+    with pytest.raises(ValueError):
+        batched_eigh(np.zeros((3, 2)))
+
+
+@pytest.mark.parametrize('shape', [(2, 2), (3, 2), (2, 3), (3, 3), (1, 3),
+                                   (2, 5), (4, 4)])
+def test_batched_svd(shape):
+    """Compare `batched_svdvals` and `batched_svd_map` to NumPy."""
+    mats = np.random.randn(*((100,) + shape))
+    mats[0] = 0
+    mats[1, 0] = mats[1, -1]  # rank deficient
+
+    u, s, vt = np.linalg.svd(mats, full_matrices=False)
+    assert all_almost_equal(batched_svdvals(mats, chunk_size=16), s)
+
+    def shrink(svdvals):
+        return np.maximum(svdvals - 0.5, 0)
+
+    expected = np.einsum('...ik,...k,...kj->...ij', u, shrink(s), vt)
+    assert all_almost_equal(batched_svd_map(mats, shrink, chunk_size=16),
+                            expected)
+    out = np.empty_like(mats)
+    assert batched_svd_map(mats, shrink, out=out) is out
+    assert all_almost_equal(out, expected)
+    # Aliased input and output
+    batched_svd_map(mats, shrink, out=mats)
+    assert all_almost_equal(mats, expected)
+
+
+@pytest.mark.parametrize('n', [2, 3])
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_batched_svd_accuracy(n, dtype):
+    """Check the accuracy for single precision and rank-deficient input."""
+    mats = np.random.randn(2000, n, n)
+    # Half of the matrices have rank 1, some others are close to it
+    mats[:1000] = np.einsum('ki,kj->kij', np.random.randn(1000, n),
+                            np.random.randn(1000, n))
+    mats[1000:1100, -1] = mats[1000:1100, 0] * (1 + 1e-5)
+    mats = mats.astype(dtype)
+
+    u, s, vt = np.linalg.svd(mats.astype('float64'), full_matrices=False)
+    svdvals = batched_svdvals(mats)
+    assert svdvals.dtype == dtype
+    # Errors relative to the largest singular value, comparable to NumPy
+    # in single precision
+    tol = {'float32': 1e-6, 'float64': 1e-11}[dtype]
+    assert np.max(np.abs(svdvals - s) / s[:, :1]) < tol
+
+    result = batched_svd_map(mats, lambda svdvals: 0.5 * svdvals)
+    assert result.dtype == dtype
+    max_abs = np.max(np.abs(mats), axis=(1, 2))
+    assert np.max(np.abs(result - 0.5 * mats.astype('float64')).max(
+        axis=(1, 2)) / max_abs) < tol
+
+    def shrink(svdvals):
+        return np.maximum(svdvals - 0.1, 0)
+
+    expected = np.einsum('...ik,...k,...kj->...ij', u, shrink(s), vt)
+    result = batched_svd_map(mats, shrink)
+    assert np.max(np.abs(result - expected).max(axis=(1, 2)) /
+                  max_abs) < 10 * tol
+
+
+def test_batched_svd_clustered():
+    """Check the accuracy for (nearly) repeated singular values."""
+    s = np.array([[2, 1, 1], [5, 5, 0.01], [3, 1, 1], [2, 1 + 1e-6, 1]])
+    u, _, _ = np.linalg.svd(np.random.randn(len(s), 3, 3))
+    _, _, vt = np.linalg.svd(np.random.randn(len(s), 3, 3))
+    mats = np.einsum('...ik,...k,...kj->...ij', u, s, vt)
+
+    assert all_almost_equal(batched_svdvals(mats), s, ndigits=12)
+
+    result = batched_svd_map(mats, lambda svdvals: svdvals ** 2)
+    expected = np.einsum('...ik,...k,...kj->...ij', u, s ** 2, vt)
+    assert all_almost_equal(result, expected, ndigits=11)
+
+
 if __name__ == '__main__':
     odl.util.test_file(__file__)
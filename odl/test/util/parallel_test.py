@@ -0,0 +1,68 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for the shared thread pool."""
+
+from __future__ import division
+import threading
+import pytest
+
+import odl
+from odl.util import parallel
+from odl.util.parallel import parallel_map
+
+
+def test_parallel_map_order():
+    """Check that the results are returned in the order of the items."""
+    items = list(range(50))
+    for num_threads in [None, 1, 3, 100]:
+        result = parallel_map(lambda i: i ** 2, items, num_threads)
+        assert result == [i ** 2 for i in items]
+
+    assert parallel_map(abs, [], num_threads=3) == []
+
+
+def test_parallel_map_shared_pool():
+    """Check that the pool is created once and reused."""
+    parallel_map(abs, range(10), num_threads=2)
+    pool = parallel._POOL
+    assert pool is not None
+
+    thread_ids = parallel_map(lambda _: threading.current_thread().ident,
+                              range(10), num_threads=2)
+    assert parallel._POOL is pool
+    assert threading.current_thread().ident not in thread_ids
+
+
+def test_parallel_map_nested():
+    """Check that nested calls run serially instead of deadlocking."""
+    num_threads = parallel._POOL_SIZE or 2
+
+    def inner(i):
+        return parallel_map(lambda j: i + j, range(3), num_threads)
+
+    result = parallel_map(inner, range(2 * num_threads), num_threads)
+    assert result == [[i, i + 1, i + 2] for i in range(2 * num_threads)]
+
+
+def test_parallel_map_exception():
+    """Check that exceptions in the workers are raised to the caller."""
+    def func(i):
+        if i == 5:
+            raise ValueError('bad item')
+        return i
+
+    with pytest.raises(ValueError):
+        parallel_map(func, range(10), num_threads=3)
+
+    # The pool is still usable afterwards
+    assert parallel_map(abs, [-1, -2], num_threads=2) == [1, 2]
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
@@ -0,0 +1,98 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for the operator profiler."""
+
+from __future__ import division
+import pytest
+
+import odl
+from odl.util.profiling import profile
+
+
+def test_profile_call_tree():
+    """Check the recorded tree of a composed operator and functional."""
+    space = odl.uniform_discr(0, 1, 10)
+    grad = odl.Gradient(space)
+    scaling = odl.ScalingOperator(space, 2.0)
+    op = grad * (scaling + odl.IdentityOperator(space))
+    func = odl.solvers.L2NormSquared(grad.range) * op
+    x = space.one()
+    orig_call = odl.Operator.__call__
+
+    with profile() as prof:
+        y = op(x)
+        op(x, out=y)
+        func(x)
+
+    assert odl.Operator.__call__ is orig_call
+    assert list(prof.root.children) == ['OperatorComp',
+                                        'FunctionalComp']
+
+    comp = prof.root.children['OperatorComp']
+    assert comp.calls == 2
+    assert comp.calls_in_place == 1
+    assert comp.calls_out_of_place == 1
+    assert comp.nbytes == y.nbytes
+    assert comp.time >= comp.self_time >= 0
+    assert set(comp.children) == {'Gradient', 'OperatorSum'}
+    assert comp.children['Gradient'].calls == 2
+    op_sum = comp.children['OperatorSum']
+    assert set(op_sum.children) == {'ScalingOperator', 'IdentityOperator'}
+    assert op_sum.children['ScalingOperator'].path == (
+        'OperatorComp', 'OperatorSum', 'ScalingOperator')
+
+    # Functional calls return scalars, which do not count as allocations
+    func_node = prof.root.children['FunctionalComp']
+    assert func_node.calls == 1
+    assert func_node.children['OperatorComp'].calls == 1
+
+    # All nodes appear in the report and the flame graph
+    report = prof.report()
+    flame_graph = prof.flame_graph(metric='calls').splitlines()
+    assert len(flame_graph) == len(prof.nodes)
+    for node in prof.nodes:
+        assert node.name in report
+        assert any(line.startswith(';'.join(node.path) + ' ')
+                   for line in flame_graph)
+    assert 'OperatorComp;OperatorSum;ScalingOperator 2' in flame_graph
+
+    with pytest.raises(ValueError):
+        prof.flame_graph(metric='memory')
+
+
+def test_profile_options(tmpdir):
+    """Check custom labels, file export and error handling."""
+    space = odl.rn(3)
+    op = odl.ScalingOperator(space, 2.0)
+
+    with profile(label=lambda op: repr(op)) as prof:
+        op(op([1, 2, 3]))
+    assert list(prof.root.children) == [repr(op)]
+    assert prof.root.children[repr(op)].calls == 2
+
+    filename = str(tmpdir.join('profile.txt'))
+    prof.save_flame_graph(filename, metric='bytes')
+    with open(filename) as f:
+        assert f.read() == '{} 48\n'.format(repr(op))
+
+    # Only one profiler at a time, and the call is restored on errors
+    orig_call = odl.Operator.__call__
+    with profile():
+        with pytest.raises(RuntimeError):
+            with profile():
+                pass
+    with pytest.raises(odl.OpDomainError):
+        with profile() as prof:
+            op([1, 2])
+    assert odl.Operator.__call__ is orig_call
+    assert prof.root.children['ScalingOperator'].calls == 1
+
+
+if __name__ == '__main__':
+    odl.util.test_file(__file__)
@@ -7,14 +7,19 @@
 # obtain one at https://mozilla.org/MPL/2.0/.
 
 from __future__ import print_function, division, absolute_import
+from multiprocessing import cpu_count
+from queue import Empty, Full, Queue
+import threading
 import numpy as np
 
 from odl.discr import ResizingOperator
+from odl.operator import Operator, MultiplyOperator
 from odl.trafos import FourierTransform, PYFFTW_AVAILABLE
+from odl.util import cache_arguments, parallel_map, writable_array
 
 
-__all__ = ('fbp_op', 'fbp_filter_op', 'tam_danielson_window',
-           'parker_weighting')
+__all__ = ('fbp_op', 'fbp_filter_op', 'fbp_stream', 'FbpFilterOperator',
+           'tam_danielson_window', 'parker_weighting')
 
 
 def _axis_in_detector(geometry):
@@ -99,6 +104,187 @@ def _fbp_filter(norm_freq, filter_type, frequency_scaling):
     return filt
 
 
+@cache_arguments
+def _fbp_filter_response(num_padded, filter_type, frequency_scaling):
+    """Return the FBP filter at the frequencies of a real FFT.
+
+    The filter is given in units of the frequency step, i.e., it has to be
+    multiplied with ``2 * pi / (num_padded * cell_side)``. Results are
+    cached, hence the returned array is read-only.
+
+    Parameters
+    ----------
+    num_padded : int
+        Number of points along the (padded) detector axis.
+    filter_type, frequency_scaling :
+        Filter parameters, see `_fbp_filter`.
+
+    Returns
+    -------
+    response : `numpy.ndarray`
+        Filter of shape ``(num_padded // 2 + 1,)``.
+
+    Examples
+    --------
+    >>> _fbp_filter_response(8, 'Ram-Lak', 1.0)
+    array([ 0.,  1.,  2.,  3.,  4.])
+    """
+    freq = np.arange(num_padded // 2 + 1, dtype=float)
+    max_freq = freq[-1]
+    response = _fbp_filter(freq / max_freq, filter_type, frequency_scaling)
+    response *= max_freq
+    response.flags.writeable = False
+    return response
+
+
+def _fast_fft_size(n):
+    """Return the smallest integer ``>= n`` with prime factors 2, 3 and 5.
+
+    Examples
+    --------
+    >>> _fast_fft_size(7)
+    8
+    >>> _fast_fft_size(199)
+    200
+    """
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+class FbpFilterOperator(Operator):
+
+    """Filtering of projection data along a single detector axis.
+
+    The data is zero-padded and filtered with real-input FFTs along
+    ``axis``, processing blocks of projection angles in parallel. An
+    optional weighting, e.g., `parker_weighting` or
+    `tam_danielson_window`, is applied to the data in the same pass.
+
+    This operator is usually created with `fbp_filter_op`.
+    """
+
+    def __init__(self, space, axis, filter_type='Ram-Lak',
+                 frequency_scaling=1.0, padding=True, scaling=1.0,
+                 weighting=None, num_threads=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        space : `DiscreteLp`
+            Space of the projection data, with the angles along axis 0.
+        axis : positive int
+            Detector axis along which the data is filtered.
+        filter_type, frequency_scaling :
+            Filter parameters, see `fbp_filter_op`.
+        padding : bool, optional
+            If ``True``, zero-pad the data to at least twice its size along
+            ``axis`` to avoid artifacts from the circular convolution.
+        scaling : float, optional
+            Constant factor applied to the filter.
+        weighting : `array-like`, optional
+            Weights multiplied with the data before filtering. Must be
+            broadcastable to ``space.shape``.
+        num_threads : positive int, optional
+            Number of threads used for the filtering.
+            Default: number of CPUs
+        """
+        super(FbpFilterOperator, self).__init__(space, space, linear=True)
+        self.axis = int(axis)
+        if not 0 < self.axis < space.ndim:
+            raise ValueError('`axis` must be a detector axis, got {}'
+                             ''.format(axis))
+
+        self.filter_type = filter_type
+        self.frequency_scaling = float(frequency_scaling)
+        self.padding = bool(padding)
+        self.scaling = float(scaling)
+        self.num_threads = cpu_count() if num_threads is None else num_threads
+
+        num_det = space.shape[self.axis]
+        if self.padding:
+            self.num_padded = _fast_fft_size(2 * num_det - 1)
+        else:
+            self.num_padded = num_det
+
+        response = _fbp_filter_response(self.num_padded, filter_type,
+                                        self.frequency_scaling)
+        freq_step = 2 * np.pi / (self.num_padded * space.cell_sides[self.axis])
+        resp_shape = [1] * space.ndim
+        resp_shape[self.axis] = -1
+        self.__response = (response * (freq_step * self.scaling)).reshape(
+            resp_shape)
+
+        if weighting is None:
+            self.__weighting = None
+        else:
+            self.__weighting = np.broadcast_to(
+                np.asarray(weighting, dtype=space.dtype), space.shape)
+
+    @property
+    def weighting(self):
+        """Weights applied to the data before filtering, or ``None``."""
+        return self.__weighting
+
+    def _filter_block(self, x_arr, out_arr, start, stop, offset):
+        """Filter rows ``start:stop`` of ``x_arr`` into ``out_arr``."""
+        data = x_arr[start:stop]
+        if self.weighting is not None:
+            data = data * self.weighting[offset + start:offset + stop]
+
+        spectrum = np.fft.rfft(data, n=self.num_padded, axis=self.axis)
+        spectrum *= self.__response
+        filtered = np.fft.irfft(spectrum, n=self.num_padded, axis=self.axis)
+
+        crop = [slice(None)] * filtered.ndim
+        crop[self.axis] = slice(0, out_arr.shape[self.axis])
+        out_arr[start:stop] = filtered[tuple(crop)]
+
+    def _filter_angles(self, x_arr, out_arr, offset=0):
+        """Filter data of consecutive angles, starting at ``offset``.
+
+        Blocks of angles are filtered in parallel.
+        """
+        num_angles = x_arr.shape[0]
+        row_size = (int(np.prod(x_arr.shape[1:])) //
+                    x_arr.shape[self.axis] * self.num_padded)
+        step = max(1, 2 ** 16 // row_size)
+        blocks = [(start, min(start + step, num_angles))
+                  for start in range(0, num_angles, step)]
+
+        def apply(block):
+            start, stop = block
+            self._filter_block(x_arr, out_arr, start, stop, offset)
+
+        parallel_map(apply, blocks, self.num_threads)
+
+    def _call(self, x, out):
+        """Filter ``x`` and write the result to ``out``."""
+        with writable_array(out) as out_arr:
+            self._filter_angles(x.asarray(), out_arr)
+
+    @property
+    def adjoint(self):
+        """Adjoint of this operator.
+
+        The filter is self-adjoint, hence the adjoint applies the weighting
+        after filtering.
+        """
+        if self.weighting is None:
+            return self
+
+        unweighted = FbpFilterOperator(
+            self.domain, self.axis, self.filter_type, self.frequency_scaling,
+            self.padding, self.scaling, num_threads=self.num_threads)
+        weighting = MultiplyOperator(self.domain.element(self.weighting))
+        return weighting * unweighted
+
+
 def tam_danielson_window(ray_trafo, smoothing_width=0.05, n_half_rot=1):
     """Create Tam-Danielson window from a `RayTransform`.
 
@@ -304,7 +490,7 @@ def parker_weighting(ray_trafo, q=0.25):
 
 
 def fbp_filter_op(ray_trafo, padding=True, filter_type='Ram-Lak',
-                  frequency_scaling=1.0):
+                  frequency_scaling=1.0, weighting=None):
     """Create a filter operator for FBP from a `RayTransform`.
 
     Parameters
@@ -345,6 +531,11 @@ def fbp_filter_op(ray_trafo, padding=True, filter_type='Ram-Lak',
         The normalized frequencies are rescaled so that they fit into the range
         [0, frequency_scaling]. Any frequency above ``frequency_scaling`` is
         set to zero.
+    weighting : `array-like`, optional
+        Weights multiplied with the data before filtering, for instance
+        `parker_weighting` or `tam_danielson_window`. If the detector
+        direction of the filter is aligned with a detector axis, the
+        weights are applied in the same pass as the filtering.
 
     Returns
     -------
@@ -354,44 +545,35 @@ def fbp_filter_op(ray_trafo, padding=True, filter_type='Ram-Lak',
     See Also
     --------
     tam_danielson_window : Windowing for helical data
+    FbpFilterOperator : Filtering along a single detector axis
+
+    Notes
+    -----
+    If the filter direction is aligned with a detector axis, which is the
+    case for all geometries except 3d ones with tilted rotation axis, the
+    data is filtered with real-input FFTs along that axis by
+    `FbpFilterOperator`. The filter responses are cached, such that
+    creating several operators for the same setup is cheap.
     """
-    impl = 'pyfftw' if PYFFTW_AVAILABLE else 'numpy'
     alen = ray_trafo.geometry.motion_params.length
 
+    weight = 1
+    if not ray_trafo.range.is_weighted:
+        # Compensate for potentially unweighted range of the ray transform
+        weight *= ray_trafo.range.cell_volume
+
+    if not ray_trafo.domain.is_weighted:
+        # Compensate for potentially unweighted domain of the ray transform
+        weight /= ray_trafo.domain.cell_volume
+
     if ray_trafo.domain.ndim == 2:
-        # Define ramp filter
-        def fourier_filter(x):
-            abs_freq = np.abs(x[1])
-            norm_freq = abs_freq / np.max(abs_freq)
-            filt = _fbp_filter(norm_freq, filter_type, frequency_scaling)
-            scaling = 1 / (2 * alen)
-            return filt * np.max(abs_freq) * scaling
-
-        # Define (padded) fourier transform
-        if padding:
-            # Define padding operator
-            ran_shp = (ray_trafo.range.shape[0],
-                       ray_trafo.range.shape[1] * 2 - 1)
-            resizing = ResizingOperator(ray_trafo.range, ran_shp=ran_shp)
-
-            fourier = FourierTransform(resizing.range, axes=1, impl=impl)
-            fourier = fourier * resizing
-        else:
-            fourier = FourierTransform(ray_trafo.range, axes=1, impl=impl)
+        axis = 1
+        scale = 1.0
 
     elif ray_trafo.domain.ndim == 3:
         # Find the direction that the filter should be taken in
         rot_dir = _rotation_direction_in_detector(ray_trafo.geometry)
 
-        # Find what axes should be used in the fourier transform
-        used_axes = (rot_dir != 0)
-        if used_axes[0] and not used_axes[1]:
-            axes = [1]
-        elif not used_axes[0] and used_axes[1]:
-            axes = [2]
-        else:
-            axes = [1, 2]
-
         # Add scaling for cone-beam case
         if hasattr(ray_trafo.geometry, 'src_radius'):
             scale = (ray_trafo.geometry.src_radius /
@@ -408,66 +590,67 @@ def fbp_filter_op(ray_trafo, padding=True, filter_type='Ram-Lak',
         else:
             scale = 1.0
 
-        # Define ramp filter
-        def fourier_filter(x):
-            # If axis is aligned to a coordinate axis, save some memory and
-            # time by using broadcasting
-            if not used_axes[0]:
-                abs_freq = np.abs(rot_dir[1] * x[2])
-            elif not used_axes[1]:
-                abs_freq = np.abs(rot_dir[0] * x[1])
-            else:
-                abs_freq = np.abs(rot_dir[0] * x[1] + rot_dir[1] * x[2])
-            norm_freq = abs_freq / np.max(abs_freq)
-            filt = _fbp_filter(norm_freq, filter_type, frequency_scaling)
-            scaling = scale * np.max(abs_freq) / (2 * alen)
-            return filt * scaling
-
-        # Define (padded) fourier transform
-        if padding:
-            # Define padding operator
-            if used_axes[0]:
-                padded_shape_u = ray_trafo.range.shape[1] * 2 - 1
-            else:
-                padded_shape_u = ray_trafo.range.shape[1]
-
-            if used_axes[1]:
-                padded_shape_v = ray_trafo.range.shape[2] * 2 - 1
-            else:
-                padded_shape_v = ray_trafo.range.shape[2]
-
-            ran_shp = (ray_trafo.range.shape[0],
-                       padded_shape_u,
-                       padded_shape_v)
-            resizing = ResizingOperator(ray_trafo.range, ran_shp=ran_shp)
-
-            fourier = FourierTransform(resizing.range, axes=axes, impl=impl)
-            fourier = fourier * resizing
+        # Find what axes should be used in the fourier transform
+        used_axes = (rot_dir != 0)
+        if used_axes[0] and not used_axes[1]:
+            axis = 1
+        elif not used_axes[0] and used_axes[1]:
+            axis = 2
         else:
-            fourier = FourierTransform(ray_trafo.range, axes=axes, impl=impl)
+            filter_op = _fbp_filter_op_fourier(
+                ray_trafo, padding, filter_type, frequency_scaling, rot_dir,
+                scale * weight / (2 * alen))
+            if weighting is not None:
+                filter_op = filter_op * MultiplyOperator(
+                    ray_trafo.range.element(weighting))
+            return filter_op
     else:
         raise NotImplementedError('FBP only implemented in 2d and 3d')
 
-    # Create ramp in the detector direction
-    ramp_function = fourier.range.element(fourier_filter)
+    return FbpFilterOperator(ray_trafo.range, axis, filter_type,
+                             frequency_scaling, padding=padding,
+                             scaling=scale * weight / (2 * alen),
+                             weighting=weighting)
 
-    weight = 1
-    if not ray_trafo.range.is_weighted:
-        # Compensate for potentially unweighted range of the ray transform
-        weight *= ray_trafo.range.cell_volume
 
-    if not ray_trafo.domain.is_weighted:
-        # Compensate for potentially unweighted domain of the ray transform
-        weight /= ray_trafo.domain.cell_volume
+def _fbp_filter_op_fourier(ray_trafo, padding, filter_type,
+                           frequency_scaling, rot_dir, scaling):
+    """Create an FBP filter in both detector directions.
 
-    ramp_function *= weight
+    This is used if the filter direction is not aligned with a detector
+    axis, hence it cannot be applied as a 1d filter.
+    """
+    impl = 'pyfftw' if PYFFTW_AVAILABLE else 'numpy'
+
+    # Define ramp filter
+    def fourier_filter(x):
+        abs_freq = np.abs(rot_dir[0] * x[1] + rot_dir[1] * x[2])
+        norm_freq = abs_freq / np.max(abs_freq)
+        filt = _fbp_filter(norm_freq, filter_type, frequency_scaling)
+        return filt * np.max(abs_freq) * scaling
+
+    # Define (padded) fourier transform
+    if padding:
+        # Define padding operator
+        ran_shp = (ray_trafo.range.shape[0],
+                   ray_trafo.range.shape[1] * 2 - 1,
+                   ray_trafo.range.shape[2] * 2 - 1)
+        resizing = ResizingOperator(ray_trafo.range, ran_shp=ran_shp)
+
+        fourier = FourierTransform(resizing.range, axes=[1, 2], impl=impl)
+        fourier = fourier * resizing
+    else:
+        fourier = FourierTransform(ray_trafo.range, axes=[1, 2], impl=impl)
+
+    # Create ramp in the detector direction
+    ramp_function = fourier.range.element(fourier_filter)
 
     # Create ramp filter via the convolution formula with fourier transforms
     return fourier.inverse * ramp_function * fourier
 
 
 def fbp_op(ray_trafo, padding=True, filter_type='Ram-Lak',
-           frequency_scaling=1.0):
+           frequency_scaling=1.0, weighting=None):
     """Create filtered back-projection operator from a `RayTransform`.
 
     The filtered back-projection is an approximate inverse to the ray
@@ -511,6 +694,10 @@ def fbp_op(ray_trafo, padding=True, filter_type='Ram-Lak',
         The normalized frequencies are rescaled so that they fit into the range
         [0, frequency_scaling]. Any frequency above ``frequency_scaling`` is
         set to zero.
+    weighting : `array-like`, optional
+        Weights multiplied with the data before filtering, for instance
+        `parker_weighting` or `tam_danielson_window`. They are applied in
+        the same pass as the filtering if possible, see `fbp_filter_op`.
 
     Returns
     -------
@@ -523,7 +710,170 @@ def fbp_op(ray_trafo, padding=True, filter_type='Ram-Lak',
     parker_weighting : Windowing for overcomplete fan-beam data.
     """
     return ray_trafo.adjoint * fbp_filter_op(ray_trafo, padding, filter_type,
-                                             frequency_scaling)
+                                             frequency_scaling, weighting)
+
+
+def _prefetch(iterable, num_prefetch):
+    """Iterate over ``iterable`` while a thread fetches the next items.
+
+    Exceptions raised by the iteration are re-raised in the caller. If
+    the caller stops early, i.e., closes the generator or raises, the
+    thread stops fetching and the prefetched items are released.
+    """
+    queue = Queue(maxsize=num_prefetch)
+    stop = object()
+    stopped = threading.Event()
+
+    def put(entry):
+        """Put ``entry`` into the queue, return ``False`` if stopped."""
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=0.1)
+            except Full:
+                continue
+            else:
+                return True
+        return False
+
+    def producer():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as exc:
+            put((stop, exc))
+        else:
+            put((stop, None))
+
+    thread = threading.Thread(target=producer)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item, exc = queue.get()
+            if item is stop:
+                if exc is not None:
+                    raise exc
+                return
+            yield item
+    finally:
+        stopped.set()
+        while True:
+            try:
+                queue.get_nowait()
+            except Empty:
+                break
+
+
+def fbp_stream(ray_trafo, data_chunks, padding=True, filter_type='Ram-Lak',
+               frequency_scaling=1.0, weighting=None, out=None,
+               num_prefetch=1):
+    """Compute an FBP reconstruction from chunks of projection data.
+
+    This computes the same result as ``fbp_op(ray_trafo, ...)(data)``,
+    but ``data`` is given as an iterable of chunks of consecutive angles,
+    which are filtered, back-projected and discarded one at a time. Hence
+    the full projection data never needs to be in memory, and the next
+    chunk is loaded while the current one is processed.
+
+    Parameters
+    ----------
+    ray_trafo : `RayTransform`
+        The ray transform for the full projection data. The filter
+        direction must be aligned with a detector axis, see
+        `fbp_filter_op`, and the range must have constant weighting.
+    data_chunks : iterable of `array-like`
+        Projection data in chunks along the angle axis, in the order of
+        the angles in ``ray_trafo.geometry``. Each chunk has shape
+        ``(num_angles_in_chunk,) + ray_trafo.range.shape[1:]``.
+    padding, filter_type, frequency_scaling, weighting :
+        Filter parameters, see `fbp_filter_op`. ``weighting`` is given
+        for the full projection data.
+    out : ``ray_trafo.domain`` element, optional
+        Element to which the result is written.
+    num_prefetch : nonnegative int, optional
+        Number of chunks that are loaded ahead in a background thread.
+        For 0, chunks are loaded when they are needed.
+
+    Returns
+    -------
+    out : ``ray_trafo.domain`` element
+        The FBP reconstruction. If ``out`` was provided, the returned
+        object is a reference to it.
+
+    See Also
+    --------
+    fbp_op : FBP operator for data in memory
+
+    Notes
+    -----
+    Besides the result, memory for one more volume (for the
+    back-projection of a chunk) and for ``num_prefetch + 2`` chunks
+    (loaded and filtered data) is needed.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr([-1, -1], [1, 1], (20, 20))
+    >>> geometry = odl.tomo.parallel_beam_geometry(space, num_angles=30)
+    >>> ray_trafo = odl.tomo.RayTransform(space, geometry, impl='numpy')
+    >>> data = ray_trafo(odl.phantom.shepp_logan(space, modified=True))
+    >>> chunks = (data.asarray()[i:i + 8] for i in range(0, 30, 8))
+    >>> reco = fbp_stream(ray_trafo, chunks)
+    >>> reco.dist(odl.tomo.fbp_op(ray_trafo)(data)) < 1e-10
+    True
+    """
+    filter_op = fbp_filter_op(ray_trafo, padding, filter_type,
+                              frequency_scaling, weighting)
+    if not isinstance(filter_op, FbpFilterOperator):
+        raise NotImplementedError('streaming FBP requires the filter '
+                                  'direction to be aligned with a detector '
+                                  'axis')
+
+    if out is None:
+        out = ray_trafo.domain.zero()
+    else:
+        if out not in ray_trafo.domain:
+            raise TypeError('`out` {!r} not an element of the domain {!r} '
+                            'of the ray transform'
+                            ''.format(out, ray_trafo.domain))
+        out.set_zero()
+
+    if num_prefetch > 0:
+        data_chunks = _prefetch(data_chunks, num_prefetch)
+
+    proj_shape = ray_trafo.range.shape
+    backproj = ray_trafo.domain.element()
+    start = 0
+    try:
+        for chunk in data_chunks:
+            chunk = np.asarray(chunk, dtype=ray_trafo.range.dtype)
+            stop = start + chunk.shape[0]
+            if chunk.shape[1:] != proj_shape[1:] or stop > proj_shape[0]:
+                raise ValueError('chunk of shape {} does not fit into '
+                                 'projection data of shape {} at angle {}'
+                                 ''.format(chunk.shape, proj_shape, start))
+
+            filtered = np.empty_like(chunk)
+            filter_op._filter_angles(chunk, filtered, offset=start)
+            del chunk
+
+            # Same range weighting as `ray_trafo` and, for the sparse
+            # matrix back-end, a view into its system matrix
+            chunk_op = ray_trafo._subset_operators([slice(start, stop)])[0]
+            chunk_op.adjoint(filtered, out=backproj)
+            del filtered
+            out += backproj
+            start = stop
+    finally:
+        if num_prefetch > 0:
+            # Stop the prefetching thread if we leave early
+            data_chunks.close()
+
+    if start != proj_shape[0]:
+        raise ValueError('got data for {} angles, expected {}'
+                         ''.format(start, proj_shape[0]))
+    return out
 
 
 if __name__ == '__main__':
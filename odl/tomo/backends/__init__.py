@@ -23,3 +23,9 @@ __all__ += astra_cuda.__all__
 
 from .skimage_radon import *
 __all__ += skimage_radon.__all__
+
+from .numpy_ray import *
+__all__ += numpy_ray.__all__
+
+from .sparse_matrix import *
+__all__ += sparse_matrix.__all__
@@ -0,0 +1,470 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Ray transform in pure NumPy, using a multi-threaded Joseph-type scheme.
+
+The forward projector samples each ray at equidistant points inside the
+bounding box of the reconstruction volume and sums up the (per-axis
+nearest or linear) interpolated volume values. The back-projector applies
+the exact transpose of that sampling scheme, hence the two are matched
+up to floating point errors.
+
+Rays are generated for chunks of angles using the vectorized
+`Geometry.det_point_position` and related methods, such that all
+geometries from `odl.tomo.geometry` are supported, including helical
+cone beam and Euler-angle parallel beam geometries.
+"""
+
+from __future__ import print_function, division, absolute_import
+from itertools import product
+from multiprocessing import cpu_count
+from threading import Lock
+import numpy as np
+
+from odl.discr import DiscreteLp, DiscreteLpElement
+from odl.tomo.geometry import Geometry, DivergentBeamGeometry
+from odl.util import parallel_map, writable_array
+
+
+__all__ = ('numpy_forward_projector', 'numpy_back_projector',
+           'numpy_ray_trafo_matrix')
+
+
+# Maximum number of sample points along rays processed at once in a
+# single thread. This bounds the size of temporary arrays.
+_MAX_SAMPLES_PER_BLOCK = 2 ** 19
+
+
+def _check_args(vol_space, geometry, proj_space=None):
+    """Check the spaces and the geometry for compatibility."""
+    if not isinstance(geometry, Geometry):
+        raise TypeError('`geometry` {!r} is not a `Geometry` instance'
+                        ''.format(geometry))
+    if not isinstance(vol_space, DiscreteLp):
+        raise TypeError('volume space {!r} is not a `DiscreteLp` instance'
+                        ''.format(vol_space))
+    if vol_space.ndim != geometry.ndim:
+        raise ValueError('dimensions {} of volume space and {} of geometry '
+                         'do not match'.format(vol_space.ndim, geometry.ndim))
+    if not vol_space.is_uniform:
+        raise ValueError('volume space {!r} is not uniformly discretized'
+                         ''.format(vol_space))
+    if proj_space is None:
+        return
+    if not isinstance(proj_space, DiscreteLp):
+        raise TypeError('projection space {!r} is not a `DiscreteLp` '
+                        'instance'.format(proj_space))
+    if proj_space.shape != geometry.partition.shape:
+        raise ValueError('projection space shape {} not equal to geometry '
+                         'shape {}'.format(proj_space.shape,
+                                           geometry.partition.shape))
+
+
+def _angle_chunks(geometry, num_threads):
+    """Return index arrays partitioning the first motion axis."""
+    num_angles = geometry.motion_partition.shape[0]
+    num_chunks = min(num_angles, 4 * num_threads)
+    return np.array_split(np.arange(num_angles), num_chunks)
+
+
+def _rays(geometry, angle_idcs):
+    """Return starting points and unit directions of rays.
+
+    The rays correspond to the motion parameters with indices
+    ``angle_idcs`` along the first motion axis, all other motion
+    parameters and all detector parameters.
+
+    Returns
+    -------
+    points, directions : `numpy.ndarray`
+        Arrays of shape ``(num_rays, ndim)``, where ``num_rays`` is the
+        total number of projection values in the chunk.
+    """
+    m_ndim = geometry.motion_partition.ndim
+    d_ndim = geometry.det_partition.ndim
+    ndim_tot = m_ndim + d_ndim
+
+    def bcast_vecs(vecs, offset):
+        """Reshape coordinate vectors for broadcasting ("sparse mesh")."""
+        bcast = []
+        for i, vec in enumerate(vecs):
+            shape = [1] * ndim_tot
+            shape[offset + i] = -1
+            bcast.append(np.reshape(vec, shape))
+        return bcast[0] if len(bcast) == 1 else tuple(bcast)
+
+    m_vecs = list(geometry.motion_grid.coord_vectors)
+    m_vecs[0] = m_vecs[0][angle_idcs]
+    mparam = bcast_vecs(m_vecs, 0)
+    dparam = bcast_vecs(geometry.det_grid.coord_vectors, m_ndim)
+
+    det_pts = geometry.det_point_position(mparam, dparam)
+    if isinstance(geometry, DivergentBeamGeometry):
+        src_pts = geometry.src_position(mparam)
+        points = np.broadcast_to(src_pts, det_pts.shape)
+        dirs = det_pts - src_pts
+        dirs /= np.linalg.norm(dirs, axis=-1, keepdims=True)
+    else:
+        points = det_pts
+        dirs = -np.broadcast_to(geometry.det_to_src(mparam, dparam),
+                                det_pts.shape)
+
+    ndim = geometry.ndim
+    return points.reshape(-1, ndim), dirs.reshape(-1, ndim)
+
+
+def _box_intersection(points, dirs, min_pt, max_pt):
+    """Return parameters ``tmin, tmax`` of ray intersections with a box.
+
+    Rays that do not hit the box get ``tmin == tmax``.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (min_pt - points) / dirs
+        t2 = (max_pt - points) / dirs
+    tlo = np.minimum(t1, t2)
+    thi = np.maximum(t1, t2)
+
+    # Rays parallel to a face are either fully inside or outside the slab
+    parallel = (dirs == 0)
+    inside = (points >= min_pt) & (points <= max_pt)
+    tlo[parallel & inside] = -np.inf
+    thi[parallel & inside] = np.inf
+    tlo[parallel & ~inside] = np.inf
+    thi[parallel & ~inside] = -np.inf
+
+    tmin = np.max(tlo, axis=1)
+    tmax = np.min(thi, axis=1)
+    tmax = np.maximum(tmin, tmax)
+    tmin[~np.isfinite(tmin)] = 0
+    tmax[~np.isfinite(tmax)] = 0
+    return tmin, tmax
+
+
+def _sampling_blocks(points, dirs, vol_space):
+    """Generate sample points and step sizes for blocks of rays.
+
+    Yields
+    ------
+    ray_slc : slice
+        Slice of the rays in the current block.
+    samples : `numpy.ndarray`
+        Sample points of shape ``(num_rays_block, num_samples, ndim)``.
+    steps : `numpy.ndarray`
+        Step size per ray, of shape ``(num_rays_block,)``. Rays that
+        miss the volume have step size 0.
+    """
+    min_pt = vol_space.min_pt
+    max_pt = vol_space.max_pt
+    tmin, tmax = _box_intersection(points, dirs, min_pt, max_pt)
+    lengths = tmax - tmin
+
+    # One sample per cell (along the smallest cell side) for the longest
+    # possible ray, i.e., the diagonal. This makes the sampling independent
+    # of the chunking.
+    diag_len = np.linalg.norm(vol_space.domain.extent)
+    num_samples = int(np.ceil(diag_len / np.min(vol_space.cell_sides)))
+    block_size = max(_MAX_SAMPLES_PER_BLOCK // num_samples, 1)
+
+    # Midpoint rule on [tmin, tmax] with `num_samples` points per ray
+    rel_pos = (np.arange(num_samples) + 0.5) / num_samples
+    for start in range(0, points.shape[0], block_size):
+        slc = slice(start, start + block_size)
+        steps = lengths[slc] / num_samples
+        tvals = (tmin[slc, None] + lengths[slc, None] * rel_pos[None, :])
+        samples = (points[slc, None, :] +
+                   tvals[:, :, None] * dirs[slc, None, :])
+        yield slc, samples, steps
+
+
+def _interp_indices_weights(samples, vol_space):
+    """Return flat indices and weights for the interpolation corners.
+
+    Returns
+    -------
+    corners : list of tuple
+        For each of the corners of the interpolation stencil a pair
+        ``(flat_index, weight)``, each of the shape of the samples without
+        the last axis.
+    """
+    shape = vol_space.shape
+    strides = np.cumprod((shape[1:] + (1,))[::-1])[::-1]
+
+    per_axis = []
+    for i, (n, interp) in enumerate(zip(shape, vol_space.interp_byaxis)):
+        # Continuous index with cell midpoints at integers; clipping
+        # extends volume boundary values up to the boundary of the box.
+        idx = ((samples[..., i] - vol_space.min_pt[i]) /
+               vol_space.cell_sides[i] - 0.5)
+        np.clip(idx, 0, n - 1, out=idx)
+        if interp == 'nearest':
+            per_axis.append([(np.rint(idx).astype(int) * strides[i], None)])
+        elif interp == 'linear':
+            idx_lo = np.floor(idx).astype(int)
+            idx_hi = np.minimum(idx_lo + 1, n - 1)
+            wgt_hi = idx - idx_lo
+            per_axis.append([(idx_lo * strides[i], 1 - wgt_hi),
+                             (idx_hi * strides[i], wgt_hi)])
+        else:
+            raise ValueError('interpolation {!r} not supported'
+                             ''.format(interp))
+
+    corners = []
+    for corner in product(*per_axis):
+        flat_idx = corner[0][0]
+        weight = corner[0][1]
+        for idx, wgt in corner[1:]:
+            flat_idx = flat_idx + idx
+            if wgt is not None:
+                weight = wgt if weight is None else weight * wgt
+        if weight is None:
+            weight = np.ones(flat_idx.shape)
+        corners.append((flat_idx, weight))
+
+    return corners
+
+
+def numpy_forward_projector(vol_data, geometry, proj_space, out=None,
+                            num_threads=None):
+    """Run a forward projection on the given data using NumPy.
+
+    Parameters
+    ----------
+    vol_data : `DiscreteLpElement`
+        Volume data to which the forward projector is applied. It must
+        be real-valued.
+    geometry : `Geometry`
+        Geometry defining the tomographic setup.
+    proj_space : `DiscreteLp`
+        Space to which the calling operator maps.
+    out : ``proj_space`` element, optional
+        Element of the projection space to which the result is written. If
+        ``None``, an element in ``proj_space`` is created.
+    num_threads : positive int, optional
+        Number of threads over which chunks of angles are distributed.
+        Default: number of CPUs
+
+    Returns
+    -------
+    out : ``proj_space`` element
+        Projection data resulting from the application of the projector.
+        If ``out`` was provided, the returned object is a reference to it.
+    """
+    if not isinstance(vol_data, DiscreteLpElement):
+        raise TypeError('volume data {!r} is not a `DiscreteLpElement` '
+                        'instance'.format(vol_data))
+    _check_args(vol_data.space, geometry, proj_space)
+    if out is None:
+        out = proj_space.element()
+    elif out not in proj_space:
+        raise TypeError('`out` {!r} is not an element of `proj_space` {!r}'
+                        ''.format(out, proj_space))
+    if num_threads is None:
+        num_threads = cpu_count()
+
+    vol_space = vol_data.space
+    vol_flat = vol_data.asarray().ravel()
+    angle_chunks = _angle_chunks(geometry, num_threads)
+
+    with writable_array(out) as out_arr:
+
+        def project_chunk(angle_idcs):
+            points, dirs = _rays(geometry, angle_idcs)
+            result = np.empty(points.shape[0], dtype=out_arr.dtype)
+            for slc, samples, steps in _sampling_blocks(points, dirs,
+                                                        vol_space):
+                ray_sums = 0
+                for flat_idx, weight in _interp_indices_weights(samples,
+                                                                vol_space):
+                    ray_sums += np.sum(vol_flat[flat_idx] * weight, axis=1)
+                result[slc] = ray_sums * steps
+
+            sub_shape = (len(angle_idcs),) + out_arr.shape[1:]
+            out_arr[angle_idcs] = result.reshape(sub_shape)
+
+        parallel_map(project_chunk, angle_chunks, num_threads)
+
+    return out
+
+
+def numpy_back_projector(proj_data, geometry, reco_space, out=None,
+                         num_threads=None):
+    """Run a back-projection on the given data using NumPy.
+
+    The back-projection is the exact adjoint of
+    `numpy_forward_projector` with respect to the inner products of the
+    spaces.
+
+    Parameters
+    ----------
+    proj_data : `DiscreteLpElement`
+        Projection data to which the back-projector is applied. It must
+        be real-valued.
+    geometry : `Geometry`
+        Geometry defining the tomographic setup.
+    reco_space : `DiscreteLp`
+        Space to which the calling operator maps.
+    out : ``reco_space`` element, optional
+        Element of the reconstruction space to which the result is written.
+        If ``None``, an element in ``reco_space`` is created.
+    num_threads : positive int, optional
+        Number of threads over which chunks of angles are distributed.
+        Default: number of CPUs
+
+    Returns
+    -------
+    out : ``reco_space`` element
+        Reconstruction data resulting from the application of the backward
+        projector. If ``out`` was provided, the returned object is a
+        reference to it.
+
+    Notes
+    -----
+    Each thread sums up the contributions of one block of rays per
+    touched volume index and adds them to the result while holding a
+    lock. If the touched indices are spread out over the volume, e.g.,
+    for oblique rays, they are summed up per unique index instead of
+    over their whole range. Hence, the temporaries are bounded by the
+    block size and do not grow with the size of the volume.
+    """
+    if not isinstance(proj_data, DiscreteLpElement):
+        raise TypeError('projection data {!r} is not a `DiscreteLpElement` '
+                        'instance'.format(proj_data))
+    _check_args(reco_space, geometry, proj_data.space)
+    if out is None:
+        out = reco_space.element()
+    elif out not in reco_space:
+        raise TypeError('`out` {!r} is not an element of `reco_space` {!r}'
+                        ''.format(out, reco_space))
+    if num_threads is None:
+        num_threads = cpu_count()
+
+    proj_arr = proj_data.asarray()
+    angle_chunks = _angle_chunks(geometry, num_threads)
+    lock = Lock()
+
+    # Weight the transpose by the ratio of the space weightings
+    scaling_factor = float(proj_data.space.weighting.const)
+    scaling_factor /= float(reco_space.weighting.const)
+
+    # Accumulate in double precision, cast in the end
+    accum = np.zeros(reco_space.size, dtype='float64')
+
+    def back_project_chunk(angle_idcs):
+        points, dirs = _rays(geometry, angle_idcs)
+        data = proj_arr[angle_idcs].ravel()
+        for slc, samples, steps in _sampling_blocks(points, dirs,
+                                                    reco_space):
+            ray_wgts = (data[slc] * steps)[:, None]
+            corners = _interp_indices_weights(samples, reco_space)
+            flat_idx = np.concatenate([c[0].ravel() for c in corners])
+            weights = np.concatenate([(c[1] * ray_wgts).ravel()
+                                      for c in corners])
+            if flat_idx.size == 0:
+                continue
+
+            idx_min = np.min(flat_idx)
+            idx_max = np.max(flat_idx)
+            if idx_max - idx_min < 2 * flat_idx.size:
+                # Touched indices are dense, sum up over their range
+                partial = np.bincount(flat_idx - idx_min, weights,
+                                      minlength=idx_max - idx_min + 1)
+                with lock:
+                    accum[idx_min:idx_max + 1] += partial
+            else:
+                # Sparse, e.g. for oblique rays, sum up per unique index
+                # to keep the temporary at the size of the block
+                uniq_idx, inverse = np.unique(flat_idx, return_inverse=True)
+                partial = np.bincount(inverse, weights,
+                                      minlength=uniq_idx.size)
+                with lock:
+                    accum[uniq_idx] += partial
+
+    parallel_map(back_project_chunk, angle_chunks, num_threads)
+
+    accum *= scaling_factor
+    out[:] = accum.reshape(reco_space.shape)
+    return out
+
+
+def numpy_ray_trafo_matrix(reco_space, geometry, dtype=None,
+                           num_threads=None):
+    """Return the system matrix of the NumPy ray transform.
+
+    The matrix represents `numpy_forward_projector` as a mapping from
+    the flattened volume to the flattened projection data, both in
+    C order. Since it only contains the line integral weights, it does
+    not depend on the weighting of the spaces.
+
+    Parameters
+    ----------
+    reco_space : `DiscreteLp`
+        Reconstruction space, the space of the images to be forward
+        projected.
+    geometry : `Geometry`
+        Geometry defining the tomographic setup.
+    dtype : optional
+        Data type of the matrix entries.
+        Default: ``reco_space.real_dtype``
+    num_threads : positive int, optional
+        Number of threads over which chunks of angles are distributed.
+        Default: number of CPUs
+
+    Returns
+    -------
+    matrix : `scipy.sparse.csr_matrix`
+        Matrix of shape ``(geometry.partition.size, reco_space.size)``.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr([-1, -1], [1, 1], (4, 4))
+    >>> geom = odl.tomo.parallel_beam_geometry(space, num_angles=6)
+    >>> ray_trafo = odl.tomo.RayTransform(space, geom, impl='numpy')
+    >>> matrix = numpy_ray_trafo_matrix(space, geom)
+    >>> matrix.shape == (geom.partition.size, space.size)
+    True
+    >>> x = odl.phantom.cuboid(space)
+    >>> np.allclose(matrix.dot(x.asarray().ravel()),
+    ...             ray_trafo(x).asarray().ravel())
+    True
+    """
+    import scipy.sparse
+
+    if dtype is None:
+        dtype = reco_space.real_dtype
+    if num_threads is None:
+        num_threads = cpu_count()
+    _check_args(reco_space, geometry)
+    angle_chunks = _angle_chunks(geometry, num_threads)
+
+    def chunk_matrix(angle_idcs):
+        points, dirs = _rays(geometry, angle_idcs)
+        blocks = []
+        for slc, samples, steps in _sampling_blocks(points, dirs,
+                                                    reco_space):
+            corners = _interp_indices_weights(samples, reco_space)
+            num_rays = samples.shape[0]
+            rows = np.broadcast_to(np.arange(num_rays)[:, None],
+                                   samples.shape[:-1])
+            rows = np.concatenate([rows.ravel()] * len(corners))
+            cols = np.concatenate([c[0].ravel() for c in corners])
+            vals = np.concatenate([(c[1] * steps[:, None]).ravel()
+                                   for c in corners])
+            nonzero = (vals != 0)
+            blocks.append(scipy.sparse.coo_matrix(
+                (vals[nonzero].astype(dtype),
+                 (rows[nonzero], cols[nonzero])),
+                shape=(num_rays, reco_space.size)).tocsr())
+        return scipy.sparse.vstack(blocks, format='csr')
+
+    chunk_matrices = parallel_map(chunk_matrix, angle_chunks, num_threads)
+    return scipy.sparse.vstack(chunk_matrices, format='csr')
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -0,0 +1,428 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Ray transform as precomputed sparse system matrix.
+
+The system matrix of the NumPy ray transform is built once and stored in
+CSR format together with its transpose. It is cached in memory per
+geometry and, optionally, on disk as ``.npy`` files that are loaded as
+memory maps.
+"""
+
+from __future__ import print_function, division, absolute_import
+from builtins import object
+import hashlib
+from multiprocessing import cpu_count
+import os
+import shutil
+import tempfile
+import numpy as np
+import scipy.sparse
+
+from odl.discr import DiscreteLp
+from odl.tomo.backends.numpy_ray import numpy_ray_trafo_matrix
+from odl.tomo.geometry import Geometry
+from odl.util import parallel_map
+
+
+__all__ = ('SparseMatrixRayTrafoImpl', 'ray_trafo_matrix_key')
+
+
+# Increase when the matrix layout or the projection scheme changes, to
+# invalidate existing caches
+_CACHE_FORMAT_VERSION = 1
+
+
+def ray_trafo_matrix_key(reco_space, geometry):
+    """Return a string identifying the system matrix of a setup.
+
+    The key is a hash of all properties of ``reco_space`` and ``geometry``
+    that influence the matrix, i.e., it does not depend on the space
+    weightings.
+
+    Parameters
+    ----------
+    reco_space : `DiscreteLp`
+        Reconstruction space of the ray transform.
+    geometry : `Geometry`
+        Geometry of the ray transform.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal hash string.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr([-1, -1], [1, 1], (4, 4))
+    >>> geom = odl.tomo.parallel_beam_geometry(space, num_angles=6)
+    >>> key = ray_trafo_matrix_key(space, geom)
+
+    The key does not change with the weighting of the space, but with
+    its discretization:
+
+    >>> space2 = odl.uniform_discr([-1, -1], [1, 1], (4, 4), weighting=1.0)
+    >>> key == ray_trafo_matrix_key(space2, geom)
+    True
+    >>> space3 = odl.uniform_discr([-1, -1], [1, 1], (4, 5))
+    >>> key == ray_trafo_matrix_key(space3, geom)
+    False
+    """
+    hasher = hashlib.sha1()
+
+    def update(obj):
+        hasher.update(repr(obj).encode('utf-8'))
+
+    update(_CACHE_FORMAT_VERSION)
+    update(np.dtype(reco_space.real_dtype).name)
+    update(reco_space.shape)
+    update(reco_space.interp_byaxis)
+    update(reco_space.min_pt.tolist())
+    update(reco_space.max_pt.tolist())
+
+    update(type(geometry).__name__)
+    update(repr(geometry))
+    for vec in geometry.grid.coord_vectors:
+        hasher.update(np.ascontiguousarray(vec, dtype=float).tobytes())
+
+    return hasher.hexdigest()
+
+
+def _row_block(matrix, start, stop):
+    """Return rows ``start:stop`` of a CSR matrix without copying data."""
+    indptr = matrix.indptr
+    i0, i1 = indptr[start], indptr[stop]
+    return scipy.sparse.csr_matrix(
+        (matrix.data[i0:i1], matrix.indices[i0:i1],
+         indptr[start:stop + 1] - i0),
+        shape=(stop - start, matrix.shape[1]), copy=False)
+
+
+def _split_rows(matrix, num_blocks):
+    """Split a CSR matrix into row blocks with approximately equal nnz.
+
+    The blocks share ``data`` and ``indices`` with ``matrix``.
+
+    Returns
+    -------
+    blocks : list of tuple
+        Pairs ``(row_slice, block_matrix)``.
+    """
+    indptr = matrix.indptr
+    nnz_bounds = np.linspace(0, matrix.nnz, num_blocks + 1)
+    row_bounds = np.unique(np.searchsorted(indptr, nnz_bounds))
+    row_bounds[0] = 0
+    row_bounds[-1] = matrix.shape[0]
+    row_bounds = np.unique(row_bounds)
+
+    return [(slice(start, stop), _row_block(matrix, start, stop))
+            for start, stop in zip(row_bounds[:-1], row_bounds[1:])]
+
+
+def _save_matrices(path, matrices):
+    """Atomically save CSR matrices as ``.npy`` files in a new directory."""
+    parent = os.path.dirname(path)
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+
+    tmp_path = tempfile.mkdtemp(dir=parent)
+    try:
+        for name, matrix in matrices.items():
+            for attr in ('data', 'indices', 'indptr'):
+                np.save(os.path.join(tmp_path, '{}_{}.npy'.format(name, attr)),
+                        getattr(matrix, attr))
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another process may have been faster, then we just discard ours
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def _load_matrices(path, shapes):
+    """Load CSR matrices from ``.npy`` files as memory maps."""
+    matrices = {}
+    for name, shape in shapes.items():
+        arrs = [np.load(os.path.join(path, '{}_{}.npy'.format(name, attr)),
+                        mmap_mode='r')
+                for attr in ('data', 'indices', 'indptr')]
+        matrices[name] = scipy.sparse.csr_matrix(tuple(arrs), shape=shape,
+                                                 copy=False)
+    return matrices
+
+
+class SparseMatrixRayTrafoImpl(object):
+
+    """Ray transform and back-projection via a precomputed sparse matrix."""
+
+    def __init__(self, geometry, reco_space, proj_space, cache_dir=None,
+                 num_threads=None):
+        """Initialize a new instance.
+
+        The matrix is looked up in memory (in
+        ``geometry.implementation_cache``), then in ``cache_dir``, and
+        only built if both fail.
+
+        Parameters
+        ----------
+        geometry : `Geometry`
+            Geometry defining the tomographic setup.
+        reco_space : `DiscreteLp`
+            Reconstruction space, the space of the images to be forward
+            projected.
+        proj_space : `DiscreteLp`
+            Projection space, the space of the projection data.
+        cache_dir : str, optional
+            Directory in which system matrices are stored on disk. For
+            ``None``, matrices are only cached in memory.
+        num_threads : positive int, optional
+            Number of threads used to build the matrix and to compute
+            matrix-vector products.
+            Default: number of CPUs
+        """
+        assert isinstance(geometry, Geometry)
+        assert isinstance(reco_space, DiscreteLp)
+        assert isinstance(proj_space, DiscreteLp)
+
+        self.geometry = geometry
+        self.reco_space = reco_space
+        self.proj_space = proj_space
+        self.cache_dir = cache_dir
+        self.num_threads = cpu_count() if num_threads is None else num_threads
+
+        self.key = ray_trafo_matrix_key(reco_space, geometry)
+        self.matrix, self.matrix_t = self._get_matrices()
+        self._subset_cache = {}
+        self._matrix_blocks = _split_rows(self.matrix, self.num_threads)
+        self._matrix_t_blocks = _split_rows(self.matrix_t, self.num_threads)
+
+    def _get_matrices(self):
+        """Return forward and transposed matrix from cache or new ones."""
+        mem_cache = self.geometry.implementation_cache.setdefault(
+            'sparse_matrix', {})
+        if self.key in mem_cache:
+            return mem_cache[self.key]
+
+        shapes = {'fwd': (self.proj_space.size, self.reco_space.size),
+                  'adj': (self.reco_space.size, self.proj_space.size)}
+        path = None
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, self.key)
+
+        if path is not None and os.path.isdir(path):
+            matrices = _load_matrices(path, shapes)
+        else:
+            matrix = numpy_ray_trafo_matrix(self.reco_space, self.geometry,
+                                            num_threads=self.num_threads)
+            matrices = {'fwd': matrix, 'adj': matrix.T.tocsr()}
+            if path is not None:
+                _save_matrices(path, matrices)
+
+        mem_cache[self.key] = (matrices['fwd'], matrices['adj'])
+        return mem_cache[self.key]
+
+    def _matvec(self, blocks, x_arr, out_arr):
+        """Compute ``out_arr = matrix.dot(x_arr)`` block-wise in parallel."""
+        x_flat = x_arr.ravel()
+
+        def apply_block(slc_block):
+            slc, block = slc_block
+            out_arr[slc] = block.dot(x_flat)
+
+        parallel_map(apply_block, blocks, self.num_threads)
+
+    def call_forward(self, vol_data, out=None):
+        """Forward project the given data.
+
+        Parameters
+        ----------
+        vol_data : ``reco_space`` element
+            Volume data to which the projector is applied.
+        out : ``proj_space`` element, optional
+            Element of the projection space to which the result is written.
+            If ``None``, an element in `proj_space` is created.
+
+        Returns
+        -------
+        out : ``proj_space`` element
+            Projection data resulting from the application of the projector.
+            If ``out`` was provided, the returned object is a reference to it.
+        """
+        assert vol_data in self.reco_space
+        if out is None:
+            out = self.proj_space.element()
+        else:
+            assert out in self.proj_space
+
+        out_flat = np.empty(self.proj_space.size, dtype=self.proj_space.dtype)
+        self._matvec(self._matrix_blocks, vol_data.asarray(), out_flat)
+        out[:] = out_flat.reshape(self.proj_space.shape)
+        return out
+
+    def call_backward(self, proj_data, out=None):
+        """Back-project the given data.
+
+        Parameters
+        ----------
+        proj_data : ``proj_space`` element
+            Projection data to which the back-projector is applied.
+        out : ``reco_space`` element, optional
+            Element of the reconstruction space to which the result is
+            written. If ``None``, an element in `reco_space` is created.
+
+        Returns
+        -------
+        out : ``reco_space`` element
+            Reconstruction data resulting from the application of the
+            back-projector. If ``out`` was provided, the returned object is
+            a reference to it.
+        """
+        assert proj_data in self.proj_space
+        if out is None:
+            out = self.reco_space.element()
+        else:
+            assert out in self.reco_space
+
+        out_flat = np.empty(self.reco_space.size, dtype=self.reco_space.dtype)
+        self._matvec(self._matrix_t_blocks, proj_data.asarray(), out_flat)
+
+        # Weight the transpose by the ratio of the space weightings
+        scaling_factor = float(self.proj_space.weighting.const)
+        scaling_factor /= float(self.reco_space.weighting.const)
+        out_flat *= scaling_factor
+
+        out[:] = out_flat.reshape(self.reco_space.shape)
+        return out
+
+    def subsets(self, angle_slices, proj_spaces):
+        """Return implementations for subsets of the projection angles.
+
+        The rows of the system matrix are reordered once such that the
+        rows of each subset are contiguous. The subset implementations
+        use views into this reordered matrix, and the transposes of
+        these views for back-projection. Hence, all subsets together
+        need as much additional memory as one copy of the system matrix,
+        independently of the number of subsets. Contiguous slices with
+        step 1 are views into the system matrix itself and need no
+        additional memory.
+
+        Parameters
+        ----------
+        angle_slices : sequence of slice
+            Slices of the first (angle) axis of the projection space
+            defining the subsets.
+        proj_spaces : sequence of `DiscreteLp`
+            Projection spaces of the subsets.
+
+        Returns
+        -------
+        impls : list of `SparseMatrixRayTrafoImpl`
+            Implementations of the subsets, in the order of
+            ``angle_slices``.
+        """
+        num_angles = self.proj_space.shape[0]
+        rows_per_angle = self.proj_space.size // num_angles
+        angle_slices = [slice(*slc.indices(num_angles))
+                        for slc in angle_slices]
+        key = tuple((slc.start, slc.stop, slc.step) for slc in angle_slices)
+        if all(slc.step == 1 for slc in angle_slices):
+            subset_matrices = [
+                _row_block(self.matrix, slc.start * rows_per_angle,
+                           max(slc.start, slc.stop) * rows_per_angle)
+                for slc in angle_slices]
+        else:
+            subset_matrices = self._subset_cache.get(key)
+        if subset_matrices is None:
+            angles = [np.arange(num_angles)[slc] for slc in angle_slices]
+            angle_perm = np.concatenate(angles)
+            row_perm = (angle_perm[:, None] * rows_per_angle +
+                        np.arange(rows_per_angle)).ravel()
+            permuted = self.matrix[row_perm]
+
+            bounds = np.cumsum([0] + [len(a) * rows_per_angle
+                                      for a in angles])
+            subset_matrices = [_row_block(permuted, start, stop)
+                               for start, stop in zip(bounds[:-1],
+                                                      bounds[1:])]
+            self._subset_cache[key] = subset_matrices
+
+        return [_SparseMatrixSubsetImpl(self, matrix, proj_space)
+                for matrix, proj_space in zip(subset_matrices, proj_spaces)]
+
+
+class _SparseMatrixSubsetImpl(SparseMatrixRayTrafoImpl):
+
+    """Sparse matrix ray transform of a subset of the projection angles.
+
+    Instances are created by `SparseMatrixRayTrafoImpl.subsets`.
+    """
+
+    def __init__(self, parent, matrix, proj_space):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        parent : `SparseMatrixRayTrafoImpl`
+            Implementation of the full ray transform.
+        matrix : `scipy.sparse.csr_matrix`
+            Rows of the system matrix belonging to the subset.
+        proj_space : `DiscreteLp`
+            Projection space of the subset.
+        """
+        self.geometry = None
+        self.reco_space = parent.reco_space
+        self.proj_space = proj_space
+        self.cache_dir = parent.cache_dir
+        self.num_threads = parent.num_threads
+        self.key = parent.key
+        self.matrix = matrix
+        # CSC view with the same data, no copy
+        self.matrix_t = matrix.T
+        self._subset_cache = {}
+        self._matrix_blocks = _split_rows(matrix, self.num_threads)
+
+    def _rmatvec(self, x_arr, out_arr):
+        """Compute ``out_arr = matrix.T.dot(x_arr)`` block-wise in parallel.
+
+        The columns of the transpose are split into the same blocks as the
+        rows of ``matrix`` for the forward projection, and the partial
+        products of the blocks are summed up.
+        """
+        x_flat = x_arr.ravel()
+
+        def apply_block(slc_block):
+            slc, block = slc_block
+            return block.T.dot(x_flat[slc])
+
+        partials = parallel_map(apply_block, self._matrix_blocks,
+                                self.num_threads)
+        out_arr[:] = partials[0]
+        for partial in partials[1:]:
+            out_arr += partial
+
+    def call_backward(self, proj_data, out=None):
+        """Back-project the given data."""
+        assert proj_data in self.proj_space
+        if out is None:
+            out = self.reco_space.element()
+        else:
+            assert out in self.reco_space
+
+        out_flat = np.empty(self.reco_space.size, dtype=self.reco_space.dtype)
+        self._rmatvec(proj_data.asarray(), out_flat)
+        scaling_factor = float(self.proj_space.weighting.const)
+        scaling_factor /= float(self.reco_space.weighting.const)
+        out_flat *= scaling_factor
+
+        out[:] = out_flat.reshape(self.reco_space.shape)
+        return out
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -23,11 +23,14 @@ from odl.tomo.backends import (
     astra_supports, ASTRA_VERSION,
     astra_cpu_forward_projector, astra_cpu_back_projector,
     AstraCudaProjectorImpl, AstraCudaBackProjectorImpl,
-    skimage_radon_forward, skimage_radon_back_projector)
+    skimage_radon_forward, skimage_radon_back_projector,
+    numpy_forward_projector, numpy_back_projector,
+    SparseMatrixRayTrafoImpl, ray_trafo_matrix_key)
 
 
 ASTRA_CPU_AVAILABLE = ASTRA_AVAILABLE
-_SUPPORTED_IMPL = ('astra_cpu', 'astra_cuda', 'skimage')
+_SUPPORTED_IMPL = ('astra_cpu', 'astra_cuda', 'skimage', 'numpy',
+                   'sparse_matrix')
 _AVAILABLE_IMPLS = []
 if ASTRA_CPU_AVAILABLE:
     _AVAILABLE_IMPLS.append('astra_cpu')
@@ -35,6 +38,8 @@ if ASTRA_CUDA_AVAILABLE:
     _AVAILABLE_IMPLS.append('astra_cuda')
 if SKIMAGE_AVAILABLE:
     _AVAILABLE_IMPLS.append('skimage')
+_AVAILABLE_IMPLS.append('numpy')
+_AVAILABLE_IMPLS.append('sparse_matrix')
 
 
 __all__ = ('RayTransform', 'RayBackProjection')
@@ -61,13 +66,19 @@ class RayTransformBase(Operator):
 
         Other Parameters
         ----------------
-        impl : {`None`, 'astra_cuda', 'astra_cpu', 'skimage'}, optional
+        impl : {`None`, str}, optional
             Implementation back-end for the transform. Supported back-ends:
 
             - ``'astra_cuda'``: ASTRA toolbox, using CUDA, 2D or 3D
             - ``'astra_cpu'``: ASTRA toolbox using CPU, only 2D
             - ``'skimage'``: scikit-image, only 2D parallel with square
               reconstruction space.
+            - ``'numpy'``: Multi-threaded NumPy implementation, all
+              geometries. Always available.
+            - ``'sparse_matrix'``: System matrix of the ``'numpy'``
+              back-end, precomputed once and stored together with its
+              transpose. Fast for repeated evaluation of small to
+              mid-size problems, but memory-intensive.
 
             For the default ``None``, the fastest available back-end is
             used.
@@ -86,6 +97,17 @@ class RayTransformBase(Operator):
             and on the CPU, since a full volume and a projection dataset
             are stored. That may be prohibitive in 3D.
             Default: True
+        num_threads : positive int, optional
+            Number of threads used by the ``'numpy'`` and
+            ``'sparse_matrix'`` back-ends.
+            Default: number of CPUs
+        matrix_cache_dir : str, optional
+            Directory in which the ``'sparse_matrix'`` back-end stores
+            system matrices, keyed by a hash of geometry and
+            reconstruction space. Stored matrices are loaded as memory
+            maps by later instances with the same setup, also in other
+            processes. For ``None``, matrices are only cached in memory
+            (in ``geometry.implementation_cache``).
 
         Notes
         -----
@@ -114,10 +136,6 @@ class RayTransformBase(Operator):
                             '{!r}'.format(geometry))
 
         # Handle backend choice
-        if not _AVAILABLE_IMPLS:
-            raise RuntimeError('no ray transform back-end available; '
-                               'this requires 3rd party packages, please '
-                               'check the install docs')
         impl = kwargs.pop('impl', None)
         if impl is None:
             # Select fastest available
@@ -143,7 +161,7 @@ class RayTransformBase(Operator):
                         "`impl='skimage'`.",
                         RuntimeWarning)
             else:
-                raise RuntimeError('bad impl')
+                impl = 'numpy'
 
         impl, impl_in = str(impl).lower(), impl
         if impl not in _SUPPORTED_IMPL:
@@ -154,6 +172,10 @@ class RayTransformBase(Operator):
         # Cache for input/output arrays of transforms
         self.use_cache = kwargs.pop('use_cache', True)
 
+        # Settings for the 'numpy' and 'sparse_matrix' back-ends
+        self.num_threads = kwargs.pop('num_threads', None)
+        self.matrix_cache_dir = kwargs.pop('matrix_cache_dir', None)
+
         # Sanity checks
         if impl.startswith('astra'):
             if geometry.ndim > 2 and impl.endswith('cpu'):
@@ -207,6 +229,7 @@ class RayTransformBase(Operator):
 
         self.__geometry = geometry
         self.__impl = impl
+        self.__variant = variant
 
         # Generate or check projection space
         proj_space = kwargs.pop('proj_space', None)
@@ -285,6 +308,7 @@ class RayTransformBase(Operator):
         # Reserve name for cached properties (used for efficiency reasons)
         self._adjoint = None
         self._astra_wrapper = None
+        self._sparse_matrix_impl = None
 
         # Extra kwargs that can be reused for adjoint etc. These must
         # be retrieved with `get` instead of `pop` above.
@@ -308,6 +332,26 @@ class RayTransformBase(Operator):
         """Geometry of this operator."""
         return self.__geometry
 
+    @property
+    def opnorm_cache_key(self):
+        """Stable key of this operator for `estimate_opnorm`.
+
+        The key depends on the discretization of the reconstruction space,
+        the geometry and the weighting constants of domain and range. It is
+        ``None`` for spaces with non-constant weighting.
+        """
+        weightings = (self.domain.weighting, self.range.weighting)
+        if not all(isinstance(w, ConstWeighting) for w in weightings):
+            return None
+
+        if self.__variant == 'forward':
+            reco_space = self.domain
+        else:
+            reco_space = self.range
+        return '{}_{}_{!r}_{!r}'.format(
+            self.__variant, ray_trafo_matrix_key(reco_space, self.geometry),
+            float(weightings[0].const), float(weightings[1].const))
+
     def _call(self, x, out=None):
         """Return ``self(x[, out])``."""
         if self.domain.is_real:
@@ -347,13 +391,19 @@ class RayTransform(RayTransformBase):
 
         Other Parameters
         ----------------
-        impl : {`None`, 'astra_cuda', 'astra_cpu', 'skimage'}, optional
+        impl : {`None`, str}, optional
             Implementation back-end for the transform. Supported back-ends:
 
             - ``'astra_cuda'``: ASTRA toolbox, using CUDA, 2D or 3D
             - ``'astra_cpu'``: ASTRA toolbox using CPU, only 2D
             - ``'skimage'``: scikit-image, only 2D parallel with square
               reconstruction space.
+            - ``'numpy'``: Multi-threaded NumPy implementation, all
+              geometries. Always available.
+            - ``'sparse_matrix'``: System matrix of the ``'numpy'``
+              back-end, precomputed once and stored together with its
+              transpose. Fast for repeated evaluation of small to
+              mid-size problems, but memory-intensive.
 
             For the default ``None``, the fastest available back-end is
             used, tried in the above order.
@@ -371,6 +421,17 @@ class RayTransform(RayTransformBase):
             and on the CPU, since a full volume and a projection dataset
             are stored. That may be prohibitive in 3D.
             Default: True
+        num_threads : positive int, optional
+            Number of threads used by the ``'numpy'`` and
+            ``'sparse_matrix'`` back-ends.
+            Default: number of CPUs
+        matrix_cache_dir : str, optional
+            Directory in which the ``'sparse_matrix'`` back-end stores
+            system matrices, keyed by a hash of geometry and
+            reconstruction space. Stored matrices are loaded as memory
+            maps by later instances with the same setup, also in other
+            processes. For ``None``, matrices are only cached in memory
+            (in ``geometry.implementation_cache``).
 
         Notes
         -----
@@ -412,10 +473,183 @@ class RayTransform(RayTransformBase):
         elif self.impl == 'skimage':
             return skimage_radon_forward(x_real, self.geometry,
                                          self.range.real_space, out_real)
+        elif self.impl == 'numpy':
+            return numpy_forward_projector(x_real, self.geometry,
+                                           self.range.real_space, out_real,
+                                           num_threads=self.num_threads)
+        elif self.impl == 'sparse_matrix':
+            return self._get_sparse_matrix_impl().call_forward(x_real,
+                                                               out_real)
         else:
             # Should never happen
             raise RuntimeError('bad `impl` {!r}'.format(self.impl))
 
+    def _get_sparse_matrix_impl(self):
+        """Return the ``'sparse_matrix'`` back-end, creating it if needed."""
+        if self._sparse_matrix_impl is None:
+            self._sparse_matrix_impl = SparseMatrixRayTrafoImpl(
+                self.geometry, self.domain.real_space,
+                self.range.real_space, cache_dir=self.matrix_cache_dir,
+                num_threads=self.num_threads)
+        return self._sparse_matrix_impl
+
+    def subset_slices(self, num_subsets, order='interlaced'):
+        """Return slices of the angle axis defining subsets of the data.
+
+        Parameters
+        ----------
+        num_subsets : positive int
+            Number of subsets. It must not be larger than the number of
+            angles.
+        order : {'interlaced', 'block'}, optional
+            How the angles are distributed to the subsets.
+            ``'interlaced'``: Subset ``i`` contains every
+            ``num_subsets``-th angle, starting from angle ``i``. This is
+            the usual choice for ordered-subset methods since each
+            subset covers the full angular range.
+            ``'block'``: Each subset is a contiguous range of angles,
+            with sizes differing by at most 1.
+
+        Returns
+        -------
+        slices : list of slice
+            Slices of the first axis of the operator range.
+
+        Examples
+        --------
+        >>> space = odl.uniform_discr([-1, -1], [1, 1], (10, 10))
+        >>> geometry = odl.tomo.parallel_beam_geometry(space, num_angles=5)
+        >>> ray_trafo = odl.tomo.RayTransform(space, geometry, impl='numpy')
+        >>> ray_trafo.subset_slices(2)
+        [slice(0, 5, 2), slice(1, 5, 2)]
+        >>> ray_trafo.subset_slices(2, order='block')
+        [slice(0, 3, 1), slice(3, 5, 1)]
+        """
+        if self.geometry.motion_partition.ndim != 1:
+            raise NotImplementedError(
+                'subsets only supported for geometries with one motion '
+                'parameter, got {}'
+                ''.format(self.geometry.motion_partition.ndim))
+
+        num_angles = self.geometry.motion_partition.shape[0]
+        num_subsets, num_subsets_in = int(num_subsets), num_subsets
+        if not 0 < num_subsets <= num_angles:
+            raise ValueError('`num_subsets` must be between 1 and the '
+                             'number of angles {}, got {}'
+                             ''.format(num_angles, num_subsets_in))
+
+        order, order_in = str(order).lower(), order
+        if order == 'interlaced':
+            return [slice(i, num_angles, num_subsets)
+                    for i in range(num_subsets)]
+        elif order == 'block':
+            sizes = [len(a) for a in np.array_split(np.arange(num_angles),
+                                                    num_subsets)]
+            bounds = np.cumsum([0] + sizes)
+            return [slice(int(start), int(stop), 1)
+                    for start, stop in zip(bounds[:-1], bounds[1:])]
+        else:
+            raise ValueError('`order` {!r} not understood'.format(order_in))
+
+    def subsets(self, num_subsets, order='interlaced'):
+        """Return ray transforms for subsets of the projection angles.
+
+        The subsets are meant for ordered-subset methods like
+        `odl.solvers.osmlem`, `odl.solvers.kaczmarz` or SPDHG. Subset
+        ``i`` is the ray transform over ``geometry[slices[i]]``, where
+        ``slices = self.subset_slices(num_subsets, order)``, and its range
+        has the same weighting as the range of this operator. The
+        subsets are thus row blocks of this operator, i.e., the sum of
+        the back-projections of the data subsets is the back-projection
+        of the full data.
+
+        The subsets share the back-end state of this operator where
+        possible. For the ``'sparse_matrix'`` back-end, they use views
+        into one reordered copy of the system matrix, such that neither
+        the matrix computation nor its memory are multiplied by the
+        number of subsets.
+
+        Parameters
+        ----------
+        num_subsets : positive int
+            Number of subsets.
+        order : {'interlaced', 'block'}, optional
+            How the angles are distributed to the subsets, see
+            `subset_slices`.
+
+        Returns
+        -------
+        subsets : list of `RayTransform`
+            Ray transforms of the subsets.
+
+        Examples
+        --------
+        >>> space = odl.uniform_discr([-1, -1], [1, 1], (10, 10))
+        >>> geometry = odl.tomo.parallel_beam_geometry(space, num_angles=6)
+        >>> ray_trafo = odl.tomo.RayTransform(space, geometry,
+        ...                                   impl='sparse_matrix')
+        >>> subsets = ray_trafo.subsets(3)
+        >>> subsets[0].range.shape
+        (2, 17)
+
+        Data is split into subsets with the same slices:
+
+        >>> data = ray_trafo(odl.phantom.shepp_logan(space, modified=True))
+        >>> slices = ray_trafo.subset_slices(3)
+        >>> data_subsets = [op.range.element(data.asarray()[slc])
+        ...                 for op, slc in zip(subsets, slices)]
+        >>> backproj = sum(op.adjoint(d) for op, d in zip(subsets,
+        ...                                               data_subsets))
+        >>> backproj.dist(ray_trafo.adjoint(data)) < 1e-4
+        True
+        """
+        return self._subset_operators(self.subset_slices(num_subsets, order))
+
+    def _subset_operators(self, slices):
+        """Return ray transforms for slices of the angle axis.
+
+        See `subsets` for details.
+        """
+        try:
+            geometries = [self.geometry[slc] for slc in slices]
+        except TypeError:
+            raise NotImplementedError('{} does not support slicing'
+                                      ''.format(type(self.geometry).__name__))
+
+        kwargs = self._extra_kwargs.copy()
+        kwargs['num_threads'] = self.num_threads
+        kwargs['matrix_cache_dir'] = self.matrix_cache_dir
+        subsets = [RayTransform(self.domain, geometry,
+                                range=self._subset_range(geometry),
+                                impl=self.impl, use_cache=self.use_cache,
+                                **kwargs)
+                   for geometry in geometries]
+
+        if self.impl == 'sparse_matrix':
+            impls = self._get_sparse_matrix_impl().subsets(
+                slices, [op.range.real_space for op in subsets])
+            for op, impl in zip(subsets, impls):
+                op._sparse_matrix_impl = impl
+
+        return subsets
+
+    def _subset_range(self, geometry):
+        """Return the range for a sub-geometry, with the same weighting."""
+        ran = self.range
+        if not ran.is_weighted:
+            weighting = None
+        elif isinstance(ran.weighting, ConstWeighting):
+            weighting = ran.weighting.const
+        else:
+            raise NotImplementedError(
+                'subsets are only supported for ranges with constant '
+                'weighting, got weighting {!r}'.format(ran.weighting))
+        fspace = FunctionSpace(geometry.params, out_dtype=ran.dtype)
+        tspace = ran.tspace_type(geometry.partition.shape,
+                                 weighting=weighting, dtype=ran.dtype)
+        return DiscreteLp(fspace, geometry.partition, tspace,
+                          interp=ran.interp, axis_labels=ran.axis_labels)
+
     @property
     def adjoint(self):
         """Adjoint of this operator.
@@ -429,10 +663,16 @@ class RayTransform(RayTransformBase):
 
         kwargs = self._extra_kwargs.copy()
         kwargs['domain'] = self.range
+        kwargs['num_threads'] = self.num_threads
+        kwargs['matrix_cache_dir'] = self.matrix_cache_dir
         self._adjoint = RayBackProjection(self.domain, self.geometry,
                                           impl=self.impl,
                                           use_cache=self.use_cache,
                                           **kwargs)
+        if self.impl == 'sparse_matrix':
+            # Share the system matrix, creating it here if necessary
+            self._adjoint._sparse_matrix_impl = (
+                self._get_sparse_matrix_impl())
         return self._adjoint
 
 
@@ -454,13 +694,19 @@ class RayBackProjection(RayTransformBase):
 
         Other Parameters
         ----------------
-        impl : {`None`, 'astra_cuda', 'astra_cpu', 'skimage'}, optional
+        impl : {`None`, str}, optional
             Implementation back-end for the transform. Supported back-ends:
 
             - ``'astra_cuda'``: ASTRA toolbox, using CUDA, 2D or 3D
             - ``'astra_cpu'``: ASTRA toolbox using CPU, only 2D
             - ``'skimage'``: scikit-image, only 2D parallel with square
               reconstruction space.
+            - ``'numpy'``: Multi-threaded NumPy implementation, all
+              geometries. Always available.
+            - ``'sparse_matrix'``: System matrix of the ``'numpy'``
+              back-end, precomputed once and stored together with its
+              transpose. Fast for repeated evaluation of small to
+              mid-size problems, but memory-intensive.
 
             For the default ``None``, the fastest available back-end is
             used, tried in the above order.
@@ -479,6 +725,17 @@ class RayBackProjection(RayTransformBase):
             and on the CPU, since a full volume and a projection dataset
             are stored. That may be prohibitive in 3D.
             Default: True
+        num_threads : positive int, optional
+            Number of threads used by the ``'numpy'`` and
+            ``'sparse_matrix'`` back-ends.
+            Default: number of CPUs
+        matrix_cache_dir : str, optional
+            Directory in which the ``'sparse_matrix'`` back-end stores
+            system matrices, keyed by a hash of geometry and
+            reconstruction space. Stored matrices are loaded as memory
+            maps by later instances with the same setup, also in other
+            processes. For ``None``, matrices are only cached in memory
+            (in ``geometry.implementation_cache``).
 
         Notes
         -----
@@ -521,10 +778,26 @@ class RayBackProjection(RayTransformBase):
             return skimage_radon_back_projector(x_real, self.geometry,
                                                 self.range.real_space,
                                                 out_real)
+        elif self.impl == 'numpy':
+            return numpy_back_projector(x_real, self.geometry,
+                                        self.range.real_space, out_real,
+                                        num_threads=self.num_threads)
+        elif self.impl == 'sparse_matrix':
+            return self._get_sparse_matrix_impl().call_backward(x_real,
+                                                                out_real)
         else:
             # Should never happen
             raise RuntimeError('bad `impl` {!r}'.format(self.impl))
 
+    def _get_sparse_matrix_impl(self):
+        """Return the ``'sparse_matrix'`` back-end, creating it if needed."""
+        if self._sparse_matrix_impl is None:
+            self._sparse_matrix_impl = SparseMatrixRayTrafoImpl(
+                self.geometry, self.range.real_space,
+                self.domain.real_space, cache_dir=self.matrix_cache_dir,
+                num_threads=self.num_threads)
+        return self._sparse_matrix_impl
+
     @property
     def adjoint(self):
         """Adjoint of this operator.
@@ -538,10 +811,16 @@ class RayBackProjection(RayTransformBase):
 
         kwargs = self._extra_kwargs.copy()
         kwargs['range'] = self.domain
+        kwargs['num_threads'] = self.num_threads
+        kwargs['matrix_cache_dir'] = self.matrix_cache_dir
         self._adjoint = RayTransform(self.range, self.geometry,
                                      impl=self.impl,
                                      use_cache=self.use_cache,
                                      **kwargs)
+        if self.impl == 'sparse_matrix':
+            # Share the system matrix, creating it here if necessary
+            self._adjoint._sparse_matrix_impl = (
+                self._get_sparse_matrix_impl())
         return self._adjoint
 
 
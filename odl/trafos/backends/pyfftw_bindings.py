@@ -11,10 +11,22 @@
 The `pyFFTW <https://pyfftw.readthedocs.io>`_  package is a Python
 wrapper around the well-known `FFTW <http://fftw.org/>`_ library for fast
 Fourier transforms.
+
+FFTW plans are kept in a process-wide cache such that transforms of the
+same kind only pay the planning cost once. Since plans keep the arrays of
+their last call alive, the cache is bounded by the size of those arrays.
+If the environment variable ``ODL_FFTW_WISDOM`` is set to a file name,
+FFTW wisdom is loaded from that file when this module is imported and
+saved to it when the interpreter exits.
 """
 
 from __future__ import print_function, division, absolute_import
+import atexit
+from collections import OrderedDict
 from multiprocessing import cpu_count
+import os
+import pickle
+import threading
 import numpy as np
 from packaging.version import parse as parse_version
 import warnings
@@ -33,7 +45,18 @@ else:
 from odl.util import (
     is_real_dtype, dtype_repr, complex_dtype, normalized_axes_tuple)
 
-__all__ = ('pyfftw_call', 'PYFFTW_AVAILABLE')
+__all__ = ('pyfftw_call', 'PYFFTW_AVAILABLE', 'clear_fftw_plan_cache',
+           'import_fftw_wisdom', 'export_fftw_wisdom')
+
+
+# Maximum number of plans in the cache and maximum total size in bytes of
+# the arrays referenced by them, least recently used plans are discarded
+# first. Plans whose arrays alone exceed the size limit are not cached.
+PLAN_CACHE_SIZE = 32
+PLAN_CACHE_MAX_BYTES = 2 ** 28
+
+_PLAN_CACHE = OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
 
 
 def pyfftw_call(array_in, array_out, direction='forward', axes=None,
@@ -102,6 +125,14 @@ def pyfftw_call(array_in, array_out, direction='forward', axes=None,
         it is ignored.
     export_wisdom : filename or file handle, optional
         File to append the accumulated FFTW wisdom to
+    plan_cache : bool, optional
+        If ``True`` and ``fftw_plan`` is not given, look up a plan in the
+        process-wide plan cache and store newly created plans in it.
+        Plans are identified by shapes, data types, memory layout,
+        ``direction``, ``axes``, ``halfcomplex``, ``planning_effort`` and
+        ``threads``. The cache is bounded by `PLAN_CACHE_SIZE` plans and
+        `PLAN_CACHE_MAX_BYTES` bytes of referenced arrays.
+        Default: ``True``
 
     Returns
     -------
@@ -128,9 +159,10 @@ def pyfftw_call(array_in, array_out, direction='forward', axes=None,
       use ``'estimate'``.
     * If a plan is provided via the ``fftw_plan`` parameter, no copy
       is needed internally.
+    * Cached plans hold references to the arrays of their last call,
+      which count towards `PLAN_CACHE_MAX_BYTES`. Use
+      `clear_fftw_plan_cache` to free them.
     """
-    import pickle
-
     if not array_in.flags.aligned:
         raise ValueError('input array not aligned')
 
@@ -151,6 +183,7 @@ def pyfftw_call(array_in, array_out, direction='forward', axes=None,
     normalise_idft = kwargs.pop('normalise_idft', False)
     wimport = kwargs.pop('import_wisdom', '')
     wexport = kwargs.pop('export_wisdom', '')
+    use_cache = kwargs.pop('plan_cache', True)
 
     # Cast input to complex if necessary
     array_in_copied = False
@@ -175,34 +208,52 @@ def pyfftw_call(array_in, array_out, direction='forward', axes=None,
         if wisdom:
             pyfftw.import_wisdom(wisdom)
 
-    # Copy input array if it hasn't been done yet and the planner is likely
-    # to destroy it. If we already have a plan, we don't have to worry.
-    planner_destroys = _pyfftw_destroys_input(
-        [planning_effort], direction, halfcomplex, array_in.ndim)
-    must_copy_array_in = fftw_plan_in is None and planner_destroys
-
-    if must_copy_array_in and not array_in_copied:
-        plan_arr_in = np.empty_like(array_in)
-        flags = [_local_to_pyfftw(planning_effort), 'FFTW_DESTROY_INPUT']
-    else:
-        plan_arr_in = array_in
-        flags = [_local_to_pyfftw(planning_effort)]
-
     if fftw_plan_in is None:
         if threads is None:
-            if plan_arr_in.size <= 4096:  # Trade-off wrt threading overhead
+            if array_in.size <= 4096:  # Trade-off wrt threading overhead
                 threads = 1
             else:
                 threads = cpu_count()
 
-        fftw_plan = pyfftw.FFTW(
-            plan_arr_in, array_out, direction=_local_to_pyfftw(direction),
-            flags=flags, planning_timelimit=planning_timelimit,
-            threads=threads, axes=axes)
+        key = fftw_plan = lock = None
+        if use_cache:
+            key = _plan_cache_key(array_in, array_out, direction, axes,
+                                  halfcomplex, planning_effort, threads)
+            fftw_plan, lock = _cached_plan(key)
+
+        if fftw_plan is None:
+            # Copy input array if it hasn't been done yet and the planner
+            # is likely to destroy it.
+            planner_destroys = _pyfftw_destroys_input(
+                [planning_effort], direction, halfcomplex, array_in.ndim)
+
+            if planner_destroys and not array_in_copied:
+                plan_arr_in = np.empty_like(array_in)
+                flags = [_local_to_pyfftw(planning_effort),
+                         'FFTW_DESTROY_INPUT']
+            else:
+                plan_arr_in = array_in
+                flags = [_local_to_pyfftw(planning_effort)]
+
+            fftw_plan = pyfftw.FFTW(
+                plan_arr_in, array_out,
+                direction=_local_to_pyfftw(direction),
+                flags=flags, planning_timelimit=planning_timelimit,
+                threads=threads, axes=axes)
+
+            if use_cache:
+                lock = _cache_plan(key, fftw_plan)
     else:
         fftw_plan = fftw_plan_in
+        lock = _plan_lock(fftw_plan)
 
-    fftw_plan(array_in, array_out, normalise_idft=normalise_idft)
+    if lock is None:
+        fftw_plan(array_in, array_out, normalise_idft=normalise_idft)
+    else:
+        # Calling a plan updates its arrays, hence shared plans must not
+        # be used concurrently
+        with lock:
+            fftw_plan(array_in, array_out, normalise_idft=normalise_idft)
 
     if wexport:
         try:
@@ -214,6 +265,136 @@ def pyfftw_call(array_in, array_out, direction='forward', axes=None,
     return fftw_plan
 
 
+def _is_simd_aligned(arr):
+    """Return ``True`` if ``arr`` has the alignment preferred by FFTW."""
+    return arr.ctypes.data % pyfftw.simd_alignment == 0
+
+
+def _plan_cache_key(array_in, array_out, direction, axes, halfcomplex,
+                    planning_effort, threads):
+    """Return the plan cache key for the given transform parameters."""
+    # Plans can only be reused for arrays with the same memory layout
+    layout = tuple((arr.shape, arr.dtype, arr.strides, _is_simd_aligned(arr))
+                   for arr in (array_in, array_out))
+    return (layout, direction, tuple(axes), bool(halfcomplex),
+            planning_effort, threads)
+
+
+def _cached_plan(key):
+    """Return ``(plan, lock)`` for ``key``, or ``(None, None)``."""
+    with _PLAN_CACHE_LOCK:
+        try:
+            entry = _PLAN_CACHE.pop(key)
+        except KeyError:
+            return None, None
+        # Re-insert to mark as most recently used
+        _PLAN_CACHE[key] = entry
+        return entry[:2]
+
+
+def _plan_nbytes(fftw_plan):
+    """Return the size in bytes of the arrays referenced by a plan."""
+    return fftw_plan.input_array.nbytes + fftw_plan.output_array.nbytes
+
+
+def _cache_plan(key, fftw_plan):
+    """Store ``fftw_plan`` under ``key`` and return its lock.
+
+    The plan is not cached, and ``None`` is returned, if its arrays are
+    larger than `PLAN_CACHE_MAX_BYTES`.
+    """
+    # Calls of a plan rebind it to the arrays of the same layout, hence
+    # the size stays the same
+    nbytes = _plan_nbytes(fftw_plan)
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE.pop(key, None)
+        if nbytes > PLAN_CACHE_MAX_BYTES:
+            return None
+        lock = threading.Lock()
+        _PLAN_CACHE[key] = (fftw_plan, lock, nbytes)
+        total = sum(entry[2] for entry in _PLAN_CACHE.values())
+        while (len(_PLAN_CACHE) > max(PLAN_CACHE_SIZE, 0) or
+               total > PLAN_CACHE_MAX_BYTES):
+            total -= _PLAN_CACHE.popitem(last=False)[1][2]
+    return lock
+
+
+def _plan_lock(fftw_plan):
+    """Return the lock of a cached plan, or ``None`` if not cached."""
+    with _PLAN_CACHE_LOCK:
+        for plan, lock, _ in _PLAN_CACHE.values():
+            if plan is fftw_plan:
+                return lock
+    return None
+
+
+def clear_fftw_plan_cache():
+    """Remove all plans from the process-wide FFTW plan cache.
+
+    Examples
+    --------
+    >>> clear_fftw_plan_cache()
+    """
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE.clear()
+
+
+def import_fftw_wisdom(filename):
+    """Load FFTW wisdom from a file.
+
+    Parameters
+    ----------
+    filename : str
+        File that was written by `export_fftw_wisdom`.
+
+    Returns
+    -------
+    success : bool
+        ``True`` if wisdom was loaded, ``False`` if the file does not
+        exist or cannot be read.
+    """
+    try:
+        with open(filename, 'rb') as wfile:
+            wisdom = pickle.load(wfile)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError):
+        return False
+
+    pyfftw.import_wisdom(wisdom)
+    return True
+
+
+def export_fftw_wisdom(filename):
+    """Save the accumulated FFTW wisdom to a file.
+
+    The file is replaced atomically, such that concurrent processes
+    never read a partially written file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file to write.
+    """
+    filename = os.path.abspath(filename)
+    tmp_name = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(tmp_name, 'wb') as wfile:
+        pickle.dump(pyfftw.export_wisdom(), wfile)
+    try:
+        os.replace(tmp_name, filename)
+    except AttributeError:  # Python 2
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(tmp_name, filename)
+
+
+def _export_fftw_wisdom_at_exit(filename):
+    """Save FFTW wisdom to ``filename``, warning instead of failing."""
+    try:
+        export_fftw_wisdom(filename)
+    except (IOError, OSError) as err:
+        warnings.warn('failed to save FFTW wisdom to {!r}: {}'
+                      ''.format(filename, err), RuntimeWarning)
+
+
 def _pyfftw_to_local(flag):
     return flag.lstrip('FFTW_').lower()
 
@@ -298,6 +479,13 @@ def _pyfftw_check_args(arr_in, arr_out, axes, halfcomplex, direction):
         raise RuntimeError
 
 
+# Persistent wisdom across processes
+FFTW_WISDOM_FILE = os.environ.get('ODL_FFTW_WISDOM', None)
+if PYFFTW_AVAILABLE and FFTW_WISDOM_FILE:
+    import_fftw_wisdom(FFTW_WISDOM_FILE)
+    atexit.register(_export_fftw_wisdom_at_exit, FFTW_WISDOM_FILE)
+
+
 if __name__ == '__main__':
     from odl.util.testutils import run_doctests
     run_doctests(skip_if=not PYFFTW_AVAILABLE)
@@ -170,6 +170,15 @@ class DiscreteFourierTransformBase(Operator):
         else:
             out[:] = self._call_pyfftw(x.asarray(), out.asarray(), **kwargs)
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Transform a stack of inputs in one pass with the NumPy backend."""
+        if self.impl != 'numpy':
+            return super(DiscreteFourierTransformBase, self)._call_batch(
+                x, out, num_threads=num_threads)
+
+        # Axis 0 is the batch axis
+        out[:] = self._call_numpy(x, axes=[axis + 1 for axis in self.axes])
+
     @property
     def impl(self):
         """Backend for the FFT implementation."""
@@ -213,13 +222,15 @@ class DiscreteFourierTransformBase(Operator):
         """
         raise NotImplementedError('abstract method')
 
-    def _call_numpy(self, x):
+    def _call_numpy(self, x, axes=None):
         """Return ``self(x)`` using numpy.
 
         Parameters
         ----------
         x : `numpy.ndarray`
             Input array to be transformed
+        axes : sequence of ints, optional
+            Axes of ``x`` along which to transform. Default: `axes`
 
         Returns
         -------
@@ -316,6 +327,10 @@ class DiscreteFourierTransformBase(Operator):
         To save memory, clear the plan when the transform is no longer
         used (the plan stores 2 arrays).
 
+        The plan is also stored in a process-wide cache, such that other
+        transforms with the same parameters can reuse it without
+        planning.
+
         See Also
         --------
         clear_fftw_plan
@@ -343,7 +358,10 @@ class DiscreteFourierTransformBase(Operator):
 
         Notes
         -----
-        If no plan exists, this is a no-op.
+        If no plan exists, this is a no-op. The plan is still kept in the
+        process-wide plan cache, use
+        `odl.trafos.backends.pyfftw_bindings.clear_fftw_plan_cache` to
+        remove it from there.
         """
         if self.impl != 'pyfftw':
             raise ValueError('cannot create fftw plan without fftw backend')
@@ -440,7 +458,7 @@ class DiscreteFourierTransform(DiscreteFourierTransformBase):
             inverse=False, domain=domain, range=range, axes=axes,
             sign=sign, halfcomplex=halfcomplex, impl=impl)
 
-    def _call_numpy(self, x):
+    def _call_numpy(self, x, axes=None):
         """Return ``self(x)`` using numpy.
 
         See Also
@@ -448,16 +466,18 @@ class DiscreteFourierTransform(DiscreteFourierTransformBase):
         DiscreteFourierTransformBase._call_numpy
         """
         assert isinstance(x, np.ndarray)
+        if axes is None:
+            axes = self.axes
 
         if self.halfcomplex:
-            return np.fft.rfftn(x, axes=self.axes)
+            return np.fft.rfftn(x, axes=axes)
         else:
             if self.sign == '-':
-                return np.fft.fftn(x, axes=self.axes)
+                return np.fft.fftn(x, axes=axes)
             else:
                 # Need to undo Numpy IFFT scaling
                 return (np.prod(np.take(self.domain.shape, self.axes)) *
-                        np.fft.ifftn(x, axes=self.axes))
+                        np.fft.ifftn(x, axes=axes))
 
     def _call_pyfftw(self, x, out, **kwargs):
         """Implement ``self(x[, out, **kwargs])`` using pyfftw.
@@ -591,26 +611,33 @@ class DiscreteFourierTransformInverse(DiscreteFourierTransformBase):
             inverse=True, domain=range, range=domain, axes=axes,
             sign=sign, halfcomplex=halfcomplex, impl=impl)
 
-    def _call_numpy(self, x):
+    def _call_numpy(self, x, axes=None):
         """Return ``self(x)`` using numpy.
 
         Parameters
         ----------
         x : `numpy.ndarray`
             Input array to be transformed
+        axes : sequence of ints, optional
+            Axes of ``x`` along which to transform. Default: `axes`
 
         Returns
         -------
         out : `numpy.ndarray`
             Result of the transform
         """
+        if axes is None:
+            axes = self.axes
+
         if self.halfcomplex:
-            return np.fft.irfftn(x, axes=self.axes)
+            # Pass the shape explicitly, otherwise odd sizes are lost
+            return np.fft.irfftn(x, s=np.take(self.range.shape, self.axes),
+                                 axes=axes)
         else:
             if self.sign == '+':
-                return np.fft.ifftn(x, axes=self.axes)
+                return np.fft.ifftn(x, axes=axes)
             else:
-                return (np.fft.fftn(x, axes=self.axes) /
+                return (np.fft.fftn(x, axes=axes) /
                         np.prod(np.take(self.domain.shape, self.axes)))
 
     def _call_pyfftw(self, x, out, **kwargs):
@@ -1066,6 +1093,10 @@ class FourierTransformBase(Operator):
         To save memory, clear the plan when the transform is no longer
         used (the plan stores 2 arrays).
 
+        The plan is also stored in a process-wide cache, such that other
+        transforms with the same parameters can reuse it without
+        planning.
+
         See Also
         --------
         clear_fftw_plan
@@ -1133,7 +1164,10 @@ class FourierTransformBase(Operator):
 
         Notes
         -----
-        If no plan exists, this is a no-op.
+        If no plan exists, this is a no-op. The plan is still kept in the
+        process-wide plan cache, use
+        `odl.trafos.backends.pyfftw_bindings.clear_fftw_plan_cache` to
+        remove it from there.
         """
 
         if self.impl != 'pyfftw':
@@ -431,6 +431,23 @@ class WaveletTransform(WaveletTransformBase):
         else:
             raise RuntimeError("bad `impl` '{}'".format(self.impl))
 
+    def _call_batch(self, x, out, num_threads=None):
+        """Return wavelet transforms of a stack of inputs in one pass."""
+        if self.impl != 'pywt':
+            raise RuntimeError("bad `impl` '{}'".format(self.impl))
+
+        # Axis 0 is the batch axis, it is not transformed
+        coeffs = pywt.wavedecn(
+            x, wavelet=self.pywt_wavelet, level=self.nlevels,
+            mode=self.pywt_pad_mode, axes=[axis + 1 for axis in self.axes])
+
+        # Ravel per stack entry, with the same layout as `_call`
+        num = x.shape[0]
+        out[:, self._coeff_slices[0]] = coeffs[0].reshape(num, -1)
+        for details, slices in zip(coeffs[1:], self._coeff_slices[1:]):
+            for key, slc in slices.items():
+                out[:, slc] = details[key].reshape(num, -1)
+
     @property
     def adjoint(self):
         """Adjoint wavelet transform.
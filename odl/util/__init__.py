@@ -9,10 +9,26 @@
 """Utility library for ODL, mainly for internal use."""
 
 from __future__ import absolute_import
+import sys
 
 __all__ = ()
 
-from .testutils import *
+if sys.version_info >= (3, 7):
+    from . import testutils
+    # Bind everything but the pytest marks, which are created on first
+    # access through `__getattr__`
+    globals().update((name, getattr(testutils, name))
+                     for name in testutils.__all__
+                     if name not in testutils._PUBLIC_PYTEST_MARKS)
+
+    def __getattr__(name):
+        """Forward access to the lazily created pytest marks."""
+        if name in testutils._PUBLIC_PYTEST_MARKS:
+            return getattr(testutils, name)
+        raise AttributeError('module {!r} has no attribute {!r}'
+                             ''.format(__name__, name))
+else:
+    from .testutils import *
 __all__ += testutils.__all__
 
 from .utility import *
@@ -33,4 +49,10 @@ __all__ += numerics.__all__
 from .vectorization import *
 __all__ += vectorization.__all__
 
+from .profiling import *
+__all__ += profiling.__all__
+
+from .parallel import *
+__all__ += parallel.__all__
+
 from . import ufuncs
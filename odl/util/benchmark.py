@@ -0,0 +1,379 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Recording and comparison of benchmark timings.
+
+The benchmark suite in ``odl/test/benchmark`` is run with ::
+
+    pytest odl/test/benchmark --benchmark --benchmark-json=results.json
+
+and two result files can be compared with ::
+
+    python -m odl.util.benchmark compare baseline.json results.json
+
+which exits with a nonzero status if a benchmark got slower than the
+allowed threshold.
+"""
+
+from __future__ import print_function, division, absolute_import
+from builtins import object
+import argparse
+import datetime
+import importlib
+import json
+import multiprocessing
+import platform
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+__all__ = ('machine_info', 'time_function', 'BenchmarkRecorder',
+           'load_benchmark_results', 'compare_benchmark_results')
+
+
+_VERSIONED_PACKAGES = ('numpy', 'scipy', 'pyfftw', 'pywt', 'astra',
+                       'skimage')
+
+
+def machine_info():
+    """Return a dictionary describing the machine and the software stack.
+
+    The packages are only listed if they are installed. Optional backends
+    are imported by this function.
+    """
+    import odl
+
+    versions = {'odl': odl.__version__}
+    for name in _VERSIONED_PACKAGES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        versions[name] = str(getattr(module, '__version__', 'unknown'))
+
+    uname = platform.uname()
+    return {
+        'python': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'system': uname[0],
+        'release': uname[2],
+        'machine': uname[4],
+        'processor': platform.processor() or uname[4],
+        'node': uname[1],
+        'cpu_count': multiprocessing.cpu_count(),
+        'versions': versions}
+
+
+def time_function(func, repeat=5, number=None, min_time=0.2):
+    """Return timing statistics of ``func()`` in seconds per call.
+
+    Parameters
+    ----------
+    func : callable
+        Function without arguments to be timed.
+    repeat : positive int, optional
+        Number of measurements. Each measurement consists of ``number``
+        calls of ``func``.
+    number : positive int, optional
+        Number of calls per measurement. By default, it is chosen such
+        that one measurement takes at least ``min_time`` seconds.
+    min_time : float, optional
+        Minimum duration of one measurement if ``number`` is not given.
+
+    Returns
+    -------
+    timing : dict
+        Dictionary with the keys ``'min'``, ``'median'``, ``'mean'``,
+        ``'std'`` (all in seconds per call), ``'repeat'`` and ``'number'``.
+
+    Examples
+    --------
+    >>> timing = time_function(lambda: sum(range(100)), repeat=3, number=10)
+    >>> timing['repeat'], timing['number']
+    (3, 10)
+    >>> timing['min'] <= timing['median']
+    True
+    """
+    repeat, repeat_in = int(repeat), repeat
+    if repeat < 1:
+        raise ValueError('`repeat` must be positive, got {}'
+                         ''.format(repeat_in))
+
+    def measure(n):
+        tstart = default_timer()
+        for _ in range(n):
+            func()
+        return default_timer() - tstart
+
+    if number is None:
+        # Warm-up call, also used to calibrate the number of calls
+        number = 1
+        elapsed = measure(1)
+        while elapsed < min_time:
+            number *= 10 if elapsed < min_time / 10 else 2
+            elapsed = measure(number)
+    else:
+        number, number_in = int(number), number
+        if number < 1:
+            raise ValueError('`number` must be positive, got {}'
+                             ''.format(number_in))
+        measure(1)
+
+    times = np.array([measure(number) for _ in range(repeat)]) / number
+    return {'min': float(np.min(times)),
+            'median': float(np.median(times)),
+            'mean': float(np.mean(times)),
+            'std': float(np.std(times)),
+            'repeat': repeat,
+            'number': number}
+
+
+class BenchmarkRecorder(object):
+
+    """Collection of benchmark timings that can be written to JSON.
+
+    Examples
+    --------
+    >>> recorder = BenchmarkRecorder()
+    >>> timing = recorder.run('sum', lambda: sum(range(100)), repeat=2,
+    ...                       number=10, params={'n': 100})
+    >>> sorted(recorder.results['sum'])
+    ['mean', 'median', 'min', 'number', 'params', 'repeat', 'std']
+    """
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self.results = {}
+
+    def add(self, name, timing, params=None):
+        """Store ``timing`` under ``name``, overwriting earlier results."""
+        result = dict(timing)
+        if params is not None:
+            result['params'] = {str(key): _jsonify(value)
+                                for key, value in params.items()}
+        self.results[str(name)] = result
+
+    def run(self, name, func, params=None, **kwargs):
+        """Time ``func`` with `time_function` and store the result.
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the benchmark.
+        func : callable
+            Function without arguments to be timed.
+        params : dict, optional
+            Parameters of the benchmark, stored with the timing.
+        kwargs :
+            Further keyword arguments passed to `time_function`.
+
+        Returns
+        -------
+        timing : dict
+            The timing statistics, see `time_function`.
+        """
+        timing = time_function(func, **kwargs)
+        self.add(name, timing, params)
+        return timing
+
+    def save(self, filename):
+        """Write the results and `machine_info` to a JSON file."""
+        data = {'machine': machine_info(),
+                'date': datetime.datetime.now().isoformat(),
+                'results': self.results}
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def __len__(self):
+        """Return ``len(self)``."""
+        return len(self.results)
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}()'.format(self.__class__.__name__)
+
+
+def _jsonify(value):
+    """Return ``value`` or its string representation if not serializable."""
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_jsonify(v) for v in value]
+    return str(value)
+
+
+def load_benchmark_results(filename):
+    """Return the data of a JSON file written by `BenchmarkRecorder.save`.
+
+    Returns
+    -------
+    data : dict
+        Dictionary with the keys ``'machine'``, ``'date'`` and
+        ``'results'``.
+    """
+    with open(filename) as f:
+        data = json.load(f)
+    if 'results' not in data:
+        raise ValueError('{!r} does not contain benchmark results'
+                         ''.format(filename))
+    return data
+
+
+def compare_benchmark_results(baseline, current, threshold=0.1,
+                              stat='min'):
+    """Compare two sets of benchmark results.
+
+    Parameters
+    ----------
+    baseline, current : dict
+        Benchmark data as returned by `load_benchmark_results`, or only
+        the ``'results'`` part of it.
+    threshold : nonnegative float, optional
+        Relative slow-down (or speed-up) above which a benchmark is
+        flagged. For example, ``0.1`` flags benchmarks that got more than
+        10 % slower.
+    stat : {'min', 'median', 'mean'}, optional
+        Statistic of the timings that is compared. The minimum is the
+        least sensitive to noise from other processes.
+
+    Returns
+    -------
+    comparison : list of tuple
+        One tuple ``(name, baseline_time, current_time, ratio, status)``
+        per benchmark, sorted by name. ``status`` is one of
+        ``'regression'``, ``'improvement'``, ``'ok'``, ``'new'`` and
+        ``'missing'``, where the latter two mean that the benchmark only
+        exists in ``current`` or ``baseline``, respectively.
+
+    Examples
+    --------
+    >>> baseline = {'a': {'min': 1.0}, 'b': {'min': 1.0}, 'c': {'min': 1.0}}
+    >>> current = {'a': {'min': 1.5}, 'b': {'min': 1.05}, 'd': {'min': 1.0}}
+    >>> for row in compare_benchmark_results(baseline, current):
+    ...     print(row)
+    ('a', 1.0, 1.5, 1.5, 'regression')
+    ('b', 1.0, 1.05, 1.05, 'ok')
+    ('c', 1.0, None, None, 'missing')
+    ('d', None, 1.0, None, 'new')
+    """
+    threshold, threshold_in = float(threshold), threshold
+    if threshold < 0:
+        raise ValueError('`threshold` must be nonnegative, got {}'
+                         ''.format(threshold_in))
+    if stat not in ('min', 'median', 'mean'):
+        raise ValueError('`stat` {!r} not understood'.format(stat))
+
+    baseline = baseline.get('results', baseline)
+    current = current.get('results', current)
+
+    comparison = []
+    for name in sorted(set(baseline).union(current)):
+        if name not in current:
+            comparison.append((name, baseline[name][stat], None, None,
+                               'missing'))
+        elif name not in baseline:
+            comparison.append((name, None, current[name][stat], None,
+                               'new'))
+        else:
+            t_base = baseline[name][stat]
+            t_cur = current[name][stat]
+            ratio = t_cur / t_base if t_base > 0 else float('inf')
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'improvement'
+            else:
+                status = 'ok'
+            comparison.append((name, t_base, t_cur, ratio, status))
+
+    return comparison
+
+
+def _format_time(t):
+    """Return ``t`` seconds as string with a suitable unit."""
+    if t is None:
+        return '-'
+    for unit, factor in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if t >= factor:
+            return '{:.3f} {}'.format(t / factor, unit)
+    return '{:.3f} ns'.format(t / 1e-9)
+
+
+def _print_comparison(comparison, baseline, current, file=None):
+    """Print a table of ``comparison`` and differing machine info."""
+    file = sys.stdout if file is None else file
+    machine_base = baseline.get('machine', {})
+    machine_cur = current.get('machine', {})
+    for key in sorted(set(machine_base).union(machine_cur)):
+        if machine_base.get(key) != machine_cur.get(key):
+            print('warning: {} differs: {!r} != {!r}'.format(
+                key, machine_base.get(key), machine_cur.get(key)),
+                file=file)
+
+    width = max([len('benchmark')] + [len(row[0]) for row in comparison])
+    row_fmt = '{:<' + str(width) + 's} {:>12s} {:>12s} {:>8s}  {}'
+    print(row_fmt.format('benchmark', 'baseline', 'current', 'ratio',
+                         'status'), file=file)
+    for name, t_base, t_cur, ratio, status in comparison:
+        ratio_str = '-' if ratio is None else '{:.2f}'.format(ratio)
+        print(row_fmt.format(name, _format_time(t_base),
+                             _format_time(t_cur), ratio_str, status),
+              file=file)
+
+
+def main(argv=None):
+    """Command line interface, see ``python -m odl.util.benchmark -h``.
+
+    Returns
+    -------
+    status : int
+        1 if a regression (or a missing benchmark with ``--strict``) was
+        found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m odl.util.benchmark',
+        description='Tools for ODL benchmark results.')
+    subparsers = parser.add_subparsers(dest='command')
+    compare = subparsers.add_parser(
+        'compare', help='compare results against a baseline')
+    compare.add_argument('baseline', help='JSON file with baseline results')
+    compare.add_argument('current', help='JSON file with current results')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help='relative slow-down that counts as '
+                         'regression (default: %(default)s)')
+    compare.add_argument('--stat', choices=('min', 'median', 'mean'),
+                         default='min',
+                         help='compared statistic (default: %(default)s)')
+    compare.add_argument('--strict', action='store_true',
+                         help='also fail if a baseline benchmark is '
+                         'missing')
+
+    args = parser.parse_args(argv)
+    if args.command != 'compare':
+        parser.print_help()
+        return 2
+
+    baseline = load_benchmark_results(args.baseline)
+    current = load_benchmark_results(args.current)
+    comparison = compare_benchmark_results(
+        baseline, current, threshold=args.threshold, stat=args.stat)
+    _print_comparison(comparison, baseline, current)
+
+    failed = ('regression', 'missing') if args.strict else ('regression',)
+    num_failed = sum(row[-1] in failed for row in comparison)
+    if num_failed:
+        print('{} benchmark(s) failed'.format(num_failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
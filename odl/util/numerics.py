@@ -15,7 +15,7 @@ from odl.util.normalize import normalized_scalar_param_list, safe_int_conv
 
 
 __all__ = ('apply_on_boundary', 'fast_1d_tensor_mult', 'resize_array',
-           'zscore')
+           'zscore', 'batched_eigh', 'batched_svdvals', 'batched_svd_map')
 
 
 _SUPPORTED_RESIZE_PAD_MODES = ('constant', 'symmetric', 'periodic',
@@ -847,6 +847,381 @@ def zscore(arr):
     return arr
 
 
+# Number of matrices processed at once in the batched small matrix
+# functions, bounding the size of temporary arrays
+SMALL_MATRIX_CHUNK_SIZE = 4096
+
+# Singular values from the closed-form eigenvalues of ``A^T A`` lose
+# accuracy for matrices whose smallest singular value, or for 3x3 the gap
+# between two singular values, is below this fraction of the largest
+# singular value. Those are handed over to `numpy.linalg.svd`.
+_SVD_CLOSED_FORM_RTOL = 1e-3
+
+
+def _chunks(size, chunk_size):
+    """Yield slices of length ``chunk_size`` covering ``range(size)``."""
+    if chunk_size is None:
+        chunk_size = SMALL_MATRIX_CHUNK_SIZE
+    for start in range(0, size, chunk_size):
+        yield slice(start, min(start + chunk_size, size))
+
+
+def _eigvalsh_2x2(a, b, c):
+    """Eigenvalues of symmetric 2x2 matrices ``[[a, b], [b, c]]``.
+
+    Returns the eigenvalues in ascending order and the rotation angle
+    of the eigenvector of the largest eigenvalue.
+    """
+    mean = (a + c) / 2
+    radius = np.hypot((a - c) / 2, b)
+    angle = np.arctan2(2 * b, a - c) / 2
+    return mean - radius, mean + radius, angle
+
+
+def _eigh_2x2(mat):
+    """Eigendecomposition of a stack of symmetric 2x2 matrices."""
+    lam_lo, lam_hi, angle = _eigvalsh_2x2(mat[:, 0, 0], mat[:, 0, 1],
+                                          mat[:, 1, 1])
+    cos, sin = np.cos(angle), np.sin(angle)
+    eigvecs = np.empty_like(mat)
+    eigvecs[:, 0, 0] = -sin
+    eigvecs[:, 1, 0] = cos
+    eigvecs[:, 0, 1] = cos
+    eigvecs[:, 1, 1] = sin
+    return np.stack([lam_lo, lam_hi], axis=-1), eigvecs
+
+
+def _eigvalsh_3x3(mat):
+    """Eigenvalues of a stack of symmetric 3x3 matrices, ascending.
+
+    Uses the trigonometric solution of the characteristic polynomial,
+    see `Smith (1961) <https://doi.org/10.1145/355578.366316>`_.
+    """
+    a00, a11, a22 = mat[:, 0, 0], mat[:, 1, 1], mat[:, 2, 2]
+    a01, a02, a12 = mat[:, 0, 1], mat[:, 0, 2], mat[:, 1, 2]
+
+    q = (a00 + a11 + a22) / 3
+    b00, b11, b22 = a00 - q, a11 - q, a22 - q
+    p = np.sqrt((b00 ** 2 + b11 ** 2 + b22 ** 2 +
+                 2 * (a01 ** 2 + a02 ** 2 + a12 ** 2)) / 6)
+    # Multiples of the identity have p = 0 and a triple eigenvalue q
+    p_safe = np.where(p > 0, p, 1)
+    det = (b00 * (b11 * b22 - a12 ** 2) -
+           a01 * (a01 * b22 - a12 * a02) +
+           a02 * (a01 * a12 - b11 * a02))
+    r = np.clip(det / (2 * p_safe ** 3), -1, 1)
+    phi = np.arccos(r) / 3
+
+    lam_max = q + 2 * p * np.cos(phi)
+    lam_min = q + 2 * p * np.cos(phi + 2 * np.pi / 3)
+    lam_mid = 3 * q - lam_max - lam_min
+    return lam_min, lam_mid, lam_max
+
+
+def _eigh_3x3(mat):
+    """Eigendecomposition of a stack of symmetric 3x3 matrices.
+
+    The eigenvector of the eigenvalue that is best separated from the
+    others is computed from cross products of the rows of
+    ``mat - lambda * I``. The remaining two are found from the 2x2
+    problem in the orthogonal complement, which is robust also for
+    repeated eigenvalues, see D. Eberly, *A Robust Eigensolver for 3 x 3
+    Symmetric Matrices*, 2014.
+    """
+    lam_min, lam_mid, lam_max = _eigvalsh_3x3(mat)
+    use_max = (lam_max - lam_mid) >= (lam_mid - lam_min)
+    lam0 = np.where(use_max, lam_max, lam_min)
+
+    # Eigenvector of lam0 as the largest cross product of two rows
+    shifted = mat.copy()
+    for i in range(3):
+        shifted[:, i, i] -= lam0
+    rows = [shifted[:, i, :] for i in range(3)]
+    crosses = [np.cross(rows[0], rows[1]), np.cross(rows[0], rows[2]),
+               np.cross(rows[1], rows[2])]
+    sq_norms = np.stack([np.sum(c ** 2, axis=-1) for c in crosses], axis=-1)
+    best = np.argmax(sq_norms, axis=-1)
+    v0 = np.choose(best[:, None], crosses)
+    v0_norm = np.sqrt(np.max(sq_norms, axis=-1))
+    # Zero for multiples of the identity, any unit vector will do then
+    degenerate = v0_norm == 0
+    v0[degenerate] = [1, 0, 0]
+    v0_norm[degenerate] = 1
+    v0 /= v0_norm[:, None]
+
+    # Orthonormal basis (u, w) of the complement of v0
+    x, y, z = v0[:, 0], v0[:, 1], v0[:, 2]
+    use_x = np.abs(x) > np.abs(y)
+    u = np.where(use_x[:, None],
+                 np.stack([-z, np.zeros_like(z), x], axis=-1),
+                 np.stack([np.zeros_like(z), z, -y], axis=-1))
+    u /= np.sqrt(np.sum(u ** 2, axis=-1))[:, None]
+    w = np.cross(v0, u)
+
+    # 2x2 problem in the complement
+    mat_u = np.matmul(mat, u[:, :, None])[:, :, 0]
+    mat_w = np.matmul(mat, w[:, :, None])[:, :, 0]
+    lam_lo, lam_hi, angle = _eigvalsh_2x2(np.sum(u * mat_u, axis=-1),
+                                          np.sum(u * mat_w, axis=-1),
+                                          np.sum(w * mat_w, axis=-1))
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    v_hi = cos * u + sin * w
+    v_lo = cos * w - sin * u
+
+    # Sort ascending: lam0 is either the largest or the smallest
+    use_max_v = use_max[:, None]
+    eigvals = np.where(use_max_v,
+                       np.stack([lam_lo, lam_hi, lam0], axis=-1),
+                       np.stack([lam0, lam_lo, lam_hi], axis=-1))
+    eigvecs = np.empty_like(mat)
+    eigvecs[:, :, 0] = np.where(use_max_v, v_lo, v0)
+    eigvecs[:, :, 1] = np.where(use_max_v, v_hi, v_lo)
+    eigvecs[:, :, 2] = np.where(use_max_v, v0, v_hi)
+    return eigvals, eigvecs
+
+
+def _is_small_real(arr):
+    """Return ``True`` if the closed-form formulas apply to ``arr``."""
+    return (np.issubdtype(arr.dtype, np.floating) and
+            min(arr.shape[-2:]) <= 3)
+
+
+def batched_eigh(arr, chunk_size=None):
+    """Return the eigendecomposition of a stack of symmetric matrices.
+
+    For real matrices of size up to 3x3, closed-form expressions are
+    evaluated in double precision, which is much faster than
+    `numpy.linalg.eigh` for many small matrices. Other cases are handed
+    over to `numpy.linalg.eigh`.
+
+    Parameters
+    ----------
+    arr : `array-like`
+        Array of shape ``(..., n, n)`` containing symmetric matrices in
+        the last two axes. Only the upper triangle is used.
+    chunk_size : positive int, optional
+        Number of matrices processed at once.
+        Default: `SMALL_MATRIX_CHUNK_SIZE`
+
+    Returns
+    -------
+    eigvals : `numpy.ndarray`
+        Eigenvalues in ascending order, shape ``(..., n)``.
+    eigvecs : `numpy.ndarray`
+        Normalized eigenvectors as columns, shape ``(..., n, n)``.
+
+    Examples
+    --------
+    >>> eigvals, eigvecs = batched_eigh([[[2.0, 1.0],
+    ...                                   [1.0, 2.0]]])
+    >>> eigvals
+    array([[ 1.,  3.]])
+    >>> np.allclose(np.abs(eigvecs), np.sqrt(0.5))
+    True
+    """
+    arr = np.asarray(arr)
+    if arr.ndim < 2 or arr.shape[-1] != arr.shape[-2]:
+        raise ValueError('`arr` must have shape (..., n, n), got {}'
+                         ''.format(arr.shape))
+    n = arr.shape[-1]
+    if not _is_small_real(arr) or n == 1:
+        return np.linalg.eigh(arr, UPLO='U')
+
+    flat = arr.reshape((-1, n, n))
+    eigvals = np.empty(flat.shape[:2], dtype=arr.dtype)
+    eigvecs = np.empty(flat.shape, dtype=arr.dtype)
+    # Symmetrize from the upper triangle, like `UPLO='U'`
+    triu = np.triu_indices(n, 1)
+    for slc in _chunks(len(flat), chunk_size):
+        mat = flat[slc].astype('float64')
+        mat[:, triu[1], triu[0]] = mat[:, triu[0], triu[1]]
+        if n == 2:
+            eigvals[slc], eigvecs[slc] = _eigh_2x2(mat)
+        else:
+            eigvals[slc], eigvecs[slc] = _eigh_3x3(mat)
+
+    return (eigvals.reshape(arr.shape[:-1]), eigvecs.reshape(arr.shape))
+
+
+def _gram(mat):
+    """Return the smaller one of ``A^T A`` and ``A A^T``."""
+    if mat.shape[-1] <= mat.shape[-2]:
+        return np.matmul(mat.swapaxes(-1, -2), mat)
+    else:
+        return np.matmul(mat, mat.swapaxes(-1, -2))
+
+
+def _inaccurate_svdvals(svdvals):
+    """Return a mask of closed-form singular values that are inaccurate.
+
+    ``svdvals`` is an array of shape ``(N, k)`` with singular values in
+    descending order. Besides (close to) rank-deficient matrices, this
+    includes 3x3 problems with (nearly) repeated singular values, for
+    which the trigonometric solution loses about half of the digits.
+    """
+    if svdvals.shape[-1] == 1:
+        return np.zeros(len(svdvals), dtype=bool)
+    tol = _SVD_CLOSED_FORM_RTOL * svdvals[:, 0]
+    inaccurate = svdvals[:, -1] < tol
+    if svdvals.shape[-1] == 3:
+        gaps = svdvals[:, :-1] - svdvals[:, 1:]
+        inaccurate |= np.min(gaps, axis=-1) < tol
+    return inaccurate
+
+
+def batched_svdvals(arr, chunk_size=None):
+    """Return the singular values of a stack of matrices.
+
+    For real matrices with at most 3 rows or columns, the singular values
+    are computed in double precision from the closed-form eigenvalues of
+    ``A^T A`` or ``A A^T``, otherwise with `numpy.linalg.svd`. Matrices
+    that are (close to) rank-deficient, and 3x3 problems with (nearly)
+    repeated singular values, are also handed over to `numpy.linalg.svd`
+    since the closed forms are inaccurate for them.
+
+    Parameters
+    ----------
+    arr : `array-like`
+        Array of shape ``(..., n, m)`` containing matrices in the last
+        two axes.
+    chunk_size : positive int, optional
+        Number of matrices processed at once.
+        Default: `SMALL_MATRIX_CHUNK_SIZE`
+
+    Returns
+    -------
+    svdvals : `numpy.ndarray`
+        Singular values in descending order, shape ``(..., min(n, m))``.
+
+    Examples
+    --------
+    >>> batched_svdvals([[[3.0, 0.0],
+    ...                   [4.0, 5.0]]])
+    array([[ 6.70820393,  2.23606798]])
+    """
+    arr = np.asarray(arr)
+    if arr.ndim < 2:
+        raise ValueError('`arr` must have shape (..., n, m), got {}'
+                         ''.format(arr.shape))
+    if not _is_small_real(arr):
+        return np.linalg.svd(arr, compute_uv=False)
+
+    n, m = arr.shape[-2:]
+    k = min(n, m)
+    flat = arr.reshape((-1, n, m))
+    svdvals = np.empty((len(flat), k), dtype=arr.dtype)
+    for slc in _chunks(len(flat), chunk_size):
+        mat = flat[slc]
+        gram = _gram(mat.astype('float64'))
+        if k == 1:
+            eigvals = gram[:, :, 0]
+        elif k == 2:
+            lam_lo, lam_hi, _ = _eigvalsh_2x2(gram[:, 0, 0], gram[:, 0, 1],
+                                              gram[:, 1, 1])
+            eigvals = np.stack([lam_hi, lam_lo], axis=-1)
+        else:
+            eigvals = np.stack(_eigvalsh_3x3(gram)[::-1], axis=-1)
+        chunk_svdvals = np.sqrt(np.maximum(eigvals, 0))
+        inaccurate = _inaccurate_svdvals(chunk_svdvals)
+        if np.any(inaccurate):
+            chunk_svdvals[inaccurate] = np.linalg.svd(mat[inaccurate],
+                                                      compute_uv=False)
+        svdvals[slc] = chunk_svdvals
+
+    return svdvals.reshape(arr.shape[:-2] + (k,))
+
+
+def batched_svd_map(arr, func, out=None, chunk_size=None):
+    """Apply a function to the singular values of a stack of matrices.
+
+    For each matrix ``A = U diag(s) V^T`` in the stack, the result is
+    ``U diag(func(s)) V^T``. It is computed as ``A V diag(func(s) / s) V^T``
+    (or the transposed variant), with the closed-form eigendecomposition
+    of ``A^T A`` in double precision for real matrices with at most 3
+    rows or columns, and with `numpy.linalg.svd` otherwise, including
+    (close to) rank-deficient matrices and 3x3 problems with (nearly)
+    repeated singular values.
+
+    Parameters
+    ----------
+    arr : `array-like`
+        Array of shape ``(..., n, m)`` containing matrices in the last
+        two axes.
+    func : callable
+        Function mapping an array of shape ``(N, min(n, m))`` of singular
+        values (of ``N`` matrices) to an array of the same shape. It must
+        map zero singular values to zero.
+    out : `numpy.ndarray`, optional
+        Array of the same shape as ``arr`` to which the result is written.
+    chunk_size : positive int, optional
+        Number of matrices processed at once.
+        Default: `SMALL_MATRIX_CHUNK_SIZE`
+
+    Returns
+    -------
+    out : `numpy.ndarray`
+        The result of the mapping. If ``out`` was given, the returned
+        object is a reference to it.
+
+    Examples
+    --------
+    Soft-thresholding of the singular values of a diagonal matrix:
+
+    >>> arr = np.array([[[3.0, 0.0],
+    ...                  [0.0, -0.5]]])
+    >>> batched_svd_map(arr, lambda s: np.maximum(s - 1, 0))
+    array([[[ 2.,  0.],
+            [ 0.,  0.]]])
+    """
+    arr = np.asarray(arr)
+    if arr.ndim < 2:
+        raise ValueError('`arr` must have shape (..., n, m), got {}'
+                         ''.format(arr.shape))
+    if out is None:
+        out = np.empty_like(arr)
+    elif out.shape != arr.shape:
+        raise ValueError('`out` must have shape {}, got {}'
+                         ''.format(arr.shape, out.shape))
+
+    n, m = arr.shape[-2:]
+    flat = arr.reshape((-1, n, m))
+    out_flat = out.reshape((-1, n, m))
+
+    def svd_map(mat):
+        """Apply the mapping using `numpy.linalg.svd`."""
+        u, svdvals, vt = np.linalg.svd(mat, full_matrices=False)
+        return np.matmul(u * func(svdvals)[:, None, :], vt)
+
+    for slc in _chunks(len(flat), chunk_size):
+        mat = flat[slc]
+        if not _is_small_real(arr):
+            out_flat[slc] = svd_map(mat)
+            continue
+
+        mat = mat.astype('float64')
+        eigvals, eigvecs = batched_eigh(_gram(mat), chunk_size=len(mat))
+        svdvals = np.sqrt(np.maximum(eigvals, 0))
+        # Ascending order here, hence reversed for the accuracy check
+        inaccurate = _inaccurate_svdvals(svdvals[:, ::-1])
+        new_svdvals = func(svdvals)
+        factors = np.zeros_like(svdvals)
+        nonzero = svdvals > 0
+        factors[nonzero] = new_svdvals[nonzero] / svdvals[nonzero]
+        spectral = np.matmul(eigvecs * factors[:, None, :],
+                             eigvecs.swapaxes(-1, -2))
+        if m <= n:
+            result = np.matmul(mat, spectral)
+        else:
+            result = np.matmul(spectral, mat)
+        if np.any(inaccurate):
+            result[inaccurate] = svd_map(flat[slc][inaccurate])
+        out_flat[slc] = result
+
+    if not np.may_share_memory(out_flat, out):
+        out[:] = out_flat.reshape(out.shape)
+    return out
+
+
 if __name__ == '__main__':
     from odl.util.testutils import run_doctests
     run_doctests()
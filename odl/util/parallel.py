@@ -0,0 +1,110 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Shared thread pool for internal parallel loops."""
+
+from __future__ import print_function, division, absolute_import
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+
+__all__ = ('parallel_map',)
+
+
+_POOL = None
+_POOL_SIZE = 0
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+_WORKER_STATE = threading.local()
+
+
+def _submit(func, args):
+    """Submit ``func`` for all ``args`` to the shared pool.
+
+    The pool is created on first use with ``cpu_count()`` workers and
+    replaced by a larger one if more workers are requested. A pool
+    inherited from a parent process through ``fork`` has no running
+    threads and is replaced as well.
+    """
+    global _POOL, _POOL_SIZE, _POOL_PID
+    with _POOL_LOCK:
+        if (_POOL is None or _POOL_SIZE < len(args) or
+                _POOL_PID != os.getpid()):
+            if _POOL is not None and _POOL_PID == os.getpid():
+                # Tasks that are already queued still run to completion
+                _POOL.close()
+            _POOL_SIZE = max(len(args), cpu_count())
+            _POOL = ThreadPool(_POOL_SIZE)
+            _POOL_PID = os.getpid()
+
+        # Submit while holding the lock so the pool cannot be closed by
+        # another thread in between
+        return _POOL.map_async(func, args, chunksize=1)
+
+
+def parallel_map(func, items, num_threads=None):
+    """Return ``[func(item) for item in items]``, computed in threads.
+
+    The items are handed out one by one to ``num_threads`` tasks of a
+    lazily created thread pool that is shared across all callers. Calls
+    made from inside a worker of that pool run serially, which avoids
+    deadlocks from nested parallel loops.
+
+    Parameters
+    ----------
+    func : callable
+        Function that is applied to each item.
+    items : iterable
+        Items to which ``func`` is applied.
+    num_threads : positive int, optional
+        Maximum number of items processed concurrently.
+        ``None`` means ``multiprocessing.cpu_count()``.
+
+    Returns
+    -------
+    results : list
+        Return values of ``func``, in the order of ``items``.
+
+    Examples
+    --------
+    >>> parallel_map(abs, [-1, 2, -3], num_threads=2)
+    [1, 2, 3]
+    """
+    items = list(items)
+    if num_threads is None:
+        num_threads = cpu_count()
+    num_threads = max(1, min(int(num_threads), len(items)))
+    if num_threads == 1 or getattr(_WORKER_STATE, 'active', False):
+        return [func(item) for item in items]
+
+    results = [None] * len(items)
+    indexed_items = iter(enumerate(items))
+    lock = threading.Lock()
+
+    def worker(_):
+        """Apply ``func`` to items until none are left."""
+        _WORKER_STATE.active = True
+        try:
+            while True:
+                with lock:
+                    try:
+                        i, item = next(indexed_items)
+                    except StopIteration:
+                        return
+                results[i] = func(item)
+        finally:
+            _WORKER_STATE.active = False
+
+    _submit(worker, range(num_threads)).get()
+    return results
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -0,0 +1,307 @@
+# Copyright 2014-2018 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Profiling of operator evaluations."""
+
+from __future__ import print_function, division, absolute_import
+from builtins import object
+from collections import OrderedDict
+from functools import wraps
+import threading
+from timeit import default_timer
+
+__all__ = ('profile', 'ProfileNode')
+
+
+class ProfileNode(object):
+
+    """Statistics of one operator at one position in the call tree.
+
+    A node collects all calls of operators with the same label that were
+    made from the same parent node. The time is inclusive, i.e., it
+    contains the time spent in the children.
+    """
+
+    def __init__(self, name, parent=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        name : str
+            Label of the operator(s) recorded in this node.
+        parent : `ProfileNode`, optional
+            Node from which the operator is called. ``None`` means that
+            this is a root node.
+        """
+        self.name = str(name)
+        self.parent = parent
+        self.children = OrderedDict()
+        self.calls = 0
+        self.calls_in_place = 0
+        self.time = 0.0
+        self.nbytes = 0
+
+    def child(self, name):
+        """Return the child node ``name``, creating it if necessary."""
+        node = self.children.get(name)
+        if node is None:
+            node = ProfileNode(name, parent=self)
+            self.children[name] = node
+        return node
+
+    @property
+    def calls_out_of_place(self):
+        """Number of calls that returned a newly allocated result."""
+        return self.calls - self.calls_in_place
+
+    @property
+    def self_time(self):
+        """Time spent in this node excluding its children."""
+        return max(self.time - sum(c.time for c in self.children.values()),
+                   0.0)
+
+    @property
+    def path(self):
+        """Tuple of node names from the root to this node."""
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+
+    def walk(self):
+        """Iterate over all nodes of the subtree in depth-first order."""
+        yield self
+        for child in self.children.values():
+            for node in child.walk():
+                yield node
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r}, calls={}, time={:.3g})'.format(
+            self.__class__.__name__, self.name, self.calls, self.time)
+
+
+def _nbytes(obj):
+    """Return the number of bytes occupied by an evaluation result."""
+    try:
+        return int(obj.nbytes)
+    except (AttributeError, TypeError):
+        return 0
+
+
+def _default_label(op):
+    """Return the operator class name as label."""
+    return op.__class__.__name__
+
+
+class profile(object):
+
+    """Context manager recording statistics of operator calls.
+
+    While the context is active, every call ``op(x[, out])`` of an
+    `Operator` (including functionals and composite operators such as
+    `OperatorComp` or `ProductSpaceOperator`) is timed. Calls that happen
+    during the evaluation of another operator are attached as children
+    of that operator's node, such that the recorded tree mirrors the
+    composition structure. Per node, the following is recorded:
+
+    - number of calls, split into in-place (``out`` given) and
+      out-of-place calls,
+    - inclusive wall time and, derived from it, the time spent in the
+      node itself,
+    - number of bytes of newly allocated results of out-of-place calls.
+
+    Examples
+    --------
+    >>> space = odl.rn(3)
+    >>> op = odl.ScalingOperator(space, 2) * odl.IdentityOperator(space)
+    >>> with odl.util.profile() as prof:
+    ...     result = op([1, 2, 3])
+    ...     result = op([1, 2, 3], out=result)
+    >>> comp = prof.root.children['OperatorComp']
+    >>> comp.calls, comp.calls_in_place
+    (2, 1)
+    >>> list(comp.children)
+    ['IdentityOperator', 'ScalingOperator']
+    >>> comp.nbytes  # one out-of-place call with 3 float64 entries
+    24
+
+    The recorded tree can be exported in the "folded stacks" format
+    understood by flame graph tools:
+
+    >>> print(prof.flame_graph(metric='calls'))
+    OperatorComp 0
+    OperatorComp;IdentityOperator 2
+    OperatorComp;ScalingOperator 2
+    """
+
+    _active = None
+    _lock = threading.Lock()
+
+    def __init__(self, label=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        label : callable, optional
+            Function mapping an operator to the string under which its
+            calls are recorded. Calls of operators with the same label
+            and the same parent node are merged.
+            Default: name of the operator class
+        """
+        self.label = _default_label if label is None else label
+        self.root = ProfileNode('<root>')
+        self.__local = threading.local()
+        self.__orig_call = None
+
+    def __enter__(self):
+        """Start recording operator calls."""
+        from odl.operator.operator import Operator
+
+        with profile._lock:
+            if profile._active is not None:
+                raise RuntimeError('only one profiler can be active at a '
+                                   'time')
+            profile._active = self
+
+        orig_call = Operator.__call__
+        profiler = self
+
+        @wraps(orig_call)
+        def profiled_call(op, x, out=None, **kwargs):
+            return profiler._call(orig_call, op, x, out, kwargs)
+
+        self.__orig_call = orig_call
+        Operator.__call__ = profiled_call
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop recording and restore the original ``Operator.__call__``."""
+        from odl.operator.operator import Operator
+
+        Operator.__call__ = self.__orig_call
+        self.__orig_call = None
+        with profile._lock:
+            profile._active = None
+
+    def _current(self):
+        """Return the node of the running operator in this thread.
+
+        Calls from threads other than the one that opened the context are
+        recorded as top-level nodes.
+        """
+        node = getattr(self.__local, 'node', None)
+        return self.root if node is None else node
+
+    def _call(self, orig_call, op, x, out, kwargs):
+        """Evaluate ``orig_call(op, x, out, **kwargs)`` and record it."""
+        parent = self._current()
+        with profile._lock:
+            node = parent.child(self.label(op))
+
+        self.__local.node = node
+        result = None
+        tstart = default_timer()
+        try:
+            result = orig_call(op, x, out=out, **kwargs)
+            return result
+        finally:
+            elapsed = default_timer() - tstart
+            self.__local.node = parent
+            with profile._lock:
+                node.calls += 1
+                node.time += elapsed
+                if out is None:
+                    node.nbytes += _nbytes(result)
+                else:
+                    node.calls_in_place += 1
+
+    @property
+    def nodes(self):
+        """List of all recorded nodes in depth-first order."""
+        return list(self.root.walk())[1:]
+
+    def flame_graph(self, metric='time'):
+        """Return the call tree in the "folded stacks" text format.
+
+        Each line has the form ``parent;child;grandchild value`` and
+        represents one node of the tree. The format can be rendered by
+        e.g. ``flamegraph.pl`` or https://www.speedscope.app.
+
+        Parameters
+        ----------
+        metric : {'time', 'calls', 'bytes'}, optional
+            Value to assign to each line. For ``'time'``, this is the
+            time spent in the node itself (excluding children) in
+            microseconds, and for ``'bytes'`` the number of allocated
+            bytes in the node. Both add up along the stack as expected
+            by flame graph tools.
+
+        Returns
+        -------
+        folded : str
+            One line per node.
+        """
+        metric, metric_in = str(metric).lower(), metric
+        if metric == 'time':
+            def value(node):
+                return int(round(node.self_time * 1e6))
+        elif metric == 'calls':
+            def value(node):
+                return node.calls - sum(
+                    c.calls for c in node.children.values())
+        elif metric == 'bytes':
+            def value(node):
+                return node.nbytes - sum(
+                    c.nbytes for c in node.children.values())
+        else:
+            raise ValueError('`metric` {!r} not understood'
+                             ''.format(metric_in))
+
+        lines = ['{} {}'.format(';'.join(node.path), max(value(node), 0))
+                 for node in self.nodes]
+        return '\n'.join(lines)
+
+    def save_flame_graph(self, filename, metric='time'):
+        """Write `flame_graph` to a text file.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the file to be written.
+        metric : {'time', 'calls', 'bytes'}, optional
+            Value to assign to each node, see `flame_graph`.
+        """
+        with open(filename, 'w') as f:
+            f.write(self.flame_graph(metric=metric))
+            f.write('\n')
+
+    def report(self):
+        """Return a table of the recorded call tree as a string."""
+        header = '{:<40s} {:>8s} {:>8s} {:>12s} {:>12s} {:>12s}'.format(
+            'operator', 'calls', 'inplace', 'time [s]', 'self [s]',
+            'bytes')
+        lines = [header, '-' * len(header)]
+        for node in self.nodes:
+            name = '  ' * (len(node.path) - 1) + node.name
+            lines.append(
+                '{:<40s} {:>8d} {:>8d} {:>12.6f} {:>12.6f} {:>12d}'.format(
+                    name[:40], node.calls, node.calls_in_place, node.time,
+                    node.self_time, node.nbytes))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return self.report()
+
+
+if __name__ == '__main__':
+    from odl.util.testutils import run_doctests
+    run_doctests()
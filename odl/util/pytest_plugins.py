@@ -41,6 +41,10 @@ def pytest_addoption(parser):
     parser.addoption('--benchmark', action='store_true',
                      help='Run benchmarks')
 
+    parser.addoption('--benchmark-json', metavar='PATH', default=None,
+                     help='Store benchmark timings and machine info in a '
+                     'JSON file')
+
     parser.addoption('--examples', action='store_true',
                      help='Run examples')
 
@@ -48,6 +52,13 @@ def pytest_addoption(parser):
                      help='Run doctests in the documentation')
 
 
+def pytest_sessionfinish(session):
+    recorder = getattr(session.config, '_odl_benchmark_recorder', None)
+    filename = session.config.getoption('--benchmark-json')
+    if recorder is not None and len(recorder) > 0 and filename is not None:
+        recorder.save(filename)
+
+
 # --- Ignored tests due to missing modules ---
 
 this_dir = os.path.dirname(__file__)
@@ -135,3 +146,32 @@ arithmetic_op_ids = [" op = '{}' ".format(op)
 def odl_arithmetic_op(request):
     """An arithmetic operator, e.g. +, -, // etc."""
     return request.param
+
+
+@fixture
+def odl_benchmark(request):
+    """Function timing a callable and recording the result.
+
+    Calling ``odl_benchmark(func, *args, **kwargs)`` times
+    ``func(*args, **kwargs)``, stores the timing under the test id and
+    returns the result of the last timed call. With ``--benchmark-json``,
+    all timings are written to a JSON file at the end of the session.
+    """
+    from odl.util.benchmark import BenchmarkRecorder
+
+    config = request.config
+    if getattr(config, '_odl_benchmark_recorder', None) is None:
+        config._odl_benchmark_recorder = BenchmarkRecorder()
+    recorder = config._odl_benchmark_recorder
+    params = getattr(getattr(request.node, 'callspec', None), 'params', None)
+
+    def benchmark(func, *args, **kwargs):
+        result = []
+
+        def timed():
+            result[:] = [func(*args, **kwargs)]
+
+        recorder.run(request.node.nodeid, timed, params=params)
+        return result[0]
+
+    return benchmark
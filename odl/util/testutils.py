@@ -29,6 +29,12 @@ __all__ = (
     'ProgressRange', 'test', 'run_doctests', 'test_file'
 )
 
+# Pytest marks, created on first access since importing pytest is slow.
+# Only the public ones are part of `__all__`.
+_PUBLIC_PYTEST_MARKS = ('never_skip', 'skip_if_no_pywavelets',
+                        'skip_if_no_pyfftw', 'skip_if_no_largescale')
+_PYTEST_MARKS = _PUBLIC_PYTEST_MARKS + ('skip_if_no_benchmark',)
+
 
 def _ndigits(a, b, default=None):
     """Return number of expected correct digits comparing ``a`` and ``b``.
@@ -183,44 +189,54 @@ def is_subdict(subdict, dictionary):
     return all(item in dictionary.items() for item in subdict.items())
 
 
-try:
-    # Try catch in case user does not have pytest
-    import pytest
-except ImportError:
-    def _pass(function):
-        """Trivial decorator used if pytest marks are not available."""
-        return function
-
-    never_skip = _pass
-    skip_if_no_pywavelets = _pass
-    skip_if_no_pyfftw = _pass
-    skip_if_no_largescale = _pass
-    skip_if_no_benchmark = _pass
+def _pytest_marks():
+    """Return a dictionary of the pytest marks used in the ODL tests."""
+    try:
+        # Try catch in case user does not have pytest
+        import pytest
+    except ImportError:
+        def _pass(function):
+            """Trivial decorator used if pytest marks are not available."""
+            return function
+
+        return {name: _pass for name in _PYTEST_MARKS}
+
+    return {
+        # Used in lists where the elements should all be skipifs
+        'never_skip': pytest.mark.skipif(
+            "False",
+            reason='Fill in, never skips'
+        ),
+        'skip_if_no_pywavelets': pytest.mark.skipif(
+            "not odl.trafos.PYWT_AVAILABLE",
+            reason='PyWavelets not available'
+        ),
+        'skip_if_no_pyfftw': pytest.mark.skipif(
+            "not odl.trafos.PYFFTW_AVAILABLE",
+            reason='pyFFTW not available'
+        ),
+        'skip_if_no_largescale': pytest.mark.skipif(
+            "not config.getoption('--largescale')",
+            reason='Need --largescale option to run'
+        ),
+        'skip_if_no_benchmark': pytest.mark.skipif(
+            "not config.getoption('--benchmark')",
+            reason='Need --benchmark option to run'
+        ),
+    }
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Create the pytest marks on first access."""
+        if name in _PYTEST_MARKS:
+            marks = _pytest_marks()
+            globals().update(marks)
+            return marks[name]
+        raise AttributeError('module {!r} has no attribute {!r}'
+                             ''.format(__name__, name))
 else:
-    # Used in lists where the elements should all be skipifs
-    never_skip = pytest.mark.skipif(
-        "False",
-        reason='Fill in, never skips'
-    )
-
-    skip_if_no_pywavelets = pytest.mark.skipif(
-        "not odl.trafos.PYWT_AVAILABLE",
-        reason='PyWavelets not available'
-    )
-
-    skip_if_no_pyfftw = pytest.mark.skipif(
-        "not odl.trafos.PYFFTW_AVAILABLE",
-        reason='pyFFTW not available')
-
-    skip_if_no_largescale = pytest.mark.skipif(
-        "not pytest.config.getoption('--largescale')",
-        reason='Need --largescale option to run'
-    )
-
-    skip_if_no_benchmark = pytest.mark.skipif(
-        "not pytest.config.getoption('--benchmark')",
-        reason='Need --benchmark option to run'
-    )
+    globals().update(_pytest_marks())
 
 
 def simple_fixture(name, params, fmt=None):
@@ -249,6 +265,7 @@ def simple_fixture(name, params, fmt=None):
             - ``" {name}={value} "`` for other types.
     """
     import _pytest
+    import pytest
 
     if fmt is None:
         # Use some intelligence to make good format strings
@@ -183,11 +183,39 @@ for name, n_in, n_out, doc in UFUNCS:
 # --- Wrappers for `ProductSpaceElement` --- #
 
 
+def _block_data(*elems):
+    """Return the contiguous data of ``elems``, or ``None``.
+
+    Scalars are passed through, and ``None`` is returned if any other
+    element does not store its parts in one array.
+    """
+    data = []
+    for elem in elems:
+        if np.isscalar(elem):
+            data.append(elem)
+        elif getattr(elem, 'data', None) is None:
+            return None
+        else:
+            data.append(elem.data)
+    return data
+
+
 def wrap_ufunc_productspace(name, n_in, n_out, doc):
     """Return ufunc wrapper for `ProductSpaceUfuncs`."""
+    ufunc = getattr(np, name)
     if n_in == 1:
         if n_out == 1:
             def wrapper(self, out=None, **kwargs):
+                # Single call for contiguously stored elements
+                data = _block_data(self.elem, *([] if out is None else [out]))
+                if data is not None:
+                    if out is None:
+                        return self.elem.space.element(ufunc(data[0],
+                                                             **kwargs))
+                    else:
+                        ufunc(data[0], out=data[1], **kwargs)
+                        return out
+
                 if out is None:
                     result = [getattr(x.ufuncs, name)(**kwargs)
                               for x in self.elem]
@@ -213,6 +241,20 @@ def wrap_ufunc_productspace(name, n_in, n_out, doc):
     elif n_in == 2:
         if n_out == 1:
             def wrapper(self, x2, out=None, **kwargs):
+                # Single call for contiguously stored elements
+                if x2 in self.elem.space or np.isscalar(x2):
+                    data = _block_data(self.elem, x2,
+                                       *([] if out is None else [out]))
+                else:
+                    data = None
+                if data is not None:
+                    if out is None:
+                        return self.elem.space.element(
+                            ufunc(data[0], data[1], **kwargs))
+                    else:
+                        ufunc(data[0], data[1], out=data[2], **kwargs)
+                        return out
+
                 if x2 in self.elem.space:
                     if out is None:
                         result = [getattr(x.ufuncs, name)(x2p, **kwargs)
@@ -260,6 +302,8 @@ class ProductSpaceUfuncs(object):
         numpy.sum
         prod
         """
+        if self.elem.data is not None:
+            return np.sum(self.elem.data)
         results = [x.ufuncs.sum() for x in self.elem]
         return np.sum(results)
 
@@ -271,6 +315,8 @@ class ProductSpaceUfuncs(object):
         numpy.prod
         sum
         """
+        if self.elem.data is not None:
+            return np.prod(self.elem.data)
         results = [x.ufuncs.prod() for x in self.elem]
         return np.prod(results)
 
@@ -282,6 +328,8 @@ class ProductSpaceUfuncs(object):
         numpy.amin
         max
         """
+        if self.elem.data is not None:
+            return np.min(self.elem.data)
         results = [x.ufuncs.min() for x in self.elem]
         return np.min(results)
 
@@ -293,6 +341,8 @@ class ProductSpaceUfuncs(object):
         numpy.amax
         min
         """
+        if self.elem.data is not None:
+            return np.max(self.elem.data)
         results = [x.ufuncs.max() for x in self.elem]
         return np.max(results)
 